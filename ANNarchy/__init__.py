@@ -15,8 +15,9 @@ from .core.SpecificProjection import DecodingProjection
 from .core.Dendrite import Dendrite
 from .core.Random import Uniform, DiscreteUniform, Normal, LogNormal, Gamma, Exponential
 from .core.IO import save, load, load_parameter, load_parameters, save_parameters
+from .core.Checkpoint import Checkpoint
 from .core.Utils import sparse_random_matrix
-from .core.Monitor import Monitor, BoldMonitor, raster_plot, histogram, population_rate, smoothed_rate, mean_fr
+from .core.Monitor import Monitor, BoldMonitor, raster_plot, histogram, population_rate, smoothed_rate, mean_fr, inter_spike_interval, coefficient_of_variation
 from .core.Network import Network, parallel_run
 from .parser.report.Report import report
 from .models import *
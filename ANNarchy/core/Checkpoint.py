@@ -0,0 +1,212 @@
+#===============================================================================
+#
+#     Checkpoint.py
+#
+#     This file is part of ANNarchy.
+#
+#     Copyright (C) 2013-2016  Julien Vitay <julien.vitay@gmail.com>,
+#     Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     ANNarchy is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#===============================================================================
+from ANNarchy.core import Global
+from ANNarchy.core import IO
+from ANNarchy.core import Simulate
+import numpy as np
+import hashlib, json, os, shutil, threading
+
+
+class Checkpoint(object):
+    """
+    Periodically saves the state of the network during ``simulate()``, so that long simulations can be resumed after an interruption.
+
+    Example::
+
+        checkpoint = Checkpoint('checkpoints/', period=60000.)
+        simulate(24*3600*1000.)
+        checkpoint.wait()
+
+    Every ``period`` ms of simulated time, the values of all attributes of the populations and projections are copied and written to the disk by a background thread while the simulation continues. Each checkpoint is a sub-directory of ``directory`` (``step_<t>/``) using the directory format of ``save()``. Arrays which did not change since the previous checkpoint (e.g. parameters, or weights when learning is disabled) are not written again but hard-linked to the previous file.
+
+    Only completely written checkpoints are considered for restoring. After an interruption, the network has to be created and compiled as before, and the last checkpoint can be loaded with::
+
+        checkpoint = Checkpoint('checkpoints/', period=60000.)
+        t = checkpoint.restore()
+        simulate(T - t)
+
+    As for ``every``, the checkpoints are only taken by ``simulate()`` when callbacks are enabled, and the period is counted from the start of each call to ``simulate()``. Recorded data and the state of the random number generators are not saved.
+    """
+
+    def __init__(self, directory, period, populations=True, projections=True, keep=2, net_id=0):
+        """
+        *Parameters:*
+
+        * **directory**: directory where the checkpoints are stored.
+        * **period**: interval in ms of simulated time between two checkpoints.
+        * **populations**: if True, population data will be saved (default: True).
+        * **projections**: if True, projection data will be saved (default: True).
+        * **keep**: number of complete checkpoints kept in the directory, older ones are deleted (default: 2).
+        * **net_id**: ID of the network (default: 0, the global network).
+        """
+        self.directory = directory
+        self.populations = populations
+        self.projections = projections
+        self.keep = max(int(keep), 1)
+        self.net_id = net_id
+
+        # Background writing
+        self._thread = None
+        self._exception = None
+
+        # Digest and file of each array in the last checkpoint
+        self._digests = {}
+
+        # Complete checkpoints, oldest first
+        self._checkpoints = []
+        if os.path.isdir(directory):
+            steps = [int(d[5:]) for d in os.listdir(directory) if d.startswith('step_') and d[5:].isdigit()]
+            self._checkpoints = [os.path.join(directory, 'step_' + str(t)) for t in sorted(steps)]
+
+        # Periodic callback
+        self._callback = Simulate.every(period=period, wait=period, net_id=net_id)
+        self._callback(self._periodic)
+
+    def _periodic(self, n):
+        "Callback called by simulate()."
+        self.save()
+
+    def save(self):
+        """
+        Takes a checkpoint at the current time. The data is copied immediately, the method returns before it is written.
+        """
+        self.wait()
+
+        # Copy the data, the simulation can be resumed afterwards
+        objects = []
+        if self.populations:
+            for pop in Global._network[self.net_id]['populations']:
+                desc, arrays = pop._binary_data()
+                objects.append((pop.name, 'populations', desc, list(arrays)))
+        if self.projections:
+            for proj in Global._network[self.net_id]['projections']:
+                if not proj._saveable:
+                    continue
+                desc, arrays = proj._binary_data()
+                objects.append((proj.name, 'projections', desc, list(arrays)))
+
+        self._thread = threading.Thread(target=self._write, args=(Global.get_current_step(self.net_id), objects))
+        self._thread.start()
+
+    def wait(self):
+        """
+        Waits until the last checkpoint is completely written.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._exception is not None:
+            e = self._exception
+            self._exception = None
+            Global._error('Checkpoint: unable to write the checkpoint in', self.directory, ':', e)
+
+    def stop(self):
+        """
+        Stops taking checkpoints during ``simulate()`` and waits for the last one to be written.
+        """
+        if self._callback in Simulate._callbacks[self.net_id]:
+            Simulate._callbacks[self.net_id].remove(self._callback)
+        self.wait()
+
+    def restore(self):
+        """
+        Loads the last complete checkpoint of the directory into the network.
+
+        *Returns:*
+
+        * the time (in ms) at which the checkpoint was taken, or None if there is no checkpoint.
+        """
+        self.wait()
+
+        try:
+            with open(os.path.join(self.directory, 'latest.json'), 'r') as rfile:
+                latest = json.load(rfile)
+        except IOError:
+            Global._warning('Checkpoint: no checkpoint found in', self.directory)
+            return None
+
+        IO._load_binary(os.path.join(self.directory, latest['checkpoint']), self.populations, self.projections, self.net_id)
+        return latest['time_step'] * Global.config['dt']
+
+    def _write(self, time_step, objects):
+        "Writes a checkpoint in the background thread."
+        try:
+            name = 'step_' + str(time_step)
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+            names = {'populations': [], 'projections': []}
+            digests = {}
+            for obj_name, obj_type, desc, arrays in objects:
+                obj_path = os.path.join(path, obj_name)
+                os.makedirs(obj_path)
+                for array_name, array in arrays:
+                    array = np.ascontiguousarray(array)
+                    digest = (hashlib.sha1(array).hexdigest(), array.dtype.str, array.shape)
+                    filename = os.path.join(obj_path, array_name + '.bin')
+                    previous = self._digests.get((obj_name, array_name))
+                    if previous is not None and previous[0] == digest and self._link(previous[1], filename):
+                        desc['arrays'][array_name] = IO._array_description(array)
+                    else:
+                        IO._write_array(obj_path, array_name, array, desc['arrays'])
+                    digests[(obj_name, array_name)] = (digest, filename)
+                IO._write_description(obj_path, desc)
+                names[obj_type].append(obj_name)
+
+            IO._write_network_description(path, time_step, names['populations'], names['projections'], self.net_id)
+
+            # The checkpoint is complete
+            tmp_file = os.path.join(self.directory, 'latest.json.tmp')
+            with open(tmp_file, 'w') as wfile:
+                json.dump({'checkpoint': name, 'time_step': int(time_step)}, wfile)
+            self._replace(tmp_file, os.path.join(self.directory, 'latest.json'))
+
+            self._digests = digests
+            if path in self._checkpoints:
+                self._checkpoints.remove(path)
+            self._checkpoints.append(path)
+            while len(self._checkpoints) > self.keep:
+                shutil.rmtree(self._checkpoints.pop(0), ignore_errors=True)
+
+        except Exception as e:
+            self._exception = e
+
+    def _link(self, source, destination):
+        "Hard-links an unchanged file of the previous checkpoint, returns False if it is not possible."
+        try:
+            os.link(source, destination)
+            return True
+        except OSError:
+            return False
+
+    def _replace(self, source, destination):
+        "Renames source into destination, atomically replacing an existing file."
+        if hasattr(os, 'replace'):
+            os.replace(source, destination)
+        else: # Python 2: os.rename() only replaces existing files on POSIX systems
+            if os.name == 'nt' and os.path.exists(destination):
+                os.remove(destination)
+            os.rename(source, destination)
@@ -72,7 +72,7 @@ def connect_all_to_all(self, weights, delays=0.0, allow_self_connections=False,
 
     *Additional Parameter*:
 
-    * **storage_format**: for some of the default connection patterns ANNarchy provide different storage formats. For all-to-all we support list-of-list ("lil") or compressed sparse row ("csr"), by default lil is chosen.
+    * **storage_format**: for some of the default connection patterns ANNarchy provide different storage formats. For all-to-all we support list-of-list ("lil"), compressed sparse row ("csr") or, for rate-coded synapses, sliced ELLPACK ("sell"), by default lil is chosen.
     * **storage_order**: for some of the available storage formats ANNarchy provides different storage orderings. For all-to-all we support pre_to_post and post_to_pre, by default post_to_pre is chosen.
 
     Please note, these arguments should be changed carefully, as they can have large impact on the computational performance of ANNarchy.
@@ -156,6 +156,39 @@ def connect_dog(self, amp_pos, sigma_pos, amp_neg, sigma_neg, delays=0.0, limit=
     self._store_connectivity( dog, (amp_pos, sigma_pos, amp_neg, sigma_neg, delays, limit, allow_self_connections,  "lil", "post_to_pre"), delays,  "lil", "post_to_pre")
     return self
 
+def connect_distance(self, kernel, radius, delays=0.0, allow_self_connections=False):
+    """
+    Builds a distance-based connection pattern between the two populations.
+
+    Each neuron in the postsynaptic population is connected to all neurons of the presynaptic population whose
+    normalized position lies within ``radius`` of its own normalized position. The weight of each synapse is
+    given by ``kernel(distance)``.
+
+    Example:
+
+    .. code-block:: python
+
+        proj.connect_distance(kernel = lambda d: 1.0 - d/0.2, radius = 0.2)
+
+    *Parameters*:
+
+    * **kernel**: function taking a NumPy array of distances (in normalized coordinates) and returning the corresponding weights.
+    * **radius**: maximal distance between two connected neurons (in normalized coordinates).
+    * **delays**: synaptic delay, either a single value or a random distribution object (default=dt).
+    * **allow_self_connections**: allows connections between a neuron and itself.
+    """
+    if self.pre!=self.post:
+        allow_self_connections = True
+
+    if isinstance(self.pre, PopulationView) or isinstance(self.post, PopulationView):
+        Global._error('Distance-based connector is only possible on whole populations, not PopulationViews.')
+
+    self.connector_name = "Distance-based"
+    self.connector_description = "Distance-based, kernel %(kernel)s, radius %(radius)s, delays %(delay)s"% {'kernel': getattr(kernel, '__name__', str(kernel)), 'radius': str(radius), 'delay': _process_random(delays)}
+
+    self._store_connectivity( distance, (kernel, radius, delays, allow_self_connections, "lil", "post_to_pre"), delays)
+    return self
+
 def connect_fixed_probability(self, probability, weights, delays=0.0, allow_self_connections=False, force_multiple_weights=False, storage_format="lil", storage_order="post_to_pre"):
     """
     Builds a probabilistic connection pattern between the two populations.
@@ -169,7 +202,7 @@ def connect_fixed_probability(self, probability, weights, delays=0.0, allow_self
     * **delays**: either a single value for all synapses or a RandomDistribution object (default = dt)
     * **allow_self_connections** : defines if self-connections are allowed (default=False).
     * **force_multiple_weights**: if a single value is provided for ``weights`` and there is no learning, a single weight value will be used for the whole projection instead of one per synapse. Setting ``force_multiple_weights`` to True ensures that a value per synapse will be used.
-    * **storage_format**: for some of the default connection patterns ANNarchy provide different storage formats. For all-to-all we support list-of-list ("lil") or compressed sparse row ("csr"), by default lil is chosen.
+    * **storage_format**: for some of the default connection patterns ANNarchy provide different storage formats. For all-to-all we support list-of-list ("lil"), compressed sparse row ("csr") or, for rate-coded synapses, sliced ELLPACK ("sell"), by default lil is chosen.
     """
     if self.pre!=self.post:
         allow_self_connections = True
@@ -196,6 +229,7 @@ def connect_fixed_number_pre(self, number, weights, delays=0.0, allow_self_conne
     * **delays**: either a single value for all synapses or a RandomDistribution object (default = dt)
     * **allow_self_connections** : defines if self-connections are allowed (default=False).
     * **force_multiple_weights**: if a single value is provided for ``weights`` and there is no learning, a single weight value will be used for the whole projection instead of one per synapse. Setting ``force_multiple_weights`` to True ensures that a value per synapse will be used.
+    * **storage_format**: list-of-list ("lil"), compressed sparse row ("csr") or, for rate-coded synapses, sliced ELLPACK ("sell"), by default lil is chosen.
     """
     if self.pre!=self.post:
         allow_self_connections = True
@@ -22,6 +22,7 @@
 #
 #===============================================================================
 import ANNarchy.core.Global as Global
+import ANNarchy.core.Simulate as Simulate
 from ANNarchy.core import Synapse
 from ANNarchy.core.Random import RandomDistribution
 
@@ -240,6 +241,8 @@ class Dendrite(object):
             Global._error('"structural_plasticity" has not been set to True in setup(), can not add the synapse.')
             return
 
+        Simulate._check_object_not_running('create_synapse()', self.proj)
+
         if rank in self.pre_ranks:
             Global._error('the synapse of rank ' + str(rank) + ' already exists.')
             return
@@ -271,6 +274,8 @@ class Dendrite(object):
             Global._error('"structural_plasticity" has not been set to True in setup(), can not remove the synapse.')
             return
 
+        Simulate._check_object_not_running('prune_synapse()', self.proj)
+
         if not rank in self.pre_ranks:
             Global._error('the synapse with the pre-synaptic neuron of rank ' + str(rank) + ' did not already exist.')
             return
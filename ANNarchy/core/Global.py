@@ -41,6 +41,7 @@ _network = [
         'monitors': [],
         'instance': None,
         'compiled': False,
+        'ensemble': 1,
         'directory': os.getcwd() + "/annarchy/"
     },
 ]
@@ -59,7 +60,12 @@ config = dict(
     'seed': -1,
     'structural_plasticity': False,
     'profiling': False,
-    'profile_out': None
+    'profile_out': None,
+    'compilation_cache': True,
+    'cache_dir': None,
+    'cache_size': 1024,
+    'build_jobs': None,
+    'compiler_launcher': "auto"
    }
 )
 
@@ -115,6 +121,16 @@ def setup(**keyValueArgs):
 
     * **seed**: the seed (integer) to be used in the random number generators (default = -1 is equivalent to time(NULL)).
 
+    * **compilation_cache**: if True, compiled networks are stored in a user-level cache and reused when the generated code is identical (default: True).
+
+    * **cache_dir**: directory of the compilation cache (default = None is equivalent to ``~/.cache/ANNarchy``).
+
+    * **cache_size**: maximal size of the compilation cache in MB, the least recently used libraries are removed first (default: 1024).
+
+    * **build_jobs**: number of parallel jobs used to compile the generated code (default = None is equivalent to the number of cores).
+
+    * **compiler_launcher**: compiler cache prepended to the compiler calls. The default "auto" uses ccache or sccache if one of them is installed, "" disables it.
+
     The following parameters are mainly for debugging and profiling, and should be ignored by most users:
 
     * **verbose**: shows details about compilation process on console (by default False). Additional some information of the network construction will be shown.
@@ -408,6 +424,7 @@ def _add_network():
             'monitors': [],
             'instance': None,
             'compiled': False,
+            'ensemble': 1,
             'directory': os.getcwd() + "/annarchy/"
         }
     )
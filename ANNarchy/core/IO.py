@@ -360,6 +360,8 @@ def save(filename, populations=True, projections=True, net_id=0):#, pure_data=Tr
 
     * If the extension is '.npz', the data will be saved and compressed using `np.savez_compressed` (recommended).
 
+    * If the filename ends with a path separator (e.g. 'results/init/'), the data will be saved in a directory with one sub-directory per population/projection, each array being written as a raw binary file (recommended for large networks, see below).
+
     * If the extension is '.mat', the data will be saved as a Matlab 7.2 file. Scipy must be installed.
 
     * If the extension ends with '.gz', the data will be pickled into a binary file and compressed using gzip.
@@ -388,7 +390,14 @@ def save(filename, populations=True, projections=True, net_id=0):#, pure_data=Tr
 
         save('1000_trials.mat')
 
+        save('results/init/')
+
+    In the directory format, each array (ranks, connectivity and values of each variable) is stored in little-endian byte order in a ``.bin`` file, described by a ``description.json`` file in the same sub-directory. The arrays are written one after the other, so the whole network never has to be gathered in memory, and they can be read without ANNarchy using ``np.memmap``.
     """
+    if _is_binary(filename):
+        _save_binary(filename, populations, projections, net_id)
+        return
+
     data = _net_description(populations, projections, net_id)
     _save_data(filename, data)
 
@@ -463,7 +472,12 @@ def load(filename, populations=True, projections=True, net_id=0):
 
         load('results/network.npz')
 
+        load('results/init/')
+
     """
+    if _is_binary(filename):
+        _load_binary(filename, populations, projections, net_id)
+        return
 
     desc = _load_data(filename)
     if desc is None:
@@ -519,3 +533,138 @@ def _net_description(populations, projections, net_id=0):
     }
 
     return network_desc
+
+
+################################
+## Binary (directory) format
+################################
+def _is_binary(filename):
+    """
+    The binary format is used when the file name ends with a path separator, or when it is a directory previously written in this format (containing network.json or description.json). Other existing directories are not considered.
+    """
+    if filename.endswith(os.sep) or filename.endswith('/'):
+        return True
+    return os.path.isfile(os.path.join(filename, 'network.json')) or os.path.isfile(os.path.join(filename, 'description.json'))
+
+def _save_binary(dirname, populations=True, projections=True, net_id=0):
+    """
+    Saves the network in a directory, with one sub-directory per population/projection.
+    """
+    Global._print("Saving network in binary format...")
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    pop_names = []
+    proj_names = []
+
+    if populations:
+        for pop in Global._network[net_id]['populations']:
+            pop._save_binary(os.path.join(dirname, pop.name))
+            pop_names.append(pop.name)
+
+    if projections:
+        for proj in Global._network[net_id]['projections']:
+            if not proj._saveable:
+                continue
+            proj._save_binary(os.path.join(dirname, proj.name))
+            proj_names.append(proj.name)
+
+    _write_network_description(dirname, Global.get_current_step(net_id), pop_names, proj_names, net_id)
+
+def _write_network_description(dirname, time_step, pop_names, proj_names, net_id=0):
+    "Writes dirname/network.json, listing the objects saved in the directory."
+    import json
+    network_desc = {
+        'time_step': int(time_step),
+        'net_id': net_id,
+        'obj_names': {
+            'populations': pop_names,
+            'projections': proj_names,
+        }
+    }
+    with open(os.path.join(dirname, 'network.json'), 'w') as wfile:
+        json.dump(network_desc, wfile, indent=4)
+
+def _load_binary(dirname, populations=True, projections=True, net_id=0):
+    """
+    Loads a network saved by _save_binary().
+    """
+    import json
+
+    try:
+        with open(os.path.join(dirname, 'network.json'), 'r') as rfile:
+            desc = json.load(rfile)
+    except Exception as e:
+        Global._print('Unable to read the directory ' + dirname)
+        Global._print(e)
+        return
+
+    Global.set_current_step(desc['time_step'], net_id)
+
+    if populations:
+        for pop in Global._network[net_id]['populations']:
+            if pop.name in desc['obj_names']['populations']:
+                pop._load_binary(os.path.join(dirname, pop.name))
+
+    if projections:
+        for proj in Global._network[net_id]['projections']:
+            if proj.name in desc['obj_names']['projections']:
+                proj._load_binary(os.path.join(dirname, proj.name))
+
+def _write_binary(path, desc, arrays):
+    """
+    Writes an object in the directory ``path``: the (name, array) pairs of the iterator ``arrays`` as raw binary files, then the description.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    for name, array in arrays:
+        _write_array(path, name, array, desc['arrays'])
+    _write_description(path, desc)
+
+def _write_description(path, desc):
+    "Writes the description of an object (everything except the arrays) in path/description.json."
+    import json
+    with open(os.path.join(path, 'description.json'), 'w') as wfile:
+        json.dump(desc, wfile, indent=4)
+
+def _read_description(path):
+    "Reads the description written by _write_description()."
+    import json
+    with open(os.path.join(path, 'description.json'), 'r') as rfile:
+        return json.load(rfile)
+
+def _write_array(path, name, array, arrays):
+    """
+    Writes an array in little-endian byte order into path/name.bin. Its type and shape are stored in the dictionary ``arrays``.
+    """
+    array = np.ascontiguousarray(array)
+    arrays[name] = _array_description(array)
+    array.astype(arrays[name]['dtype'], copy=False).tofile(os.path.join(path, name + '.bin'))
+
+def _array_description(array):
+    "Type (in little-endian byte order) and shape of an array written by _write_array()."
+    return {'dtype': array.dtype.newbyteorder('<').str, 'shape': list(array.shape)}
+
+def _read_array(path, name, arrays):
+    """
+    Memory-maps an array written by _write_array(): the data is only read from the disk when accessed.
+    """
+    dtype = np.dtype(arrays[name]['dtype'])
+    shape = tuple(arrays[name]['shape'])
+    if int(np.prod(shape)) == 0: # empty files can not be mapped
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(os.path.join(path, name + '.bin'), dtype=dtype, mode='r', shape=shape)
+
+class _BinaryArrays(object):
+    """
+    Read-only mapping over the arrays of a directory written by _write_binary(), each array is memory-mapped when accessed.
+    """
+    def __init__(self, path, arrays):
+        self.path = path
+        self.arrays = arrays
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    def __getitem__(self, name):
+        return _read_array(self.path, name, self.arrays)
@@ -22,6 +22,7 @@
 #
 #===============================================================================
 from . import Global
+from . import Simulate
 from .Population import Population
 from .PopulationView import PopulationView
 from .Projection import Projection
@@ -104,6 +105,8 @@ class Monitor(object):
         self._recorded_variables = {}
 
         # Add the monitor to the global variable
+        if Global._network[self.net_id]['compiled']:
+            Simulate._check_not_running('Monitor()', self.net_id)
         self.id = len(Global._network[self.net_id]['monitors'])
 
         Global._network[self.net_id]['monitors'].append(self)
@@ -170,7 +173,9 @@ class Monitor(object):
         "Creates the C++ object and starts the recording for a population."
 
         if isinstance(self.object, PopulationView):
-            self.ranks = self.object.ranks
+            # In ensemble mode, the neurons of the view are recorded in all instances
+            size = self.object.population.size
+            self.ranks = [rk + k * size for k in range(Global._network[self.net_id]['ensemble']) for rk in self.object.ranks]
         else:
             self.ranks = [-1]
 
@@ -265,6 +270,7 @@ class Monitor(object):
 
     def resume(self):
         "Resumes the recordings."
+        Simulate._check_not_running('Monitor.resume()', self.net_id)
         # Start recording the variables
         for var in self.variables:
             name = var
@@ -286,7 +292,8 @@ class Monitor(object):
             self._recorded_variables[var]['start'].append(Global.get_current_step(self.net_id))
 
     def pause(self):
-        "Resumes the recordings."
+        "Pauses the recordings."
+        Simulate._check_not_running('Monitor.pause()', self.net_id)
         # Start recording the variables
         for var in self.variables:
             name = var
@@ -309,6 +316,7 @@ class Monitor(object):
 
     def stop(self):
         "Stops the recordings."
+        Simulate._check_not_running('Monitor.stop()', self.net_id)
         # Stop and clear the variables
         for var in self.variables:
             name = var
@@ -331,10 +339,18 @@ class Monitor(object):
 
         self.variables = []
         self._recorded_variables = {}
-        Global._network[0]['instance'].remove_recorder(self.cyInstance)
+        Global._network[self.net_id]['instance'].remove_recorder(self.cyInstance)
         self.cyInstance = None
 
 
+    def _reset(self):
+        "Discards the recorded data and restarts the time bookkeeping at the current step. Used by parallel_run() when a network is reused."
+        if self.cyInstance is None:
+            return
+        for var in list(self._recorded_variables.keys()):
+            self.get(var)
+            self._recorded_variables[var] = {'start': [Global.get_current_step(self.net_id)], 'stop': [Global.get_current_step(self.net_id)]}
+
     def get(self, variables=None, keep=False, reshape=False, force_dict=False):
         """
         Returns the recorded variables as a Numpy array (first dimension is time, second is neuron index).
@@ -352,10 +368,13 @@ class Monitor(object):
 
         * **reshape**: transforms the second axis of the array to match the population's geometry (default: False).
         """
+        Simulate._check_not_running('Monitor.get()', self.net_id)
 
         def reshape_recording(self, data):
             if not reshape:
                 return data
+            elif isinstance(self.object, Population) and Global._network[self.net_id]['ensemble'] > 1:
+                return data.reshape((data.shape[0], Global._network[self.net_id]['ensemble']) + self.object.geometry)
             else:
                 return data.reshape((data.shape[0],) + self.object.geometry)
 
@@ -409,6 +428,10 @@ class Monitor(object):
 
 
     def _get_population(self, pop, name, keep):
+        # Variables stored in contiguous buffers (openMP) are directly returned as arrays
+        if hasattr(self.cyInstance, 'get_' + name):
+            return getattr(self.cyInstance, 'get_' + name)(keep)
+
         try:
             data = getattr(self.cyInstance, name)
             if not keep:
@@ -453,6 +476,19 @@ class Monitor(object):
     ###############################
     ### Spike visualisation stuff
     ###############################
+    def _spike_data(self, spikes):
+        """
+        Returns the dictionary of recorded spikes to be analysed: ``spikes`` if provided, the result of ``get('spike')`` otherwise.
+        """
+        if not 'spike' in self.variables:
+            Global._error('Monitor: spike was not recorded')
+
+        if not spikes:
+            return self.get('spike')
+        if 'spike' in spikes.keys():
+            return spikes['spike']
+        return spikes
+
     def raster_plot(self, spikes=None):
         """ 
         Returns two vectors representing for each recorded spike 1) the spike times and 2) the ranks of the neurons.
@@ -477,26 +513,7 @@ class Monitor(object):
             plot(spike_times, spike_ranks, '.')
 
         """
-        times = []; ranks=[]
-        if not 'spike' in self.variables:
-            Global._error('Monitor: spike was not recorded')
-
-        # Get data
-        if not spikes:
-            data = self.get('spike')
-        else:
-            if 'spike' in spikes.keys():
-                data = spikes['spike']
-            else:
-                data = spikes
-
-        # Compute raster
-        for n in data.keys():
-            for t in data[n]:
-                times.append(t)
-                ranks.append(n)
-
-        return Global.dt()* np.array(times), np.array(ranks)
+        return raster_plot(self._spike_data(spikes))
 
     def histogram(self, spikes=None, bins=None):
         """ 
@@ -523,17 +540,7 @@ class Monitor(object):
             plot(histo)
 
         """
-        if not 'spike' in self.variables:
-            Global._error('Monitor: spike was not recorded')
-
-        # Get data
-        if not spikes:
-            data = self.get('spike')
-        else:
-            if 'spike' in spikes.keys():
-                data = spikes['spike']
-            else:
-                data = spikes
+        data = self._spike_data(spikes)
 
         if not bins:
             bins =  Global.config['dt']
@@ -545,16 +552,11 @@ class Monitor(object):
         # Number of bins
         nb_bins = int(duration*Global.config['dt']/bins)
 
-        # Initialize histogram
-        histo = [0 for t in range(nb_bins)]
-
         # Compute histogram
-        neurons = self.object.ranks if isinstance(self.object, PopulationView) else range(self.object.size)
-        for neuron in neurons:
-            for t in data[neuron]:
-                histo[int((t-t_start)/float(bins/Global.config['dt']))] += 1
+        times, _ = _spike_arrays(data)
+        idx = ((times - t_start)/float(bins/Global.config['dt'])).astype(np.int64)
 
-        return np.array(histo)
+        return np.bincount(idx[idx >= 0], minlength=nb_bins)
 
     def mean_fr(self, spikes=None):
         """ 
@@ -578,18 +580,7 @@ class Monitor(object):
             fr = m.mean_fr(spikes)
 
         """
-        if not 'spike' in self.variables:
-            Global._error('Monitor: spike was not recorded')
-
-        # Get data
-        if not spikes:
-            data = self.get('spike')
-        else:
-            if 'spike' in spikes.keys():
-                data = spikes['spike']
-            else:
-                data = spikes
-
+        data = self._spike_data(spikes)
 
         # Compute the duration of the recordings
         duration = self._recorded_variables['spike']['stop'][-1] - self._recorded_variables['spike']['start'][-1]
@@ -598,14 +589,10 @@ class Monitor(object):
         neurons = self.object.ranks if isinstance(self.object, PopulationView) else range(self.object.size)
 
         # Compute fr
-        fr = 0
-        for neuron in neurons:
-            fr += len(data[neuron])
+        fr = sum([len(data[neuron]) for neuron in neurons])
 
         return fr/float(len(neurons))/duration/Global.dt()*1000.0
 
-
-
     def smoothed_rate(self, spikes=None, smooth=0.):
         """ 
         Computes the smoothed firing rate of the recorded spiking neurons.
@@ -624,17 +611,7 @@ class Monitor(object):
             r = m.smoothed_rate(smooth=100.)
 
         """
-        if not 'spike' in self.variables:
-            Global._error('Monitor: spike was not recorded')
-
-        # Get data
-        if not spikes:
-            data = self.get('spike')
-        else:
-            if 'spike' in spikes.keys():
-                data = spikes['spike']
-            else:
-                data = spikes
+        data = self._spike_data(spikes)
 
         import ANNarchy.core.cython_ext.Transformations as Transformations
         return Transformations.smoothed_rate(
@@ -668,17 +645,7 @@ class Monitor(object):
             r = m.population_rate(smooth=100.)
 
         """
-        if not 'spike' in self.variables:
-            Global._error('Monitor: spike was not recorded')
-
-        # Get data
-        if not spikes:
-            data = self.get('spike')
-        else:
-            if 'spike' in spikes.keys():
-                data = spikes['spike']
-            else:
-                data = spikes
+        data = self._spike_data(spikes)
 
         import ANNarchy.core.cython_ext.Transformations as Transformations
         return Transformations.population_rate(
@@ -690,6 +657,48 @@ class Monitor(object):
             smooth
         )
 
+    def inter_spike_interval(self, spikes=None, ranks=None, per_neuron=False):
+        """
+        Computes the inter-spike intervals (ISI, in ms) of the recorded neurons.
+
+        *Parameters*:
+
+        * **spikes**: the dictionary of spikes returned by ``get('spike')``. If left empty, ``get('spike')`` will be called. Beware: this erases the data from memory.
+        * **ranks**: list of ranks of the neurons to analyse (default: all recorded neurons).
+        * **per_neuron**: if True, a dictionary containing the ISIs of each neuron is returned. Otherwise (default), the ISIs of all neurons are returned in a single array.
+
+        Example::
+
+            m = Monitor(P[:1000], 'spike')
+            simulate(1000.0)
+            isi = m.inter_spike_interval()
+            hist(isi, 50)
+
+        """
+        return inter_spike_interval(self._spike_data(spikes), ranks, per_neuron)
+
+    def coefficient_of_variation(self, spikes=None, ranks=None, per_neuron=False):
+        """
+        Computes the coefficient of variation (standard deviation divided by the mean) of the inter-spike intervals of the recorded neurons.
+
+        Neurons having emitted less than three spikes are not taken into account.
+
+        *Parameters*:
+
+        * **spikes**: the dictionary of spikes returned by ``get('spike')``. If left empty, ``get('spike')`` will be called. Beware: this erases the data from memory.
+        * **ranks**: list of ranks of the neurons to analyse (default: all recorded neurons).
+        * **per_neuron**: if True, a dictionary containing the coefficient of variation of each neuron is returned. Otherwise (default), an array of the coefficients, ordered by rank.
+
+        Example::
+
+            m = Monitor(P[:1000], 'spike')
+            simulate(1000.0)
+            cv = m.coefficient_of_variation()
+            print(np.mean(cv))
+
+        """
+        return coefficient_of_variation(self._spike_data(spikes), ranks, per_neuron)
+
 class BoldMonitor(Monitor):
     """
     Specialized monitor for populations. Transforms the signal *variables* into a BOLD signal.
@@ -1051,6 +1060,18 @@ cdef class BoldMonitor%(pop_id)s_wrapper(Monitor_wrapper):
 ######################
 # Static methods to plot spike patterns without a Monitor (e.g. offline)
 ######################
+def _spike_arrays(spikes):
+    """
+    Flattens a dictionary of spikes into two arrays: the spike times (in steps) and the ranks of the corresponding neurons.
+
+    The spikes are grouped by neuron, in the order of the dictionary.
+    """
+    import ANNarchy.core.cython_ext.Transformations as Transformations
+    times = Transformations.spike_times(spikes)
+    counts = np.fromiter((len(data) for data in spikes.values()), dtype=np.int64, count=len(spikes))
+    ranks = np.repeat(np.fromiter(spikes.keys(), dtype=np.int64, count=len(spikes)), counts)
+    return times, ranks
+
 def raster_plot(spikes):
     """ 
     Returns two vectors representing for each recorded spike 1) the spike times and 2) the ranks of the neurons.
@@ -1068,15 +1089,9 @@ def raster_plot(spikes):
         plot(spike_times, spike_ranks, '.')
 
     """
-    times = []; ranks=[]
-
-    # Compute raster
-    for n in spikes.keys():
-        for t in spikes[n]:
-            times.append(t)
-            ranks.append(n)
+    times, ranks = _spike_arrays(spikes)
 
-    return Global.dt()* np.array(times), np.array(ranks)
+    return Global.dt()* times, ranks
 
 
 def histogram(spikes, bins=None):
@@ -1103,30 +1118,15 @@ def histogram(spikes, bins=None):
     bin_step = int(bins/Global.config['dt'])
 
     # Compute the duration of the recordings
-    t_maxes = []
-    t_mines = []
-    for neuron in spikes.keys():
-        if len(spikes[neuron]) == 0 : continue
-        t_maxes.append(np.max(spikes[neuron])) 
-        t_mines.append(np.min(spikes[neuron]))
-
-    t_max = np.max(t_maxes)
-    t_min = np.min(t_mines)
-    duration = t_max - t_min
+    times, _ = _spike_arrays(spikes)
+    t_min = np.min(times)
+    duration = np.max(times) - t_min
 
     # Number of bins
     nb_bins = int(duration/bin_step)
-    print(t_min, t_max, duration, nb_bins)
-
-    # Initialize histogram
-    histo = [0 for t in range(nb_bins+1)]
 
     # Compute per step histogram
-    for neuron in spikes.keys():
-        for t in spikes[neuron]:
-            histo[int((t-t_min)/float(bin_step))] += 1
-
-    return np.array(histo)
+    return np.bincount(((times - t_min)/float(bin_step)).astype(np.int64), minlength=nb_bins+1)
 
 def population_rate(spikes, smooth=0.0):
     """ 
@@ -1150,15 +1150,9 @@ def population_rate(spikes, smooth=0.0):
 
     """
     # Compute the duration of the recordings
-    t_maxes = []
-    t_mines = []
-    for neuron in spikes.keys():
-        if len(spikes[neuron]) == 0 : continue
-        t_maxes.append(np.max(spikes[neuron])) 
-        t_mines.append(np.min(spikes[neuron]))
-
-    t_max = np.max(t_maxes)
-    t_min = np.min(t_mines)
+    times, _ = _spike_arrays(spikes)
+    t_max = np.max(times)
+    t_min = np.min(times)
 
     import ANNarchy.core.cython_ext.Transformations as Transformations
     return Transformations.population_rate(
@@ -1190,15 +1184,9 @@ def smoothed_rate(spikes, smooth=0.):
 
     """
     # Compute the duration of the recordings
-    t_maxes = []
-    t_mines = []
-    for neuron in spikes.keys():
-        if len(spikes[neuron]) == 0 : continue
-        t_maxes.append(np.max(spikes[neuron])) 
-        t_mines.append(np.min(spikes[neuron]))
-
-    t_max = np.max(t_maxes)
-    t_min = np.min(t_mines)
+    times, _ = _spike_arrays(spikes)
+    t_max = np.max(times)
+    t_min = np.min(times)
 
     import ANNarchy.core.cython_ext.Transformations as Transformations
     return Transformations.smoothed_rate(
@@ -1227,26 +1215,91 @@ def mean_fr(spikes, duration=None):
         fr = mean_fr(spikes)
 
     """
-    if duration is None:
+    times, _ = _spike_arrays(spikes)
 
+    if duration is None:
         # Compute the duration of the recordings
-        t_maxes = []
-        t_mines = []
-        for neuron in spikes.keys():
-            if len(spikes[neuron]) == 0 : continue
-            t_maxes.append(np.max(spikes[neuron])) 
-            t_mines.append(np.min(spikes[neuron]))
-
-        t_max = np.max(t_maxes)
-        t_min = np.min(t_mines)
-        duration = t_max - t_min
+        duration = np.max(times) - np.min(times)
 
     nb_neurons = len(spikes.keys())
 
     # Compute fr
-    fr = 0
-    for neuron in spikes:
-        fr += len(spikes[neuron])
+    fr = times.size
 
     return fr/float(nb_neurons)/duration/Global.dt()*1000.0
 
+def inter_spike_interval(spikes, ranks=None, per_neuron=False):
+    """
+    Computes the inter-spike intervals (ISI, in ms) of the recorded neurons.
+
+    *Parameters*:
+
+    * **spikes**: the dictionary of spikes returned by ``get('spike')``.
+    * **ranks**: list of ranks of the neurons to analyse (default: all recorded neurons).
+    * **per_neuron**: if True, a dictionary containing the ISIs of each neuron is returned. Otherwise (default), the ISIs of all neurons are returned in a single array.
+
+    Example::
+
+        m = Monitor(P[:1000], 'spike')
+        simulate(1000.0)
+        spikes = m.get('spike')
+        isi = inter_spike_interval(spikes)
+
+    """
+    if ranks is not None:
+        spikes = dict((rank, spikes.get(rank, [])) for rank in ranks)
+
+    times, neurons = _spike_arrays(spikes)
+    isi = Global.dt() * np.diff(times)
+
+    if not per_neuron:
+        return isi[neurons[1:] == neurons[:-1]]
+
+    # The ISIs of a neuron lie between the positions of its first and last spikes
+    data = {}
+    idx = 0
+    for rank, spike_times in spikes.items():
+        nb_spikes = len(spike_times)
+        data[rank] = isi[idx:idx+max(nb_spikes-1, 0)]
+        idx += nb_spikes
+    return data
+
+def coefficient_of_variation(spikes, ranks=None, per_neuron=False):
+    """
+    Computes the coefficient of variation (standard deviation divided by the mean) of the inter-spike intervals of the recorded neurons.
+
+    Neurons having emitted less than three spikes are not taken into account.
+
+    *Parameters*:
+
+    * **spikes**: the dictionary of spikes returned by ``get('spike')``.
+    * **ranks**: list of ranks of the neurons to analyse (default: all recorded neurons).
+    * **per_neuron**: if True, a dictionary containing the coefficient of variation of each neuron is returned. Otherwise (default), an array of the coefficients, ordered by rank.
+
+    Example::
+
+        m = Monitor(P[:1000], 'spike')
+        simulate(1000.0)
+        spikes = m.get('spike')
+        cv = coefficient_of_variation(spikes)
+
+    """
+    if ranks is not None:
+        spikes = dict((rank, spikes.get(rank, [])) for rank in ranks)
+
+    times, neurons = _spike_arrays(spikes)
+    same = neurons[1:] == neurons[:-1]
+    isi = np.diff(times)[same].astype(np.float64)
+
+    # Mean and standard deviation of the ISIs of each neuron
+    rank_list, idx = np.unique(neurons[1:][same], return_inverse=True)
+    nb_isi = np.bincount(idx, minlength=rank_list.size)
+    mean = np.bincount(idx, isi, minlength=rank_list.size) / nb_isi
+    std = np.sqrt(np.bincount(idx, (isi - mean[idx])**2, minlength=rank_list.size) / nb_isi)
+
+    valid = nb_isi > 1
+    cv = std[valid] / mean[valid]
+
+    if not per_neuron:
+        return cv
+    return dict(zip(rank_list[valid].tolist(), cv.tolist()))
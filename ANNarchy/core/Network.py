@@ -130,6 +130,49 @@ class Network(object):
         for proj in self.get_projections(suppress_error=True):
             proj._clear()
 
+    def _snapshot(self):
+        """
+        Copies the current state of the network, which can be restored with ``_restore()``: values of the populations and projections, enabled and learning flags, callbacks and monitors. Used by parallel_run().
+        """
+        self._state = []
+        for obj in self.populations + [proj for proj in self.projections if proj._saveable]:
+            desc, arrays = obj._binary_data()
+            self._state.append((obj, desc, dict(arrays)))
+        self._state_enabled = [(pop, pop.enabled) for pop in self.populations]
+        self._state_flags = [(proj, dict((flag, proj._get_flag(flag)) for flag in ['transmission', 'update', 'plasticity', 'update_period', 'update_offset'])) for proj in self.projections]
+        self._state_callbacks = (list(Simulate._callbacks[self.id]), Simulate._callbacks_enabled[self.id])
+        self._state_monitors = list(Global._network[self.id]['monitors'])
+
+    def _restore(self):
+        """
+        Restores the state saved by ``_snapshot()``, resets the time and discards the recordings. The callbacks and monitors added since the snapshot are removed.
+        """
+        for obj, desc, arrays in self._state:
+            obj._load_binary_data(desc, arrays)
+        for pop, enabled in self._state_enabled:
+            if enabled:
+                pop.enable()
+            else:
+                pop.disable()
+        for proj, flags in self._state_flags:
+            for flag, value in flags.items():
+                proj._set_flag(flag, value)
+        for pop in self.populations:
+            pop.clear()
+
+        Simulate._callbacks[self.id] = list(self._state_callbacks[0])
+        Simulate._callbacks_enabled[self.id] = self._state_callbacks[1]
+
+        for monitor in Global._network[self.id]['monitors']:
+            if not monitor in self._state_monitors and monitor.cyInstance is not None:
+                monitor.stop()
+        Global._network[self.id]['monitors'] = list(self._state_monitors)
+        self.monitors = [monitor for monitor in self.monitors if monitor in self._state_monitors]
+
+        Global.set_current_step(0, self.id)
+        for monitor in self.monitors:
+            monitor._reset()
+
     def _cpp_memory_footprint(self):
         """
         Print the C++ memory consumption for populations, projections on the console.
@@ -170,6 +213,7 @@ class Network(object):
             pop.name = obj.name
             pop.class_name = obj.class_name
             pop.init = obj.init
+            pop._init_distributions = obj._init_distributions
             pop.enabled = obj.enabled
             if not obj.enabled: # Also copy the enabled state:
                 pop.disable()
@@ -209,6 +253,7 @@ class Network(object):
 
             # Copy the synapses if they are already created
             proj._store_connectivity(obj._connection_method, obj._connection_args, obj._connection_delay, obj._storage_format)
+            proj._single_constant_weight = obj._single_constant_weight
 
             # Add the copy to the local network
             Global._network[self.id]['projections'].append(proj)
@@ -292,7 +337,9 @@ class Network(object):
                 compiler="default",
                 compiler_flags="-march=native -O2",
                 cuda_config=None,
-                silent=False):
+                silent=False,
+                ensemble=1,
+                autotune=False):
 
 
         """
@@ -306,9 +353,11 @@ class Network(object):
         * **compiler_flags**: platform-specific flags to pass to the compiler. Default: "-march=native -O2". Warning: -O3 often generates slower code and can cause linking problems, so it is not recommended.
         * **cuda_config**: dictionary defining the CUDA configuration for each population and projection.
         * **silent**: defines if the "Compiling... OK" should be printed.
+        * **ensemble**: number of independent instances of the network simulated together (default: 1).
+        * **autotune**: if True, the storage format and openMP schedule of the projections are chosen by timing short trial runs (default: False).
 
         """
-        Compiler.compile(directory=directory, silent=silent, clean=clean, compiler=compiler, compiler_flags=compiler_flags, net_id=self.id)
+        Compiler.compile(directory=directory, silent=silent, clean=clean, compiler=compiler, compiler_flags=compiler_flags, ensemble=ensemble, autotune=autotune, net_id=self.id)
 
     def simulate(self, duration, measure_time = False):
         """
@@ -355,6 +404,26 @@ class Network(object):
         """
         Simulate.step(self.id)
 
+    def simulate_async(self, duration, batch=100, callbacks=True):
+        """
+        Starts the simulation of the network for the given duration in milliseconds in a background thread and returns immediately::
+
+            sim = net.simulate_async(1000.0)
+            ...
+            sim.wait()
+
+        *Parameters*:
+
+        * **duration**: the duration in milliseconds.
+        * **batch**: number of steps simulated between two checks of the cancellation (default: 100).
+        * **callbacks**: defines if the callback methods (decorator ``every``) should be called (default: True).
+
+        *Returns*:
+
+        * an ``AsyncSimulation`` object, see ``simulate_async()``.
+        """
+        return Simulate.simulate_async(duration, batch, callbacks, net_id=self.id)
+
     def reset(self, populations=True, projections=False, synapses=False):
         """
         Reinitialises the network to its state before the call to compile.
@@ -500,6 +569,20 @@ class Network(object):
         """
         IO.save(filename, populations, projections, self.id)
 
+    def load(self, filename, populations=True, projections=True,):
+        """
+        Loads a saved state of the current network by calling ANNarchy.core.IO.load().
+
+        *Parameters*:
+
+        * **filename**: filename, may contain relative or absolute path.
+
+        * **populations**: if True, population data will be loaded (by default True)
+
+        * **projections**: if True, projection data will be loaded (by default True)
+        """
+        IO.load(filename, populations, projections, self.id)
+
 def parallel_run(method, networks=None, number=0, max_processes=-1, measure_time=False, sequential=False, same_seed=False, **args):
     """
     Allows to run multiple networks in parallel using multiprocessing.
@@ -514,12 +597,14 @@ def parallel_run(method, networks=None, number=0, max_processes=-1, measure_time
 
     If ``number`` is used, the created networks are not returned, you should return what you need to analyse.
 
+    With the openMP backend, the simulations are run in threads on ``max_processes`` copies of the network, each one importing its own copy of the compiled library. A copy is reset to its initial state (values of the variables, time, recordings, enabled and learning flags) before each simulation and the monitors and callbacks added by the previous one are removed, so ``number`` can be much larger than ``max_processes``. The connectivity is only created once per copy, so random connection patterns are not drawn again for each simulation. All copies use the connectivity of the network 0. The copies are kept for the next calls to ``parallel_run()``, which do not pay for their creation again. When ``num_threads`` was set in ``setup()``, the threads are shared between the copies.
+
     *Parameters*:
 
     * **method**: a Python method which will be executed for each network. This function must accept an integer as first argument (id of the simulation) and a Network object as second argument.
     * **networks**: a list of networks to simulate in parallel.
     * **number**: the number of odentical networks to run in parallel.
-    * **max_processes**: maximal number of processes to start concurrently (default: the available number of cores on the machine).
+    * **max_processes**: maximal number of processes (or copies of the network) to run concurrently (default: the available number of cores on the machine).
     * **measure_time**: if the total simulation time should be printed out.
     * **sequential**: if True, runs the simulations sequentially instead of in parallel (default: False).
     * **same_seed**: if True, all networks will use the same seed. If not, the seed will be randomly initialized with time(0) for each network (default). It has no influence when the ``networks`` argument is set (the seed has to be set individually for each network using ``net.set_seed()``), only when ``number`` is used.
@@ -674,9 +759,16 @@ def _parallel_multi(method, number, max_processes, measure_time, sequential, sam
     for n in range(number): # Add the seed at the end. Increment the seed if the seeds should be different
         arguments[n].append(seed + n if not same_seed else 0)
 
-
     # Simulation
-    if not sequential:
+    if Global._check_paradigm("openmp"):
+        # The copies are created and seeded in this process: the seed and the state of numpy.random are kept for the caller
+        seed_state = (Global.config['seed'], np.random.get_state())
+        try:
+            results = _parallel_warm(number, max_processes, sequential, arguments)
+        finally:
+            Global.config['seed'] = seed_state[0]
+            np.random.set_state(seed_state[1])
+    elif not sequential:
         try:
             pool = Pool(max_processes)
             results = pool.map(_create_and_run_method, arguments)
@@ -689,7 +781,7 @@ def _parallel_multi(method, number, max_processes, measure_time, sequential, sam
         results = []
         try:
             for n in range(number):
-                results.append(_create_and_run_method(arguments))
+                results.append(_create_and_run_method(arguments[n]))
         except Exception as e:
             Global._print(e)
             Global._error('parallel_run(): running ' + str(number) + ' networks failed.', exit=True)
@@ -707,6 +799,41 @@ def _parallel_multi(method, number, max_processes, measure_time, sequential, sam
     return results
 
 
+def _parallel_warm(number, max_processes, sequential, arguments):
+    """
+    Runs the simulations in threads, each one on the first free copy of the network 0.
+    """
+    from multiprocessing.dummy import Pool
+    try:
+        import Queue as queue # Python2
+    except:
+        import queue # Python3
+
+    networks = _warm_networks(max_processes if not sequential else 1)
+    free = queue.Queue()
+    for net in networks:
+        free.put(net)
+
+    # The threads are shared between the copies
+    threads = max(1, Global.config['num_threads'] // len(networks))
+
+    results = []
+    try:
+        if not sequential:
+            pool = Pool(len(networks))
+            results = pool.map(lambda args: _run_warm_method(free, threads, args), arguments)
+            pool.close()
+            pool.join()
+        else:
+            for n in range(number):
+                results.append(_run_warm_method(free, threads, arguments[n]))
+    except Exception as e:
+        Global._print(e)
+        Global._error('parallel_run(): running ' + str(number) + ' networks failed.', exit=True)
+
+    return results
+
+
 def _create_and_run_method(args):
     """
     Method called to wrap the user-defined method when different networks are created.
@@ -729,6 +856,92 @@ def _create_and_run_method(args):
     return res
 
 
+# Copies of the network 0 used by parallel_run(), kept between calls, and the module they were created from.
+_warm_copies = []
+_warm_module = None
+
+def _warm_networks(number):
+    """
+    Returns ``number`` instantiated copies of the network 0 which can be simulated concurrently in threads.
+
+    The C++ data of a library is global, so each copy imports its own copy of the compiled library. The copies are kept and reused by the next calls to parallel_run(), until the network 0 is recompiled.
+    """
+    global _warm_copies, _warm_module
+    import shutil, sys, tempfile
+
+    if _warm_module is not Global._network[0]['instance']:
+        _warm_copies = []
+        _warm_module = Global._network[0]['instance']
+
+    if len(_warm_copies) >= number:
+        return _warm_copies[:number]
+
+    # Network(True) stops the recordings of the original monitors
+    recording = []
+    for monitor in Global._network[0]['monitors']:
+        for var in monitor.variables:
+            try:
+                recording.append((monitor.cyInstance, 'record_'+var, getattr(monitor.cyInstance, 'record_'+var)))
+            except:
+                pass
+
+    # Importing a library replaces the module in sys.modules
+    name = 'ANNarchyCore0'
+    module = sys.modules.get(name)
+    directory = Global._network[0]['directory']
+
+    try:
+        while len(_warm_copies) < number:
+            # The same file would be opened only once, the copy is deleted once imported
+            fd, library = tempfile.mkstemp(suffix='.so', dir=directory)
+            os.close(fd)
+            try:
+                shutil.copyfile(os.path.join(directory, name + '.so'), library)
+                net = Network(True)
+                Compiler._instantiate(net_id=net.id, import_id=0, library=library)
+            finally:
+                os.remove(library)
+            # The connectivity drawn again by _instantiate() is replaced by the one of the network 0
+            for proj, original in zip(net.projections, Global._network[0]['projections']):
+                if proj._saveable:
+                    desc, arrays = original._binary_data()
+                    proj._load_binary_data(desc, dict(arrays))
+            net._snapshot()
+            _warm_copies.append(net)
+    finally:
+        if module is not None:
+            sys.modules[name] = module
+        for instance, flag, value in recording:
+            setattr(instance, flag, value)
+
+    return _warm_copies[:number]
+
+
+def _run_warm_method(free, threads, args):
+    """
+    Method called to wrap the user-defined method on the first free copy of the network, after restoring its initial state.
+    """
+    # Get arguments
+    method = args[1]
+    seed = args[-1]
+    # Get a free network and reset it
+    net = free.get()
+    try:
+        net._restore()
+        # Only the library of the copy is seeded, Global.set_seed() would modify the caller's seed
+        Global._network[net.id]['instance'].set_seed(seed)
+        # The number of OpenMP threads is set for the calling thread
+        if Global.config['num_threads'] > 1:
+            Global._network[net.id]['instance'].set_number_threads(threads)
+        # Create the arguments
+        arguments = args[:-1] # all arguments except seed
+        arguments[1] = net # replace the second argument method with net
+        # Call the method
+        return method(*arguments)
+    finally:
+        free.put(net)
+
+
 def _only_run_method(args):
     """
     Method called to wrap the user-defined method when a single network is already instantiated.
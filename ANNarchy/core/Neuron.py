@@ -134,7 +134,7 @@ class IndividualNeuron(object):
                         return val
                 else:
                     if name in self.population.neuron_type.description['local']:
-                        return getattr(self.population.cyInstance, 'get_single_'+name)(self.rank)
+                        return self.population._get_single(name, self.rank)
                     else:
                         return getattr(self.population.cyInstance, 'get_'+name)()
             else:
@@ -156,7 +156,7 @@ class IndividualNeuron(object):
                         newval[self.population.coordinates_from_rank(self.rank)] = value
                         self.population.__setattr__(name, newval)
                     else: # Access the C++ data
-                        getattr(self.population.cyInstance, 'set_single_'+name)(self.rank, value)
+                        self.population._set_single(name, self.rank, value)
                 else:
                     self.population.__setattr__(name, value)
             else:
@@ -22,6 +22,7 @@
 #
 #===============================================================================
 import ANNarchy.core.Global as Global
+import ANNarchy.core.Simulate as Simulate
 
 from .PopulationView import PopulationView
 from .Random import RandomDistribution
@@ -132,6 +133,9 @@ class Population(object):
         for var in self.neuron_type.description['variables']:
             self.init[var['name']] = var['init']
 
+        # Random distributions assigned before compile(), drawn again for the other instances in ensemble mode
+        self._init_distributions = {}
+
         # List of targets actually connected
         self.targets = []
 
@@ -180,6 +184,9 @@ class Population(object):
         # Storage order. TODO: why?
         self._storage_order = storage_order
 
+        # Number of instances in ensemble mode, set by compile()
+        self._ensemble = 1
+
     def _copy(self):
         "Returns a copy of the population when creating networks. Internal use only."
         return Population(geometry=self.geometry, neuron=self.neuron_type, name=self.name, stop_condition=self.stop_condition, storage_order=self._storage_order, copied=True)
@@ -191,7 +198,7 @@ class Population(object):
     def _instantiate(self, module):
         # Create the Cython instance
         try:
-            self.cyInstance = getattr(module, self.class_name+'_wrapper')(self.size, self.max_delay)
+            self.cyInstance = getattr(module, self.class_name+'_wrapper')(self._ensemble * self.size, self.max_delay)
         except:
             Global._error('unable to instantiate the population', self.name)
 
@@ -200,6 +207,14 @@ class Population(object):
         # Initialize the population
         self.initialized = True
 
+        # In ensemble mode, the random initial values are drawn for each instance,
+        # the first one keeping the values drawn before compile()
+        if self._ensemble > 1 and len(self._init_distributions) > 0:
+            self.init = dict(self.init) # may be shared with the original population of a network
+            for name, dist in self._init_distributions.items():
+                values = np.concatenate((np.asarray(self.init[name]).reshape(self.size), dist.get_values((self._ensemble - 1) * self.size)))
+                self.init[name] = values.reshape((self._ensemble,) + self.geometry)
+
         # Transfer the initial values of all attributes
         for name, value in self.init.items():
             if isinstance(value, Global.Constant):
@@ -256,6 +271,8 @@ class Population(object):
 
         * **attributes**: list of attributes (parameter or variable) which should be reinitialized. Default: all attributes.
         """
+        Simulate._check_object_not_running('Population.reset()', self)
+
         if attributes == -1:
             try:
                 self.set(self.init)
@@ -286,6 +303,7 @@ class Population(object):
 
         Note: does nothing for rate-coded networks.
         """
+        Simulate._check_object_not_running('Population.clear()', self)
         self.cyInstance.reset()
 
     def enable(self):
@@ -339,8 +357,10 @@ class Population(object):
                 if not self.initialized:
                     if isinstance(value, RandomDistribution): # Make sure it is generated only once
                         self.init[name] = np.array(value.get_values(self.size)).reshape(self.geometry)
+                        self._init_distributions[name] = value
                     else:
                         self.init[name] = value
+                        self._init_distributions.pop(name, None)
                 else:
                     self._set_cython_attribute(name, value)
             else:
@@ -361,6 +381,8 @@ class Population(object):
         try:
             if attribute in self.neuron_type.description['local']:
                 data = getattr(self.cyInstance, 'get_'+attribute)()
+                if self._ensemble > 1:
+                    return data.reshape((self._ensemble,) + self.geometry)
                 return data.reshape(self.geometry)
             else:
                 return getattr(self.cyInstance, 'get_'+attribute)()
@@ -381,7 +403,9 @@ class Population(object):
         """
         try:
             if attribute in self.neuron_type.description['local']:
-                if isinstance(value, np.ndarray):
+                if self._ensemble > 1:
+                    getattr(self.cyInstance, 'set_'+attribute)(self._ensemble_values(value))
+                elif isinstance(value, np.ndarray):
                     getattr(self.cyInstance, 'set_'+attribute)(value.reshape(self.size))
                 elif isinstance(value, list):
                     getattr(self.cyInstance, 'set_'+attribute)(np.array(value).reshape(self.size))
@@ -394,6 +418,34 @@ class Population(object):
             err_msg = """Population.set(): either the variable '%(attr)s' does not exist in the population '%(pop)s', or the provided array does not have the right size."""
             Global._error(err_msg  % { 'attr': attribute, 'pop': self.name } )
 
+    def _ensemble_values(self, value):
+        """
+        Returns the values of a local attribute for all instances of the ensemble as a flat array.
+
+        The value can be a single value or an array of the size of the population (the same for all instances), a flat array of size ``ensemble*size``, or any array which can be broadcast to the shape ``(ensemble,) + geometry``.
+        """
+        value = np.asarray(value)
+        if value.size == self._ensemble * self.size:
+            return value.reshape(self._ensemble * self.size)
+        if value.size == self.size:
+            value = value.reshape(self.geometry)
+        return np.broadcast_to(value, (self._ensemble,) + self.geometry).reshape(self._ensemble * self.size)
+
+    def _get_single(self, attribute, rank):
+        "Returns the value of a local attribute for a single neuron, as an array with one value per instance in ensemble mode."
+        if self._ensemble > 1:
+            return np.array([getattr(self.cyInstance, 'get_single_'+attribute)(rank + k * self.size) for k in range(self._ensemble)])
+        return getattr(self.cyInstance, 'get_single_'+attribute)(rank)
+
+    def _set_single(self, attribute, rank, value):
+        "Sets the value of a local attribute for a single neuron, either the same for all instances or one value per instance in ensemble mode."
+        if self._ensemble > 1:
+            values = np.broadcast_to(value, (self._ensemble,))
+            for k in range(self._ensemble):
+                getattr(self.cyInstance, 'set_single_'+attribute)(rank + k * self.size, values[k])
+        else:
+            getattr(self.cyInstance, 'set_single_'+attribute)(rank, value)
+
     def __len__(self):
         """
         Number of neurons in the population.
@@ -493,7 +545,9 @@ class Population(object):
         if self.neuron_type.description['type'] == 'spike':
             if self.initialized:
                 if isinstance(value, RandomDistribution):
-                    refs = (value.get_values(self.size)/Global.config['dt']).astype(int)
+                    refs = (value.get_values(self._ensemble * self.size)/Global.config['dt']).astype(int)
+                elif self._ensemble > 1:
+                    refs = (self._ensemble_values(value) / Global.config['dt']).astype(int)
                 elif isinstance(value, np.ndarray):
                     refs = (value / Global.config['dt']).astype(int).reshape(self.size)
                 else:
@@ -734,7 +788,7 @@ class Population(object):
             try:
                 desc[var] = getattr(self.cyInstance, 'get_'+var)()
             except:
-                Global._warning('Can not save the attribute ' + var + 'in the population ' + self.name + '.')
+                Global._warning('Can not save the attribute ' + var + ' in the population ' + self.name + '.')
 
         return desc
 
@@ -744,6 +798,8 @@ class Population(object):
 
         * If the file name is '.npz', the data will be saved and compressed using `np.savez_compressed` (recommended).
 
+        * If the file name ends with a path separator, the data will be saved in that directory as raw binary files (see ``save()``).
+
         * If the file name ends with '.gz', the data will be pickled into a binary file and compressed using gzip.
 
         * If the file name is '.mat', the data will be saved as a Matlab 7.2 file. Scipy must be installed.
@@ -766,7 +822,10 @@ class Population(object):
             pop.save('pop1.mat')
 
         """
-        from ANNarchy.core.IO import _save_data
+        from ANNarchy.core.IO import _save_data, _is_binary
+        if _is_binary(filename):
+            self._save_binary(filename)
+            return
         _save_data(filename, self._data())
 
 
@@ -787,7 +846,10 @@ class Population(object):
             pop.load('pop1.txt.gz')
 
         """
-        from ANNarchy.core.IO import _load_data
+        from ANNarchy.core.IO import _load_data, _is_binary
+        if _is_binary(filename):
+            self._load_binary(filename)
+            return
         self._load_pop_data(_load_data(filename))
 
     def _load_pop_data(self, desc):
@@ -805,3 +867,65 @@ class Population(object):
                 Global._warning('Can not load the variable ' + var + ' in the population ' + self.name)
                 Global._print('Skipping this variable.')
                 continue
+
+    def _save_binary(self, path):
+        """
+        Saves the population in the directory ``path``: the arrays are written as raw binary files, the rest in a JSON description.
+        """
+        from ANNarchy.core.IO import _write_binary
+        desc, arrays = self._binary_data()
+        _write_binary(path, desc, arrays)
+
+    def _binary_data(self):
+        """
+        Returns the JSON description of the population and an iterator over the (name, array) pairs saved by ``_save_binary()``.
+        """
+        desc = {}
+        desc['name'] = self.name
+        desc['geometry'] = list(self.geometry)
+        desc['size'] = self.size
+        desc['attributes'] = self.attributes
+        desc['parameters'] = self.parameters
+        desc['variables'] = self.variables
+        desc['values'] = {}
+        desc['arrays'] = {}
+        arrays = []
+        for var in self.attributes:
+            try:
+                value = getattr(self.cyInstance, 'get_'+var)()
+            except:
+                Global._warning('Can not save the attribute ' + var + ' in the population ' + self.name + '.')
+                continue
+            if var in self.neuron_type.description['global']:
+                desc['values'][var] = value
+            else:
+                arrays.append((var, np.array(value)))
+
+        return desc, iter(arrays)
+
+    def _load_binary(self, path):
+        """
+        Updates the population with the data saved by ``_save_binary()``.
+        """
+        from ANNarchy.core.IO import _BinaryArrays, _read_description
+        desc = _read_description(path)
+        self._load_binary_data(desc, _BinaryArrays(path, desc['arrays']))
+
+    def _load_binary_data(self, desc, arrays):
+        """
+        Updates the population with a description and a mapping of arrays, as returned by ``_binary_data()``.
+        """
+        for var in desc['attributes']:
+            try:
+                if var in desc['values']:
+                    getattr(self.cyInstance, 'set_'+var)(desc['values'][var])
+                elif var in arrays:
+                    if arrays[var].size != self._ensemble * self.size:
+                        Global._warning('Can not load the variable ' + var + ' in the population ' + self.name + ': ' + str(arrays[var].size) + ' values are stored for ' + str(self._ensemble * self.size) + ' neurons.')
+                        continue
+                    getattr(self.cyInstance, 'set_'+var)(arrays[var])
+            except Exception as e:
+                Global._print(e)
+                Global._warning('Can not load the variable ' + var + ' in the population ' + self.name)
+                Global._print('Skipping this variable.')
+                continue
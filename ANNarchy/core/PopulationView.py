@@ -143,8 +143,10 @@ class PopulationView(object):
             * *name*: name of the parameter/variable.
         """
         if name in self.population.attributes:
-            all_val = getattr(self.population, name).reshape(self.population.size)
-            return all_val[self.ranks]
+            all_val = getattr(self.population, name)
+            if self.population._ensemble > 1: # one row per instance
+                return all_val.reshape((self.population._ensemble, self.population.size))[:, self.ranks]
+            return all_val.reshape(self.population.size)[self.ranks]
         else:
             Global._error("Population does not have a parameter/variable called " + name + ".")
 
@@ -182,7 +184,7 @@ class PopulationView(object):
                     data[rank] = value
                     self.population.init[name] = data.reshape(self.population.geometry)
             else:
-                getattr(self.population.cyInstance, 'set_single_'+name)(rank, value)
+                self.population._set_single(name, rank, value)
 
         for val_key in value.keys():
             if hasattr(self.population, val_key):
@@ -26,6 +26,7 @@ import math, os
 import copy, inspect
 
 from ANNarchy.core import Global
+from ANNarchy.core import Simulate
 from ANNarchy.core.Random import RandomDistribution
 from ANNarchy.core.Dendrite import Dendrite
 from ANNarchy.core.PopulationView import PopulationView
@@ -159,6 +160,9 @@ class Projection(object):
         # If a dense matrix should be used instead of LIL
         self._dense_matrix = False
 
+        # Number of instances in ensemble mode, set by compile()
+        self._ensemble = 1
+
         # Reporting
         self.connector_name = "Specific"
         self.connector_description = "Specific"
@@ -186,6 +190,7 @@ class Projection(object):
     connect_all_to_all = ConnectorMethods.connect_all_to_all
     connect_gaussian = ConnectorMethods.connect_gaussian
     connect_dog = ConnectorMethods.connect_dog
+    connect_distance = ConnectorMethods.connect_distance
     connect_fixed_probability = ConnectorMethods.connect_fixed_probability
     connect_fixed_number_pre = ConnectorMethods.connect_fixed_number_pre
     connect_fixed_number_post = ConnectorMethods.connect_fixed_number_post
@@ -226,7 +231,15 @@ class Projection(object):
             Global._error('The projection between ' + self.pre.name + ' and ' + self.post.name + ' is declared but not connected.')
 
         proj = getattr(module, 'proj'+str(self.id)+'_wrapper')
-        self.cyInstance = proj(self._connection_method(*((self.pre, self.post,) + self._connection_args)))
+        synapses = self._connection_method(*((self.pre, self.post,) + self._connection_args))
+
+        # Ensemble mode: one copy of the connectivity per instance
+        if self._ensemble > 1:
+            synapses = synapses.replicate(self._ensemble,
+                self.pre.population.size if isinstance(self.pre, PopulationView) else self.pre.size,
+                self.post.population.size if isinstance(self.post, PopulationView) else self.post.size)
+
+        self.cyInstance = proj(synapses)
 
         # Access the list of postsynaptic neurons
         self.post_ranks = self.cyInstance.post_rank()
@@ -295,6 +308,8 @@ class Projection(object):
             The parameter ``synapses`` will be used in a future release to also reinitialize the connectivity structure.
 
         """
+        Simulate._check_object_not_running('Projection.reset()', self)
+
         if attributes == -1:
             attributes = self.attributes
 
@@ -759,16 +774,17 @@ class Projection(object):
         extension = os.path.splitext(fname)[1]
 
         # Gathering the data
+        indptr, indices, w = self._csr('w')
         data = {
                 'name': self.name,
                 'post_ranks': self.post_ranks,
-                'pre_ranks': self.cyInstance.pre_rank_all(), # was: [self.cyInstance.pre_rank(n) for n in range(self.size)],
-                'w': self.cyInstance.get_w(),
+                'pre_ranks': [row.tolist() for row in self._split_rows(indices, indptr)],
+                'w': self.cyInstance.get_w() if self._has_single_weight() else [row.tolist() for row in self._split_rows(w, indptr)],
                 'delay': self.cyInstance.get_delay() if hasattr(self.cyInstance, 'get_delay') else None,
                 'max_delay': self.max_delay,
                 'uniform_delay': self.uniform_delay,
                 'size': self.size,
-                'nb_synapses': sum([self.cyInstance.nb_synapses(n) for n in range(self.size)])
+                'nb_synapses': int(indptr[-1])
             }
 
         # Save the data
@@ -837,23 +853,18 @@ class Projection(object):
             x_size = int( math.floor(math.sqrt(self.post.size)) )
             y_size = int( math.ceil(math.sqrt(self.post.size)) )
 
+        # One row per post-synaptic neuron, expanded to the whole populations
+        matrix = self._dense_values(variable, 0.0)
+        pre_geometry = self.pre.population.geometry if isinstance(self.pre, PopulationView) else self.pre.geometry
 
-        def get_rf(rank): # TODO: IMPROVE
-            res = np.zeros( self.pre.size )
-            for n in range(len(self.post_ranks)):
-                if self.post_ranks[n] == n:
-                    pre_ranks = self.cyInstance.pre_rank(n)
-                    data = getattr(self.cyInstance, 'get_dendrite_'+variable)(rank)
-                    for j in range(len(pre_ranks)):
-                        res[pre_ranks[j]] = data[j]
-            return res.reshape(self.pre.geometry)
+        def get_rf(rank):
+            return matrix[rank].reshape(pre_geometry)
 
-        res = np.zeros((1, x_size*self.pre.geometry[1]))
+        rows = [np.zeros((1, x_size*pre_geometry[1]))]
         for y in range ( y_size ):
-            row = np.concatenate(  [ get_rf(self.post.rank_from_coordinates( (y, x) ) ) for x in range ( x_size ) ], axis = 1)
-            res = np.concatenate((res, row))
+            rows.append(np.concatenate(  [ get_rf(self.post.rank_from_coordinates( (y, x) ) ) for x in range ( x_size ) ], axis = 1))
 
-        return res
+        return np.concatenate(rows)
 
     def connectivity_matrix(self, fill=0.0):
         """
@@ -867,6 +878,95 @@ class Projection(object):
 
         * **fill**: value to put in the matrix when there is no connection (default: 0.0).
         """
+        if not self.initialized:
+            Global._error('The connectivity matrix can only be accessed after compilation')
+            return []
+
+        return self._dense_values('w', fill)
+
+    def to_scipy_sparse(self, variable='w'):
+        """
+        Returns a Scipy sparse matrix (``csr_matrix``) containing the values of a synaptic variable for all existing synapses.
+
+        The matrix has the same layout as the one expected by ``connect_from_sparse()``: the first index represents the pre-synaptic neurons, the second the post-synaptic ones. If PopulationViews were used for creating the projection, the indices are the positions of the neurons in the views.
+
+        *Parameters*:
+
+        * **variable**: name of the synaptic variable (default: 'w').
+        """
+        try:
+            from scipy.sparse import csr_matrix
+        except:
+            Global._error("to_scipy_sparse(): scipy is not installed.")
+
+        if not self.initialized:
+            Global._error('to_scipy_sparse(): the network has not been compiled yet.')
+
+        indptr, indices, data = self._csr(variable)
+
+        # Positions of the ranks inside the (views of the) populations
+        pre_index = np.zeros(self.pre.population.size if isinstance(self.pre, PopulationView) else self.pre.size, dtype=np.int_)
+        pre_index[self.pre.ranks] = np.arange(self.pre.size)
+        post_index = np.zeros(self.post.population.size if isinstance(self.post, PopulationView) else self.post.size, dtype=np.int_)
+        post_index[self.post.ranks] = np.arange(self.post.size)
+
+        # In ensemble mode, the instances are placed along the diagonal
+        instances = np.arange(self._ensemble)[:, None]
+        pre_index = (pre_index + instances * self.pre.size).reshape(-1)
+        post_index = (post_index + instances * self.post.size).reshape(-1)
+
+        rows = pre_index[indices]
+        cols = post_index[np.repeat(np.array(self.post_ranks, dtype=np.int_), np.diff(indptr))]
+        return csr_matrix((data, (rows, cols)), shape=(self._ensemble * self.pre.size, self._ensemble * self.post.size))
+
+    def _csr(self, variable='w'):
+        """
+        Returns the (indptr, indices, data) arrays describing the projection in CSR format.
+
+        The rows follow ``post_ranks``: the pre-synaptic ranks of the post-synaptic neuron ``post_ranks[i]`` are ``indices[indptr[i]:indptr[i+1]]``, ``data`` contains the corresponding values of ``variable``.
+        """
+        if variable != 'w' and not variable in self.attributes:
+            Global._error('Projection: the variable', variable, 'does not exist.')
+
+        indptr, indices = self._csr_connectivity()
+        return indptr, indices, self._csr_values(variable, indptr)
+
+    def _csr_connectivity(self):
+        "Returns the (indptr, indices) arrays of the connectivity, see ``_csr()``."
+        if hasattr(self.cyInstance, 'export_connectivity'):
+            indptr, indices = self.cyInstance.export_connectivity()
+        else:
+            pre_ranks = [self.cyInstance.pre_rank(n) for n in range(self.size)]
+            indptr = np.concatenate(([0], np.cumsum([len(r) for r in pre_ranks]))).astype(np.int_)
+            indices = np.concatenate(pre_ranks).astype(np.int32) if len(pre_ranks) > 0 else np.zeros(0, dtype=np.int32)
+        return indptr, indices
+
+    def _csr_values(self, variable, indptr):
+        "Returns the values of ``variable`` for all synapses, in the order of ``_csr_connectivity()``."
+        nb_synapses = int(indptr[-1])
+        if variable == 'w' and self._has_single_weight():
+            data = np.full(nb_synapses, self.cyInstance.get_w())
+        elif variable == 'w' or variable in self.synapse_type.description['local']:
+            if hasattr(self.cyInstance, 'export_' + variable):
+                data = getattr(self.cyInstance, 'export_' + variable)(nb_synapses)
+            else:
+                dendrites = [getattr(self.cyInstance, 'get_dendrite_' + variable)(n) for n in range(self.size)]
+                data = np.concatenate(dendrites) if len(dendrites) > 0 else np.zeros(0)
+        elif variable in self.synapse_type.description['semiglobal']:
+            data = np.repeat(np.array(getattr(self.cyInstance, 'get_' + variable)()), np.diff(indptr))
+        else:
+            data = np.full(nb_synapses, getattr(self.cyInstance, 'get_' + variable)())
+
+        return data
+
+    def _split_rows(self, values, indptr):
+        "Splits the flat array ``values`` into one array per dendrite, following ``indptr``."
+        if len(indptr) < 2: # no dendrite: np.split() would return one empty row
+            return []
+        return np.split(values, indptr[1:-1])
+
+    def _dense_values(self, variable, fill):
+        "Dense (post, pre) matrix of a synaptic variable, expanded to the whole populations."
         if isinstance(self.pre, PopulationView):
             size_pre = self.pre.population.size
         else:
@@ -876,16 +976,9 @@ class Projection(object):
         else:
             size_post = self.post.size
 
-        res = np.ones((size_post, size_pre)) * fill
-        for rank in self.post_ranks:
-            idx = self.post_ranks.index(rank)
-            try:
-                preranks = self.cyInstance.pre_rank(idx)
-                w = self.cyInstance.get_dendrite_w(idx)
-            except:
-                Global._error('The connectivity matrix can only be accessed after compilation')
-                return []
-            res[rank, preranks] = w
+        indptr, indices, data = self._csr(variable)
+        res = np.full((self._ensemble * size_post, self._ensemble * size_pre), fill, dtype=np.float64)
+        res[np.repeat(np.array(self.post_ranks, dtype=np.int_), np.diff(indptr)), indices] = data
         return res
 
 
@@ -932,6 +1025,8 @@ class Projection(object):
 
         * If the file name is '.npz', the data will be saved and compressed using `np.savez_compressed` (recommended).
 
+        * If the file name ends with a path separator, the data will be saved in that directory as raw binary files (see ``save()``).
+
         * If the file name ends with '.gz', the data will be pickled into a binary file and compressed using gzip.
 
         * If the file name is '.mat', the data will be saved as a Matlab 7.2 file. Scipy must be installed.
@@ -954,7 +1049,10 @@ class Projection(object):
             proj.save('proj1.mat')
 
         """
-        from ANNarchy.core.IO import _save_data
+        from ANNarchy.core.IO import _save_data, _is_binary
+        if _is_binary(filename):
+            self._save_binary(filename)
+            return
         _save_data(filename, self._data())
 
 
@@ -975,7 +1073,10 @@ class Projection(object):
             proj.load('proj1.txt.gz')
 
         """
-        from ANNarchy.core.IO import _load_data
+        from ANNarchy.core.IO import _load_data, _is_binary
+        if _is_binary(filename):
+            self._load_binary(filename)
+            return
         self._load_proj_data(_load_data(filename))
 
 
@@ -1018,6 +1119,154 @@ class Projection(object):
                 Global._warning('load(): the variable', var, 'does not exist in the current version of the network, skipping it.')
                 continue
 
+    def _save_binary(self, path):
+        """
+        Saves the projection in the directory ``path``. The connectivity is stored in CSR format (``post_ranks``, ``indptr``, ``indices``), local variables as one value per synapse in the same order. Each array is written as soon as it is exported.
+        """
+        from ANNarchy.core.IO import _write_binary
+        desc, arrays = self._binary_data()
+        _write_binary(path, desc, arrays)
+
+    def _binary_data(self):
+        """
+        Returns the JSON description of the projection and a generator over the (name, array) pairs saved by ``_save_binary()``.
+        """
+        if not self.initialized:
+            Global._error('save(): the network has not been compiled yet.')
+
+        desc = {}
+        desc['name'] = self.name
+        desc['pre'] = self.pre.name
+        desc['post'] = self.post.name
+        desc['target'] = self.target
+        desc['attributes'] = self.attributes
+        desc['parameters'] = self.parameters
+        desc['variables'] = self.variables
+        desc['values'] = {}
+        desc['arrays'] = {}
+
+        # Delays
+        delays = self._get_delay()
+        if not isinstance(delays, list): # uniform delays
+            desc['values']['delays'] = delays
+
+        # Attributes to save
+        attributes = list(self.attributes)
+        if not 'w' in attributes:
+            attributes.append('w')
+
+        local_attributes = []
+        for var in attributes:
+            if var == 'w' and self._has_single_weight():
+                desc['values'][var] = self.cyInstance.get_w()
+            elif var == 'w' or var in self.synapse_type.description['local'] or var in self.synapse_type.description['semiglobal']:
+                local_attributes.append(var)
+            else:
+                try:
+                    desc['values'][var] = getattr(self.cyInstance, 'get_'+var)()
+                except:
+                    Global._warning('Can not save the attribute ' + var + ' in the projection.')
+
+        return desc, self._binary_arrays(local_attributes, delays)
+
+    def _binary_arrays(self, attributes, delays):
+        "Generator over the arrays of the projection, each one being exported when requested."
+        # Connectivity
+        yield 'post_ranks', np.array(self.post_ranks, dtype=np.int32)
+        indptr, indices = self._csr_connectivity()
+        yield 'indptr', indptr.astype(np.int64)
+        yield 'indices', indices
+        del indices
+
+        # Variable delays
+        if isinstance(delays, list):
+            yield 'delays', np.array([d for dendrite in delays for d in dendrite], dtype=np.float64)
+
+        for var in attributes:
+            try:
+                if var in self.synapse_type.description['semiglobal']:
+                    data = np.array(getattr(self.cyInstance, 'get_'+var)())
+                else:
+                    data = self._csr_values(var, indptr)
+            except:
+                Global._warning('Can not save the attribute ' + var + ' in the projection.')
+                continue
+            yield var, data
+
+    def _load_binary(self, path):
+        """
+        Updates the projection with the data saved by ``_save_binary()``. The arrays are memory-mapped and copied directly into the C++ structures when the bulk import is available.
+        """
+        from ANNarchy.core.IO import _BinaryArrays, _read_description
+        desc = _read_description(path)
+        self._load_binary_data(desc, _BinaryArrays(path, desc['arrays']))
+
+    def _load_binary_data(self, desc, arrays):
+        """
+        Updates the projection with a description and a mapping of arrays, as returned by ``_binary_data()``.
+        """
+        post_ranks = arrays['post_ranks']
+        indptr = np.array(arrays['indptr'])
+        indices = arrays['indices']
+        nb_synapses = int(indptr[-1]) if len(indptr) > 0 else 0
+
+        # Check the connectivity before passing it to the C++ side
+        size_pre = self.pre.population.size if isinstance(self.pre, PopulationView) else self.pre.size
+        size_post = self.post.population.size if isinstance(self.post, PopulationView) else self.post.size
+        if len(indptr) != len(post_ranks) + 1 or indptr[0] != 0 or np.any(np.diff(indptr) < 0) or nb_synapses != len(indices):
+            Global._error('load(): the connectivity of the projection ' + self.name + ' is inconsistent (post_ranks, indptr and indices do not match).')
+        if (len(post_ranks) > 0 and (np.min(post_ranks) < 0 or np.max(post_ranks) >= self._ensemble * size_post)) or \
+           (len(indices) > 0 and (np.min(indices) < 0 or np.max(indices) >= self._ensemble * size_pre)):
+            Global._error('load(): the ranks stored for the projection ' + self.name + ' do not fit the populations ' + self.pre.name + ' and ' + self.post.name + '.')
+
+        # If the post ranks have changed, overwrite
+        if not np.array_equal(post_ranks, self.post_ranks):
+            self.cyInstance.set_post_rank(list(post_ranks))
+
+        # If the pre ranks have changed, overwrite
+        current_indptr, current_indices = self._csr_connectivity()
+        if not (np.array_equal(indptr, current_indptr) and np.array_equal(indices, current_indices)):
+            if hasattr(self.cyInstance, 'import_connectivity'):
+                self.cyInstance.import_connectivity(indptr, indices)
+            else:
+                self.cyInstance.set_pre_rank(self._split_rows(indices, indptr))
+        del current_indices
+
+        # Delays
+        if 'delays' in desc['values']:
+            self._set_delay(desc['values']['delays'])
+        elif 'delays' in arrays:
+            if arrays['delays'].size != nb_synapses:
+                Global._error('load(): the projection ' + self.name + ' has ' + str(nb_synapses) + ' synapses, but ' + str(arrays['delays'].size) + ' delays are stored.')
+            self._set_delay(self._split_rows(arrays['delays'], indptr))
+
+        # Other variables
+        attributes = list(desc['attributes'])
+        if not 'w' in attributes:
+            attributes.append('w')
+
+        for var in attributes:
+            if not var in desc['values'] and var in arrays:
+                expected = len(post_ranks) if var in self.synapse_type.description['semiglobal'] else nb_synapses
+                if arrays[var].size != expected:
+                    Global._warning('load(): the variable ' + var + ' of the projection ' + self.name + ' has ' + str(arrays[var].size) + ' values instead of ' + str(expected) + ', skipping it.')
+                    continue
+            try:
+                if var in desc['values']:
+                    getattr(self.cyInstance, 'set_' + var)(desc['values'][var])
+                elif not var in arrays:
+                    continue
+                elif var in self.synapse_type.description['semiglobal']:
+                    getattr(self.cyInstance, 'set_' + var)(arrays[var])
+                elif hasattr(self.cyInstance, 'import_' + var):
+                    getattr(self.cyInstance, 'import_' + var)(arrays[var])
+                else:
+                    getattr(self.cyInstance, 'set_' + var)(self._split_rows(arrays[var], indptr))
+            except Exception as e:
+                Global._print(e)
+                Global._warning('load(): the variable', var, 'does not exist in the current version of the network, skipping it.')
+                continue
+
     ################################
     ## Structural plasticity
     ################################
@@ -25,12 +25,17 @@ from .Global import _network
 from .Global import get_current_step, dt
 from .Global import _error, _print
 from math import ceil
+import threading
 import time
 
 # Callbacks
 _callbacks = [[]]
 _callbacks_enabled = [True]
 
+# Simulations running in the background, per network
+_async_simulations = {}
+_async_lock = threading.Lock()
+
 
 def simulate(duration, measure_time = False, callbacks=True, net_id=0):
     """
@@ -46,7 +51,7 @@ def simulate(duration, measure_time = False, callbacks=True, net_id=0):
     """
     if not _network[net_id]['instance']:
         _error('simulate(): the network is not compiled yet.')
-        
+    _check_not_running('simulate()', net_id)
 
     # Compute the number of steps
     nb_steps = ceil(float(duration) / dt())
@@ -88,7 +93,7 @@ def simulate_until(max_duration, population, operator='and', measure_time = Fals
     """
     if not _network[net_id]['instance']:
         _error('simulate_until(): the network is not compiled yet.')
-        
+    _check_not_running('simulate_until()', net_id)
 
     nb_steps = ceil(float(max_duration) / dt())
     if not isinstance(population, list):
@@ -111,12 +116,210 @@ def step(net_id=0):
     Performs a single simulation step (duration = ``dt``).
     """
     if not _network[net_id]['instance']:
-        _error('simulate_until(): the network is not compiled yet.')
-        
+        _error('step(): the network is not compiled yet.')
+    _check_not_running('step()', net_id)
 
     _network[net_id]['instance'].pyx_step()
 
 
+def simulate_async(duration, batch=100, callbacks=True, net_id=0):
+    """
+    Starts the simulation of the network for the given duration in milliseconds in a background thread and returns immediately. The simulation releases the GIL, so Python code can run in the meantime, for example to prepare the next stimulus::
+
+        sim = simulate_async(1000.0)
+        stimulus = generate_stimulus()
+        sim.wait()
+        pop.I = stimulus
+
+    Inside a coroutine, the end of the simulation can be awaited::
+
+        duration = await simulate_async(1000.0)
+
+    The simulation is performed by batches of ``batch`` steps, a cancellation is only taken into account between two batches. The callbacks declared with ``every`` are called in the background thread.
+
+    No other simulation (``simulate()``, ``step()``...) of the same network can be started before the end of the asynchronous one. Values assigned to the attributes of the network during the simulation are taken into account at an unspecified step.
+
+    *Parameters*:
+
+    * **duration**: the duration in milliseconds.
+    * **batch**: number of steps simulated between two checks of the cancellation (default: 100).
+    * **callbacks**: defines if the callback methods (decorator ``every``) should be called (default: True).
+
+    *Returns*:
+
+    * an ``AsyncSimulation`` object.
+    """
+    if not _network[net_id]['instance']:
+        _error('simulate_async(): the network is not compiled yet.')
+
+    # The check and the registration must be atomic, otherwise two concurrent calls could both start
+    with _async_lock:
+        _check_not_running('simulate_async()', net_id)
+        simulation = AsyncSimulation(duration, batch, callbacks, net_id)
+        _async_simulations[net_id] = simulation
+    simulation._thread.start()
+    return simulation
+
+
+class AsyncSimulation(object):
+    """
+    Handle on a simulation started with ``simulate_async()``.
+
+    The handle mimics the interface of ``concurrent.futures.Future``: ``done()``, ``cancel()``, ``cancelled()``, ``result()``, ``exception()`` and ``add_done_callback()``. It can also be awaited in a coroutine running in an ``asyncio`` event loop.
+    """
+
+    def __init__(self, duration, batch, callbacks, net_id=0):
+        self.net_id = net_id
+        self._t_start = get_current_step(net_id)
+        self._nb_steps = int(ceil(float(duration) / dt()))
+        self._batch = max(int(batch), 1)
+        self._callbacks = callbacks and _callbacks_enabled[net_id] and len(_callbacks[net_id]) > 0
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._cancel = False
+        self._cancelled = False
+        self._exception = None
+        self._done_callbacks = []
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    @property
+    def progress(self):
+        "Fraction of the duration which has already been simulated, between 0.0 and 1.0."
+        if self._nb_steps == 0:
+            return 1.0
+        return min(float(get_current_step(self.net_id) - self._t_start) / self._nb_steps, 1.0)
+
+    def done(self):
+        "Returns True if the simulation is finished, cancelled or failed."
+        return self._finished.is_set()
+
+    def cancel(self):
+        """
+        Stops the simulation at the end of the current batch of steps.
+
+        *Returns*:
+
+        * False if the simulation was already finished, True otherwise.
+        """
+        with self._lock:
+            if self._finished.is_set():
+                return False
+            self._cancel = True
+            return True
+
+    def cancelled(self):
+        "Returns True if the simulation was stopped by ``cancel()`` before its end."
+        return self._cancelled
+
+    def wait(self, timeout=None):
+        """
+        Waits until the end of the simulation, or ``timeout`` seconds.
+
+        *Returns*:
+
+        * True if the simulation is finished.
+        """
+        return self._finished.wait(timeout)
+
+    def result(self, timeout=None):
+        """
+        Waits until the end of the simulation, or ``timeout`` seconds. The exceptions raised during the simulation (e.g. by a callback) are raised again.
+
+        *Returns*:
+
+        * the simulated duration in milliseconds, shorter than the requested one when the simulation was cancelled.
+        """
+        if not self._finished.wait(timeout):
+            _error('AsyncSimulation.result(): the simulation is not finished after', timeout, 'seconds.')
+        if self._exception is not None:
+            raise self._exception
+        return (self._t_stop - self._t_start) * dt()
+
+    def exception(self, timeout=None):
+        "Waits until the end of the simulation and returns the exception raised during the simulation, or None."
+        if not self._finished.wait(timeout):
+            _error('AsyncSimulation.exception(): the simulation is not finished after', timeout, 'seconds.')
+        return self._exception
+
+    def add_done_callback(self, fn):
+        "Calls ``fn(simulation)`` at the end of the simulation, in the background thread, or immediately if the simulation is already finished."
+        with self._lock:
+            if not self._finished.is_set():
+                self._done_callbacks.append(fn)
+                return
+        fn(self)
+
+    def __await__(self):
+        import asyncio
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+
+        def _set_future(simulation):
+            if future.cancelled():
+                return
+            if simulation._exception is not None:
+                future.set_exception(simulation._exception)
+            else:
+                future.set_result(simulation.result())
+
+        self.add_done_callback(lambda simulation: loop.call_soon_threadsafe(_set_future, simulation))
+        return future.__await__()
+
+    def _run(self):
+        "Simulates the network in the background thread."
+        try:
+            t_end = self._t_start + self._nb_steps
+            times = _callback_times(self._t_start, self._nb_steps, self.net_id) if self._callbacks else []
+            times.append((t_end, None, 0))
+
+            for t, callback, n in times:
+                # Advance the simulation to the desired time
+                while get_current_step(self.net_id) < t:
+                    if self._cancel:
+                        self._cancelled = True
+                        return
+                    _network[self.net_id]['instance'].pyx_run(min(self._batch, t - get_current_step(self.net_id)))
+                # Call the callback
+                if callback is not None:
+                    if self._cancel:
+                        self._cancelled = True
+                        return
+                    callback.func(n)
+
+        except Exception as e:
+            self._exception = e
+
+        finally:
+            self._t_stop = get_current_step(self.net_id)
+            with _async_lock:
+                if _async_simulations.get(self.net_id) is self:
+                    del _async_simulations[self.net_id]
+            with self._lock:
+                self._finished.set()
+                callbacks = self._done_callbacks
+                self._done_callbacks = []
+            for fn in callbacks:
+                fn(self)
+
+
+def _check_not_running(name, net_id):
+    "Raises an error if an asynchronous simulation of the network is running. The callbacks, called in the background thread between two batches of steps, are allowed."
+    simulation = _async_simulations.get(net_id)
+    if simulation is not None and not simulation.done() and threading.current_thread() is not simulation._thread:
+        _error(name + ': an asynchronous simulation of the network is still running, call wait() or cancel() on it first.')
+
+def _check_object_not_running(name, obj):
+    "Raises an error if an asynchronous simulation of the network containing the population or projection ``obj`` is running."
+    for net_id, simulation in list(_async_simulations.items()):
+        if simulation is None or simulation.done():
+            continue
+        if any(o is obj for o in _network[net_id]['populations'] + _network[net_id]['projections']):
+            _check_not_running(name, net_id)
+
+
 ################################
 ## Decorators
 ################################
@@ -194,7 +397,23 @@ def _simulate_with_callbacks(duration, net_id=0):
     t_start = get_current_step(net_id)
     length = int(duration/dt())
 
-    # Compute the times
+    for time, callback, n in _callback_times(t_start, length, net_id):
+        #print time, 
+        # Advance the simulation to the desired time
+        if time != get_current_step(net_id):
+            _network[net_id]['instance'].pyx_run(time-get_current_step(net_id))
+        # Call the callback
+        callback.func(n)
+
+    # Go to the end of the duration
+    if get_current_step(net_id) < t_start + length:
+        _network[net_id]['instance'].pyx_run(t_start + length - get_current_step(net_id))
+
+
+def _callback_times(t_start, length, net_id=0):
+    """
+    Returns the sorted list of (step, callback, n) at which the callbacks must be called during a simulation of ``length`` steps starting at ``t_start``.
+    """
     times = []
     for c in _callbacks[net_id]:
         period = int(c.period/dt())
@@ -207,18 +426,6 @@ def _simulate_with_callbacks(duration, net_id=0):
             times.append((m, c, n))
             n += 1
 
-    # Sort the times to be surethey are in the right order.
-    # TODO: make sure the callbacks stay in the declaration order.
-    times = sorted(times)
-
-    for time, callback, n in times:
-        #print time, 
-        # Advance the simulation to the desired time
-        if time != get_current_step(net_id):
-            _network[net_id]['instance'].pyx_run(time-get_current_step(net_id))
-        # Call the callback
-        callback.func(n)
-
-    # Go to the end of the duration
-    if get_current_step(net_id) < t_start + length:
-        _network[net_id]['instance'].pyx_run(t_start + length - get_current_step(net_id))
\ No newline at end of file
+    # Sort the times to be sure they are in the right order.
+    # The sort is stable, so callbacks occurring at the same time stay in the declaration order.
+    return sorted(times, key=lambda x: x[0])
@@ -82,6 +82,8 @@ class PoissonPopulation(SpecificPopulation):
 
         pop.rates = np.linspace(10, 150, 100)
 
+    With the openMP backend, the spike times of each neuron are then drawn in advance, so the cost of a step only depends on the number of emitted spikes. Modifying the rates redraws the next spike of all neurons. The variable ``p`` is then only drawn when it is read, consistently with the spikes of the last step. In ensemble mode, a uniform number ``p`` is drawn for each neuron at each step.
+
     It is also possible to define a temporal equation for the rates, by passing a string to the argument::
 
         pop = PoissonPopulation(geometry=100, rates="100.0 * (1.0 + sin(2*pi*t/1000.0) )/2.0")
@@ -232,8 +234,177 @@ class PoissonPopulation(SpecificPopulation):
         return PoissonPopulation(self.geometry, name=self.name, rates=self.rates_init, target=self.target, parameters=self.parameters, refractory=self.refractory_init, copied=True)
 
     def _generate_omp(self):
-        " Nothing special to do here. "
-        pass
+        """
+        Code generation for the single-thread and openMP paradigm.
+
+        When the rates are a parameter (single value or array), the neurons do not draw a
+        random number at each step: the number of steps until the next spike is drawn from
+        a geometric distribution (the discrete counterpart of the exponential inter-spike
+        intervals) and each neuron is stored in a timing wheel at the step of its next spike.
+        Only the neurons scheduled at the current step are visited. Changing the rates
+        reschedules all neurons at the next step.
+
+        The rates equation (string), the hybrid population and the ensemble mode keep the
+        default code. The number of instances is not known by the population yet, but by
+        its network.
+        """
+        from ANNarchy.generator.Utils import rng_key
+
+        if self.target is not None or isinstance(self.rates_init, str):
+            return
+
+        for network in Global._network:
+            if any(pop is self for pop in network['populations']) and network['ensemble'] > 1:
+                return
+
+        # After a spike, the neuron can not fire before the end of the refractory period
+        if self.neuron_type.refractory or self.refractory:
+            refractory = "refractory[i]"
+        else:
+            refractory = "0"
+
+        # The uniform random numbers p are not needed anymore
+        self._specific_template['update_rng'] = ""
+
+        self._specific_template['include_additional'] = """
+extern long int rng_seed;
+"""
+
+        self._specific_template['declare_additional'] = """
+    // Timing wheel: neurons are stored in the bucket of the step of their next spike
+    std::vector< std::vector<int> > _wheel;
+    std::vector< int > _bucket;
+    long int _wheel_mask;
+    std::vector< long int > _next_spike;
+    bool _reschedule;
+
+    // Draws the step of the next spike of neuron i, emitted after the step `last`
+    long int draw_next_spike(int i, long int last, int stream) {
+        %(float_prec)s proba = rates[i] * dt / 1000.0;
+        if (proba <= 0.0)
+            return -1;
+        if (proba >= 1.0)
+            return last + 1;
+        PhiloxStream _rng(rng_seed, %(key)s, i, stream, t);
+        double u = 1.0 - std::uniform_real_distribution< double >(0.0, 1.0)(_rng);
+        double isi = std::floor(std::log(u) / std::log1p(-proba));
+        return last + 1 + (long int)(std::min(isi, 1e15));
+    }
+
+    // Draws the uniform number p of neuron i at the last step, below rates if it fired then
+    %(float_prec)s draw_p(int i) {
+        double p_max = 1000.0 / dt;
+        double bound = std::max(0.0, std::min(p_max, double(rates[i])));
+        PhiloxStream _rng(rng_seed, %(key)s, i, 4, t - 1);
+        double u = std::uniform_real_distribution< double >(0.0, 1.0)(_rng);
+        if (last_spike[i] == t - 1)
+            return u * bound;
+        return bound + u * (p_max - bound);
+    }
+
+    // Draws the next spike of all neurons and rebuilds the timing wheel
+    void schedule_spikes() {
+        // The wheel covers the mean inter-spike interval
+        double mean_proba = 0.0;
+        for (int i = 0; i < size; i++) {
+            mean_proba += std::max(0.0, std::min(1.0, double(rates[i] * dt / 1000.0)));
+        }
+        mean_proba /= double(size);
+        long int wheel_size = 1;
+        while ( (wheel_size < 65536) && (double(wheel_size) * mean_proba < 1.0) ) {
+            wheel_size *= 2;
+        }
+        _wheel = std::vector< std::vector<int> >(wheel_size, std::vector<int>());
+        _wheel_mask = wheel_size - 1;
+
+        for (int i = 0; i < size; i++) {
+            // A neuron in its refractory period can not fire before its end
+            _next_spike[i] = draw_next_spike(i, std::max(t - 1, last_spike[i] + %(refractory)s), 3);
+            if (_next_spike[i] >= 0)
+                _wheel[_next_spike[i] & _wheel_mask].push_back(i);
+        }
+        _reschedule = false;
+    }
+""" % {'float_prec': Global.config['precision'], 'key': rng_key(self), 'refractory': refractory}
+
+        self._specific_template['access_parameters_variables'] = """
+    // Local parameter rates
+    std::vector< %(float_prec)s > get_rates() { return rates; }
+    %(float_prec)s get_single_rates(int rk) { return rates[rk]; }
+    void set_rates(std::vector< %(float_prec)s > val) { rates = val; _reschedule = true; }
+    void set_single_rates(int rk, %(float_prec)s val) { rates[rk] = val; _reschedule = true; }
+
+    // Local variable p, drawn when read
+    std::vector< %(float_prec)s > get_p() { for (int i = 0; i < size; i++) p[i] = draw_p(i); return p; }
+    %(float_prec)s get_single_p(int rk) { p[rk] = draw_p(rk); return p[rk]; }
+    void set_p(std::vector< %(float_prec)s > val) { p = val; }
+    void set_single_p(int rk, %(float_prec)s val) { p[rk] = val; }
+
+    // Local variable r
+    std::vector< %(float_prec)s > get_r() { return r; }
+    %(float_prec)s get_single_r(int rk) { return r[rk]; }
+    void set_r(std::vector< %(float_prec)s > val) { r = val; }
+    void set_single_r(int rk, %(float_prec)s val) { r[rk] = val; }
+""" % {'float_prec': Global.config['precision']}
+
+        self._specific_template['init_additional'] = """
+        // Timing wheel, filled at the first step
+        _next_spike = std::vector<long int>(size, -1);
+        _wheel_mask = 0;
+        _reschedule = true;
+"""
+
+        self._specific_template['reset_additional'] = """
+        _reschedule = true;
+"""
+
+        self._specific_template['update_variables'] = """
+        if( _active ) {
+            spiked.clear();
+
+            // Rates were modified
+            if (_reschedule) {
+                this->schedule_spikes();
+            }
+
+            // Neurons scheduled at this step, the others stay for a later turn of the wheel
+            _bucket.swap(_wheel[t & _wheel_mask]);
+            for (int i : _bucket) {
+                if (_next_spike[i] != t) {
+                    _wheel[t & _wheel_mask].push_back(i);
+                    continue;
+                }
+
+                // Store the spike
+                spiked.push_back(i);
+                last_spike[i] = t;
+
+                // Update the mean firing rate
+                if(_mean_fr_window> 0)
+                    _spike_history[i].push(t);
+
+                // Next spike after the refractory period
+                _next_spike[i] = draw_next_spike(i, t + %(refractory)s, 2);
+                if (_next_spike[i] >= 0)
+                    _wheel[_next_spike[i] & _wheel_mask].push_back(i);
+            }
+            _bucket.clear();
+            std::sort(spiked.begin(), spiked.end());
+
+            // Update the mean firing rate
+            if(_mean_fr_window> 0){
+                for(int i = 0; i < size; i++){
+                    while((_spike_history[i].size() != 0)&&(_spike_history[i].front() <= t - _mean_fr_window)){
+                        _spike_history[i].pop(); // Suppress spikes outside the window
+                    }
+                    r[i] = _mean_fr_rate * float(_spike_history[i].size());
+                }
+            }
+        } else {
+            // The spikes scheduled while inactive are drawn again
+            _reschedule = true;
+        }
+""" % {'refractory': refractory}
 
     def _generate_cuda(self):
         " Nothing special to do here. "
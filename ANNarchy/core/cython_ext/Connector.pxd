@@ -1,6 +1,7 @@
 # distutils: language = c++
 from libcpp.vector cimport vector
 from libcpp cimport bool
+cimport numpy as np
 from sympy.mpmath.matrices.matrices import _matrix
 
 cdef class LILConnectivity:
@@ -31,6 +32,9 @@ cdef class LILConnectivity:
     # Method to clean a LIL object
     cpdef validate(self)
 
+    # Copies of the connectivity for ensembles
+    cpdef LILConnectivity replicate(self, int number, int pre_size, int post_size)
+
     # pre-defined pattern
     cpdef all_to_all(self, pre, post, weights, delays, allow_self_connections)
     cpdef one_to_one(self, pre, post, weights, delays)
@@ -39,6 +43,9 @@ cdef class LILConnectivity:
     cpdef fixed_number_post(self, pre, post, int number, weights, delays, allow_self_connections)
     cpdef gaussian(self, pre_pop, post_pop, float amp, float sigma, delays, limit, allow_self_connections)
     cpdef dog(self, pre_pop, post_pop, float amp_pos, float sigma_pos, float amp_neg, float sigma_neg, delays, limit, allow_self_connections)
+    cpdef distance(self, pre_pop, post_pop, kernel, float radius, delays, allow_self_connections)
+    cdef _push_back_rows(self, np.ndarray ranks, np.ndarray row_ptr, np.ndarray cols, weights, delays)
+    cdef _distance_based(self, pre_pop, post_pop, kernel, double radius, delays, allow_self_connections)
 
 cdef extern from "CSRMatrix.hpp":
     cdef cppclass CSRMatrix[VT]:
@@ -78,3 +85,4 @@ cdef class CSRConnectivityPre1st:
     cpdef all_to_all(self, pre, post, weights, delays, allow_self_connections)
     cpdef fixed_probability(self, pre, post, probability, weights, delays, allow_self_connections)
     cpdef fixed_number_pre(self, pre, post, int number, weights, delays, allow_self_connections)
+    cdef _push_back_rows(self, np.ndarray ranks, np.ndarray row_ptr, np.ndarray cols, weights, delays)
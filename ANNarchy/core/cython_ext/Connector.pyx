@@ -5,18 +5,18 @@ from libcpp cimport bool
 
 import numpy as np
 cimport numpy as np
+cimport cython
 
 import random
+from functools import partial
 
-from libc.math cimport exp, fabs, ceil
+from libc.math cimport exp, fabs, ceil, floor, sqrt, log
 
 import ANNarchy
 from ANNarchy.core import Global
 from ANNarchy.core.Random import RandomDistribution
 from ANNarchy.core.Population import Population
 
-cimport ANNarchy.core.cython_ext.Coordinates as Coordinates
-
 ##################################################
 ### Connector methods, these functions are    ####
 ### exported towards ConnectorMethods         ####
@@ -44,6 +44,11 @@ def all_to_all(pre, post, weights, delays, allow_self_connections, storage_forma
             projection = CSRConnectivity(size_post)
         else:
             Global._error('storage_order == ' + storage_order + ' is not allowed for all-to-all pattern')
+    elif storage_format == "sell":
+        # the sliced layout is built from the LIL by the generated code
+        if storage_order != "post_to_pre":
+            Global._error('storage_order == ' + storage_order + ' is not allowed for the sell format')
+        projection = LILConnectivity()
     else:
         Global._error('storage_format == '+storage_format+' is not allowed for all-to-all pattern')
 
@@ -77,6 +82,11 @@ def fixed_probability(pre, post, probability, weights, delays, allow_self_connec
             projection = CSRConnectivityPre1st(size_pre)
         else:
             Global._error('storage_order == ' + storage_order + ' is not allowed for all-to-all pattern')
+    elif storage_format == "sell":
+        # the sliced layout is built from the LIL by the generated code
+        if storage_order != "post_to_pre":
+            Global._error('storage_order == ' + storage_order + ' is not allowed for the sell format')
+        projection = LILConnectivity()
     else:
         Global._error('storage_format == '+storage_format+' is not allowed for fixed_probability pattern')
 
@@ -97,6 +107,11 @@ def fixed_number_pre(pre, post, int number, weights, delays, allow_self_connecti
             projection = CSRConnectivityPre1st(size_pre)
         else:
             Global._error('storage_order == ' + storage_order + ' is not allowed for all-to-all pattern')
+    elif storage_format == "sell":
+        # the sliced layout is built from the LIL by the generated code
+        if storage_order != "post_to_pre":
+            Global._error('storage_order == ' + storage_order + ' is not allowed for the sell format')
+        projection = LILConnectivity()
     else:
         Global._error('storage_format == '+storage_format+' is not allowed for fixed_number_pre pattern')
 
@@ -144,6 +159,19 @@ def dog(pre_pop, post_pop, float amp_pos, float sigma_pos, float amp_neg, float
 
     return projection
 
+def distance(pre_pop, post_pop, kernel, float radius, delays, allow_self_connections, storage_format, storage_order):
+    """ Cython implementation of the distance-based pattern."""
+    # instanciate connector class based on storage_format
+    if storage_format == "lil":
+        projection = LILConnectivity()
+    else:
+        Global._error('storage_format == '+storage_format+' is not allowed for distance pattern')
+
+    # instantiate pattern
+    projection.distance(pre_pop, post_pop, kernel, radius, delays, allow_self_connections)
+
+    return projection
+
 ###################################################
 ########## LIL object to hold synapses ############
 ###################################################
@@ -260,6 +288,36 @@ cdef class LILConnectivity:
             self.w.push_back(weights)
             self.delay.push_back(delays)
 
+    cpdef LILConnectivity replicate(self, int number, int pre_size, int post_size):
+        """
+        Returns a new LIL object containing ``number`` copies of the connectivity along the diagonal: the ranks of the k-th copy are shifted by ``k*pre_size`` and ``k*post_size``. Used by the ensemble mode.
+        """
+        cdef LILConnectivity res = LILConnectivity()
+        cdef int k, j
+        cdef unsigned int i
+        cdef vector[int] ranks
+
+        res.post_rank.reserve(number * self.post_rank.size())
+        res.pre_rank.reserve(number * self.pre_rank.size())
+        res.w.reserve(number * self.w.size())
+        res.delay.reserve(number * self.delay.size())
+
+        for k in range(number):
+            for i in range(self.post_rank.size()):
+                res.post_rank.push_back(self.post_rank[i] + k * post_size)
+                ranks = self.pre_rank[i]
+                for j in range(ranks.size()):
+                    ranks[j] += k * pre_size
+                res.pre_rank.push_back(ranks)
+                res.w.push_back(self.w[i])
+                res.delay.push_back(self.delay[i])
+
+        res.max_delay = self.max_delay
+        res.uniform_delay = self.uniform_delay
+        res.size = number * self.size
+        res.nb_synapses = number * self.nb_synapses
+        return res
+
     #####################################################
     # Connector method implementations for list-of-list #
     #####################################################
@@ -322,261 +380,209 @@ cdef class LILConnectivity:
 
     cpdef fixed_probability(self, pre, post, probability, weights, delays, allow_self_connections):
         " Implementation of the fixed-probability pattern "
-        cdef double weight
-        cdef int r_post, r_pre, size_pre, max_size_pre
-        cdef list post_ranks
-        cdef vector[int] r
-        cdef vector[double] w, d
-        cdef np.ndarray random_values, tmp, pre_ranks
+        cdef np.ndarray post_ranks, pre_ranks, row_ptr, cols
 
         # Retríeve ranks
-        post_ranks = post.ranks
+        post_ranks = np.array(post.ranks, dtype=np.int32)
+        pre_ranks = np.array(pre.ranks, dtype=np.int32)
 
-        pre_ranks = np.array(pre.ranks)
-        max_size_pre = len(pre.ranks)
+        # Draw all dendrites at once
+        row_ptr, cols = _bernoulli_rows(post_ranks.size, pre_ranks.size, probability)
+        cols = pre_ranks[cols]
+        if not allow_self_connections:
+            row_ptr, cols = _remove_self(post_ranks, row_ptr, cols)
 
-        for r_post in post_ranks:
-            # List of pre ranks
-            random_values = np.random.random(max_size_pre)
-            tmp = pre_ranks[random_values < probability]
-            if not allow_self_connections:
-                tmp = tmp[tmp != r_post]
-            r = tmp
-            size_pre = tmp.size
-            if size_pre == 0:
-                continue
-            # Weights
-            if isinstance(weights, (int, float)):
-                weight = weights
-                w = vector[double](1, weight)
-            elif isinstance(weights, RandomDistribution):
-                w = weights.get_list_values(size_pre)
-            # Delays
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(size_pre)
-            # Create the dendrite
-            self.push_back(r_post, r, w, d)
+        self._push_back_rows(post_ranks, row_ptr, cols, weights, delays)
 
     cpdef fixed_number_pre(self, pre, post, int number, weights, delays, allow_self_connections):
-        cdef double weight
-        cdef int r_post, r_pre, size_pre
-        cdef list pre_ranks, post_ranks
-        cdef vector[int] r
-        cdef vector[double] w, d
+        " Implementation of the fixed-number-pre pattern "
+        cdef np.ndarray post_ranks, pre_ranks, row_ptr, cols
 
         # Retríeve ranks
-        post_ranks = post.ranks
-        pre_ranks = pre.ranks
+        post_ranks = np.array(post.ranks, dtype=np.int32)
+        pre_ranks = np.array(pre.ranks, dtype=np.int32)
 
-        for r_post in post_ranks:
-            # List of pre ranks
-            r = random.sample(pre_ranks, number)
-            if len(r) == 0:
-                continue
-            if not allow_self_connections:
-                while r_post in list(r): # the post index is in the list
-                    r = random.sample(pre_ranks, number)
-            # Weights
-            if isinstance(weights, (int, float)):
-                weight = weights
-                w = vector[double](1, weight)
-            elif isinstance(weights, RandomDistribution):
-                w = weights.get_list_values(number)
-            # Delays
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(number)
-            # Create the dendrite
-            self.push_back(r_post, r, w, d)
+        # Each post-synaptic neuron draws number distinct pre-synaptic neurons
+        cols = _sample_rows(number, pre_ranks.size, _self_index(post_ranks, pre_ranks, allow_self_connections))
+        row_ptr = np.arange(post_ranks.size + 1, dtype=np.int64) * number
+
+        self._push_back_rows(post_ranks, row_ptr, pre_ranks[cols], weights, delays)
 
     cpdef fixed_number_post(self, pre, post, int number, weights, delays, allow_self_connections):
-        cdef double weight
-        cdef int r_post, r_pre, size_pre
-        cdef list pre_ranks, post_ranks
-        cdef list pre_r, tmp
-        cdef dict rk_mat
-        cdef vector[int] r
-        cdef vector[double] w, d
+        " Implementation of the fixed-number-post pattern "
+        cdef np.ndarray post_ranks, pre_ranks, row_ptr, cols
 
         # Retríeve ranks
-        post_ranks = post.ranks
-        pre_ranks = pre.ranks
-
-        # Build the backward matrix
-        rk_mat = {i: [] for i in post_ranks}
-        for r_pre in pre_ranks:
-            if number >= len(post_ranks):
-                tmp = post_ranks
-            else:
-                tmp = random.sample(post_ranks, number)
-                if not allow_self_connections:
-                    while r_pre in tmp: # the post index is in the list
-                        tmp = random.sample(post_ranks, number)
-            for i in tmp:
-                rk_mat[i].append(r_pre)
-
-        # Create the dendrites
-        for r_post in post_ranks:
-            # List of pre ranks
-            r = rk_mat[r_post]
-            size_pre = len(r)
-            if size_pre == 0:
-                continue
-            # Weights
-            if isinstance(weights, (int, float)):
-                weight = weights
-                w = vector[double](1, weight)
-            elif isinstance(weights, RandomDistribution):
-                w = weights.get_list_values(size_pre)
-            # Delays
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(size_pre)
-            # Create the dendrite
-            self.push_back(r_post, r, w, d)
+        post_ranks = np.array(post.ranks, dtype=np.int32)
+        pre_ranks = np.array(pre.ranks, dtype=np.int32)
 
-    cpdef gaussian(self, pre_pop, post_pop, float amp, float sigma, delays, limit, allow_self_connections):
-        cdef float distance, value
-        cdef int post, pre, pre_size, post_size, c, nb_synapses, pre_dim, post_dim
-        cdef tuple pre_coord, post_coord
-        cdef tuple pre_geometry, post_geometry
-        cdef list ranks, values
-
-        cdef vector[int] r
-        cdef vector[double] w, d
+        # Each pre-synaptic neuron draws number distinct post-synaptic neurons
+        if number >= post_ranks.size:
+            cols = np.tile(np.arange(post_ranks.size, dtype=np.int32), pre_ranks.size)
+            number = post_ranks.size
+        else:
+            cols = _sample_rows(number, post_ranks.size, _self_index(pre_ranks, post_ranks, allow_self_connections))
+
+        # Transpose into the post-synaptic view
+        row_ptr, cols = _transpose(np.arange(pre_ranks.size + 1, dtype=np.int64) * number, cols, post_ranks.size)
+
+        self._push_back_rows(post_ranks, row_ptr, pre_ranks[cols], weights, delays)
+
+    cdef _push_back_rows(self, np.ndarray ranks, np.ndarray row_ptr, np.ndarray cols, weights, delays):
+        """
+        Stores the dendrites of a CSR-like description (the pre-synaptic ranks of ranks[i] are cols[row_ptr[i]:row_ptr[i+1]]).
+
+        Weights and delays are drawn for all synapses at once.
+        """
+        cdef int i, max_d
+        cdef long start, stop
+        cdef bint single_w, single_d
+        cdef int[::1] ranks_view, cols_view
+        cdef long[::1] ptr_view
+        cdef double[::1] w_view
+        cdef long[::1] d_view
+        cdef vector[int] r, int_delays
+        cdef vector[double] w
+
+        ranks_view = np.ascontiguousarray(ranks, dtype=np.int32)
+        cols_view = np.ascontiguousarray(cols, dtype=np.int32)
+        ptr_view = np.ascontiguousarray(row_ptr, dtype=np.int_)
+        if cols.size == 0:
+            return
 
-        # Retrieve simulation time step
-        dt = Global.config['dt']
+        # Weights
+        if isinstance(weights, RandomDistribution):
+            w_view = np.ascontiguousarray(weights.get_values(cols.size), dtype=np.float64)
+        else:
+            w_view = np.full(1, weights, dtype=np.float64)
+        single_w = w_view.shape[0] == 1
 
-        # Population sizes
-        pre_geometry = pre_pop.geometry
-        post_geometry = post_pop.geometry
-        if isinstance(pre_geometry, int):
-            pre_size = pre_geometry
-            pre_dim = 1
+        # Delays
+        if isinstance(delays, RandomDistribution):
+            d_view = np.rint(np.asarray(delays.get_values(cols.size))/self.dt).astype(np.int_)
         else:
-            pre_dim = len(pre_geometry)
-            pre_size = 1
-            for c in pre_geometry:
-                pre_size  = pre_size * c
-        if isinstance(post_geometry, int):
-            post_size = post_geometry
-            post_dim = 1
+            d_view = np.full(1, round(delays/self.dt), dtype=np.int_)
+        single_d = d_view.shape[0] == 1
+        max_d = np.max(d_view)
+        if max_d > self.max_delay:
+            self.max_delay = max_d
+
+        # Are the delays uniform?
+        if not single_d:
+            self.uniform_delay = -1
+        elif self.uniform_delay != d_view[0] and self.size > 0:
+            self.uniform_delay = -1
         else:
-            post_dim = len(post_geometry)
-            post_size = 1
-            for c in post_geometry:
-                post_size  = post_size * c
-
-        # Create the projection data
-        for post in list(range(post_size)):
-            ranks = []
-            values = []
-            if post_dim == 1:
-                post_coord = (post/float(post_size-1), )
-            elif post_dim == 2:
-                post_coord = Coordinates.get_normalized_2d_coord(post, post_geometry)
-            elif post_dim == 3:
-                post_coord = Coordinates.get_normalized_3d_coord(post, post_geometry)
+            self.uniform_delay = d_view[0]
+
+        for i in range(ranks_view.shape[0]):
+            start = ptr_view[i]
+            stop = ptr_view[i+1]
+            if stop == start:
+                continue
+            r.assign(&cols_view[start], &cols_view[start] + (stop - start))
+            if single_w:
+                w.assign(stop - start, w_view[0])
             else:
-                post_coord = Coordinates.get_normalized_coord(post, post_geometry)
-            for pre in list(range(pre_size)):
-                if not allow_self_connections and pre==post:
-                    continue
-                if pre_dim == 1:
-                    pre_coord = (pre/float(pre_size-1), )
-                    distance = Coordinates.comp_dist1D(pre_coord, post_coord)
-                elif pre_dim == 2:
-                    pre_coord = Coordinates.get_normalized_2d_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_dist2D(pre_coord, post_coord)
-                elif pre_dim == 3:
-                    pre_coord = Coordinates.get_normalized_3d_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_dist3D(pre_coord, post_coord)
-                else:
-                    pre_coord = Coordinates.get_normalized_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_distND(pre_coord, post_coord)
-                value = amp * exp(-distance/(2.0*sigma**2))
-                if value > limit * amp:
-                    ranks.append(pre)
-                    values.append(value)
-            nb_synapses = len(ranks)
-            r = ranks
-            w = values
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(nb_synapses)
-            # Create the dendrite
-            self.push_back(post, r, w, d)
+                w.assign(&w_view[start], &w_view[start] + (stop - start))
+            if single_d:
+                int_delays.assign(1, d_view[0])
+            else:
+                int_delays.assign(&d_view[start], &d_view[start] + (stop - start))
+
+            self.post_rank.push_back(ranks_view[i])
+            self.pre_rank.push_back(r)
+            self.w.push_back(w)
+            self.delay.push_back(int_delays)
+            self.size += 1
+            self.nb_synapses += stop - start
+
+    cpdef gaussian(self, pre_pop, post_pop, float amp, float sigma, delays, limit, allow_self_connections):
+        cdef double radius
+
+        # Only the synapses inside the cut-off radius implied by limit are evaluated
+        radius = np.inf
+        if amp > 0.0 and limit > 0.0:
+            radius = sqrt(2.0 * sigma**2 * log(1.0/limit)) if limit < 1.0 else 0.0
+
+        self._distance_based(pre_pop, post_pop, partial(_gaussian_kernel, amp, sigma, limit), radius, delays, allow_self_connections)
 
     cpdef dog(self, pre_pop, post_pop, float amp_pos, float sigma_pos, float amp_neg, float sigma_neg, delays, limit, allow_self_connections):
-        cdef float distance, value
-        cdef int post, pre, pre_size, post_size, c, nb_synapses, pre_dim, post_dim
-        cdef tuple pre_coord, post_coord
+        cdef double radius, threshold, bound
+
+        # |value| is bounded by (|amp_pos| + |amp_neg|) * exp(-distance**2/(2*max(sigma)**2))
+        threshold = limit * fabs(amp_pos - amp_neg)
+        bound = fabs(amp_pos) + fabs(amp_neg)
+        radius = np.inf
+        if threshold > 0.0:
+            radius = max(fabs(sigma_pos), fabs(sigma_neg)) * sqrt(2.0 * log(bound/threshold)) if bound > threshold else 0.0
+
+        self._distance_based(pre_pop, post_pop, partial(_dog_kernel, amp_pos, sigma_pos, amp_neg, sigma_neg, threshold), radius, delays, allow_self_connections)
+
+    cpdef distance(self, pre_pop, post_pop, kernel, float radius, delays, allow_self_connections):
+        self._distance_based(pre_pop, post_pop, partial(_user_kernel, kernel, radius), radius, delays, allow_self_connections)
+
+    cdef _distance_based(self, pre_pop, post_pop, kernel, double radius, delays, allow_self_connections):
+        """
+        Connects each post-synaptic neuron to the pre-synaptic neurons lying inside *radius* (in normalized coordinates).
+
+        The candidates are found by a box query on the regular grid of the pre-synaptic population, so the cost
+        is proportional to the number of synapses created. *kernel* is called with the distances of the candidates
+        and returns the weights and the mask of the synapses to create.
+        """
+        cdef int post, post_size, pre_dim, post_dim, k, nb_synapses
         cdef tuple pre_geometry, post_geometry
-        cdef list ranks, values
+        cdef list steps, indices
+        cdef np.ndarray post_coords, ranks, dist, values, mask
 
         cdef vector[int] r
         cdef vector[double] w, d
 
-        # Population sizes
-        pre_geometry = pre_pop.geometry
-        post_geometry = post_pop.geometry
-        if isinstance(pre_geometry, int):
-            pre_size = pre_geometry
-            pre_dim = 1
-        else:
-            pre_dim = len(pre_geometry)
-            pre_size = 1
-            for c in pre_geometry:
-                pre_size  = pre_size * c
-        if isinstance(post_geometry, int):
-            post_size = post_geometry
-            post_dim = 1
-        else:
-            post_dim = len(post_geometry)
-            post_size = 1
-            for c in post_geometry:
-                post_size  = post_size * c
-
-        # Create the projection data as LIL
-        for post in list(range(post_size)):
-            ranks = []
-            values = []
-            if post_dim == 1:
-                post_coord = (post/float(post_size-1), )
-            elif post_dim == 2:
-                post_coord = Coordinates.get_normalized_2d_coord(post, post_geometry)
-            elif post_dim == 3:
-                post_coord = Coordinates.get_normalized_3d_coord(post, post_geometry)
-            else:
-                post_coord = Coordinates.get_normalized_coord(post, post_geometry)
-            for pre in list(range(pre_size)):
-                if not allow_self_connections and pre==post:
-                    continue
-                if pre_dim == 1:
-                    pre_coord = (pre/float(pre_size-1), )
-                    distance = Coordinates.comp_dist1D(pre_coord, post_coord)
-                elif pre_dim == 2:
-                    pre_coord = Coordinates.get_normalized_2d_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_dist2D(pre_coord, post_coord)
-                elif pre_dim == 3:
-                    pre_coord = Coordinates.get_normalized_3d_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_dist3D(pre_coord, post_coord)
+        # Population geometries
+        pre_geometry = _geometry(pre_pop)
+        post_geometry = _geometry(post_pop)
+        pre_dim = len(pre_geometry)
+        post_dim = len(post_geometry)
+        if pre_dim > post_dim:
+            Global._error('distance-based connectors: the post-synaptic population must have at least as many dimensions as the pre-synaptic one.')
+        post_size = int(np.prod(post_geometry))
+
+        # Normalized coordinates of the post-synaptic neurons, only the first pre_dim axes are compared
+        post_coords = _normalized_coordinates(post_geometry)[:, :pre_dim]
+
+        # Grid step along each axis of the pre-synaptic population
+        steps = [1.0/float(c-1) if c > 1 else 0.0 for c in pre_geometry]
+
+        for post in range(post_size):
+            # Box of the grid containing the sphere of radius around the post-synaptic neuron
+            indices = []
+            for k in range(pre_dim):
+                if pre_geometry[k] == 1 or radius == np.inf:
+                    indices.append(np.arange(pre_geometry[k]))
                 else:
-                    pre_coord = Coordinates.get_normalized_coord(pre, pre_geometry)
-                    distance = Coordinates.comp_distND(pre_coord, post_coord)
-                value = amp_pos * exp(-distance/(2.0*sigma_pos**2)) - amp_neg * exp(-distance/(2.0*sigma_neg**2))
-                if fabs(value) > limit * fabs(amp_pos - amp_neg):
-                    ranks.append(pre)
-                    values.append(value)
-            nb_synapses = len(ranks)
-            r = ranks
-            w = values
+                    indices.append(np.arange(
+                        max(0, int(ceil((post_coords[post, k] - radius)/steps[k] - 1e-6))),
+                        min(pre_geometry[k]-1, int(floor((post_coords[post, k] + radius)/steps[k] + 1e-6))) + 1
+                    ))
+            grid = np.ix_(*indices)
+            ranks = np.ravel_multi_index(grid, pre_geometry).ravel()
+
+            # Euclidean distances of the candidates
+            dist = np.zeros(ranks.size)
+            for k in range(pre_dim):
+                dist += np.broadcast_to((grid[k] * steps[k] - post_coords[post, k])**2, [idx.size for idx in indices]).ravel()
+            dist = np.sqrt(dist)
+
+            # Weights and selection
+            values, mask = kernel(dist)
+            if not allow_self_connections:
+                mask = mask & (ranks != post)
+            ranks = ranks[mask]
+            nb_synapses = ranks.size
+            if nb_synapses == 0:
+                continue
+            r = ranks.tolist()
+            w = values[mask].tolist()
             if isinstance(delays, (float, int)):
                 d = vector[double](1, delays)
             elif isinstance(delays, RandomDistribution):
@@ -585,6 +591,35 @@ cdef class LILConnectivity:
             # Create the dendrite
             self.push_back(post, r, w, d)
 
+def _gaussian_kernel(amp, sigma, limit, distance):
+    value = amp * np.exp(-distance**2/(2.0*sigma**2))
+    return value, value > limit * amp
+
+def _dog_kernel(amp_pos, sigma_pos, amp_neg, sigma_neg, threshold, distance):
+    value = amp_pos * np.exp(-distance**2/(2.0*sigma_pos**2)) - amp_neg * np.exp(-distance**2/(2.0*sigma_neg**2))
+    return value, np.fabs(value) > threshold
+
+def _user_kernel(kernel, radius, distance):
+    value = np.broadcast_to(np.asarray(kernel(distance), dtype=np.float64), distance.shape)
+    return value, distance <= radius
+
+cdef tuple _geometry(pop):
+    "Geometry of a population as a tuple."
+    if isinstance(pop.geometry, int):
+        return (pop.geometry, )
+    return tuple(pop.geometry)
+
+cdef np.ndarray _normalized_coordinates(tuple geometry):
+    """
+    Coordinates of all neurons of a population (rank order), normalized in [0, 1] along each axis.
+    """
+    cdef np.ndarray coords
+    coords = np.array(np.unravel_index(np.arange(int(np.prod(geometry))), geometry), dtype=np.float64).T
+    for k, c in enumerate(geometry):
+        if c > 1:
+            coords[:, k] /= float(c - 1)
+    return coords.reshape((-1, len(geometry)))
+
 cdef _get_weights_delays(int size, weights, delays):
 
     cdef vector[double] w, d
@@ -604,6 +639,148 @@ cdef _get_weights_delays(int size, weights, delays):
 
     return w, d
 
+###################################################
+########## Bulk sampling of random patterns #######
+###################################################
+# Number of rows handled by a single random stream. It does not depend on
+# the number of threads, so the drawn pattern does not either.
+cdef int _BLOCK_SIZE = 1024
+
+cdef list _run_blocks(func, int nb_rows):
+    """
+    Calls func(generator, start, stop) on consecutive blocks of rows and returns the list of results.
+
+    Each block uses its own random stream, seeded from numpy.random so that setup(seed=...) is honoured. The blocks
+    are distributed over Global.config['num_threads'] threads.
+    """
+    cdef int nb_blocks = max(1, (nb_rows + _BLOCK_SIZE - 1) // _BLOCK_SIZE)
+    cdef list seeds = np.random.SeedSequence(np.random.randint(2**31)).spawn(nb_blocks)
+
+    def run(int b):
+        return func(np.random.default_rng(seeds[b]), b * _BLOCK_SIZE, min(nb_rows, (b+1) * _BLOCK_SIZE))
+
+    nb_threads = Global.config['num_threads']
+    if nb_threads is None or nb_threads <= 1 or nb_blocks == 1:
+        return [run(b) for b in range(nb_blocks)]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=nb_threads) as pool:
+        return list(pool.map(run, range(nb_blocks)))
+
+cdef tuple _bernoulli_rows(int nb_rows, int nb_cols, double probability):
+    """
+    Draws each of the nb_rows x nb_cols entries with the given probability, returns (row_ptr, cols) in CSR order.
+
+    The positions of the drawn entries are obtained by geometric skipping, so the cost is proportional to their number.
+    """
+    cdef list blocks
+    cdef np.ndarray counts, cols
+
+    if probability <= 0.0 or nb_rows == 0 or nb_cols == 0:
+        return np.zeros(nb_rows + 1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+
+    def draw(rng, int start, int stop):
+        cdef long total = (stop - start) * <long> nb_cols
+        cdef long last = -1
+        cdef list positions = []
+        while True:
+            remaining = total - last - 1
+            nb_draws = int(probability * remaining + 5.0 * sqrt(probability * remaining) + 16)
+            candidates = last + np.cumsum(rng.geometric(min(probability, 1.0), size=nb_draws))
+            positions.append(candidates[candidates < total])
+            if candidates[-1] >= total - 1:
+                break
+            last = candidates[-1]
+        drawn = np.concatenate(positions)
+        return np.bincount(drawn // nb_cols, minlength=stop-start), (drawn % nb_cols).astype(np.int32)
+
+    blocks = _run_blocks(draw, nb_rows)
+    counts = np.concatenate([b[0] for b in blocks])
+    cols = np.concatenate([b[1] for b in blocks])
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64), cols
+
+cdef np.ndarray _self_index(np.ndarray row_ranks, np.ndarray col_ranks, allow_self_connections):
+    """
+    For each row, index of the column having the same rank (which must not be drawn), nb_cols if there is none.
+    """
+    cdef np.ndarray index = np.full(row_ranks.size, col_ranks.size, dtype=np.int64)
+    if allow_self_connections:
+        return index
+    lookup = np.full(max(int(row_ranks.max()), int(col_ranks.max())) + 1, col_ranks.size, dtype=np.int64)
+    lookup[col_ranks] = np.arange(col_ranks.size)
+    return lookup[row_ranks]
+
+cdef np.ndarray _sample_rows(int number, int nb_cols, np.ndarray excluded):
+    """
+    Draws number distinct columns for each row, excluding the column excluded[row] (if < nb_cols).
+
+    Returns an array of size len(excluded)*number, sorted inside each row.
+    """
+    cdef np.ndarray available = nb_cols - (excluded < nb_cols)
+    if available.size > 0 and number > available.min():
+        Global._error('the number of synapses per neuron (' + str(number) + ') is larger than the number of available neurons (' + str(available.min()) + ').')
+
+    def draw(rng, int start, int stop):
+        high = available[start:stop, None]
+        if 4 * number > nb_cols:
+            # Dense case: partial sort of random keys
+            keys = rng.random((stop - start, nb_cols))
+            keys[np.arange(stop - start), np.minimum(excluded[start:stop], nb_cols-1)] += 2.0 * (excluded[start:stop] < nb_cols)
+            cols = np.sort(np.argpartition(keys, number-1, axis=1)[:, :number], axis=1)
+            return cols.astype(np.int32).ravel()
+        # Sparse case: draw with replacement and redraw the duplicates
+        cols = np.sort(rng.integers(0, high, size=(stop - start, number)), axis=1)
+        while number > 1:
+            duplicates = np.zeros(cols.shape, dtype=np.bool_)
+            duplicates[:, 1:] = cols[:, 1:] == cols[:, :-1]
+            nb_duplicates = np.count_nonzero(duplicates)
+            if nb_duplicates == 0:
+                break
+            cols[duplicates] = rng.integers(0, np.broadcast_to(high, cols.shape)[duplicates])
+            cols.sort(axis=1)
+        # Skip the excluded column
+        cols += cols >= excluded[start:stop, None]
+        return cols.astype(np.int32).ravel()
+
+    if excluded.size == 0 or number <= 0:
+        return np.zeros(0, dtype=np.int32)
+    return np.concatenate(_run_blocks(draw, excluded.size))
+
+cdef tuple _remove_self(np.ndarray row_ranks, np.ndarray row_ptr, np.ndarray cols):
+    """
+    Removes the entries whose column rank equals the rank of their row.
+    """
+    cdef np.ndarray rows = np.repeat(row_ranks, np.diff(row_ptr))
+    cdef np.ndarray keep = cols != rows
+    counts = np.bincount(np.repeat(np.arange(row_ranks.size), np.diff(row_ptr))[keep], minlength=row_ranks.size)
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64), cols[keep]
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef tuple _transpose(np.ndarray row_ptr, np.ndarray cols, int nb_cols):
+    """
+    Converts a CSR description (row_ptr, cols) into its transpose, the rows being sorted inside each column.
+    """
+    cdef long i, row
+    cdef np.ndarray col_ptr = np.zeros(nb_cols + 1, dtype=np.int_)
+    cdef np.ndarray rows = np.zeros(cols.size, dtype=np.int32)
+    cdef long[::1] ptr_view = np.ascontiguousarray(row_ptr, dtype=np.int_)
+    cdef int[::1] cols_view = np.ascontiguousarray(cols, dtype=np.int32)
+    cdef int[::1] rows_view = rows
+    cdef long[::1] fill
+
+    col_ptr[1:] = np.cumsum(np.bincount(cols, minlength=nb_cols))
+    fill = col_ptr[:-1].copy()
+
+    # Counting sort, the rows are visited in increasing order
+    with nogil:
+        for row in range(ptr_view.shape[0] - 1):
+            for i in range(ptr_view[row], ptr_view[row+1]):
+                rows_view[fill[cols_view[i]]] = row
+                fill[cols_view[i]] += 1
+
+    return col_ptr, rows
+
 ###################################################
 ########## CSR object to hold synapses ############
 ###################################################
@@ -712,89 +889,67 @@ cdef class CSRConnectivityPre1st:
             self._matrix.push_back(r_pre, r, w, d_int)
 
     cpdef fixed_probability(self, pre, post, probability, weights, delays, allow_self_connections):
-        cdef int max_size_post
-        cdef list pre_ranks
-        cdef vector[int] r, d_int
-        cdef vector[double] w, d
-        cdef np.ndarray random_values, tmp, post_ranks
+        cdef np.ndarray pre_ranks, post_ranks, row_ptr, cols
 
         # Retríeve ranks
-        pre_ranks = pre.ranks
-        post_ranks = np.array(post.ranks)
-        max_size_post = len(post.ranks)
+        pre_ranks = np.array(pre.ranks, dtype=np.int32)
+        post_ranks = np.array(post.ranks, dtype=np.int32)
 
-        for r_pre in pre_ranks:
-            # List of pre ranks
-            random_values = np.random.random(max_size_post)
-            tmp = post_ranks[random_values < probability]
-            if not allow_self_connections:
-                tmp = tmp[tmp != r_pre]
-            r = tmp
-            size_post = tmp.size
-            if size_post == 0:
-                continue
-            # Weights
-            if isinstance(weights, (int, float)):
-                weight = weights
-                w = vector[double](1, weight)
-            elif isinstance(weights, RandomDistribution):
-                w = weights.get_list_values(size_post)
-            # Delays
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(size_post)
-            d_int = np.array(d) / Global.config['dt']
+        # Draw all rows at once
+        row_ptr, cols = _bernoulli_rows(pre_ranks.size, post_ranks.size, probability)
+        cols = post_ranks[cols]
+        if not allow_self_connections:
+            row_ptr, cols = _remove_self(pre_ranks, row_ptr, cols)
 
-            # Create the dendrite
-            self._matrix.push_back(r_pre, r, w, d_int)
+        self._push_back_rows(pre_ranks, row_ptr, cols, weights, delays)
 
     cpdef fixed_number_pre(self, pre, post, int number, weights, delays, allow_self_connections):
-        cdef double weight
-        cdef int r_post, r_pre, size_pre
-        cdef list pre_ranks, post_ranks
-        cdef vector[vector[int]] ranks
-        cdef vector[int] r
-        cdef vector[double] w, d
+        cdef np.ndarray pre_ranks, post_ranks, row_ptr, cols
 
         # Retríeve ranks
-        post_ranks = post.ranks
-        pre_ranks = pre.ranks
-
-        nb_pre = pre.size if isinstance(pre, Population) else pre.population.size
-        ranks = vector[vector[int]]( nb_pre, vector[int]())
+        pre_ranks = np.array(pre.ranks, dtype=np.int32)
+        post_ranks = np.array(post.ranks, dtype=np.int32)
 
         # draw the ranks from post-view
-        for r_post in post_ranks:
-            # List of pre ranks
-            r = random.sample(pre_ranks, number)
-            if len(r) == 0:
-                continue
-            if not allow_self_connections:
-                while r_post in list(r): # the post index is in the list
-                    r = random.sample(pre_ranks, number)
+        cols = _sample_rows(number, pre_ranks.size, _self_index(post_ranks, pre_ranks, allow_self_connections))
 
-            # sort into pre-to-post view
-            for rk in r:
-                ranks[rk].push_back(r_post)
+        # sort into pre-to-post view
+        row_ptr, cols = _transpose(np.arange(post_ranks.size + 1, dtype=np.int64) * number, cols, pre_ranks.size)
 
-        for r_pre in pre_ranks:
-            number = ranks[r_pre].size()
-            if number == 0:
-                continue
+        self._push_back_rows(pre_ranks, row_ptr, post_ranks[cols], weights, delays)
 
-            # Weights
-            if isinstance(weights, (int, float)):
-                weight = weights
-                w = vector[double](1, weight)
-            elif isinstance(weights, RandomDistribution):
-                w = weights.get_list_values(number)
-            # Delays
-            if isinstance(delays, (float, int)):
-                d = vector[double](1, delays)
-            elif isinstance(delays, RandomDistribution):
-                d = delays.get_list_values(number)
-            d_int = np.array(d) / Global.config['dt']
+    cdef _push_back_rows(self, np.ndarray ranks, np.ndarray row_ptr, np.ndarray cols, weights, delays):
+        """
+        Stores the rows of a CSR-like description, weights and delays are drawn for all synapses at once.
+        """
+        cdef int i
+        cdef long start, stop
+        cdef np.ndarray w, d_int
+        cdef vector[int] r, d
+        cdef vector[double] values
+
+        if cols.size == 0:
+            return
+
+        # Weights
+        if isinstance(weights, RandomDistribution):
+            w = np.asarray(weights.get_values(cols.size), dtype=np.float64)
+        else:
+            w = np.full(1, weights, dtype=np.float64)
+        # Delays
+        if isinstance(delays, RandomDistribution):
+            d_int = (np.asarray(delays.get_values(cols.size)) / Global.config['dt']).astype(np.int32)
+        else:
+            d_int = (np.full(1, delays) / Global.config['dt']).astype(np.int32)
+
+        for i in range(ranks.size):
+            start = row_ptr[i]
+            stop = row_ptr[i+1]
+            if stop == start:
+                continue
+            r = cols[start:stop]
+            values = w if w.size == 1 else w[start:stop]
+            d = d_int if d_int.size == 1 else d_int[start:stop]
 
             # Create the dendrite
-            self._matrix.push_back(r_pre, ranks[r_pre], w, d_int)
\ No newline at end of file
+            self._matrix.push_back(ranks[i], r, values, d)
\ No newline at end of file
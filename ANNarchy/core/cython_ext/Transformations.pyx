@@ -2,6 +2,9 @@
 
 import numpy as np
 cimport numpy as np
+cimport cython
+
+from itertools import chain
 
 import ANNarchy
 
@@ -20,6 +23,28 @@ cpdef np.ndarray raster_plot(list data):
     res = np.array(d)
     return res
 
+cpdef np.ndarray spike_times(dict data):
+    """
+    Concatenates the spike times (in steps) of all neurons of the dictionary into a single array (in the order of the dictionary).
+    """
+    return np.fromiter(chain.from_iterable(data.values()), dtype=np.int64)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _low_pass(double[:, ::1] rates, double[:, ::1] res, double delta) nogil:
+    """
+    First-order low-pass filter along the second axis.
+    """
+    cdef Py_ssize_t n, t
+    for n in range(rates.shape[0]):
+        if rates.shape[1] == 0:
+            continue
+        res[n, 0] = rates[n, 0]
+        for t in range(rates.shape[1]-1):
+            res[n, t+1] = res[n, t] + (rates[n, t+1] - res[n, t])*delta
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
 cpdef np.ndarray smoothed_rate(dict data, float smooth):
     """ Takes the recorded spikes of a population and returns a smoothed firing rate.
 
@@ -29,11 +54,13 @@ cpdef np.ndarray smoothed_rate(dict data, float smooth):
 
     * *smooth* the smoothing time constant (default: 0 ms)
     """
-    cdef np.ndarray res
     cdef int N, d
-    cdef int n, t, timing, last_spike, idx
+    cdef int n, idx, i
+    cdef long t, timing, last_spike, first
     cdef float dt, delta
-    cdef list spikes
+    cdef double val
+    cdef double[:, ::1] rates
+    cdef long[::1] spikes
 
     # Retrieve simulation time step
     dt = ANNarchy.core.Global.config['dt']
@@ -41,29 +68,35 @@ cpdef np.ndarray smoothed_rate(dict data, float smooth):
     # Number of neurons
     d = data['stop'] - data['start']
     N = len(data['data'])
+    first = data['start'] - int(100.0/dt)
 
     # Prepare the matrix
-    rates = np.zeros((N, d))
+    res = np.zeros((N, d))
+    rates = res
 
     # Compute instantaneous firing rate
     idx = 0
-    for n, spikes in data['data'].items():
-        last_spike = data['start'] - int(100.0/dt)
-        for timing in spikes:
-            if last_spike>data['start']:
-                rates[idx, last_spike:timing] = 1000.0/dt/float(timing - last_spike)  
-            last_spike = timing 
+    for n, spk in data['data'].items():
+        spikes = np.asarray(spk, dtype=np.int_)
+        last_spike = first
+        for i in range(spikes.shape[0]):
+            timing = spikes[i]
+            if last_spike > data['start']:
+                val = 1000.0/dt/float(timing - last_spike)
+                t = last_spike
+                while t < timing and t < d:
+                    rates[idx, t] = val
+                    t += 1
+            last_spike = timing
         idx += 1
 
     if smooth == 0.0:
-        return rates
+        return res
 
-    smoothed_rate = np.zeros((N, d))
-    smoothed_rate[:, 0] = rates[:, 0]
     delta = dt/smooth
-    for t in xrange(d-1):
-        smoothed_rate[:, t+1] = smoothed_rate[:, t] + (rates[:, t+1] - smoothed_rate[:, t])*delta
-    return smoothed_rate
+    smoothed = np.zeros((N, d))
+    _low_pass(rates, smoothed, delta)
+    return smoothed
 
 cpdef np.ndarray population_rate(dict data, float smooth):
     """ Takes the recorded spikes of a population and returns a smoothed firing rate for the whole population.
@@ -74,11 +107,8 @@ cpdef np.ndarray population_rate(dict data, float smooth):
 
     * *smooth* the smoothing time constant (default: dt)
     """
-    cdef np.ndarray res
     cdef int N, d
-    cdef int n, t, timing, last_spike
     cdef float dt, delta
-    cdef list spikes
 
     # Retrieve simulation time step
     dt = ANNarchy.core.Global.config['dt']
@@ -87,25 +117,14 @@ cpdef np.ndarray population_rate(dict data, float smooth):
     d = data['stop'] - data['start'] + 1
     N = len(data['data'])
 
-    # Prepare the matrix
-    rates = np.zeros(d)
-
     # Compute histogram
-    for n, spikes in data['data'].items():
-        for t in spikes:
-            rates[t - data['start']] += 1
+    rates = np.bincount(spike_times(data['data']) - data['start'], minlength=d)[:d].astype(np.float64)
     rates /= dt*N/1000.0
-    
-    # print(smooth, dt)
 
     if smooth <= dt:
         return rates
 
-    smoothed_rate = np.zeros(d)
-    smoothed_rate[0] = rates[0]
     delta = dt/smooth
-    for t in xrange(d-1):
-        smoothed_rate[t+1] = smoothed_rate[t] + (rates[t+1] - smoothed_rate[t])*delta
-
-    return smoothed_rate
-
+    smoothed = np.zeros(d)
+    _low_pass(rates.reshape((1, d)), smoothed.reshape((1, d)), delta)
+    return smoothed
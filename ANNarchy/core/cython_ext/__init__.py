@@ -1,5 +1,5 @@
 # export connector functions
-from .Connector import one_to_one, all_to_all, gaussian, dog, fixed_probability, fixed_number_pre, fixed_number_post
+from .Connector import one_to_one, all_to_all, gaussian, dog, distance, fixed_probability, fixed_number_pre, fixed_number_post
 from .Connector import LILConnectivity
 
 __all__ = [
@@ -8,6 +8,7 @@ __all__ = [
     'all_to_all',
     'gaussian',
     'dog',
+    'distance',
     'fixed_probability',
     'fixed_number_pre',
     'fixed_number_post',
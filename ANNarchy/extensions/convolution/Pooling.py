@@ -389,7 +389,7 @@ class PoolingProjection(Projection):
         if self.delays > Global.config['dt']:
             pre_load_r = """
         // pre-load delayed firing rate
-        auto delayed_r = pop%(id_pre)s._delayed_r[%(delay)s];
+        const auto& delayed_r = pop%(id_pre)s._delayed_r[%(delay)s];
         """ % {'id_pre': self.pre.id, 'delay': str(int(self.delays / Global.config['dt']) - 1)}
         else:
             pre_load_r = ""
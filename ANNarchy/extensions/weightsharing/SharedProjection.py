@@ -8,6 +8,10 @@ from ANNarchy.generator.Utils import tabify # _generate_bank_code, _generate_con
 # Indices used for each dimension
 indices = ['i', 'j', 'k', 'l', 'm', 'n']
 
+# Number of positions and of kernel elements per block of the im2col product (backend 'gemm')
+gemm_block_positions = 64
+gemm_block_kernel = 128
+
 
 ###############################
 ### Shared synapse for report()
@@ -47,6 +51,7 @@ class SharedProjection(Projection):
         """
         self.psp_init = psp
         self.operation = operation
+        self._operation_type = None
         # Create the description, but it will not be used for generation
         Projection.__init__(
             self,
@@ -67,7 +72,19 @@ class SharedProjection(Projection):
 
     def _copy(self, pre, post):
         "Returns a copy of the projection when creating networks.  Internal use only."
-        return SharedProjection(pre=self.pre, post=self.post, target=self.target, psp=self.psp_init, operation=self.operation, name=self.name, copied=True)
+        proj = SharedProjection(pre=pre, post=post, target=self.target, psp=self.psp_init, operation=self.operation, name=self.name, copied=True)
+
+        # Same connection pattern
+        if self._operation_type == 'convolve':
+            proj.convolve(self.weights, self.delays, self.method, self.keep_last_dimension, self.multiple, self.padding, self.subsampling, self.backend)
+        elif self._operation_type == 'pooling':
+            proj.pooling(self.delays, tuple(self.extent))
+        elif self._operation_type == 'copy':
+            proj.copy(self.projection)
+
+        # The connectivity is stored again by Network.add()
+        proj._connection_method = None
+        return proj
 
     def _create(self):
         # create fake LIL object, just for compilation.
@@ -135,7 +152,7 @@ class SharedProjection(Projection):
     ### Connection methods
     ################################
 
-    def convolve(self, weights, delays=0.0, method='convolution', keep_last_dimension=False, multiple=False, padding=0.0, subsampling=None):
+    def convolve(self, weights, delays=0.0, method='convolution', keep_last_dimension=False, multiple=False, padding=0.0, subsampling=None, backend='loop'):
         """
         Builds the shared connection pattern that will perform a convolution of the weights kernel on the pre-synaptic population.
 
@@ -167,6 +184,8 @@ class SharedProjection(Projection):
         * **padding**: value to be used for the rates outside the pre-synaptic population. If it is a floating value, the pre-synaptic population is virtually extended with this value above its boundaries. If it is equal to 'border', the values on the boundaries are repeated. Default: 0.0.
 
         * **subsampling**: list for each post-synaptic neuron of coordinates in the pre-synaptic population defining the center of the kernel/filter. Default: None.
+
+        * **backend**: implementation of the convolution in the generated code. 'loop' iterates over the kernel for each post-synaptic neuron, checking the bounds of the pre-synaptic population for each element. 'split' separates the neurons whose kernel lies completely inside the pre-synaptic population, which are computed without any bound check. 'separable' applies a rank-1 kernel as two successive 1D filters (2D populations and kernels only). 'gemm' computes a bank of filters as a matrix product between the filters and blocks of receptive fields (im2col). 'auto' selects the fastest applicable backend. Default: 'loop'.
         """
         self._operation_type = 'convolve'
         self.method = method
@@ -232,6 +251,9 @@ class SharedProjection(Projection):
         else:
             self._generate_pre_coordinates_bank()
 
+        # Implementation of the convolution
+        self.backend = self._select_backend(backend)
+
         # Finish building the synapses
         self._create()
         return self
@@ -536,6 +558,36 @@ class SharedProjection(Projection):
     def _center_filter(self, i):
         return int(i/2) if i%2==1 else int(i/2)-1
 
+    def _select_backend(self, backend):
+        "Checks that the requested convolution backend can be used and resolves 'auto'."
+
+        if not backend in ['loop', 'split', 'separable', 'gemm', 'auto']:
+            Global._error('SharedProjection: the backend of convolve() must be one of loop, split, separable, gemm or auto.')
+
+        # The matrix-based backends only apply a linear psp and a zero or border padding
+        linear = self.synapse_type.operation in ['sum', 'mean'] and \
+                 self.psp_init.replace(' ', '') in ['w*pre.r', 'pre.r*w'] and \
+                 (self.padding == 'border' or (not isinstance(self.padding, str) and self.padding == 0.0))
+
+        gemm = linear and self.multiple
+        separable = linear and not self.multiple and not self.subsampling and \
+                    self.dim_kernel == 2 and self.dim_pre == 2 and self.dim_post == 2
+
+        if backend == 'gemm' and not gemm:
+            Global._error('SharedProjection: the gemm backend requires a bank of filters (multiple=True), the psp w * pre.r, the operation sum or mean and a padding of 0.0 or border.')
+        if backend == 'separable' and not separable:
+            Global._error('SharedProjection: the separable backend requires 2D populations and kernel without subsampling list, the psp w * pre.r, the operation sum or mean and a padding of 0.0 or border.')
+
+        if backend == 'auto':
+            if gemm:
+                backend = 'gemm'
+            elif separable and np.linalg.matrix_rank(self.weights) == 1:
+                backend = 'separable'
+            else:
+                backend = 'split'
+
+        return backend
+
     def _filter_definition(self):
         dim = self.dim_kernel
         cpp = Global.config['precision']
@@ -562,7 +614,7 @@ class SharedProjection(Projection):
 
         return txt
 
-    def _generate_convolve_code(self):
+    def _generate_convolve_code(self, bounds_check=True):
 
         # Operation to be performed: sum, max, min, mean
         operation = self.synapse_type.operation
@@ -589,7 +641,9 @@ class SharedProjection(Projection):
                 code += tabify("""int %(index)s_pre = coord[%(dim)s];""" % { 'id_proj': self.id, 'index': indices[dim], 'dim': dim}, 1)
 
             # Check indices
-            if operation in ['sum', 'mean']:
+            if not bounds_check: # the kernel is inside the pre-synaptic population
+                pass
+            elif operation in ['sum', 'mean']:
                 if isinstance(self.padding, str): # 'border'
                         code += tabify("""
                 if (%(index)s_pre < 0) %(index)s_pre = 0 ;
@@ -679,7 +733,7 @@ class SharedProjection(Projection):
 
         return impl_code, sum_code
 
-    def _generate_bank_code(self):
+    def _generate_bank_code(self, bounds_check=True):
 
         # Operation to be performed: sum, max, min, mean
         operation = self.synapse_type.operation
@@ -700,7 +754,9 @@ class SharedProjection(Projection):
                 code += tabify("""int %(index)s_pre = coord[%(dim)s];""" % { 'id_proj': self.id, 'index': indices[dim], 'dim': dim}, 1)
 
             # Check indices
-            if operation in ['sum', 'mean']:
+            if not bounds_check: # the kernel is inside the pre-synaptic population
+                pass
+            elif operation in ['sum', 'mean']:
                 if isinstance(self.padding, str): # 'border'
                     code += tabify("""
             if (%(index)s_pre < 0) %(index)s_pre = 0 ;
@@ -784,6 +840,278 @@ class SharedProjection(Projection):
 
         return impl_code, sum_code
 
+    def _pre_rates(self):
+        "Firing rates used by the convolution backends, possibly delayed."
+        if self.delays > Global.config['dt']:
+            return "delayed_r"
+        return "pop%(id_pre)s.r" % {'id_pre': self.pre.id}
+
+    def _padding_code(self, index, max_size):
+        "Border or zero padding of a pre-synaptic index, for the backends 'separable' and 'gemm'."
+        if isinstance(self.padding, str): # 'border'
+            return """if (%(index)s < 0) %(index)s = 0;
+if (%(index)s > %(max_size)s) %(index)s = %(max_size)s;""" % {'index': index, 'max_size': max_size}
+        else:
+            return """if ((%(index)s < 0) || (%(index)s > %(max_size)s))
+    continue;""" % {'index': index, 'max_size': max_size}
+
+    def _interior_bounds(self):
+        " Returns for each dimension of the kernel the range of centers for which the kernel lies inside the pre-synaptic population."
+        shape = self.weights.shape[1:] if self.multiple else self.weights.shape
+
+        bounds = []
+        for dim in range(len(shape)):
+            center = self._center_filter(shape[dim])
+            if self.method == 'convolution':
+                bounds.append((shape[dim] - 1 - center, self.pre.geometry[dim] - 1 - center))
+            else:
+                bounds.append((center, self.pre.geometry[dim] - shape[dim] + center))
+        return bounds
+
+    def _generate_split_code(self, psp_loop, sum_code):
+        """
+        Backend 'split': the post-synaptic neurons whose kernel lies inside the pre-synaptic population are
+        computed without bound checks, the others (border) with the default code.
+        """
+        if not self.multiple:
+            interior_code, _ = self._generate_convolve_code(bounds_check=False)
+            border_code, _ = self._generate_convolve_code()
+        else:
+            interior_code, _ = self._generate_bank_code(bounds_check=False)
+            border_code, _ = self._generate_bank_code()
+
+        condition = " && ".join([
+            "(pre_rank[i][%(dim)s] >= %(low)s) && (pre_rank[i][%(dim)s] <= %(high)s)" % {'dim': dim, 'low': low, 'high': high}
+            for dim, (low, high) in enumerate(self._interior_bounds())
+        ])
+
+        declare = """
+    // Post-synaptic neurons whose kernel is inside the pre-synaptic population or crosses its border
+    std::vector<int> _interior_rank;
+    std::vector<int> _border_rank;"""
+
+        update_pre_rank = """
+        _interior_rank.clear();
+        _border_rank.clear();
+        for(int i = 0; i < pre_rank.size(); i++) {
+            if ( %(condition)s )
+                _interior_rank.push_back(i);
+            else
+                _border_rank.push_back(i);
+        }""" % {'condition': condition}
+
+        loop = """
+        %(omp_code)s
+        for(int _r = 0; _r < _RANKS_.size(); _r++){
+            int i = _RANKS_[_r];
+            coord = pre_rank[i];
+_CODE_
+            pop%(id_post)s._sum_%(target)s[i] += """ + sum_code + """;
+        } // for
+"""
+        psp = """
+        // interior: no bound check""" + loop.replace('_RANKS_', '_interior_rank').replace('_CODE_', interior_code) + """
+        // border""" + loop.replace('_RANKS_', '_border_rank').replace('_CODE_', border_code)
+
+        return {'declare': declare, 'update_pre_rank': update_pre_rank, 'update_w': "", 'psp': psp}
+
+    def _generate_separable_code(self, psp_loop, sum_code):
+        """
+        Backend 'separable': a rank-1 kernel w[i][j] = row[i] * col[j] is applied as a horizontal
+        filter on all rows of the pre-synaptic population, followed by a vertical filter. The
+        decomposition is computed when the weights are set, the default loop is used if it fails.
+        """
+        ids = {
+            'float_prec': Global.config['precision'],
+            'tolerance': "1e-6" if Global.config['precision'] == "double" else "1e-4",
+            'operator': '-' if self.method=='convolution' else '+',
+            'rates': self._pre_rates(),
+            'id_post': self.post.id, 'target': self.target,
+            'sum_code': sum_code,
+            'omp_code': "#pragma omp parallel for private(sum)" if Global.config['num_threads'] > 1 else "",
+            'pre_height': self.pre.geometry[0], 'pre_width': self.pre.geometry[1],
+            'post_height': self.post.geometry[0], 'post_width': self.post.geometry[1],
+        }
+        for dim in range(2):
+            sample = int(self.pre.geometry[dim]/self.post.geometry[dim])
+            ids['size_w'+str(dim)] = self.weights.shape[dim]
+            ids['center_w'+str(dim)] = self._center_filter(self.weights.shape[dim])
+            ids['sample'+str(dim)] = sample
+            ids['offset'+str(dim)] = int((sample-1)/2)
+
+        declare = """
+    // Rank-1 decomposition of the kernel and horizontally filtered rows
+    std::vector< %(float_prec)s > _w_row;
+    std::vector< %(float_prec)s > _w_col;
+    std::vector< %(float_prec)s > _filtered_rows;
+    bool _w_separable;""" % ids
+
+        update_w = """
+        // w[i][j] = _w_row[i] * _w_col[j], pivoting on the largest coefficient
+        int _pi = 0, _pj = 0;
+        for(int i_w = 0; i_w < %(size_w0)s; i_w++)
+            for(int j_w = 0; j_w < %(size_w1)s; j_w++)
+                if (fabs(w[i_w][j_w]) > fabs(w[_pi][_pj])) { _pi = i_w; _pj = j_w; }
+        _w_separable = (w[_pi][_pj] != 0.0);
+        _w_row.resize(%(size_w0)s);
+        _w_col.resize(%(size_w1)s);
+        for(int i_w = 0; i_w < %(size_w0)s; i_w++)
+            _w_row[i_w] = w[i_w][_pj];
+        for(int j_w = 0; j_w < %(size_w1)s; j_w++)
+            _w_col[j_w] = _w_separable ? w[_pi][j_w] / w[_pi][_pj] : 0.0;
+        for(int i_w = 0; i_w < %(size_w0)s; i_w++)
+            for(int j_w = 0; j_w < %(size_w1)s; j_w++)
+                if (fabs(w[i_w][j_w] - _w_row[i_w] * _w_col[j_w]) > %(tolerance)s * fabs(w[_pi][_pj]))
+                    _w_separable = false;
+        _filtered_rows.resize(%(pre_height)s * %(post_width)s);""" % ids
+
+        ids['padding_j'] = tabify(self._padding_code('j_pre', self.pre.geometry[1]-1), 6)
+        ids['padding_i'] = tabify(self._padding_code('i_pre', self.pre.geometry[0]-1), 6)
+        psp = """
+        if (_w_separable) {
+        // horizontal filter on the rows of the pre-synaptic population
+        %(omp_code)s
+        for(int _r = 0; _r < %(pre_height)s; _r++){
+            for(int _c = 0; _c < %(post_width)s; _c++){
+                sum = 0.0;
+                for(int j_w = 0; j_w < %(size_w1)s; j_w++){
+                    int j_pre = (%(offset1)s + %(sample1)s * _c) %(operator)s (j_w - %(center_w1)s);
+%(padding_j)s
+                    sum += _w_col[j_w] * %(rates)s[_r * %(pre_width)s + j_pre];
+                }
+                _filtered_rows[_r * %(post_width)s + _c] = sum;
+            }
+        }
+        // vertical filter on the filtered rows
+        %(omp_code)s
+        for(int _r = 0; _r < %(post_height)s; _r++){
+            for(int _c = 0; _c < %(post_width)s; _c++){
+                sum = 0.0;
+                for(int i_w = 0; i_w < %(size_w0)s; i_w++){
+                    int i_pre = (%(offset0)s + %(sample0)s * _r) %(operator)s (i_w - %(center_w0)s);
+%(padding_i)s
+                    sum += _w_row[i_w] * _filtered_rows[i_pre * %(post_width)s + _c];
+                }
+                pop%(id_post)s._sum_%(target)s[_r * %(post_width)s + _c] += %(sum_code)s;
+            }
+        }
+        } else {
+""" % ids + psp_loop + """
+        }
+"""
+        return {'declare': declare, 'update_pre_rank': "", 'update_w': update_w, 'psp': psp}
+
+    def _generate_gemm_code(self, psp_loop, sum_code):
+        """
+        Backend 'gemm': the receptive fields of a block of positions are copied into a dense matrix
+        (im2col), which is multiplied with the matrix of filters, blocked over the kernel elements.
+        """
+        shape = self.weights.shape[1:]
+        ids = {
+            'float_prec': Global.config['precision'],
+            'rates': self._pre_rates(),
+            'id_post': self.post.id, 'target': self.target,
+            'sum_code': sum_code,
+            'nb_filters': self.nb_filters,
+            'kernel_size': int(np.prod(shape)),
+            'nb_positions': int(self.post.size / self.nb_filters),
+            'block_positions': gemm_block_positions,
+            'block_kernel': gemm_block_kernel,
+            'rank': self._coordinates_to_rank('pre', self.pre.geometry),
+            'omp_parallel': "#pragma omp parallel private(sum, rk_pre, coord)" if Global.config['num_threads'] > 1 else "",
+            'omp_for': "#pragma omp for" if Global.config['num_threads'] > 1 else "",
+        }
+
+        declare = """
+    // Filters as a matrix (kernel element x filter)
+    std::vector< %(float_prec)s > _w_gemm;""" % ids
+
+        # Copy of the filters, looping over the elements of each filter
+        copy_w = ""
+        for dim in range(len(shape)):
+            copy_w += tabify("for(int %(index)s_w = 0; %(index)s_w < %(size)s; %(index)s_w++)" % {'index': indices[dim], 'size': shape[dim]}, dim) + "\n"
+        copy_w += tabify("_w_gemm[(_k++) * %(nb_filters)s + _f] = w[_f]%(index)s;" % {
+            'nb_filters': self.nb_filters,
+            'index': "".join(["[" + indices[dim] + "_w]" for dim in range(len(shape))])}, len(shape))
+
+        update_w = """
+        _w_gemm.resize(%(kernel_size)s * %(nb_filters)s);
+        for(int _f = 0; _f < %(nb_filters)s; _f++){
+            int _k = 0;
+""" % ids + tabify(copy_w, 3) + """
+        }"""
+
+        # im2col: loops over the kernel, padding and copy
+        im2col = ""
+        for dim in range(len(shape)):
+            im2col += tabify("""
+for(int %(index)s_w = 0; %(index)s_w < %(size)s; %(index)s_w++) {
+    int %(index)s_pre = coord[%(dim)s] %(operator)s (%(index)s_w - %(center)s);""" % {
+                'index': indices[dim], 'dim': dim, 'size': shape[dim],
+                'operator': '-' if self.method=='convolution' else '+',
+                'center': self._center_filter(shape[dim])}, dim)
+            if isinstance(self.padding, str): # 'border'
+                im2col += tabify("\n" + self._padding_code(indices[dim]+'_pre', self.pre.geometry[dim]-1), dim+1)
+
+        if isinstance(self.padding, str): # 'border'
+            copy = "rk_pre = %(rank)s;\n_line[_k++] = %(rates)s[rk_pre];" % ids
+        else:
+            outside = " || ".join([
+                "(%(index)s_pre < 0) || (%(index)s_pre > %(max_size)s)" % {'index': indices[dim], 'max_size': self.pre.geometry[dim]-1}
+                for dim in range(len(shape))
+            ])
+            copy = """if ( %(outside)s ) {
+    _line[_k++] = 0.0;
+    continue;
+}
+rk_pre = %(rank)s;
+_line[_k++] = %(rates)s[rk_pre];""" % {'outside': outside, 'rank': ids['rank'], 'rates': ids['rates']}
+        im2col += tabify("\n" + copy, len(shape))
+        for dim in range(len(shape)):
+            im2col += tabify("\n}", len(shape)-1-dim)
+        ids['im2col'] = tabify(im2col, 4)
+
+        psp = """
+        %(omp_parallel)s
+        {
+        std::vector< %(float_prec)s > _col(%(block_positions)s * %(kernel_size)s);
+        std::vector< %(float_prec)s > _res(%(block_positions)s * %(nb_filters)s);
+        %(omp_for)s
+        for(int _p0 = 0; _p0 < %(nb_positions)s; _p0 += %(block_positions)s){
+            int _nb = std::min(%(block_positions)s, %(nb_positions)s - _p0);
+            // im2col: one line per position
+            for(int _p = 0; _p < _nb; _p++){
+                coord = pre_rank[(_p0 + _p) * %(nb_filters)s];
+                %(float_prec)s* _line = &_col[_p * %(kernel_size)s];
+                int _k = 0;
+%(im2col)s
+            }
+            // product with the filters
+            std::fill(_res.begin(), _res.end(), 0.0);
+            for(int _k0 = 0; _k0 < %(kernel_size)s; _k0 += %(block_kernel)s){
+                int _k1 = std::min(_k0 + %(block_kernel)s, %(kernel_size)s);
+                for(int _p = 0; _p < _nb; _p++){
+                    %(float_prec)s* _out = &_res[_p * %(nb_filters)s];
+                    for(int _k = _k0; _k < _k1; _k++){
+                        %(float_prec)s _a = _col[_p * %(kernel_size)s + _k];
+                        const %(float_prec)s* _wk = &_w_gemm[_k * %(nb_filters)s];
+                        #pragma omp simd
+                        for(int _f = 0; _f < %(nb_filters)s; _f++)
+                            _out[_f] += _a * _wk[_f];
+                    }
+                }
+            }
+            for(int _p = 0; _p < _nb; _p++){
+                for(int _f = 0; _f < %(nb_filters)s; _f++){
+                    sum = _res[_p * %(nb_filters)s + _f];
+                    pop%(id_post)s._sum_%(target)s[(_p0 + _p) * %(nb_filters)s + _f] += %(sum_code)s;
+                }
+            }
+        }
+        }
+""" % ids
+        return {'declare': declare, 'update_pre_rank': "", 'update_w': update_w, 'psp': psp}
+
     def _generate_pooling_code(self):
 
         # Operation to be performed: sum, max, min, mean
@@ -918,13 +1246,33 @@ class SharedProjection(Projection):
             self._generate_copy()
 
     def _generate_omp(self, filter_definition, filter_pyx_definition, convolve_code, sum_code, kernel=True):
+        # Default loop over the post-synaptic neurons
+        psp_loop = """
+        %(omp_code)s
+        for(int i = 0; i < %(size_post)s; i++){
+            coord = pre_rank[i];
+""" + convolve_code + """
+            pop%(id_post)s._sum_%(target)s[i] += """ + sum_code + """;
+        } // for
+"""
+
+        # Convolution backends: additional data, updated when the connectivity or the weights are set
+        backend = {'declare': "", 'update_pre_rank': "", 'update_w': "", 'psp': psp_loop}
+        if self._operation_type == 'convolve':
+            if self.backend == 'split':
+                backend = self._generate_split_code(psp_loop, sum_code)
+            elif self.backend == 'separable':
+                backend = self._generate_separable_code(psp_loop, sum_code)
+            elif self.backend == 'gemm':
+                backend = self._generate_gemm_code(psp_loop, sum_code)
+
         # Specific template for generation
         self._specific_template = {
             # Declare the connectivity matrix
             'declare_connectivity_matrix': """
     std::vector<int> post_rank;
     std::vector< std::vector<int> > pre_rank;
-    """ + filter_definition.strip(),
+    """ + filter_definition.strip() + backend['declare'],
 
             # Accessors for the connectivity matrix
             'access_connectivity_matrix': """
@@ -932,9 +1280,11 @@ class SharedProjection(Projection):
     std::vector<int> get_post_rank() { return post_rank; }
     void set_post_rank(std::vector<int> ranks) { post_rank = ranks; }
     std::vector< std::vector<int> > get_pre_rank() { return pre_rank; }
-    void set_pre_rank(std::vector< std::vector<int> > ranks) { pre_rank = ranks; }
+    void set_pre_rank(std::vector< std::vector<int> > ranks) {
+        pre_rank = ranks;%(update_pre_rank)s
+    }
     int nb_synapses(int n) { return pre_rank[n].size(); }
-""" ,
+""" % {'update_pre_rank': backend['update_pre_rank']},
 
             # Export the connectivity matrix
             'export_connectivity': """
@@ -963,6 +1313,11 @@ class SharedProjection(Projection):
         return proj%(id_proj)s.get_pre_rank()
             """ % {'id_proj': self.id},
 
+            # Uniform delay, the wrapper does not receive any synapses
+            'wrapper_init_delay': """
+        proj%(id_proj)s.delay = %(delay)s
+""" % {'id_proj': self.id, 'delay': self.uniform_delay},
+
             # Wrapper access to variables
             'wrapper_access_parameters_variables' : "",
 
@@ -977,8 +1332,10 @@ class SharedProjection(Projection):
             self._specific_template['access_connectivity_matrix'] += """
     // Local parameter w
     %(type_w)s get_w() { return w; }
-    void set_w(%(type_w)s value) { w = value; }
-""" % {'type_w': filter_definition.replace(' w;', '')}
+    void set_w(%(type_w)s value) {
+        w = value;%(update_w)s
+    }
+""" % {'type_w': filter_definition.replace(' w;', ''), 'update_w': backend['update_w']}
             self._specific_template['export_connectivity'] += """
         # Local variable w
         %(type_w)s get_w()
@@ -1023,7 +1380,7 @@ class SharedProjection(Projection):
         if self.delays > Global.config['dt']:
             pre_load_r = """
         // pre-load delayed firing rate
-        auto delayed_r = pop%(id_pre)s._delayed_r[%(delay)s];
+        const auto& delayed_r = pop%(id_pre)s._delayed_r[%(delay)s];
         """% {'id_pre': self.pre.id, 'delay': str(int(self.delays/Global.config['dt'])-1)}
         else:
             pre_load_r = ""
@@ -1033,12 +1390,7 @@ class SharedProjection(Projection):
         if ( _transmission && pop%(id_pre)s._active ) {
         std::vector<int> coord;
 """ + pre_load_r + """
-        %(omp_code)s
-        for(int i = 0; i < %(size_post)s; i++){
-            coord = pre_rank[i];
-""" + convolve_code + """
-            pop%(id_post)s._sum_%(target)s[i] += """ + sum_code + """;
-        } // for
+""" + backend['psp'] + """
         } // if
 """
 
@@ -0,0 +1,386 @@
+#===============================================================================
+#
+#     Autotuner.py
+#
+#     This file is part of ANNarchy.
+#
+#     Copyright (C) 2013-2019  Julien Vitay <julien.vitay@gmail.com>,
+#     Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     ANNarchy is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#===============================================================================
+"""
+Automatic selection of the storage format and openMP schedule of projections,
+enabled with ``compile(autotune=True)``.
+
+For each projection which can use several storage formats, a trial network is
+built containing one copy of the pre- and post-synaptic populations and of the
+projection per candidate configuration (storage format, storage order and, when
+several threads are used, openMP schedule of the weighted sum). The trial network
+is compiled once in the ``autotune/`` subfolder of the compilation directory and
+each candidate is simulated for a few steps while the populations of the other
+candidates are disabled. The fastest configuration is applied to the projection
+before the code generation of the actual network.
+
+The decisions are stored in ``autotune.json`` in the directory of the compilation
+cache, keyed by a hash of the structure of the projection (neuron and synapse
+models, sizes, connection pattern, delays) and of the environment (ANNarchy
+release, paradigm, precision, number of threads, processor). Later runs of the
+same model, or of other models containing the same projection, reuse them without
+any trial. Deleting this file forces a new tuning.
+"""
+import os
+import hashlib
+import json
+import platform
+import tempfile
+import time
+
+import ANNarchy
+import ANNarchy.core.Global as Global
+from ANNarchy.core.PopulationView import PopulationView
+from ANNarchy.core.Projection import Projection
+from ANNarchy.parser.report.LatexParser import _process_random
+
+from .CompilationCache import cache_directory
+
+# Connectors of ConnectorMethods whose two last arguments are the storage format and order,
+# with the configurations they support.
+_connector_formats = {
+    'all_to_all': [('lil', 'post_to_pre'), ('csr', 'post_to_pre'), ('csr', 'pre_to_post'), ('sell', 'post_to_pre')],
+    'fixed_probability': [('lil', 'post_to_pre'), ('csr', 'pre_to_post'), ('sell', 'post_to_pre')],
+    'fixed_number_pre': [('lil', 'post_to_pre'), ('csr', 'pre_to_post'), ('sell', 'post_to_pre')],
+}
+
+# Schedules tried for the weighted sums of rate-coded projections when several threads are used
+_schedules = ["", "schedule(dynamic)", "schedule(guided)"]
+
+# Number of simulation steps of each trial
+_warmup_steps = 10
+_trial_steps = 100
+_repeats = 3
+
+# Number of trial networks compiled by this process, each one in its own directory
+_nb_trials = 0
+
+def tuning_cache_file():
+    """
+    Returns the path to the file storing the autotuning decisions.
+    """
+    return cache_directory() + '/autotune.json'
+
+def candidates(proj, ensemble=1):
+    """
+    Returns the list of configurations (dictionaries with the keys 'storage_format', 'storage_order' and 'psp_schedule') which can be used by the projection. An empty list means that the projection is not tuned.
+    """
+    if type(proj) is not Projection or proj._connection_method is None:
+        return []
+
+    method = proj._connection_method.__name__
+    if not method in _connector_formats.keys():
+        return []
+
+    # Projections with a single weight do not store any connectivity-sized array
+    if proj._has_single_weight() or proj._dense_matrix:
+        return []
+
+    description = proj.synapse_type.description
+    uniform_delay = proj.max_delay <= 1 or proj.uniform_delay != -1
+
+    formats = []
+    for storage_format, storage_order in _connector_formats[method]:
+        if storage_format == "lil":
+            formats.append((storage_format, storage_order))
+            continue
+
+        # The ensemble mode replicates lil structures only
+        if ensemble > 1 or not uniform_delay:
+            continue
+
+        # Only lil and sell are generated when structural plasticity is enabled
+        if storage_format == "csr" and Global.config['structural_plasticity']:
+            continue
+
+        # csr can not initialize local synaptic attributes other than the weights
+        if storage_format == "csr" and len([name for name in description['local'] if name != "w"]) > 0:
+            continue
+
+        if proj.synapse_type.type == "rate":
+            # the rate-coded csr kernels iterate over the post-synaptic neurons
+            if storage_format == "csr" and storage_order == "pre_to_post":
+                continue
+            if storage_format == "sell" and ('pruning' in description.keys() or 'creating' in description.keys() or len(description['random_distributions']) > 0):
+                continue
+        else:
+            if storage_format == "sell" or description['plasticity']:
+                continue
+
+        formats.append((storage_format, storage_order))
+
+    schedules = [""]
+    if proj.synapse_type.type == "rate" and Global.config['num_threads'] > 1:
+        schedules = _schedules
+
+    configs = []
+    for storage_format, storage_order in formats:
+        for schedule in schedules:
+            configs.append({'storage_format': storage_format, 'storage_order': storage_order, 'psp_schedule': schedule})
+
+    return configs if len(configs) > 1 else []
+
+def projection_key(proj, ensemble=1):
+    """
+    Hash of the structure of the projection and of the environment, used as key in the tuning cache.
+    """
+    sha = hashlib.sha1()
+
+    def update(*items):
+        for item in items:
+            sha.update(str(item).encode('UTF-8'))
+            sha.update(b'\0')
+
+    # Environment
+    update(ANNarchy.__release__, Global.config['paradigm'], Global.config['precision'],
+           Global.config['num_threads'], Global.config['dt'], ensemble,
+           platform.machine(), platform.processor(), os.cpu_count() if hasattr(os, 'cpu_count') else '')
+
+    # Neuron models and sizes
+    for pop in [proj.pre, proj.post]:
+        population = pop.population if isinstance(pop, PopulationView) else pop
+        neuron = population.neuron_type
+        update(type(population).__name__, population.size, pop.size,
+               neuron.parameters, neuron.equations, neuron.functions, neuron.spike, neuron.reset, neuron.refractory)
+    update((proj.pre.population if isinstance(proj.pre, PopulationView) else proj.pre) is
+           (proj.post.population if isinstance(proj.post, PopulationView) else proj.post))
+
+    # Synapse model
+    synapse = proj.synapse_type
+    update(synapse.type, synapse.parameters, synapse.equations, synapse.functions, synapse.psp, synapse.operation,
+           synapse.pre_spike, synapse.post_spike, synapse.pruning, synapse.creating)
+
+    # Connectivity
+    update(proj.target, proj.max_delay, proj.uniform_delay, proj._connection_method.__name__)
+    update(*[_process_random(arg) for arg in proj._connection_args[:-2]])
+
+    return sha.hexdigest()
+
+def _load_cache():
+    "Returns the content of the tuning cache."
+    try:
+        with open(tuning_cache_file(), 'r') as rfile:
+            return json.load(rfile)
+    except Exception:
+        return {}
+
+def _store_cache(decisions):
+    "Adds the decisions to the tuning cache."
+    cache_dir = cache_directory()
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        # Other processes may have tuned other projections in the meantime
+        data = _load_cache()
+        data.update(decisions)
+
+        # Atomic replacement of the file
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, prefix='.tmp')
+        with os.fdopen(fd, 'w') as wfile:
+            json.dump(data, wfile, indent=4)
+        os.rename(tmp_file, tuning_cache_file())
+
+    except Exception as e:
+        Global._warning('Could not store the autotuning decisions:', e)
+
+def _apply(proj, config):
+    "Modifies the projection so that it uses the configuration."
+    proj._storage_format = config['storage_format']
+    proj._storage_order = config['storage_order']
+    proj._connection_args = proj._connection_args[:-2] + (config['storage_format'], config['storage_order'])
+
+    if config['psp_schedule'] != "":
+        proj._omp_config['psp_schedule'] = config['psp_schedule']
+    elif 'psp_schedule' in proj._omp_config.keys():
+        del proj._omp_config['psp_schedule']
+
+def _describe(config):
+    "Short textual description of a configuration."
+    desc = config['storage_format'] + ', ' + config['storage_order']
+    if config['psp_schedule'] != "":
+        desc += ', ' + config['psp_schedule']
+    return desc
+
+def _copy_population(pop, trial_id):
+    "Creates a copy of the (underlying) population in the trial network."
+    population = pop.population if isinstance(pop, PopulationView) else pop
+
+    copy = population._copy()
+    Global._network[0]['populations'].pop(-1)
+
+    copy.id = len(Global._network[trial_id]['populations'])
+    copy.class_name = 'pop' + str(copy.id)
+    copy.name = 'autotune_' + copy.class_name
+    copy.init = population.init
+    Global._network[trial_id]['populations'].append(copy)
+
+    return copy
+
+def _view(pop, copy):
+    "Applies the ranks of a population view to the copy."
+    if isinstance(pop, PopulationView):
+        return PopulationView(copy, pop.ranks)
+    return copy
+
+def _trial_network(tuned):
+    """
+    Creates the trial network. Returns the network and, for each tuned projection, the list of (configuration, populations) of its candidates.
+    """
+    from ANNarchy.core.Network import Network
+
+    net = Network()
+    trials = []
+
+    for proj, configs in tuned:
+        recurrent = (proj.pre.population if isinstance(proj.pre, PopulationView) else proj.pre) is \
+                    (proj.post.population if isinstance(proj.post, PopulationView) else proj.post)
+
+        candidates = []
+        for config in configs:
+            pre = _copy_population(proj.pre, net.id)
+            post = pre if recurrent else _copy_population(proj.post, net.id)
+
+            copy = proj._copy(_view(proj.pre, pre), _view(proj.post, post))
+            Global._network[0]['projections'].pop(-1)
+            copy.id = len(Global._network[net.id]['projections'])
+            copy.name = 'autotune_proj' + str(copy.id)
+            copy.init = proj.init
+            copy._store_connectivity(proj._connection_method, proj._connection_args, proj._connection_delay, proj._storage_format, proj._storage_order)
+            _apply(copy, config)
+            Global._network[net.id]['projections'].append(copy)
+
+            candidates.append((config, [pre] if recurrent else [pre, post]))
+
+        trials.append(candidates)
+
+    net.populations = list(Global._network[net.id]['populations'])
+    net.projections = list(Global._network[net.id]['projections'])
+
+    return net, trials
+
+def _remove_network(net):
+    """
+    Removes the trial network from the list of networks once measured. It is the last network, created by _trial_network().
+    """
+    import ANNarchy.core.Simulate as Simulate
+
+    Global._network.pop(net.id)
+    Simulate._callbacks.pop(net.id)
+    Simulate._callbacks_enabled.pop(net.id)
+
+def _measure(net, trials):
+    """
+    Simulates each candidate alone and returns, for each tuned projection, the best simulation time of its candidates.
+    """
+    timings = [[float('inf') for _ in candidates] for candidates in trials]
+
+    net.simulate(_warmup_steps * Global.config['dt'])
+
+    # The candidates are interleaved in each repetition, so that perturbations
+    # of the machine do not favour one of them.
+    for _ in range(_repeats):
+        for idx, candidates in enumerate(trials):
+            for rk, (config, pops) in enumerate(candidates):
+                for pop in net.populations:
+                    if any([pop is other for other in pops]):
+                        pop.enable()
+                    else:
+                        pop.disable()
+
+                net.simulate(_warmup_steps * Global.config['dt'])
+                tstart = time.time()
+                net.simulate(_trial_steps * Global.config['dt'])
+                timings[idx][rk] = min(timings[idx][rk], time.time() - tstart)
+
+    return timings
+
+def tune(projections, directory, compiler="default", compiler_flags="default", silent=False, ensemble=1):
+    """
+    Selects the storage format and openMP schedule of the projections, either from the tuning cache or by timing trial runs.
+
+    *Parameters*:
+
+    * **projections**: list of projections to tune. Projections which can only use one configuration are ignored.
+    * **directory**: relative path of the compilation directories of the trial networks.
+    * **compiler**, **compiler_flags**: passed to the compilation of the trial network.
+    * **silent**: if False, the decisions are printed.
+    * **ensemble**: number of instances in ensemble mode, which only supports the lil format.
+    """
+    if not Global._check_paradigm("openmp"):
+        Global._warning('compile(): autotuning is only available for the openMP backend.')
+        return
+
+    cache = _load_cache()
+
+    tuned = []
+    for proj in projections:
+        configs = candidates(proj, ensemble)
+        if len(configs) == 0:
+            continue
+
+        key = projection_key(proj, ensemble)
+        if key in cache.keys():
+            config = cache[key]
+            _apply(proj, config)
+            if Global.config['verbose']:
+                Global._print('Autotuning: found', proj.name, 'in the tuning cache (' + _describe(config) + ').')
+        else:
+            tuned.append((proj, configs))
+
+    if len(tuned) == 0:
+        return
+
+    if not silent:
+        Global._print('Autotuning', len(tuned), 'projection(s)...')
+
+    # Compile and run the trial network. Its id is given to the next network once it is removed, so each
+    # trial library gets its own path: an already loaded library would be returned again by the import.
+    global _nb_trials
+    from .Compiler import compile as _compile
+    net, trials = _trial_network(tuned)
+    _nb_trials += 1
+    try:
+        _compile(directory=directory + '/trial' + str(_nb_trials), compiler=compiler, compiler_flags=compiler_flags, silent=True, net_id=net.id)
+        timings = _measure(net, trials)
+    finally:
+        _remove_network(net)
+
+    decisions = {}
+    for (proj, configs), times in zip(tuned, timings):
+        best = configs[times.index(min(times))]
+        _apply(proj, best)
+
+        decisions[projection_key(proj, ensemble)] = {
+            'storage_format': best['storage_format'],
+            'storage_order': best['storage_order'],
+            'psp_schedule': best['psp_schedule'],
+            'name': proj.name,
+            'timings': dict((_describe(config), t) for config, t in zip(configs, times)),
+            'created': time.time()
+        }
+
+        if not silent:
+            Global._print('   ', proj.name, '->', _describe(best))
+
+    _store_cache(decisions)
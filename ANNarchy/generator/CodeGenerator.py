@@ -776,18 +776,9 @@ void set_%(name)s(%(float_prec)s value){
                 ops.append(op['function'])
 
         if Global.config['paradigm'] == "openmp":
-            if ops == []:
-                return ""
-
-            from .Template.GlobalOperationTemplate import global_operation_templates_openmp as omp_template
-            code = ""
-            for op in list(set(ops)):
-                code += omp_template[op] % {
-                    'type': Global.config['precision'],
-                    'omp': '' if Global.config['num_threads'] > 1 else "//"
-                }
-
-            return code
+            # The global operations are computed by the populations
+            # themselves (see OpenMPGenerator._update_globalops)
+            return ""
         elif Global.config['paradigm'] == "cuda":
             if ops == []:
                 return "", ""
@@ -1040,6 +1031,10 @@ void set_%(name)s(%(float_prec)s value){
                 if proj._storage_format == "csr":
                     Global._warning("CSR representation is an experimental feature, we greatly appreciate bug reports.")
                     break
+            for proj in projections:
+                if proj._storage_format == "sell":
+                    Global._warning("SELL representation is an experimental feature, we greatly appreciate bug reports.")
+                    break
 
         elif Global.config['paradigm'] == "cuda":
             for pop in populations:
@@ -0,0 +1,242 @@
+#===============================================================================
+#
+#     CompilationCache.py
+#
+#     This file is part of ANNarchy.
+#
+#     Copyright (C) 2013-2019  Julien Vitay <julien.vitay@gmail.com>,
+#     Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     ANNarchy is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#===============================================================================
+"""
+Persistent, user-level cache of compiled ANNarchyCore libraries.
+
+Each entry is stored in a sub-folder of the cache directory named after a
+hash of the generated sources (including the Makefile, i. e. the compiler
+flags and include paths), the compiler, Python, Cython and NumPy versions,
+the ANNarchy release and the precision/paradigm. A network whose generated code is byte-identical to an
+already built one (other working directory, ``--clean``, parameter sweeps in
+separate processes...) can therefore load the cached library instead of
+calling ``make``.
+
+Note that the network id is part of the generated code (the Python module is
+named ``ANNarchyCore<id>``), so two networks with different ids never share
+an entry.
+
+The cache can be inspected or purged from the command line::
+
+    python -m ANNarchy.generator.CompilationCache --list
+    python -m ANNarchy.generator.CompilationCache --purge
+"""
+import os, sys
+import hashlib
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+
+import Cython
+import numpy as np
+
+import ANNarchy
+import ANNarchy.core.Global as Global
+
+def cache_directory():
+    """
+    Returns the path to the cache directory (``Global.config['cache_dir']``, by default ``~/.cache/ANNarchy``).
+    """
+    if Global.config['cache_dir'] is None:
+        return os.path.expanduser('~/.cache/ANNarchy')
+    return os.path.expanduser(Global.config['cache_dir'])
+
+def compiler_version(compiler):
+    """
+    Returns the first line of ``compiler --version``, or an empty string if the compiler can not be called.
+    """
+    try:
+        proc = subprocess.Popen([compiler, '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, _ = proc.communicate()
+        return out.decode('UTF-8').strip().split('\n')[0]
+    except Exception:
+        return ""
+
+def compute_key(source_dir, compiler):
+    """
+    Computes the cache key of a generated network.
+
+    *Parameters*:
+
+    * **source_dir**: folder containing the generated code (including the Makefile).
+    * **compiler**: name of the compiler called in the Makefile.
+    """
+    sha = hashlib.sha1()
+
+    # Environment
+    sha.update(ANNarchy.__release__.encode('UTF-8'))
+    sha.update(Global.config['paradigm'].encode('UTF-8'))
+    sha.update(Global.config['precision'].encode('UTF-8'))
+    sha.update(compiler_version(compiler).encode('UTF-8'))
+    sha.update(sys.version.encode('UTF-8'))
+    # The Cython version changes the generated wrapper, the NumPy one its C-API
+    sha.update(Cython.__version__.encode('UTF-8'))
+    sha.update(np.__version__.encode('UTF-8'))
+
+    # The generated sources, in a deterministic order. The codegen.log only
+    # contains object names and is not compiled.
+    for filename in sorted(os.listdir(source_dir)):
+        if filename == 'codegen.log':
+            continue
+        sha.update(filename.encode('UTF-8'))
+        with open(source_dir + '/' + filename, 'rb') as rfile:
+            sha.update(rfile.read())
+
+    # Headers of the connectivity module are included by the generated code
+    cython_ext = ANNarchy.__path__[0] + '/core/cython_ext/'
+    for filename in sorted(os.listdir(cython_ext)):
+        if filename.endswith('.pxd') or filename.endswith('.hpp'):
+            with open(cython_ext + filename, 'rb') as rfile:
+                sha.update(rfile.read())
+
+    return sha.hexdigest()
+
+def fetch(key, library):
+    """
+    Copies the cached library corresponding to ``key`` to the path ``library``.
+
+    Returns True on a cache hit, False otherwise.
+    """
+    entry = cache_directory() + '/' + key
+    cached_library = entry + '/' + os.path.basename(library)
+    if not os.path.isfile(cached_library):
+        return False
+
+    try:
+        shutil.copy(cached_library, library)
+    except Exception:
+        return False
+
+    # Mark the entry as recently used
+    os.utime(entry, None)
+
+    if Global.config['verbose']:
+        Global._print('Found the compiled library in the cache (' + key + ').')
+
+    return True
+
+def store(key, library):
+    """
+    Adds the compiled library to the cache under ``key`` and evicts the least recently used entries if the maximal size is exceeded.
+    """
+    cache_dir = cache_directory()
+    entry = cache_dir + '/' + key
+
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        # Several processes can compile the same network concurrently:
+        # the entry is first built in a temporary folder and then renamed.
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp')
+        shutil.copy(library, tmp_dir + '/' + os.path.basename(library))
+        with open(tmp_dir + '/info.json', 'w') as wfile:
+            json.dump({
+                'library': os.path.basename(library),
+                'release': ANNarchy.__release__,
+                'paradigm': Global.config['paradigm'],
+                'precision': Global.config['precision'],
+                'directory': os.path.dirname(library),
+                'created': time.time()
+            }, wfile, indent=4)
+
+        if os.path.exists(entry):
+            shutil.rmtree(tmp_dir, True)
+        else:
+            os.rename(tmp_dir, entry)
+
+    except Exception as e:
+        Global._warning('Could not store the compiled library in the cache:', e)
+        return
+
+    evict(Global.config['cache_size'])
+
+def entries():
+    """
+    Returns a list of (key, size in bytes, last access time, info dict) for all cache entries, the most recently used first.
+    """
+    cache_dir = cache_directory()
+    if not os.path.isdir(cache_dir):
+        return []
+
+    data = []
+    for key in os.listdir(cache_dir):
+        entry = cache_dir + '/' + key
+        if key.startswith('.') or not os.path.isdir(entry):
+            continue
+        size = 0
+        for filename in os.listdir(entry):
+            size += os.path.getsize(entry + '/' + filename)
+        try:
+            with open(entry + '/info.json', 'r') as rfile:
+                info = json.load(rfile)
+        except Exception:
+            info = {}
+        data.append((key, size, os.path.getmtime(entry), info))
+
+    return sorted(data, key=lambda x: x[2], reverse=True)
+
+def evict(max_size):
+    """
+    Removes the least recently used entries until the cache is smaller than ``max_size`` (in MB).
+    """
+    max_bytes = max_size * 1024 * 1024
+    total = 0
+    for key, size, _, _ in entries():
+        total += size
+        if total > max_bytes:
+            shutil.rmtree(cache_directory() + '/' + key, True)
+
+def purge():
+    """
+    Removes all entries of the cache.
+    """
+    for key, _, _, _ in entries():
+        shutil.rmtree(cache_directory() + '/' + key, True)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ANNarchy: cache of compiled networks.')
+    parser.add_argument("-l", "--list", help="Lists the cached libraries.", action="store_true", default=False, dest="list")
+    parser.add_argument("-p", "--purge", help="Removes all cached libraries.", action="store_true", default=False, dest="purge")
+    parser.add_argument("--max-size", help="Evicts the least recently used libraries until the cache is smaller than the given size (in MB).", type=float, action="store", default=None, dest="max_size")
+    parser.add_argument("--cache-dir", help="Cache directory (default: ~/.cache/ANNarchy).", type=str, action="store", default=None, dest="cache_dir")
+    options = parser.parse_args()
+
+    if options.cache_dir is not None:
+        Global.config['cache_dir'] = options.cache_dir
+
+    if options.purge:
+        purge()
+    elif options.max_size is not None:
+        evict(options.max_size)
+
+    cached = entries()
+    if options.list or not (options.purge or options.max_size is not None):
+        for key, size, last_used, info in cached:
+            print(key, '%.2f MB' % (size/1024./1024.), time.strftime('%Y-%m-%d %H:%M', time.localtime(last_used)),
+                  info.get('library', ''), info.get('paradigm', ''), info.get('precision', ''), info.get('directory', ''))
+    print(cache_directory() + ':', len(cached), 'entries,', '%.2f MB' % (sum([e[1] for e in cached])/1024./1024.))
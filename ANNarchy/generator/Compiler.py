@@ -34,7 +34,7 @@ import numpy as np
 import ANNarchy
 import ANNarchy.core.Global as Global
 from .Template.MakefileTemplate import *
-from .Sanity import check_structure
+from .Sanity import check_structure, check_ensemble
 
 # String containing the extra libs which can be added by extensions
 # e.g. extra_libs = ['-lopencv_core', '-lopencv_video']
@@ -60,7 +60,7 @@ def _folder_management(annarchy_dir, profile_enabled, clean, net_id):
 
     # Create the subdirectory
     if not os.path.exists(annarchy_dir):
-        os.mkdir(annarchy_dir)
+        os.makedirs(annarchy_dir)
         os.mkdir(annarchy_dir+'/build')
         os.mkdir(annarchy_dir+'/generate')
 
@@ -68,9 +68,11 @@ def _folder_management(annarchy_dir, profile_enabled, clean, net_id):
     if not os.path.exists(annarchy_dir+'/build/net'+str(net_id)):
         os.mkdir(annarchy_dir+'/build/net'+str(net_id))
 
-    # Create the generate subfolder
-    if not os.path.exists(annarchy_dir+'/generate/net'+str(net_id)):
-        os.mkdir(annarchy_dir+'/generate/net'+str(net_id))
+    # Create the generate subfolder. All files are generated again, the ones of a previous
+    # network (e.g. pop3.cpp) must not be copied to build/ where all .cpp files are compiled.
+    if os.path.exists(annarchy_dir+'/generate/net'+str(net_id)):
+        shutil.rmtree(annarchy_dir+'/generate/net'+str(net_id), True)
+    os.mkdir(annarchy_dir+'/generate/net'+str(net_id))
 
     # Save current ANNarchy version and paradigm
     with open(annarchy_dir+'/release', 'w') as wfile:
@@ -92,6 +94,7 @@ def setup_parser():
     group.add_argument("-d", "--debug", help="Compilation with debug symbols and additional checks.", action="store_true", default=False, dest="debug")
     group.add_argument("-v", "--verbose", help="Shows all messages.", action="store_true", default=None, dest="verbose")
     group.add_argument("--prec", help="Set the floating precision used.", action="store", type=str, default=None, dest="precision")
+    group.add_argument("--no-cache", help="Disables the cache of compiled networks.", action="store_true", default=False, dest="no_cache")
 
     group = parser.add_argument_group('OpenMP')
     group.add_argument("-j", "--num_threads", help="Number of threads to use.", type=int, action="store", default=None, dest="num_threads")
@@ -118,6 +121,8 @@ def compile(
         silent=False,
         debug_build=False,
         profile_enabled=False,
+        ensemble=1,
+        autotune=False,
         net_id=0
     ):
     """
@@ -133,6 +138,8 @@ def compile(
     * **compiler_flags**: platform-specific flags to pass to the compiler. Default: "-march=native -O2". Warning: -O3 often generates slower code and can cause linking problems, so it is not recommended.
     * **cuda_config**: dictionary defining the CUDA configuration for each population and projection.
     * **silent**: defines if the "Compiling... OK" should be printed.
+    * **ensemble**: number of independent instances of the network simulated together (default: 1). See the section "Ensembles" of the manual.
+    * **autotune**: if True, the storage format and openMP schedule of the projections are chosen by timing short trial runs, the decisions being stored in a user-level cache and reused by later runs (default: False). See the section "Automatic selection of the storage format" of the manual.
 
     The ``compiler``, ``compiler_flags`` and part of ``cuda_config`` take their default value from the configuration file ``~/.config/ANNarchy/annarchy.json``.
 
@@ -147,6 +154,11 @@ def compile(
     If you are re-running a Jupyter notebook, you should call `clear()` right after importing ANNarchy in order to reset everything.""")
         return
 
+    # Number of instances in ensemble mode
+    if int(ensemble) < 1:
+        Global._error('compile(): the number of instances in the ensemble must be at least 1.')
+    Global._network[net_id]['ensemble'] = int(ensemble)
+
     # Get the command-line arguments
     parser = setup_parser()
     options, unknown = parser.parse_known_args()
@@ -186,6 +198,10 @@ def compile(
         Global.config['profiling'] = options.profile
         Global.config['profile_out'] = options.profile_out
 
+    # Compilation cache
+    if options.no_cache:
+        Global.config['compilation_cache'] = False
+
     # Debug
     if not debug_build:
         debug_build = options.debug  # debug build
@@ -213,6 +229,11 @@ def compile(
         Global._warning("OpenMP is not supported on Mac OS yet")
         Global.config['num_threads'] = 1
 
+    # Choose the storage formats before the code generation
+    if autotune:
+        from .Autotuner import tune
+        tune(projections, directory=directory + '/autotune', compiler=compiler, compiler_flags=compiler_flags, silent=silent, ensemble=int(ensemble))
+
     # Test if the current ANNarchy version is newer than what was used to create the subfolder
     from pkg_resources import parse_version
     if os.path.isfile(annarchy_dir+'/release'):
@@ -328,6 +349,22 @@ def python_environment():
 
     return py_version, py_major, python_include, python_lib, python_libpath, cython
 
+def compiler_launcher():
+    """
+    Returns the compiler cache (ccache or sccache) to prepend to the compiler call in the Makefile, or an empty string if none is installed.
+
+    The behavior is controlled by ``Global.config['compiler_launcher']``: "auto" (default) uses the first available one, "" disables it.
+    """
+    if Global.config['compiler_launcher'] != "auto":
+        launcher = Global.config['compiler_launcher']
+        return launcher + ' ' if launcher else ""
+
+    for launcher in ['ccache', 'sccache']:
+        test = subprocess.Popen(launcher + " --version > /dev/null 2> /dev/null", shell=True)
+        if test.wait() == 0:
+            return launcher + ' '
+    return ""
+
 class Compiler(object):
     " Main class to generate C++ code efficiently"
 
@@ -368,6 +405,10 @@ class Compiler(object):
         # Generate the code
         self.code_generation()
 
+        # Check that the network can be simulated in ensemble mode.
+        if Global._network[self.net_id]['ensemble'] > 1:
+            check_ensemble(self.populations, self.projections)
+
         # Generate the Makefile
         self.generate_makefile()
 
@@ -375,8 +416,21 @@ class Compiler(object):
         changed = self.copy_files()
 
         # Perform compilation if something has changed
-        if changed or not os.path.isfile(self.annarchy_dir + '/ANNarchyCore' + str(self.net_id) + '.so'):
-            self.compilation()
+        library = self.annarchy_dir + '/ANNarchyCore' + str(self.net_id) + '.so'
+        if changed or not os.path.isfile(library):
+            # The profiling and debug builds are not cached
+            use_cache = Global.config['compilation_cache'] and not (self.profile_enabled or self.debug_build)
+            if use_cache:
+                from . import CompilationCache
+                key = CompilationCache.compute_key(self.annarchy_dir + '/generate/net' + str(self.net_id), self._cache_compiler)
+
+            if use_cache and CompilationCache.fetch(key, library):
+                with open(self.annarchy_dir + '/compilation', 'w') as wfile:
+                    wfile.write("1")
+            else:
+                self.compilation()
+                if use_cache:
+                    CompilationCache.store(key, library)
 
         Global._network[self.net_id]['compiled'] = True
 
@@ -416,14 +470,15 @@ class Compiler(object):
                 if file == 'Makefile':
                     continue
                 basename, extension = os.path.splitext(file)
-                if not extension in ['h', 'hpp', 'cpp', 'cu']: # ex: .o
+                if not extension in ['.h', '.hpp', '.cpp', '.cu']: # ex: .o
                     continue
                 if not os.path.isfile(self.annarchy_dir+'/generate/net'+ str(self.net_id) + '/' + file):
                     if file.startswith('ANNarchyCore'):
                         continue
                     os.remove(self.annarchy_dir+'/build/net'+ str(self.net_id) + '/' + file)
-                    if os.path.isfile(self.annarchy_dir+'/build/net'+ str(self.net_id) + '/' + basename + '.o'):
-                        os.remove(self.annarchy_dir+'/build/net'+ str(self.net_id) + '/' + basename + '.o')
+                    for ext in ['.o', '.d']:
+                        if os.path.isfile(self.annarchy_dir+'/build/net'+ str(self.net_id) + '/' + basename + ext):
+                            os.remove(self.annarchy_dir+'/build/net'+ str(self.net_id) + '/' + basename + ext)
                     changed = True
 
         return changed
@@ -441,13 +496,21 @@ class Compiler(object):
                 t0 = time.time()
 
         # Switch to the build directory
+        cwd = os.getcwd()
         os.chdir(self.annarchy_dir + '/build/net'+ str(self.net_id))
 
         # Start the compilation
         verbose = "> compile_stdout.log 2> compile_stderr.log" if not Global.config["verbose"] else ""
 
+        # Number of parallel jobs, by default the number of cores
+        if Global.config['build_jobs'] is None:
+            import multiprocessing
+            build_jobs = multiprocessing.cpu_count()
+        else:
+            build_jobs = int(Global.config['build_jobs'])
+
         # Start the compilation process
-        make_process = subprocess.Popen("make all -j4" + verbose, shell=True)
+        make_process = subprocess.Popen("make all -j" + str(build_jobs) + verbose, shell=True)
 
         # Check for errors
         if make_process.wait() != 0:
@@ -466,7 +529,7 @@ class Compiler(object):
                 wfile.write("1")
 
         # Return to the current directory
-        os.chdir('../../..')
+        os.chdir(cwd)
 
         if not self.silent:
             Global._print('OK')
@@ -501,6 +564,9 @@ class Compiler(object):
         omp_flag = ""
         if Global.config['paradigm'] == "openmp" and Global.config['num_threads'] > 1 and sys.platform != "darwin":
             omp_flag = "-fopenmp"
+        elif Global.config['paradigm'] == "openmp" and sys.platform != "darwin":
+            # only the simd directives (e.g. of the sell format) are honoured
+            omp_flag = "-fopenmp-simd"
 
         # Cuda Library and Compiler
         #
@@ -532,6 +598,9 @@ class Compiler(object):
         for lib in extra_libs:
             libs += str(lib) + ' '
 
+        # Compiler cache (ccache or sccache) if available
+        launcher = compiler_launcher()
+
         # Python environment
         py_version, py_major, python_include, python_lib, python_libpath, cython_major = python_environment()
 
@@ -545,6 +614,7 @@ class Compiler(object):
         # Gather all Makefile flags
         makefile_flags = {
             'compiler': self.compiler,
+            'launcher': launcher,
             'cpu_flags': cpu_flags,
             'cuda_gen': cuda_gen,
             'gpu_compiler': gpu_compiler,
@@ -581,6 +651,9 @@ class Compiler(object):
         with open(self.annarchy_dir + '/generate/net'+ str(self.net_id) + '/Makefile', 'w') as wfile:
             wfile.write(makefile_template % makefile_flags)
 
+        # The version of this compiler is part of the cache key
+        self._cache_compiler = gpu_compiler if Global.config['paradigm'] == "cuda" else self.compiler
+
 
     def code_generation(self):
         """ Code generation dependent on paradigm """
@@ -590,9 +663,11 @@ class Compiler(object):
 
 
 
-def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
+def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None, library=None):
     """ After every is compiled, actually create the Cython objects and
-        bind them to the Python ones."""
+        bind them to the Python ones.
+
+        ``library`` is the path of the shared library to import, by default the one compiled for ``import_id``."""
 
     # parallel_run(number=x) defines multiple networks (net_id) but only network0 is compiled
     if import_id < 0:
@@ -600,6 +675,8 @@ def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
 
     # subdirectory where the library lies
     annarchy_dir = Global._network[import_id]['directory']
+    if library is None:
+        library = annarchy_dir + '/ANNarchyCore' + str(import_id) + '.so'
 
     if Global.config['verbose']:
         Global._print('Building network ...')
@@ -608,7 +685,7 @@ def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
     try:
         cython_module = imp.load_dynamic(
             'ANNarchyCore' + str(import_id), # Name of the network
-            annarchy_dir + '/ANNarchyCore' + str(import_id) + '.so' # Path to the library
+            library # Path to the library
         )
     except Exception as e:
         Global._print(e)
@@ -616,6 +693,10 @@ def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
 
     Global._network[net_id]['instance'] = cython_module
 
+    # Number of instances of each population and projection
+    ensemble = Global._network[import_id]['ensemble']
+    Global._network[net_id]['ensemble'] = ensemble
+
     # Set the CUDA device
     if Global._check_paradigm("cuda"):
         device = 0
@@ -636,6 +717,7 @@ def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
             t0 = time.time()
 
         # Instantiate the population
+        pop._ensemble = ensemble
         pop._instantiate(cython_module)
 
         if Global.config['show_time']:
@@ -649,6 +731,7 @@ def _instantiate(net_id, import_id=-1, cuda_config=None, user_config=None):
             t0 = time.time()
 
         # Create the projection
+        proj._ensemble = ensemble
         proj._instantiate(cython_module)
 
         if Global.config['show_time']:
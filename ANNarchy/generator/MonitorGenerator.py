@@ -171,13 +171,18 @@ class MonitorGenerator(object):
             recording_code += template[var['locality']]['recording'] % ids
 
             # Memory management
-            if var['locality'] == "global":
-                determine_size += "size_in_bytes += sizeof(%(type)s);\t//%(name)s\n" % ids
-            else:
-                determine_size += "size_in_bytes += sizeof(%(type)s) * %(name)s.capacity();\t//%(name)s\n" % ids
+            determine_size += "size_in_bytes += sizeof(%(type)s) * %(name)s.capacity();\t//%(name)s\n" % ids
 
         # Spike events
-        if pop.neuron_type.type == 'spike':
+        if pop.neuron_type.type == 'spike' and Global.config['paradigm'] == "openmp":
+            ids = {'id': pop.id, 'type' : 'long int', 'name': 'spike'}
+            struct_code += template['spike']['struct'] % ids
+            init_code += template['spike']['init'] % ids
+            determine_size += template['spike']['size_in_bytes'] % ids
+
+            recording_code += RecTemplate.recording_spike_tpl[Global.config['paradigm']] % {'id': pop.id, 'type' : 'int', 'name': 'spike'}
+
+        elif pop.neuron_type.type == 'spike':
             struct_code += """
     // Local variable %(name)s
     std::map<int, std::vector< %(type)s > > %(name)s ;
@@ -265,6 +270,9 @@ class MonitorGenerator(object):
             # Get the recording code
             if proj._storage_format == "lil":
                 recording_code += template[locality]['recording'] % {'id': proj.id, 'type' : var['ctype'], 'name': var['name']}
+            elif proj._storage_format == "sell":
+                key = 'recording_sell' if locality == 'local' else 'recording'
+                recording_code += template[locality][key] % {'id': proj.id, 'type' : var['ctype'], 'name': var['name']}
             else:
                 Global._warning("Monitor: variable "+ var['name'] + " cannot be recorded for a projection using the csr format...")
 
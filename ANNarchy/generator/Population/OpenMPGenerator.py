@@ -23,7 +23,7 @@
 #===============================================================================
 import datetime
 
-from ANNarchy.generator.Template.GlobalOperationTemplate import global_operation_templates_extern as global_op_extern_dict
+from ANNarchy.generator.Template.GlobalOperationTemplate import global_operation_templates_openmp as global_op_template
 from ANNarchy.core import Global
 from ANNarchy import __release__
 
@@ -64,10 +64,8 @@ class OpenMPGenerator(PopulationGenerator):
         init_additional = ""
         reset_additional = ""
 
-        # Declare global operations as extern at the beginning of the file
+        # Global operations are computed in the population itself
         extern_global_operations = ""
-        for op in pop.global_operations:
-            extern_global_operations += global_op_extern_dict[op['function']] % {'type': Global.config['precision']}
 
         # Initialize parameters and variables
         init_parameters_variables = self._init_population(pop)
@@ -78,6 +76,8 @@ class OpenMPGenerator(PopulationGenerator):
             # Main data for spiking pops
             declare_spike += self._templates['spike_specific']['declare_spike'] % {'id': pop.id}
             init_spike += self._templates['spike_specific']['init_spike'] % {'id': pop.id}
+            if Global.config['num_threads'] > 1 and pop.size > Global.OMP_MIN_NB_NEURONS:
+                declare_spike += self._templates['spike_specific']['declare_spike_omp'] % {'id': pop.id}
             reset_spike += self._templates['spike_specific']['reset_spike'] % {'id': pop.id}
             # If there is a refractory period
             if pop.neuron_type.refractory or pop.refractory:
@@ -172,8 +172,8 @@ class OpenMPGenerator(PopulationGenerator):
         if 'update_global_ops' in pop._specific_template.keys():
             update_global_ops = pop._specific_template['update_global_ops']
 
-        # Fill the template
-        code = self._templates['population_header'] % {
+        # Fill the templates
+        pop_dict = {
             # some information for
             'annarchy_version': __release__,
             #'time_stamp': '{:%Y-%b-%d %H:%M:%S}'.format(datetime.datetime.now()),
@@ -212,10 +212,15 @@ class OpenMPGenerator(PopulationGenerator):
             'determine_size': determine_size_in_bytes,
             'clear_container': clear_container
         }
+        code = self._templates['population_header'] % pop_dict
+        body = self._templates['population_body'] % pop_dict
 
-        # Store the complete header definition in a single file
+        # Store the header definition and the update methods in separate
+        # files, so that they can be compiled independently
         with open(annarchy_dir+'/generate/net'+str(self._net_id)+'/pop'+str(pop.id)+'.hpp', 'w') as ofile:
             ofile.write(code)
+        with open(annarchy_dir+'/generate/net'+str(self._net_id)+'/pop'+str(pop.id)+'.cpp', 'w') as ofile:
+            ofile.write(body)
 
         # Basic informations common to all populations
         pop_desc = {
@@ -330,15 +335,15 @@ class OpenMPGenerator(PopulationGenerator):
 
                 if attr['locality'] == "local":
                     declare_code += """
-    std::deque< std::vector< %(type)s > > _delayed_%(name)s; """ % attr_dict
+    DelayBuffer< std::vector< %(type)s > > _delayed_%(name)s; """ % attr_dict
                 else:
                     declare_code += """
-    std::deque< %(type)s > _delayed_%(name)s; """ % attr_dict
+    DelayBuffer< %(type)s > _delayed_%(name)s; """ % attr_dict
         else:
             # Spiking networks should only exchange spikes
             declare_code += """
     // Delays for spike population
-    std::deque< std::vector<int> > _delayed_spike;
+    DelayBuffer< std::vector<int> > _delayed_spike;
 """
             for var in pop.delayed_variables:
                 attr = self._get_attr(pop, var)
@@ -346,10 +351,10 @@ class OpenMPGenerator(PopulationGenerator):
 
                 if attr['locality'] == "local":
                     declare_code += """
-    std::deque< std::vector< %(type)s > > _delayed_%(name)s; """ % attr_dict
+    DelayBuffer< std::vector< %(type)s > > _delayed_%(name)s; """ % attr_dict
                 else:
                     declare_code += """
-    std::deque< %(type)s > _delayed_%(name)s; """ % attr_dict
+    DelayBuffer< %(type)s > _delayed_%(name)s; """ % attr_dict
 
         # Initialization
         init_code = """
@@ -372,15 +377,13 @@ class OpenMPGenerator(PopulationGenerator):
         # Delaying spike events is done differently
         if pop.neuron_type.type == 'spike':
             init_code += """
-        _delayed_spike = std::deque< std::vector<int> >(max_delay, std::vector<int>());"""
+        _delayed_spike = DelayBuffer< std::vector<int> >(max_delay, std::vector<int>());"""
 
             update_code += """
-            _delayed_spike.push_front(spiked);
-            _delayed_spike.pop_back();
+            _delayed_spike.push(spiked);
 """
             reset_code += """
-        _delayed_spike.clear();
-        _delayed_spike = std::deque< std::vector<int> >(max_delay, std::vector<int>());"""
+        _delayed_spike = DelayBuffer< std::vector<int> >(max_delay, std::vector<int>());"""
 
             resize_code += """
         _delayed_spike.resize(max_delay, std::vector<int>());
@@ -522,18 +525,46 @@ class OpenMPGenerator(PopulationGenerator):
     ##################################################
     def _update_globalops(self, pop):
         """
-        Update of global functions is a call of pre-implemented
-        functions defined in GlobalOperationTemplate. In case of
-        OpenMP this calls will take place in the population header.
+        Update of global operations. All operations on the same variable
+        are computed in a single (parallel) loop defined in
+        GlobalOperationTemplate. Operations on parameters are only
+        recomputed when the parameter was modified.
         """
+        from ANNarchy.generator.Utils import tabify
+
         if len(pop.global_operations) == 0:
             return ""
 
-        code = ""
+        # Group the operations per variable, in a deterministic order
+        functions = {}
         for op in pop.global_operations:
-            code += """
-            _%(op)s_%(var)s = %(op)s_value(%(var)s.data(), size);
-""" % {'op': op['function'], 'var': op['variable']}
+            if not op['variable'] in functions:
+                functions[op['variable']] = []
+            if not op['function'] in functions[op['variable']]:
+                functions[op['variable']].append(op['function'])
+
+        parameters = self._glops_parameters(pop)
+
+        code = ""
+        for var in sorted(functions.keys()):
+            ids = {'type': Global.config['precision'], 'var': var}
+            ops = sorted(functions[var])
+            fused = global_op_template['body'] % {
+                'var': var,
+                'ops': ', '.join(ops),
+                'init': '\n'.join(["        " + global_op_template[op]['init'] % ids for op in ops]),
+                'clauses': ' '.join([global_op_template[op]['clause'] % ids for op in ops]),
+                'update': '\n'.join(["            " + global_op_template[op]['update'] % ids for op in ops]),
+                'result': '\n'.join(["        " + global_op_template[op]['result'] % ids for op in ops]),
+                'omp': '' if Global.config['num_threads'] > 1 else '//'
+            }
+            if var in parameters:
+                fused = """
+        if ( _update_glops_%(var)s ) {%(code)s
+            _update_glops_%(var)s = false;
+        }
+""" % {'var': var, 'code': '\n' + tabify(fused.strip('\n'), 1).rstrip()}
+            code += fused
 
         return """
     if ( _active ){
@@ -543,19 +574,16 @@ class OpenMPGenerator(PopulationGenerator):
     def _update_random_distributions(self, pop):
         """
         Generate the C++ for drawing pseudo-random numbers in each step.
-        The random variables are drawn sequentially from the same source.
+
+        Each neuron draws its random variables from its own counter-based
+        stream (seed, population, rank, time step), so the neurons can be
+        updated in parallel with reproducible results.
         """
+        from ANNarchy.generator.Utils import rng_key
+
         if len(pop.neuron_type.description['random_distributions']) == 0:
             return ""
 
-        res = """
-        if (_active){
-%(update_rng_global)s
-            for(int i = 0; i < size; i++) {
-%(update_rng_local)s
-            }
-        }
-        """
         local_code = ""
         global_code = ""
         for rd in pop.neuron_type.description['random_distributions']:
@@ -564,8 +592,27 @@ class OpenMPGenerator(PopulationGenerator):
             else:
                 global_code += self._templates['rng'][rd['locality']]['update'] % {'id': pop.id, 'rd_name': rd['name']}
 
+        if global_code != "":
+            global_code = """
+            {
+                PhiloxStream _rng(rng_seed, %(key)s, 0, 1, t);
+%(code)s
+            }""" % {'key': rng_key(pop), 'code': global_code}
+
+        if local_code != "":
+            omp_code = "#pragma omp parallel for" if Global.config['num_threads'] > 1 and pop.size > Global.OMP_MIN_NB_NEURONS else ""
+            local_code = """
+            %(omp_code)s
+            for(int i = 0; i < size; i++) {
+                PhiloxStream _rng(rng_seed, %(key)s, i, 0, t);
+%(code)s
+            }""" % {'key': rng_key(pop), 'omp_code': omp_code, 'code': local_code}
+
         # Final code consists of local and global variables
-        final_code = res % {
+        final_code = """
+        if (_active){%(update_rng_global)s%(update_rng_local)s
+        }
+""" % {
             'update_rng_local': local_code,
             'update_rng_global': global_code
         }
@@ -702,9 +749,9 @@ class OpenMPGenerator(PopulationGenerator):
 """ + tabify(pre_code, 3)
             global_code = pre_code % {'id': pop.id, 'local_index': "[i]", 'semiglobal_index': '', 'global_index': ''} + global_code
 
-        # OMP code
-        omp_code = "#pragma omp parallel for" if (Global.config['num_threads'] > 1 and pop.size > Global.OMP_MIN_NB_NEURONS) else ""
-        omp_critical_code = "#pragma omp critical" if (Global.config['num_threads'] > 1 and pop.size > Global.OMP_MIN_NB_NEURONS) else ""
+        # OMP code: the emitted spikes are collected in per-thread buffers
+        use_omp = Global.config['num_threads'] > 1 and pop.size > Global.OMP_MIN_NB_NEURONS
+        store_spike = "_spiked_thread[tid].push_back(i);" if use_omp else "spiked.push_back(i);"
 
         # Local variables, evaluated in parallel
         code += generate_equation_code(pop.id, pop.neuron_type.description, 'local', padding=4) % {'id': pop.id, 'local_index': "[i]", 'semiglobal_index': '', 'global_index': ''}
@@ -729,10 +776,7 @@ class OpenMPGenerator(PopulationGenerator):
                     // Reset variables
 %(reset)s
                     // Store the spike
-                    %(omp_critical_code)s
-                    {
-                    spiked.push_back(i);
-                    }
+                    %(store_spike)s
                     last_spike[i] = t;
 
                     // Refractory period
@@ -745,25 +789,29 @@ class OpenMPGenerator(PopulationGenerator):
       'refrac_inc': refrac_inc,
       'mean_FR_push': mean_FR_push,
       'mean_FR_update': mean_FR_update,
-      'omp_critical_code': omp_critical_code}
+      'store_spike': store_spike}
 
         code += spike_gather
 
         # finish code
-        final_code = """
+        if use_omp:
+            final_code = self._templates['spike_specific']['update_omp'] % {
+                'code': tabify(code, 1),
+                'global_code': global_code
+            }
+        else:
+            final_code = """
         if( _active ) {
             spiked.clear();
 %(global_code)s
             // Updating local variables
-            %(omp_code)s
             for(int i = 0; i < size; i++){
 %(code)s
             }
         } // active
 """ % {
        'code': code,
-       'global_code': global_code,
-       'omp_code': omp_code
+       'global_code': global_code
        }
 
         # if profiling enabled, annotate with profiling code
@@ -91,30 +91,22 @@ struct PopStruct%(id)s{
 %(reset_additional)s
     }
 
-    // Method to draw new random numbers
-    void update_rng() {
-%(update_rng)s
-    }
+    // Method to draw new random numbers (defined in pop%(id)s.cpp)
+    void update_rng();
 
     // Method to update global operations on the population (min/max/mean...)
-    void update_global_ops() {
-%(update_global_ops)s
-    }
+    void update_global_ops();
 
     // Method to enqueue output variables in case outgoing projections have non-zero delay
-    void update_delay() {
-%(update_delay)s
-    }
+    void update_delay();
 
     // Method to dynamically change the size of the queue for delayed variables
     void update_max_delay(int value) {
 %(update_max_delay)s
     }
 
-    // Main method to update neural variables
-    void update() {
-%(update_variables)s
-    }
+    // Main method to update neural variables (defined in pop%(id)s.cpp)
+    void update();
 
     %(stop_condition)s
 
@@ -132,6 +124,40 @@ struct PopStruct%(id)s{
 };
 """
 
+# Definition of the methods called at each simulation step, stored in a
+# separate translation unit (pop<id>.cpp). A modified neuron equation
+# therefore only requires the recompilation of this file.
+#
+# Parameters:
+#
+#    id: id of the population
+#    update_*: code for the corresponding methods
+population_body = """/*
+ *  ANNarchy-version: %(annarchy_version)s
+ */
+#include "ANNarchy.h"
+
+// Method to draw new random numbers
+void PopStruct%(id)s::update_rng() {
+%(update_rng)s
+}
+
+// Method to update global operations on the population (min/max/mean...)
+void PopStruct%(id)s::update_global_ops() {
+%(update_global_ops)s
+}
+
+// Method to enqueue output variables in case outgoing projections have non-zero delay
+void PopStruct%(id)s::update_delay() {
+%(update_delay)s
+}
+
+// Main method to update neural variables
+void PopStruct%(id)s::update() {
+%(update_variables)s
+}
+"""
+
 # c like definition of neuron attributes, whereas 'local' is used if values can vary across
 # neurons, consequently 'global' is used if values are common to all neurons.Currently two
 # types of sets are defined: openmp and cuda. In cuda case additional 'dirty' flags are
@@ -184,6 +210,23 @@ attribute_acc = {
 """
 }
 
+# Accessors for local parameters on which global operations are computed:
+# each modification flags the global operations for recomputation.
+#
+# Parameters:
+#
+#    type: data type of the variable (double, float, int ...)
+#    name: name of the variable
+#    attr_type: either 'variable' or 'parameter'
+#
+attribute_acc_glops = """
+    // Local %(attr_type)s %(name)s
+    std::vector< %(type)s > get_%(name)s() { return %(name)s; }
+    %(type)s get_single_%(name)s(int rk) { return %(name)s[rk]; }
+    void set_%(name)s(std::vector< %(type)s > val) { %(name)s = val; _update_glops_%(name)s = true; }
+    void set_single_%(name)s(int rk, %(type)s val) { %(name)s[rk] = val; _update_glops_%(name)s = true; }
+"""
+
 # Initialization of parameters due to the init_population method.
 #
 # Parameters:
@@ -206,11 +249,10 @@ attribute_cpp_init = {
 attribute_delayed = {
     'local': {
         'init': """
-        _delayed_%(name)s = std::deque< std::vector< %(type)s > >(max_delay, std::vector< %(type)s >(size, 0.0));""",
+        _delayed_%(name)s = DelayBuffer< std::vector< %(type)s > >(max_delay, std::vector< %(type)s >(size, 0.0));""",
 
         'update': """
-        _delayed_%(name)s.push_front(%(name)s);
-        _delayed_%(name)s.pop_back();
+        _delayed_%(name)s.push(%(name)s);
 """,
         'reset' : """
         for ( int i = 0; i < _delayed_%(name)s.size(); i++ ) {
@@ -223,10 +265,9 @@ attribute_delayed = {
     },
     'global':{
         'init': """
-        _delayed_%(name)s = std::deque< %(type)s >(max_delay, 0.0);""",
+        _delayed_%(name)s = DelayBuffer< %(type)s >(max_delay, 0.0);""",
         'update': """
-        _delayed_%(name)s.push_front(%(name)s);
-        _delayed_%(name)s.pop_back();
+        _delayed_%(name)s.push(%(name)s);
 """,
         'reset' : """
         for ( int i = 0; i < _delayed_%(name)s.size(); i++ ) {
@@ -256,7 +297,7 @@ cpp_11_rng = {
         dist_%(rd_name)s = %(rd_init)s;
     """,
         'update': """
-                %(rd_name)s[i] = dist_%(rd_name)s(rng);
+                %(rd_name)s[i] = decltype(dist_%(rd_name)s)(dist_%(rd_name)s.param())(_rng);
     """
     },
     'global': {
@@ -268,7 +309,7 @@ cpp_11_rng = {
         dist_%(rd_name)s = %(rd_init)s;
     """,
         'update': """
-            %(rd_name)s = dist_%(rd_name)s(rng);
+                %(rd_name)s = decltype(dist_%(rd_name)s)(dist_%(rd_name)s.param())(_rng);
     """
     }
 }
@@ -295,6 +336,51 @@ spike_specific = {
         // Spiking variables
         spiked = std::vector<int>(0, 0);
         last_spike = std::vector<long int>(size, -10000L);
+""",
+    'declare_spike_omp': """
+    // Per-thread buffers of emitted spikes and their offsets in spiked
+    std::vector< std::vector<int> > _spiked_thread;
+    std::vector<int> _spiked_offset;
+""",
+    # Parallel update of spiking neurons: each thread stores the emitted
+    # spikes in its own buffer. As the neurons are statically distributed
+    # over the threads in ascending order, copying the buffers at their
+    # prefix-sum offsets keeps spiked sorted, independently of the timing.
+    'update_omp': """
+        if( _active ) {
+            spiked.clear();
+%(global_code)s
+            #pragma omp parallel
+            {
+                int tid = omp_get_thread_num();
+
+                #pragma omp single
+                {
+                    if ( _spiked_thread.size() != omp_get_num_threads() ) {
+                        _spiked_thread.resize(omp_get_num_threads());
+                        _spiked_offset.resize(omp_get_num_threads()+1);
+                    }
+                }
+                _spiked_thread[tid].clear();
+
+                // Updating local variables
+                #pragma omp for schedule(static)
+                for(int i = 0; i < size; i++){
+%(code)s
+                }
+
+                // Offsets of each thread in spiked
+                #pragma omp single
+                {
+                    _spiked_offset[0] = 0;
+                    for(int th = 0; th < _spiked_thread.size(); th++)
+                        _spiked_offset[th+1] = _spiked_offset[th] + _spiked_thread[th].size();
+                    spiked.resize(_spiked_offset[_spiked_thread.size()]);
+                }
+
+                std::copy(_spiked_thread[tid].begin(), _spiked_thread[tid].end(), spiked.begin() + _spiked_offset[tid]);
+            }
+        } // active
 """,
     'declare_refractory': """
     // Refractory period
@@ -330,8 +416,10 @@ spike_specific = {
 # Final dictionary
 openmp_templates = {
     'population_header': population_header,
+    'population_body': population_body,
     'attr_decl': attribute_decl,
     'attr_acc': attribute_acc,
+    'attr_acc_glops': attribute_acc_glops,
     'attribute_cpp_init': attribute_cpp_init,
     'attribute_delayed': attribute_delayed,
     'rng': cpp_11_rng,
@@ -85,6 +85,7 @@ class PopulationGenerator(object):
         declaration = "" # member declarations
         accessors = "" # export member functions
         attributes = []
+        glops_parameters = self._glops_parameters(pop)
 
         # Parameters
         for var in pop.neuron_type.description['parameters']:
@@ -93,7 +94,10 @@ class PopulationGenerator(object):
                 continue
             attributes.append(var['name'])
             declaration += attr_template[var['locality']] % {'type' : var['ctype'], 'name': var['name'], 'attr_type': 'parameter'}
-            accessors += acc_template[var['locality']] % {'type' : var['ctype'], 'name': var['name'], 'attr_type': 'parameter'}
+            if var['name'] in glops_parameters:
+                accessors += self._templates['attr_acc_glops'] % {'type' : var['ctype'], 'name': var['name'], 'attr_type': 'parameter'}
+            else:
+                accessors += acc_template[var['locality']] % {'type' : var['ctype'], 'name': var['name'], 'attr_type': 'parameter'}
 
         # Variables
         for var in pop.neuron_type.description['variables']:
@@ -148,6 +152,9 @@ class PopulationGenerator(object):
 """ % op_dict
             else:
                 Global._error("Internal: acc/decl of global operations are not implemented for: " + Global.config['paradigm'])
+        for var in glops_parameters:
+            declaration += """    bool _update_glops_%(var)s;
+""" % {'var': var}
 
         # Arrays for the random numbers
         declaration += """
@@ -211,6 +218,9 @@ class PopulationGenerator(object):
             return ""
 
         code = "// Initialize global operations\n"
+        for var in self._glops_parameters(pop):
+            code += """    _update_glops_%(var)s = true;
+""" % {'var': var}
         for op in pop.global_operations:
             if Global.config['paradigm'] == "openmp":
                 code += """    _%(op)s_%(var)s = 0.0;
@@ -227,6 +237,19 @@ class PopulationGenerator(object):
     def _init_random_dist(self, pop):
         raise NotImplementedError
 
+    def _glops_parameters(self, pop):
+        """
+        Returns the names of the local parameters on which global operations
+        are computed. As they are only modified through the accessors, the
+        global operations are recomputed only after a modification (if the
+        paradigm provides the 'attr_acc_glops' template).
+        """
+        if not 'attr_acc_glops' in self._templates.keys():
+            return []
+
+        parameters = [var['name'] for var in pop.neuron_type.description['parameters'] if var['locality'] == 'local']
+        return sorted(list(set([op['variable'] for op in pop.global_operations if op['variable'] in parameters])))
+
     def _init_population(self, pop):
         """
         Generate the codes for the C++ function Population::init_population() method.
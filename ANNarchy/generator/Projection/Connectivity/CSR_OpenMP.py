@@ -53,6 +53,7 @@ connectivity_matrix = {
         for(int i = 0; i < row_ptr.size()-1; i++)
             if ( row_ptr[i] != row_ptr[i+1] )
                 post_ranks.push_back(i);
+        _thread_rows_dirty = true;
     }
     void set_col_idx(std::vector<int> col_idx) {
         _col_idx = col_idx;
@@ -419,9 +420,16 @@ event_driven = {
 """
 }
 
+# Rows balanced by the thread partition
+thread_partition = {
+    'nb_rows': "post_ranks.size()",
+    'row_length': "_row_ptr[post_ranks[i]+1] - _row_ptr[post_ranks[i]]"
+}
+
 conn_templates = {
     # connectivity
     'connectivity_matrix': connectivity_matrix,
+    'thread_partition': thread_partition,
     'inverse_connectivity_matrix': inverse_connectivity_matrix,
     'weight_matrix': weight_matrix,
     'single_weight_matrix': single_weight_matrix,
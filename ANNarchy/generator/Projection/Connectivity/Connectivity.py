@@ -31,6 +31,10 @@ from ANNarchy.generator.Projection.Connectivity import LIL_OpenMP
 from ANNarchy.generator.Projection.Connectivity import CSR_CUDA
 from ANNarchy.generator.Projection.Connectivity import CSR_OpenMP
 
+# sliced ELLPACK (SELL-C-sigma)
+from ANNarchy.generator.Projection.Connectivity import SELL_OpenMP
+from ANNarchy.generator.Projection import OpenMPTemplates
+
 class Connectivity(object):
     """
     Base class to define connectivities in ANNarchy, the derived classes are
@@ -145,9 +149,27 @@ class OpenMPConnectivity(Connectivity):
             self._templates.update(LIL_OpenMP.conn_templates)
         elif proj._storage_format == "csr":
             self._templates.update(CSR_OpenMP.conn_templates)
+        elif proj._storage_format == "sell":
+            self._templates.update(SELL_OpenMP.conn_templates)
         else:
             raise NotImplementedError
 
+    def _connectivity(self, proj):
+        """
+        Extends the default connectivity by the partition of the rows among the
+        threads, used by the synaptic loops (see OpenMPTemplates.thread_partition).
+        """
+        connectivity = super(OpenMPConnectivity, self)._connectivity(proj)
+
+        # The flag is also set by the structural plasticity methods
+        connectivity['declare'] += OpenMPTemplates.thread_partition['declare']
+
+        # Specific projections define their own connectivity and loops
+        if not 'declare_connectivity_matrix' in proj._specific_template.keys():
+            connectivity['accessor'] += OpenMPTemplates.thread_partition['accessor'] % self._templates['thread_partition']
+
+        return connectivity
+
 class CUDAConnectivity(Connectivity):
     """
     Implementor class to define connectivities in ANNarchy for Nvidia CUDA.
@@ -30,10 +30,28 @@ connectivity_matrix = {
     'accessor': """
     // Accessor to connectivity data
     std::vector<int> get_post_rank() { return post_rank; }
-    void set_post_rank(std::vector<int> ranks) { post_rank = ranks; }
+    void set_post_rank(std::vector<int> ranks) { post_rank = ranks; _thread_rows_dirty = true; }
     std::vector< std::vector<int> > get_pre_rank() { return pre_rank; }
-    void set_pre_rank(std::vector< std::vector<int> > ranks) { pre_rank = ranks; }
+    void set_pre_rank(std::vector< std::vector<int> > ranks) { pre_rank = ranks; _thread_rows_dirty = true; }
     int nb_synapses(int n) { return pre_rank[n].size(); }
+
+    // Bulk export of the connectivity as CSR arrays, the rows follow post_rank
+    void export_indptr(long* indptr) {
+        indptr[0] = 0;
+        for(int i = 0; i < pre_rank.size(); i++)
+            indptr[i+1] = indptr[i] + pre_rank[i].size();
+    }
+    void export_indices(int* indices) {
+        for(int i = 0; i < pre_rank.size(); i++)
+            indices = std::copy(pre_rank[i].begin(), pre_rank[i].end(), indices);
+    }
+    // Bulk import from CSR arrays, the rows follow post_rank
+    void import_pre_rank(long* indptr, int* indices) {
+        pre_rank.resize(post_rank.size());
+        for(int i = 0; i < pre_rank.size(); i++)
+            pre_rank[i].assign(indices + indptr[i], indices + indptr[i+1]);
+        _thread_rows_dirty = true;
+    }
 """,
     'init': """
 """,
@@ -44,6 +62,9 @@ connectivity_matrix = {
         void set_post_rank(vector[int])
         void set_pre_rank(vector[vector[int]])
         void inverse_connectivity_matrix()
+        void export_indptr(long*)
+        void export_indices(int*)
+        void import_pre_rank(long*, int*)
 """,
     'pyx_wrapper_args': "synapses",
     'pyx_wrapper_init': """
@@ -68,6 +89,17 @@ connectivity_matrix = {
     def set_pre_rank(self, val):
         proj%(id_proj)s.set_pre_rank(val)
         proj%(id_proj)s.inverse_connectivity_matrix()
+    def export_connectivity(self):
+        cdef np.ndarray indptr = np.empty(proj%(id_proj)s.get_size() + 1, dtype=np.int_)
+        proj%(id_proj)s.export_indptr(<long*> np.PyArray_DATA(indptr))
+        cdef np.ndarray indices = np.empty(indptr[-1], dtype=np.int32)
+        proj%(id_proj)s.export_indices(<int*> np.PyArray_DATA(indices))
+        return indptr, indices
+    def import_connectivity(self, np.ndarray indptr, np.ndarray indices):
+        indptr = np.ascontiguousarray(indptr, dtype=np.int_)
+        indices = np.ascontiguousarray(indices, dtype=np.int32)
+        proj%(id_proj)s.import_pre_rank(<long*> np.PyArray_DATA(indptr), <int*> np.PyArray_DATA(indices))
+        proj%(id_proj)s.inverse_connectivity_matrix()
 """
 }
 
@@ -95,6 +127,17 @@ weight_matrix = {
     }
     void set_dendrite_w(int rk, std::vector< double > value) { w[rk] = std::vector<%(float_prec)s>(value.begin(), value.end()); }
     void set_synapse_w(int rk_post, int rk_pre, double value) { w[rk_post][rk_pre] = value; }
+    void export_w(double* data) {
+        for(int i = 0; i < w.size(); i++)
+            data = std::copy(w[i].begin(), w[i].end(), data);
+    }
+    void import_w(double* data) {
+        w.resize(pre_rank.size());
+        for(int i = 0; i < pre_rank.size(); i++) {
+            w[i].assign(data, data + pre_rank[i].size());
+            data += pre_rank[i].size();
+        }
+    }
 """,
     'init': """
 """,
@@ -106,6 +149,8 @@ weight_matrix = {
         void set_w(vector[vector[double]])
         void set_dendrite_w(int, vector[double])
         void set_synapse_w(int, int, double)
+        void export_w(double*)
+        void import_w(double*)
 """,
     'pyx_wrapper_args': "",
     'pyx_wrapper_init': """
@@ -125,6 +170,13 @@ weight_matrix = {
         return proj%(id_proj)s.get_synapse_w(rank_post, rank_pre)
     def set_synapse_w(self, int rank_post, int rank_pre, double value):
         proj%(id_proj)s.set_synapse_w(rank_post, rank_pre, value)
+    def export_w(self, long nb_synapses):
+        cdef np.ndarray res = np.empty(nb_synapses, dtype=np.float64)
+        proj%(id_proj)s.export_w(<double*> np.PyArray_DATA(res))
+        return res
+    def import_w(self, np.ndarray data):
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        proj%(id_proj)s.import_w(<double*> np.PyArray_DATA(data))
 """
 }
 
@@ -163,16 +215,34 @@ single_weight_matrix = {
 
 inverse_connectivity_matrix = {
     'declare': """
-    std::map< int, std::vector< std::pair<int, int> > > inv_pre_rank ;
+    // Inverse connectivity: the synapses of the presynaptic neuron rk_pre are stored as
+    // (post index, synapse index) pairs in inv_idx[inv_pre_ptr[rk_pre]:inv_pre_ptr[rk_pre+1]]
+    std::vector< int > inv_pre_ptr ;
+    std::vector< std::pair<int, int> > inv_idx ;
     std::vector< int > inv_post_rank ;
+    // Set by addSynapse()/removeSynapse(), the inverse connectivity is then rebuilt before the next transmission
+    bool _inv_dirty ;
 """,
     'init': """
-        inv_pre_rank =  std::map< int, std::vector< std::pair<int, int> > > ();
+        // Number of synapses per presynaptic neuron
+        inv_pre_ptr = std::vector< int >(pop%(id_pre)s.size + 1, 0);
+        for(int i=0; i<pre_rank.size(); i++){
+            for(int j=0; j<pre_rank[i].size(); j++){
+                inv_pre_ptr[pre_rank[i][j]+1]++;
+            }
+        }
+        for(int rk=0; rk<pop%(id_pre)s.size; rk++){
+            inv_pre_ptr[rk+1] += inv_pre_ptr[rk];
+        }
+        // Fill the (post index, synapse index) pairs
+        inv_idx = std::vector< std::pair<int, int> >(inv_pre_ptr[pop%(id_pre)s.size]);
+        std::vector< int > _inv_pos = std::vector< int >(inv_pre_ptr.begin(), inv_pre_ptr.end()-1);
         for(int i=0; i<pre_rank.size(); i++){
             for(int j=0; j<pre_rank[i].size(); j++){
-                inv_pre_rank[pre_rank[i][j]].push_back(std::pair<int, int>(i,j));
+                inv_idx[_inv_pos[pre_rank[i][j]]++] = std::pair<int, int>(i, j);
             }
         }
+        _inv_dirty = false;
         inv_post_rank =  std::vector< int > (pop%(id_post)s.size, -1);
         for(int i=0; i<post_rank.size(); i++){
             inv_post_rank[post_rank[i]] = i;
@@ -208,6 +278,17 @@ attribute_acc = {
     void set_%(name)s(std::vector<std::vector< %(type)s > >value) { %(name)s = value; }
     void set_dendrite_%(name)s(int rk, std::vector<%(type)s> value) { %(name)s[rk] = value; }
     void set_synapse_%(name)s(int rk_post, int rk_pre, %(type)s value) { %(name)s[rk_post][rk_pre] = value; }
+    void export_%(name)s(%(type)s* data) {
+        for(int i = 0; i < %(name)s.size(); i++)
+            data = std::copy(%(name)s[i].begin(), %(name)s[i].end(), data);
+    }
+    void import_%(name)s(%(type)s* data) {
+        %(name)s.resize(pre_rank.size());
+        for(int i = 0; i < pre_rank.size(); i++) {
+            %(name)s[i].assign(data, data + pre_rank[i].size());
+            data += pre_rank[i].size();
+        }
+    }
 """,
     'semiglobal':
 """
@@ -225,6 +306,23 @@ attribute_acc = {
 """
 }
 
+# Bulk export/import of local attributes from/to numpy arrays
+attribute_export = {
+    'pyx_struct': """
+        void export_%(name)s(%(type)s*)
+        void import_%(name)s(%(type)s*)
+""",
+    'pyx_wrapper': """
+    def export_%(name)s(self, long nb_synapses):
+        cdef np.ndarray res = np.empty(nb_synapses, dtype=%(dtype)s)
+        proj%(id)s.export_%(name)s(<%(type)s*> np.PyArray_DATA(res))
+        return res
+    def import_%(name)s(self, np.ndarray data):
+        data = np.ascontiguousarray(data, dtype=%(dtype)s)
+        proj%(id)s.import_%(name)s(<%(type)s*> np.PyArray_DATA(data))
+"""
+}
+
 attribute_cpp_init = {
     'local':
 """
@@ -271,12 +369,10 @@ delay = {
     // Non-uniform delay
     std::vector< std::vector< int > > delay ;
     int idx_delay;
-    int max_delay;
-    std::vector< std::vector< std::vector< int > > > _delayed_spikes ;""",
+    int max_delay;""",
         'init': """
         idx_delay = 0;
         max_delay =  pop%(id_pre)s.max_delay ;
-        _delayed_spikes = std::vector< std::vector< std::vector< int > > >(max_delay, std::vector< std::vector< int > >(post_rank.size(), std::vector< int >()) );
 """,
         'pyx_struct':
 """
@@ -296,6 +392,7 @@ delay = {
         return proj%(id_proj)s.delay[idx]
     def set_delay(self, value):
         proj%(id_proj)s.delay = value
+        proj%(id_proj)s.inverse_connectivity_matrix()
     def get_max_delay(self):
         return proj%(id_proj)s.delay
     def set_max_delay(self, value):
@@ -323,9 +420,16 @@ event_driven = {
 """
 }
 
+# Rows balanced by the thread partition
+thread_partition = {
+    'nb_rows': "post_rank.size()",
+    'row_length': "pre_rank[i].size()"
+}
+
 conn_templates = {
     # connectivity
     'connectivity_matrix': connectivity_matrix,
+    'thread_partition': thread_partition,
     'inverse_connectivity_matrix': inverse_connectivity_matrix,
     'weight_matrix': weight_matrix,
     'single_weight_matrix': single_weight_matrix,
@@ -333,6 +437,7 @@ conn_templates = {
     # accessors
     'attribute_decl': attribute_decl,
     'attribute_acc':attribute_acc,
+    'attribute_export': attribute_export,
     'attribute_cpp_init': attribute_cpp_init,
     'delay': delay,
     'event_driven': event_driven
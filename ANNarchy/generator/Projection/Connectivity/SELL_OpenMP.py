@@ -0,0 +1,463 @@
+#===============================================================================
+#
+#     SELL_OpenMP.py
+#
+#     This file is part of ANNarchy.
+#
+#     Copyright (C) 2016-2018  Julien Vitay <julien.vitay@gmail.com>,
+#     Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     ANNarchy is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#===============================================================================
+#
+# Sliced ELLPACK (SELL-C-sigma): the dendrites are sorted by decreasing number
+# of synapses inside windows of _sort_window dendrites, and grouped into chunks
+# of _chunk_size rows. Each chunk is padded to its longest row and stored
+# column-major, so that the rows of a chunk are processed in SIMD lanes.
+#
+# The Python interface is the same as for LIL: the connectivity is set by the
+# LILConnectivity of Connector.pyx and the accessors use dendrite indices.
+#
+connectivity_matrix = {
+    'declare': """
+    // Connectivity, post_rank maps the dendrite index to the postsynaptic rank
+    std::vector<int> post_rank;
+
+    // Sliced ELLPACK connectivity: the synapse j of the row r in the chunk c
+    // is stored at _chunk_ptr[c] + j*_chunk_size + r.
+    static const int _chunk_size = 8;
+    static const int _sort_window = 256;
+    std::vector<int> _row_perm;     // row -> dendrite index (0 for the padding rows)
+    std::vector<int> _row_idx;      // dendrite index -> row
+    std::vector<int> _row_length;   // row -> number of synapses
+    std::vector<int> _chunk_width;  // chunk -> length of its longest row
+    std::vector<long> _chunk_ptr;   // chunk -> offset of its first synapse
+    std::vector<int> _col_idx;      // presynaptic ranks, 0 in the padding
+""",
+    'accessor': """
+    // Position of the synapse j of the dendrite i in the flat arrays
+    inline long _sell_idx(int i, int j) {
+        int row = _row_idx[i];
+        return _chunk_ptr[row / _chunk_size] + (long)j * _chunk_size + row % _chunk_size;
+    }
+
+    // Accessor to connectivity data
+    std::vector<int> get_post_rank() { return post_rank; }
+    void set_post_rank(std::vector<int> ranks) { post_rank = ranks; _thread_rows_dirty = true; }
+    std::vector<int> get_dendrite_pre_rank(int n) {
+        std::vector<int> res(_row_length[_row_idx[n]]);
+        for(int j = 0; j < res.size(); j++)
+            res[j] = _col_idx[_sell_idx(n, j)];
+        return res;
+    }
+    std::vector< std::vector<int> > get_pre_rank() {
+        std::vector< std::vector<int> > res(post_rank.size(), std::vector<int>());
+        for(int i = 0; i < post_rank.size(); i++)
+            res[i] = get_dendrite_pre_rank(i);
+        return res;
+    }
+    int nb_synapses(int n) { return _row_length[_row_idx[n]]; }
+
+    // Builds the sliced layout, the local attributes have to be set again afterwards
+    void set_pre_rank(std::vector< std::vector<int> > ranks) {
+        int nb_rows = ranks.size();
+        int nb_chunks = (nb_rows + _chunk_size - 1) / _chunk_size;
+
+        // Sort the dendrites by decreasing number of synapses inside each window
+        std::vector<int> order(nb_rows);
+        for(int i = 0; i < nb_rows; i++)
+            order[i] = i;
+        int window = _sort_window;
+        for(int beg = 0; beg < nb_rows; beg += window) {
+            int end = std::min(beg + window, nb_rows);
+            std::stable_sort(order.begin() + beg, order.begin() + end,
+                [&ranks](int a, int b) { return ranks[a].size() > ranks[b].size(); });
+        }
+        _row_perm = std::vector<int>(nb_chunks * _chunk_size, 0);
+        _row_length = std::vector<int>(nb_chunks * _chunk_size, 0);
+        _row_idx = std::vector<int>(nb_rows, 0);
+        for(int row = 0; row < nb_rows; row++) {
+            _row_perm[row] = order[row];
+            _row_idx[order[row]] = row;
+            _row_length[row] = ranks[order[row]].size();
+        }
+
+        // Pad each chunk to its longest row
+        _chunk_width = std::vector<int>(nb_chunks, 0);
+        _chunk_ptr = std::vector<long>(nb_chunks + 1, 0);
+        for(int c = 0; c < nb_chunks; c++) {
+            for(int r = 0; r < _chunk_size; r++)
+                _chunk_width[c] = std::max(_chunk_width[c], _row_length[c * _chunk_size + r]);
+            _chunk_ptr[c+1] = _chunk_ptr[c] + (long)_chunk_width[c] * _chunk_size;
+        }
+
+        _col_idx = std::vector<int>(_chunk_ptr[nb_chunks], 0);
+        for(int i = 0; i < nb_rows; i++)
+            for(int j = 0; j < ranks[i].size(); j++)
+                _col_idx[_sell_idx(i, j)] = ranks[i][j];
+        _thread_rows_dirty = true;
+    }
+
+    // Bulk export of the connectivity as CSR arrays, the rows follow post_rank
+    void export_indptr(long* indptr) {
+        indptr[0] = 0;
+        for(int i = 0; i < post_rank.size(); i++)
+            indptr[i+1] = indptr[i] + nb_synapses(i);
+    }
+    void export_indices(int* indices) {
+        for(int i = 0; i < post_rank.size(); i++)
+            for(int j = 0; j < nb_synapses(i); j++)
+                *indices++ = _col_idx[_sell_idx(i, j)];
+    }
+    // Bulk import from CSR arrays, the rows follow post_rank
+    void import_pre_rank(long* indptr, int* indices) {
+        std::vector< std::vector<int> > ranks(post_rank.size(), std::vector<int>());
+        for(int i = 0; i < ranks.size(); i++)
+            ranks[i].assign(indices + indptr[i], indices + indptr[i+1]);
+        set_pre_rank(ranks);
+    }
+""",
+    'init': """
+""",
+    'pyx_struct': """
+        # SELL Connectivity
+        vector[int] get_post_rank()
+        vector[vector[int]] get_pre_rank()
+        vector[int] get_dendrite_pre_rank(int)
+        void set_post_rank(vector[int])
+        void set_pre_rank(vector[vector[int]])
+        void inverse_connectivity_matrix()
+        void export_indptr(long*)
+        void export_indices(int*)
+        void import_pre_rank(long*, int*)
+""",
+    'pyx_wrapper_args': "synapses",
+    'pyx_wrapper_init': """
+        cdef LIL syn = synapses
+        cdef int size = syn.size
+        cdef int nb_post = syn.post_rank.size()
+        proj%(id_proj)s.set_size( size )
+        proj%(id_proj)s.set_post_rank( syn.post_rank )
+        proj%(id_proj)s.set_pre_rank( syn.pre_rank )
+""",
+    'pyx_wrapper_accessor': """
+    # Connectivity
+    def post_rank(self):
+        return proj%(id_proj)s.get_post_rank()
+    def set_post_rank(self, val):
+        proj%(id_proj)s.set_post_rank(val)
+    def pre_rank(self, int n):
+        return proj%(id_proj)s.get_dendrite_pre_rank(n)
+    def pre_rank_all(self):
+        return proj%(id_proj)s.get_pre_rank()
+    def set_pre_rank(self, val):
+        proj%(id_proj)s.set_pre_rank(val)
+    def export_connectivity(self):
+        cdef np.ndarray indptr = np.empty(proj%(id_proj)s.get_size() + 1, dtype=np.int_)
+        proj%(id_proj)s.export_indptr(<long*> np.PyArray_DATA(indptr))
+        cdef np.ndarray indices = np.empty(indptr[-1], dtype=np.int32)
+        proj%(id_proj)s.export_indices(<int*> np.PyArray_DATA(indices))
+        return indptr, indices
+    def import_connectivity(self, np.ndarray indptr, np.ndarray indices):
+        indptr = np.ascontiguousarray(indptr, dtype=np.int_)
+        indices = np.ascontiguousarray(indices, dtype=np.int32)
+        proj%(id_proj)s.import_pre_rank(<long*> np.PyArray_DATA(indptr), <int*> np.PyArray_DATA(indices))
+"""
+}
+
+weight_matrix = {
+    'declare': """
+    // SELL weights, 0 in the padding
+    std::vector< %(float_prec)s > w;
+""",
+    'accessor': """
+    // Local parameter w
+    std::vector<std::vector< double > > get_w() {
+        std::vector< std::vector< double > > res(post_rank.size(), std::vector<double>());
+        for(int i = 0; i < post_rank.size(); i++)
+            res[i] = get_dendrite_w(i);
+        return res;
+    }
+    std::vector< double > get_dendrite_w(int rk) {
+        std::vector< double > res(nb_synapses(rk));
+        for(int j = 0; j < res.size(); j++)
+            res[j] = w[_sell_idx(rk, j)];
+        return res;
+    }
+    double get_synapse_w(int rk_post, int rk_pre) { return w[_sell_idx(rk_post, rk_pre)]; }
+    void set_w(std::vector<std::vector< double > >value) {
+        w = std::vector<%(float_prec)s>(_col_idx.size(), 0.0);
+        for(int i = 0; i < value.size(); i++)
+            set_dendrite_w(i, value[i]);
+    }
+    void set_dendrite_w(int rk, std::vector< double > value) {
+        for(int j = 0; j < value.size(); j++)
+            w[_sell_idx(rk, j)] = value[j];
+    }
+    void set_synapse_w(int rk_post, int rk_pre, double value) { w[_sell_idx(rk_post, rk_pre)] = value; }
+    void export_w(double* data) {
+        for(int i = 0; i < post_rank.size(); i++)
+            for(int j = 0; j < nb_synapses(i); j++)
+                *data++ = w[_sell_idx(i, j)];
+    }
+    void import_w(double* data) {
+        w = std::vector<%(float_prec)s>(_col_idx.size(), 0.0);
+        for(int i = 0; i < post_rank.size(); i++)
+            for(int j = 0; j < nb_synapses(i); j++)
+                w[_sell_idx(i, j)] = *data++;
+    }
+""",
+    'init': """
+""",
+    'pyx_struct': """
+        # Local variable w
+        vector[vector[double]] get_w()
+        vector[double] get_dendrite_w(int)
+        double get_synapse_w(int, int)
+        void set_w(vector[vector[double]])
+        void set_dendrite_w(int, vector[double])
+        void set_synapse_w(int, int, double)
+        void export_w(double*)
+        void import_w(double*)
+""",
+    'pyx_wrapper_args': "",
+    'pyx_wrapper_init': """
+        proj%(id_proj)s.set_w(syn.w)
+""",
+    'pyx_wrapper_accessor': """
+    # Local variable w
+    def get_w(self):
+        return proj%(id_proj)s.get_w()
+    def set_w(self, value):
+        proj%(id_proj)s.set_w( value )
+    def get_dendrite_w(self, int rank):
+        return proj%(id_proj)s.get_dendrite_w(rank)
+    def set_dendrite_w(self, int rank, vector[double] value):
+        proj%(id_proj)s.set_dendrite_w(rank, value)
+    def get_synapse_w(self, int rank_post, int rank_pre):
+        return proj%(id_proj)s.get_synapse_w(rank_post, rank_pre)
+    def set_synapse_w(self, int rank_post, int rank_pre, double value):
+        proj%(id_proj)s.set_synapse_w(rank_post, rank_pre, value)
+    def export_w(self, long nb_synapses):
+        cdef np.ndarray res = np.empty(nb_synapses, dtype=np.float64)
+        proj%(id_proj)s.export_w(<double*> np.PyArray_DATA(res))
+        return res
+    def import_w(self, np.ndarray data):
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        proj%(id_proj)s.import_w(<double*> np.PyArray_DATA(data))
+"""
+}
+
+single_weight_matrix = {
+    'declare': """
+    // Single weight in the projection
+    %(float_prec)s w;
+""",
+    'accessor': "",
+    'init': "",
+    'pyx_struct': """
+        # Local variable w
+        %(float_prec)s w
+""",
+    'pyx_wrapper_args': "",
+    'pyx_wrapper_init': """
+        # Use only the first weight
+        proj%(id_proj)s.w = syn.w[0][0]
+""",
+    'pyx_wrapper_accessor': """
+    # Local variable w
+    def get_w(self):
+        return proj%(id_proj)s.w
+    def set_w(self, value):
+        proj%(id_proj)s.w = value
+    def get_dendrite_w(self, int rank):
+        return proj%(id_proj)s.w
+    def set_dendrite_w(self, int rank, %(float_prec)s value):
+        proj%(id_proj)s.w = value
+    def get_synapse_w(self, int rank_post, int rank_pre):
+        return proj%(id_proj)s.w
+    def set_synapse_w(self, int rank_post, int rank_pre, %(float_prec)s value):
+        proj%(id_proj)s.w = value
+"""
+}
+
+# Only rate-coded projections are supported
+inverse_connectivity_matrix = {
+    'declare': "",
+    'init': ""
+}
+
+attribute_decl = {
+    'local':
+"""
+    // Local %(attr_type)s %(name)s
+    std::vector< %(type)s > %(name)s;
+""",
+    'semiglobal':
+"""
+    // Semiglobal %(attr_type)s %(name)s
+    std::vector< %(type)s >  %(name)s ;
+""",
+    'global':
+"""
+    // Global %(attr_type)s %(name)s
+    %(type)s  %(name)s ;
+"""
+}
+
+attribute_acc = {
+    'local':
+"""
+    // Local %(attr_type)s %(name)s
+    std::vector<std::vector< %(type)s > > get_%(name)s() {
+        std::vector< std::vector< %(type)s > > res(post_rank.size(), std::vector<%(type)s>());
+        for(int i = 0; i < post_rank.size(); i++)
+            res[i] = get_dendrite_%(name)s(i);
+        return res;
+    }
+    std::vector<%(type)s> get_dendrite_%(name)s(int rk) {
+        std::vector<%(type)s> res(nb_synapses(rk));
+        for(int j = 0; j < res.size(); j++)
+            res[j] = %(name)s[_sell_idx(rk, j)];
+        return res;
+    }
+    %(type)s get_synapse_%(name)s(int rk_post, int rk_pre) { return %(name)s[_sell_idx(rk_post, rk_pre)]; }
+    void set_%(name)s(std::vector<std::vector< %(type)s > >value) {
+        %(name)s = std::vector<%(type)s>(_col_idx.size(), %(type)s());
+        for(int i = 0; i < value.size(); i++)
+            set_dendrite_%(name)s(i, value[i]);
+    }
+    void set_dendrite_%(name)s(int rk, std::vector<%(type)s> value) {
+        for(int j = 0; j < value.size(); j++)
+            %(name)s[_sell_idx(rk, j)] = value[j];
+    }
+    void set_synapse_%(name)s(int rk_post, int rk_pre, %(type)s value) { %(name)s[_sell_idx(rk_post, rk_pre)] = value; }
+    void export_%(name)s(%(type)s* data) {
+        for(int i = 0; i < post_rank.size(); i++)
+            for(int j = 0; j < nb_synapses(i); j++)
+                *data++ = %(name)s[_sell_idx(i, j)];
+    }
+    void import_%(name)s(%(type)s* data) {
+        %(name)s = std::vector<%(type)s>(_col_idx.size(), %(type)s());
+        for(int i = 0; i < post_rank.size(); i++)
+            for(int j = 0; j < nb_synapses(i); j++)
+                %(name)s[_sell_idx(i, j)] = *data++;
+    }
+""",
+    'semiglobal':
+"""
+    // Semiglobal %(attr_type)s %(name)s
+    std::vector<%(type)s> get_%(name)s() { return %(name)s; }
+    %(type)s get_dendrite_%(name)s(int rk) { return %(name)s[rk]; }
+    void set_%(name)s(std::vector<%(type)s> value) { %(name)s = value; }
+    void set_dendrite_%(name)s(int rk, %(type)s value) { %(name)s[rk] = value; }
+""",
+    'global':
+"""
+    // Global %(attr_type)s %(name)s
+    %(type)s get_%(name)s() { return %(name)s; }
+    void set_%(name)s(%(type)s value) { %(name)s = value; }
+"""
+}
+
+# Bulk export/import of local attributes from/to numpy arrays
+attribute_export = {
+    'pyx_struct': """
+        void export_%(name)s(%(type)s*)
+        void import_%(name)s(%(type)s*)
+""",
+    'pyx_wrapper': """
+    def export_%(name)s(self, long nb_synapses):
+        cdef np.ndarray res = np.empty(nb_synapses, dtype=%(dtype)s)
+        proj%(id)s.export_%(name)s(<%(type)s*> np.PyArray_DATA(res))
+        return res
+    def import_%(name)s(self, np.ndarray data):
+        data = np.ascontiguousarray(data, dtype=%(dtype)s)
+        proj%(id)s.import_%(name)s(<%(type)s*> np.PyArray_DATA(data))
+"""
+}
+
+attribute_cpp_init = {
+    'local':
+"""
+        // Local %(attr_type)s %(name)s
+        %(name)s = std::vector<%(type)s>(_col_idx.size(), %(init)s);
+""",
+    'semiglobal':
+"""
+        // Semiglobal %(attr_type)s %(name)s
+        %(name)s = std::vector<%(type)s>(post_rank.size(), %(init)s);
+""",
+    'global':
+"""
+        // Global %(attr_type)s %(name)s
+        %(name)s = %(init)s;
+"""
+}
+
+# Non-uniform delays are not supported
+delay = {
+    'uniform': {
+        'declare': """
+    // Uniform delay
+    int delay ;""",
+        'pyx_struct':
+"""
+        # Uniform delay
+        int delay""",
+        'init': "",
+        'pyx_wrapper_init':
+"""
+        proj%(id_proj)s.delay = syn.uniform_delay""",
+        'pyx_wrapper_accessor':
+"""
+    # Access to non-uniform delay
+    def get_delay(self):
+        return proj%(id_proj)s.delay
+    def get_dendrite_delay(self, idx):
+        return proj%(id_proj)s.delay
+    def set_delay(self, value):
+        proj%(id_proj)s.delay = value
+"""},
+    'nonuniform': {
+        'declare': "",
+        'pyx_struct': "",
+        'init': "",
+        'pyx_wrapper_init': "",
+        'pyx_wrapper_accessor': ""
+    }
+}
+
+# The thread partition balances the chunks
+thread_partition = {
+    'nb_rows': "_chunk_width.size()",
+    'row_length': "(long)_chunk_width[i] * _chunk_size"
+}
+
+conn_templates = {
+    # connectivity
+    'connectivity_matrix': connectivity_matrix,
+    'thread_partition': thread_partition,
+    'inverse_connectivity_matrix': inverse_connectivity_matrix,
+    'weight_matrix': weight_matrix,
+    'single_weight_matrix': single_weight_matrix,
+
+    # accessors
+    'attribute_decl': attribute_decl,
+    'attribute_acc': attribute_acc,
+    'attribute_export': attribute_export,
+    'attribute_cpp_init': attribute_cpp_init,
+    'delay': delay
+}
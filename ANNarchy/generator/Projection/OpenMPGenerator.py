@@ -27,7 +27,7 @@ from .Connectivity import OpenMPConnectivity
 
 from ANNarchy.core import Global
 from ANNarchy.core.PopulationView import PopulationView
-from ANNarchy.generator.Utils import generate_equation_code, tabify
+from ANNarchy.generator.Utils import generate_equation_code, tabify, rng_key
 
 import re
 from ANNarchy.generator.Projection import OpenMPTemplates
@@ -126,6 +126,14 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
         if 'access_additional' in proj._specific_template.keys():
             access_additional = proj._specific_template['access_additional']
 
+        # Spiking projections with non-uniform delays: the inverse connectivity is sorted by delay
+        declare_delay = decl['declare_delay'] if has_delay else ""
+        init_delay = decl['init_delay'] if has_delay else ""
+        if has_delay and proj.uniform_delay == -1 and proj.synapse_type.type == "spike" and proj._storage_format == "lil":
+            declare_delay += OpenMPTemplates.spiking_variable_delay['declare']
+            init_delay += OpenMPTemplates.spiking_variable_delay['init']
+            connectivity_matrix['init_inverse'] += OpenMPTemplates.spiking_variable_delay['init_inverse']
+
         # Invert the post-to-pre or pre-to-post view
         init_inverse = connectivity_matrix['init_inverse'] % {
             'id_proj': proj.id,
@@ -136,7 +144,7 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'post_size': proj.post.population.size if isinstance(proj.post, PopulationView) else proj.post.size
         }
 
-        final_code = self._templates['projection_header'] % {
+        proj_dict = {
             'id_pre': proj.pre.id,
             'id_post': proj.post.id,
             'id_proj': proj.id,
@@ -148,7 +156,7 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'struct_additional': struct_additional,
             'declare_connectivity_matrix': connectivity_matrix['declare'],
             'declare_inverse_connectivity_matrix': connectivity_matrix['declare_inverse'],
-            'declare_delay': decl['declare_delay'] if has_delay else "",
+            'declare_delay': declare_delay,
             'declare_event_driven': decl['event_driven'] if has_event_driven else "",
             'declare_rng': decl['rng'],
             'declare_parameters_variables': decl['parameters_variables'],
@@ -158,7 +166,7 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'init_inverse_connectivity_matrix': init_inverse,
             'init_event_driven': "",
             'init_rng': init_rng,
-            'init_delay': decl['init_delay']%{'id_pre': proj.pre.id, 'id_post': proj.post.id} if has_delay else "",
+            'init_delay': init_delay % {'id_pre': proj.pre.id, 'id_post': proj.post.id},
             'init_parameters_variables': init_parameters_variables,
             'init_additional': init_additional,
             'init_profile': init_profile,
@@ -176,10 +184,15 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'determine_size': determine_size_in_bytes,
             'clear_container': clear_container
         }
+        final_code = self._templates['projection_header'] % proj_dict
+        body_code = self._templates['projection_body'] % proj_dict
 
-        # Store file
+        # Store files, the header and the methods called at each step are
+        # compiled independently
         with open(annarchy_dir+'/generate/net'+str(self._net_id)+'/proj'+str(proj.id)+'.hpp', 'w') as ofile:
             ofile.write(final_code)
+        with open(annarchy_dir+'/generate/net'+str(self._net_id)+'/proj'+str(proj.id)+'.cpp', 'w') as ofile:
+            ofile.write(body_code)
 
         # Dictionary for inclusions in ANNarchy.cpp
         proj_desc = {
@@ -198,7 +211,7 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
     def creating(self, proj):
         creating_structure = proj.synapse_type.description['creating']
 
-        # Random stuff
+        # Random stuff: each candidate synapse uses its own counter-based stream
         proba = ""
         proba_init = ""
         if 'proba' in creating_structure['bounds'].keys():
@@ -206,12 +219,14 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             proba += '&&(unif(rng)<' + val + ')'
             proba_init += "std::uniform_real_distribution<double> unif(0.0, 1.0);"
         if  creating_structure['rd']:
-            proba_init += "\n        " +  creating_structure['rd']['template'] + ' rd(' + creating_structure['rd']['args'] + ');'
+            proba_init += "\n                    " +  creating_structure['rd']['template'] + ' rd(' + creating_structure['rd']['args'] + ');'
+        if proba_init != "":
+            proba_init = "PhiloxStream rng(rng_seed, %(key)s, i, rk_pre, t);\n                    " % {'key': hex(0x40000000 | rng_key(proj))} + proba_init
 
         # delays
         delay = ""
         if 'd' in creating_structure['bounds'].keys():
-            d = int(creating_structure['bounds']['delay']/Global.config['dt'])
+            d = int(float(creating_structure['bounds']['d'])/Global.config['dt'])
             if proj.max_delay > 1 and proj.uniform_delay == -1:
                 if d > proj.max_delay:
                     Global._error('creating: you can not add a delay higher than the maximum of existing delays')
@@ -221,12 +236,20 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
                 if d != proj.uniform_delay:
                     Global._error('creating: you can not add a delay different from the others if they were constant.')
 
-        # OMP
-        if Global.config['num_threads'] > 1:
-            omp_code = '#pragma omp parallel for' if proj.post.size > Global.OMP_MIN_NB_NEURONS else ''
+        # OMP: each thread marks the existing synapses in its own array. All presynaptic
+        # neurons are considered for each dendrite, so the rows have similar costs.
+        if Global.config['num_threads'] > 1 and proj.post.size > Global.OMP_MIN_NB_NEURONS:
+            omp_parallel = '#pragma omp parallel'
+            omp_code = '#pragma omp for schedule(static) reduction(||:_changed)'
         else:
+            omp_parallel = ""
             omp_code = ""
 
+        # Spiking projections must update the inverse connectivity
+        update_inverse = ""
+        if proj.synapse_type.type == 'spike':
+            update_inverse = OpenMPTemplates.structural_plasticity['header_struct']['spiking_batchcode'] % {'id_proj': proj.id}
+
         creating_condition = creating_structure['cpp'] % {
             'id_proj' : proj.id, 'target': proj.target,
             'id_post': proj.post.id, 'id_pre': proj.pre.id,
@@ -237,35 +260,53 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'id_proj' : proj.id, 'id_pre': proj.pre.id,
             'eq': creating_structure['eq'], 'modulo': '%',
             'condition': creating_condition,
+            'omp_parallel': omp_parallel,
             'omp_code': omp_code,
             'weights': 0.0 if not 'w' in creating_structure['bounds'].keys() else creating_structure['bounds']['w'],
             'proba' : proba, 'proba_init': proba_init,
-            'delay': delay
+            'delay': delay,
+            'update_inverse': update_inverse
         }
         creating = """
     // proj%(id_proj)s creating: %(eq)s
     if((proj%(id_proj)s._creating)&&((t - proj%(id_proj)s._creating_offset) %(modulo)s proj%(id_proj)s._creating_period == 0)){
-        %(proba_init)s
-        //%(omp_code)s
-        for(int i = 0; i < proj%(id_proj)s.post_rank.size(); i++){
-            int rk_post = proj%(id_proj)s.post_rank[i];
-            for(int rk_pre = 0; rk_pre < pop%(id_pre)s.size; rk_pre++){
-                if(%(condition)s){
-                    // Check if the synapse exists
-                    bool _exists = false;
-                    for(int k=0; k<proj%(id_proj)s.pre_rank[i].size(); k++){
-                        if(proj%(id_proj)s.pre_rank[i][k] == rk_pre){
-                            _exists = true;
-                            break;
-                        }
-                    }
-                    if((!_exists)%(proba)s){
-                        //std::cout << "Creating synapse between " << rk_pre << " and " << rk_post << std::endl;
-                        proj%(id_proj)s.addSynapse(i, rk_pre, %(weights)s%(delay)s);
+        // The dendrites are processed independently: the candidates are
+        // evaluated first, then inserted with a single merge per dendrite.
+        bool _changed = false;
+        %(omp_parallel)s
+        {
+            // Existing synapses of the current dendrite, allocated once and cleared after each dendrite
+            std::vector<char> _exists(pop%(id_pre)s.size, 0);
+
+            %(omp_code)s
+            for(int i = 0; i < proj%(id_proj)s.post_rank.size(); i++){
+                int rk_post = proj%(id_proj)s.post_rank[i];
+
+                for(int k=0; k<proj%(id_proj)s.pre_rank[i].size(); k++){
+                    _exists[proj%(id_proj)s.pre_rank[i][k]] = 1;
+                }
+
+                std::vector<int> _new_ranks;
+                for(int rk_pre = 0; rk_pre < pop%(id_pre)s.size; rk_pre++){
+                    if(_exists[rk_pre])
+                        continue;
+                    %(proba_init)s
+                    if((%(condition)s)%(proba)s){
+                        _new_ranks.push_back(rk_pre);
                     }
                 }
+
+                for(int k=0; k<proj%(id_proj)s.pre_rank[i].size(); k++){
+                    _exists[proj%(id_proj)s.pre_rank[i][k]] = 0;
+                }
+
+                if(!_new_ranks.empty()){
+                    proj%(id_proj)s.addSynapses(i, _new_ranks, %(weights)s%(delay)s);
+                    _changed = true;
+                }
             }
         }
+%(update_inverse)s
     }
 """ % creation_ids
 
@@ -274,6 +315,7 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
     def pruning(self, proj):
         pruning_structure = proj.synapse_type.description['pruning']
 
+        # Random stuff: each synapse uses its own counter-based stream
         proba = ""
         proba_init = ""
         if 'proba' in pruning_structure['bounds'].keys():
@@ -281,13 +323,21 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             proba = '&&(unif(rng)<' + val + ')'
             proba_init = "std::uniform_real_distribution<double> unif(0.0, 1.0);"
         if pruning_structure['rd']:
-            proba_init += "\n        " +  pruning_structure['rd']['template'] + ' rd(' + pruning_structure['rd']['args'] + ');'
+            proba_init += "\n                " +  pruning_structure['rd']['template'] + ' rd(' + pruning_structure['rd']['args'] + ');'
+        if proba_init != "":
+            proba_init = "PhiloxStream rng(rng_seed, %(key)s, i, j, t);\n                " % {'key': hex(0x80000000 | rng_key(proj))} + proba_init
 
+        # OMP: the blocks of the thread partition have similar numbers of synapses
         if Global.config['num_threads'] > 1:
-            omp_code = '#pragma omp parallel for' if proj.post.size > Global.OMP_MIN_NB_NEURONS else ''
+            omp_code = '#pragma omp parallel for schedule(static) reduction(||:_changed)' if proj.post.size > Global.OMP_MIN_NB_NEURONS else ''
         else:
             omp_code = ""
 
+        # Spiking projections must update the inverse connectivity
+        update_inverse = ""
+        if proj.synapse_type.type == 'spike':
+            update_inverse = OpenMPTemplates.structural_plasticity['header_struct']['spiking_batchcode'] % {'id_proj': proj.id}
+
         pruning_condition = pruning_structure['cpp'] % {
             'id_proj' : proj.id, 'target': proj.target,
             'id_post': proj.post.id, 'id_pre': proj.pre.id,
@@ -306,23 +356,40 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'modulo': '%',
             'condition': pruning_condition,
             'omp_code': omp_code,
+            'thread_blocks': self._thread_blocks(proj),
             'proba' : proba,
-            'proba_init': proba_init
+            'proba_init': proba_init,
+            'update_inverse': update_inverse
         }
         pruning = """
     // proj%(id_proj)s pruning: %(eq)s
     if((proj%(id_proj)s._pruning)&&((t - proj%(id_proj)s._pruning_offset) %(modulo)s proj%(id_proj)s._pruning_period == 0)){
-        %(proba_init)s
-        //%(omp_code)s
-        for(int i = 0; i < proj%(id_proj)s.post_rank.size(); i++){
+        // The dendrites are processed independently: the synapses to remove
+        // are flagged first, then removed with a single compaction per dendrite.
+        bool _changed = false;
+        proj%(id_proj)s.check_thread_partition(%(thread_blocks)s);
+        %(omp_code)s
+        for(int _b = 0; _b < %(thread_blocks)s; _b++)
+        for(int i = proj%(id_proj)s._thread_rows[_b]; i < proj%(id_proj)s._thread_rows[_b+1]; i++){
             int rk_post = proj%(id_proj)s.post_rank[i];
+
+            std::vector<char> _keep(proj%(id_proj)s.pre_rank[i].size(), 1);
+            bool _removed = false;
             for(int j = 0; j < proj%(id_proj)s.pre_rank[i].size(); j++){
                 int rk_pre = proj%(id_proj)s.pre_rank[i][j];
+                %(proba_init)s
                 if((%(condition)s)%(proba)s){
-                    proj%(id_proj)s.removeSynapse(i, j);
+                    _keep[j] = 0;
+                    _removed = true;
                 }
             }
+
+            if(_removed){
+                proj%(id_proj)s.removeSynapses(i, _keep);
+                _changed = true;
+            }
         }
+%(update_inverse)s
     }
 """ % pruning_ids
 
@@ -353,6 +420,8 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             template = OpenMPTemplates.lil_summation_operation
         elif proj._storage_format == "csr":
             template = OpenMPTemplates.csr_summation_operation
+        elif proj._storage_format == "sell":
+            template = OpenMPTemplates.sell_summation_operation
         else:
             Global._error("OpenMPGenerator: no template for this configuration available")
 
@@ -381,6 +450,9 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             ids['pre_index'] = '[_col_idx[j]]'
             ids['local_index'] = '[j]'
             ids['post_index'] = 'post_ranks[i]'
+        elif proj._storage_format == "sell":
+            ids['pre_index'] = '[_col_idx[_k]]'
+            ids['local_index'] = '[_k]'
 
         # Retrieve the PSP
         if not 'psp' in  proj.synapse_type.description.keys(): # default
@@ -447,18 +519,15 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
                 if proj.uniform_delay == -1: # Non-uniform delays: do nothing
                     omp_code = '#pragma omp parallel for private(sum) firstprivate(nb_post) %(schedule)s' % {'schedule': omp_schedule}
 
-                else: # Uniform delays
-                    omp_code = "#pragma omp parallel for private(sum) firstprivate("
+                else: # Uniform delays: read the delayed values in place
+                    omp_code = "#pragma omp parallel for private(sum) firstprivate(nb_post) %(schedule)s" % {'schedule': omp_schedule}
                     for var in dependencies:
                         if var in proj.pre.neuron_type.description['local']:
-                            pre_copy += "std::vector<double> _pre_" + var + " = %(pre_prefix)s_delayed_" + var + "%(delay_u)s;"
+                            pre_copy += "const auto& _pre_" + var + " = %(pre_prefix)s_delayed_" + var + "%(delay_u)s;"
                             psp = psp.replace(
                                 '%(pre_prefix)s_delayed_'+var+'%(delay_u)s%(pre_index)s',
                                 '_pre_'+var+'%(pre_index)s'
                             )
-                            omp_code += '_pre_%(var)s, ' % {'var': var}
-
-                    omp_code += "nb_post) %(schedule)s" % {'schedule': omp_schedule}
 
             else: # No delay
                 pre_copy = ""
@@ -486,7 +555,9 @@ class OpenMPGenerator(ProjectionGenerator, OpenMPConnectivity):
             'id_pre': proj.pre.id,
             'id_post': proj.post.id,
             'target': proj.target,
-            'post_index': ids['post_index']
+            'post_index': ids['post_index'],
+            'float_prec': Global.config['precision'],
+            'thread_blocks': self._thread_blocks(proj)
         }
 
         # Finish the code
@@ -776,7 +847,6 @@ if (%(condition)s) {
         pre_array = ""
         if proj.max_delay > 1:
             if proj.uniform_delay == -1: # Non-uniform delays
-                Global._warning('Variable delays for spiking networks is experimental and slow...')
                 template = OpenMPTemplates.spiking_summation_variable_delay
             else: # Uniform delays
                 pre_array = "pop%(id_pre)s._delayed_spike[delay-1]" % {'id_pre': proj.pre.id}
@@ -787,7 +857,8 @@ if (%(condition)s) {
         omp_code = ""
         if Global.config['num_threads'] > 1 and proj.post.size > Global.OMP_MIN_NB_NEURONS:
             if proj._storage_format == "lil":
-                omp_code = ""
+                # Non-uniform delays: the threads process distinct post-synaptic neurons
+                omp_code = "#pragma omp parallel" if proj.max_delay > 1 and proj.uniform_delay == -1 else ""
                 omp_atomic = ""
             elif proj._storage_format == "csr":
                 omp_atomic = """#pragma omp atomic""" # TODO: CHECK if necessary
@@ -830,6 +901,12 @@ if (%(condition)s) {
                 'omp_reduce_code': omp_reduce_code
             }
 
+        # Structural plasticity: addSynapse()/removeSynapse() invalidate the inverse connectivity.
+        # The flat index is not updated incrementally (inserting a synapse would shift the
+        # following ranges): it is rebuilt as a whole, at most once per step, in O(synapses).
+        if Global.config['structural_plasticity'] and proj._storage_format == "lil" and code != "":
+            code = OpenMPTemplates.structural_plasticity['header_struct']['spiking_update_inverse'] + code
+
         # Add tabs
         code = tabify(code, 2)
 
@@ -883,6 +960,8 @@ if (%(condition)s) {
         extra_args = ""
         add_var_code = ""
         add_var_remove = ""
+        batch_add = ""
+        batch_remove = ""
         for var in proj.synapse_type.description['parameters'] + proj.synapse_type.description['variables']:
             if not var['name'] in ['w', 'delay'] and  var['name'] in proj.synapse_type.description['local']:
 
@@ -893,21 +972,29 @@ if (%(condition)s) {
                 extra_args += ', ' + var['ctype'] + ' _' +  var['name'] +'='+str(init)
                 add_var_code += ' '*8 + var['name'] + '[post].insert('+var['name']+'[post].begin() + idx, _' + var['name'] + ');\n'
                 add_var_remove += ' '*8 + var['name'] + '[post].erase(' + var['name'] + '[post].begin() + idx);\n'
+                batch_add += ' '*8 + '_merge_synapses(' + var['name'] + '[post], _src, _' + var['name'] + ');\n'
+                batch_remove += ' '*8 + '_compact_synapses(' + var['name'] + '[post], keep);\n'
 
         # Delays
         delay_code = ""
         delay_remove= ""
+        delay_batch_add = ""
+        delay_batch_remove = ""
         if proj.max_delay > 1 and proj.uniform_delay == -1:
             delay_code = ' '*8 + "delay[post].insert(delay[post].begin() + idx, _delay);"
             delay_remove = ' '*8 + "delay[post].erase(delay[post].begin() + idx);"
+            delay_batch_add = ' '*8 + "_merge_synapses(delay[post], _src, _delay);"
+            delay_batch_remove = ' '*8 + "_compact_synapses(delay[post], keep);"
 
-        # Spiking networks must update the inv_pre_rank array
+        # Spiking networks must update the inverse connectivity
         spiking_addcode = "" if proj.synapse_type.type == 'rate' else header_tpl['spiking_addcode']
         spiking_removecode = "" if proj.synapse_type.type == 'rate' else header_tpl['spiking_removecode']
 
         # Randomdistributions
         rd_addcode = ""
         rd_removecode = ""
+        rd_batch_add = ""
+        rd_batch_remove = ""
         for rd in proj.synapse_type.description['random_distributions']:
             rd_addcode += """
         %(name)s[post].insert(%(name)s[post].begin() + idx, 0.0);
@@ -917,13 +1004,24 @@ if (%(condition)s) {
         %(name)s[post].erase(%(name)s[post].begin() + idx);
 """ % {'name': rd['name']}
 
+            rd_batch_add += """
+        _merge_synapses(%(name)s[post], _src, 0.0);
+""" % {'name': rd['name']}
+
+            rd_batch_remove += """
+        _compact_synapses(%(name)s[post], keep);
+""" % {'name': rd['name']}
+
         # Generate the code
         code += header_tpl['header'] % {
             'extra_args': extra_args,
             'delay_code': delay_code, 'delay_remove': delay_remove,
             'add_code': add_var_code, 'add_remove': add_var_remove,
             'spike_add': spiking_addcode, 'spike_remove': spiking_removecode,
-            'rd_add': rd_addcode, 'rd_remove': rd_removecode
+            'rd_add': rd_addcode, 'rd_remove': rd_removecode,
+            'delay_batch_add': delay_batch_add, 'delay_batch_remove': delay_batch_remove,
+            'batch_add': batch_add, 'batch_remove': batch_remove,
+            'rd_batch_add': rd_batch_add, 'rd_batch_remove': rd_batch_remove
         }
 
         return code
@@ -1037,9 +1135,10 @@ _last_event%(local_index)s = t;
             post_code += get_bounds(eq) % ids + '\n'
         post_code = tabify(post_code, 3)
 
-        # OMP code
+        # OMP code: LIL distributes blocks of dendrites with similar numbers of synapses,
+        # CSR splits the synapses of each dendrite
         if Global.config['num_threads'] > 1:
-            omp_code = '#pragma omp parallel for schedule(dynamic)' if proj.post.size > Global.OMP_MIN_NB_NEURONS else ''
+            omp_code = '#pragma omp parallel for schedule(static)' if proj.post.size > Global.OMP_MIN_NB_NEURONS else ''
         else:
             omp_code = ""
 
@@ -1049,18 +1148,31 @@ _last_event%(local_index)s = t;
                 'id_post': proj.post.id,
                 'post_event': post_code,
                 'event_driven': event_driven_code,
-                'omp_code': omp_code
+                'omp_code': omp_code,
+                'thread_blocks': self._thread_blocks(proj)
             }
             code = """
 if(_transmission && pop%(id_post)s._active){
-    %(omp_code)s
+    // Dendrites of the neurons which fired and prefix sum of their sizes
+    std::vector<int> _spiked_rows;
+    std::vector<long> _prefix(1, 0);
     for(int _idx_i = 0; _idx_i < pop%(id_post)s.spiked.size(); _idx_i++){
-        // Rank of the postsynaptic neuron which fired
-        int rk_post = pop%(id_post)s.spiked[_idx_i];
-        // Find its index in the projection
-        int i = inv_post_rank.at(rk_post);
+        // Find the index of the neuron in the projection
+        int i = inv_post_rank.at(pop%(id_post)s.spiked[_idx_i]);
         // Leave if the neuron is not part of the projection
         if (i==-1) continue;
+        _spiked_rows.push_back(i);
+        _prefix.push_back(_prefix.back() + pre_rank[i].size() + 1);
+    }
+    // Split them into blocks with similar numbers of synapses
+    int _nb_blocks = %(thread_blocks)s;
+    std::vector<int> _blocks = _split_prefix(_prefix, _nb_blocks);
+    %(omp_code)s
+    for(int _b = 0; _b < _nb_blocks; _b++)
+    for(int _k = _blocks[_b]; _k < _blocks[_b+1]; _k++){
+        int i = _spiked_rows[_k];
+        // Rank of the postsynaptic neuron which fired
+        int rk_post = post_rank[i];
         // Iterate over all synapse to this neuron
         int nb_pre = pre_rank[i].size();
         for(int j = 0; j < nb_pre; j++){
@@ -1108,15 +1220,21 @@ if(_transmission && pop%(id_post)s._active){
 
         code = ""
         if len(proj.synapse_type.description['random_distributions']) > 0:
+            # Each synapse has its own counter-based stream (seed, projection, post index, pre index, time step)
+            omp_code = "#pragma omp parallel for schedule(static)" if Global.config['num_threads'] > 1 and proj.post.size > Global.OMP_MIN_NB_NEURONS else ""
             code += """
     // RD of proj%(id_proj)s
-    for(int i = 0; i < post_rank.size(); i++){
+    check_thread_partition(%(thread_blocks)s);
+    %(omp_code)s
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
         for(int j = 0; j < pre_rank[i].size(); j++){
-"""% {'id_proj': proj.id}
+            PhiloxStream _rng(rng_seed, %(key)s, i, j, t);
+"""% {'id_proj': proj.id, 'omp_code': omp_code, 'key': rng_key(proj), 'thread_blocks': self._thread_blocks(proj)}
 
             for rd in proj.synapse_type.description['random_distributions']:
                 code += """
-            %(rd_name)s[i][j] = dist_%(rd_name)s(rng);""" % {'rd_name': rd['name']}
+            %(rd_name)s[i][j] = decltype(dist_%(rd_name)s)(dist_%(rd_name)s.param())(_rng);""" % {'rd_name': rd['name']}
 
             code += """
         }
@@ -1151,6 +1269,8 @@ if(_transmission && pop%(id_post)s._active){
         if proj._storage_format == "csr":
             ids['local_index'] = "[j]"
             ids['pre_index'] = "[_col_idx[j]]"
+        elif proj._storage_format == "sell":
+            ids['local_index'] = "[_k]"
 
         # Global variables
         global_eq = generate_equation_code(proj.id, proj.synapse_type.description, 'global', 'proj', padding=2, wrap_w="_plasticity")
@@ -1208,10 +1328,10 @@ if(_transmission && pop%(id_post)s._active){
                 ' ' + global_eq
             )
 
-        # OpenMP
+        # OpenMP: the blocks of the thread partition hold similar numbers of synapses
         omp_code = ""
         if Global.config['num_threads'] > 1 and proj.post.size > Global.OMP_MIN_NB_NEURONS:
-            omp_code = '#pragma omp parallel for private(rk_pre, rk_post) schedule(dynamic)'
+            omp_code = '#pragma omp parallel for private(rk_pre, rk_post)'
 
         # Dependencies
         dependencies = list(set(proj.synapse_type.description['dependencies']['pre']))
@@ -1248,6 +1368,8 @@ if(_transmission && pop%(id_post)s._active){
             template = OpenMPTemplates.dense_update_variables
         elif proj._storage_format == "csr":
             template = OpenMPTemplates.csr_update_variables
+        elif proj._storage_format == "sell":
+            template = OpenMPTemplates.sell_update_variables
         else: # Default: LIL
             template = OpenMPTemplates.lil_update_variables
 
@@ -1259,14 +1381,16 @@ if(_transmission && pop%(id_post)s._active){
                 'local': local_eq % ids,
                 'id_post': proj.post.id,
                 'id_pre': proj.pre.id,
-                'omp_code': omp_code
+                'omp_code': omp_code,
+                'thread_blocks': self._thread_blocks(proj)
             }
         else: # Only global variables
             code = template['global'] % {
                 'global': global_eq % ids,
                 'semiglobal': semiglobal_eq % ids,
                 'id_post': proj.post.id,
-                'omp_code': omp_code
+                'omp_code': omp_code,
+                'thread_blocks': self._thread_blocks(proj)
             }
 
         if self._prof_gen:
@@ -1275,6 +1399,18 @@ if(_transmission && pop%(id_post)s._active){
         # Return the code block
         return prefix, tabify(code, 2)
 
+    def _thread_blocks(self, proj):
+        """
+        Number of blocks of the thread partition iterated by the synaptic loops. There is
+        one block per thread, or eight when an openMP schedule is set for the weighted
+        sum (``proj._omp_config['psp_schedule']``), which then distributes the blocks.
+        """
+        if Global.config['num_threads'] == 1:
+            return "1"
+        if 'psp_schedule' in proj._omp_config.keys():
+            return "8 * omp_get_max_threads()"
+        return "omp_get_max_threads()"
+
     def _update_max_delay(self, proj):
         "When the maximum delay of a non-uniform spiking projection changes, the ring buffer for delyed spikes must be updated."
 
@@ -1284,28 +1420,6 @@ if(_transmission && pop%(id_post)s._active){
         if proj.uniform_delay >= 0:
             return ""
 
-        update_delay_code = """
-        // No need to do anything if the new max delay is smaller than the old one
-        if(d <= max_delay)
-            return;
-
-        // Update delays
-        int prev_max = max_delay;
-        max_delay = d;
-        int add_steps = d - prev_max;
-
-        // std::cout << "Delayed arrays was " << _delayed_spikes.size() << std::endl;
-
-        // Insert as many empty vectors as need at the current pointer position
-        _delayed_spikes.insert(_delayed_spikes.begin() + idx_delay, add_steps, std::vector< std::vector< int > >(post_rank.size(), std::vector< int >() ));
-
-        // The delay index has to be updated
-        idx_delay = (idx_delay + add_steps) % max_delay;
-
-        // std::cout << "Delayed arrays is now " << _delayed_spikes.size() << std::endl;
-        // std::cout << "Idx " << idx_delay << std::endl;
-        // for(int i = 0; i< max_delay; i++)
-        //     std::cout << _delayed_spikes[i][0].size() << std::endl;
-"""
+        update_delay_code = OpenMPTemplates.spiking_variable_delay['update_max_delay']
 
         return update_delay_code
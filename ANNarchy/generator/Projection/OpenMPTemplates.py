@@ -84,28 +84,17 @@ struct ProjStruct%(id_proj)s{
 %(update_max_delay)s
     }
 
-    // Computes the weighted sum of inputs or updates the conductances
-    void compute_psp() {
-%(psp_prefix)s
-%(psp_code)s
-    }
+    // Computes the weighted sum of inputs or updates the conductances (defined in proj%(id_proj)s.cpp)
+    void compute_psp();
 
-    // Draws random numbers
-    void update_rng() {
-%(update_rng)s
-    }
+    // Draws random numbers (defined in proj%(id_proj)s.cpp)
+    void update_rng();
 
-    // Updates synaptic variables
-    void update_synapse() {
-%(update_prefix)s
-%(update_variables)s
-    }
+    // Updates synaptic variables (defined in proj%(id_proj)s.cpp)
+    void update_synapse();
 
-    // Post-synaptic events
-    void post_event() {
-%(post_event_prefix)s
-%(post_event)s
-    }
+    // Post-synaptic events (defined in proj%(id_proj)s.cpp)
+    void post_event();
 
     // Accessors for default attributes
     int get_size() { return size; }
@@ -129,6 +118,42 @@ struct ProjStruct%(id_proj)s{
 };
 """
 
+# Definition of the methods called at each simulation step, stored in a
+# separate translation unit (proj<id>.cpp).
+#
+# Parameters:
+#
+#    id_proj: id of the projection
+#    psp_*, update_*, post_event*: code for the corresponding methods
+projection_body = """/*
+ * proj%(id_proj)s: %(name_pre)s -> %(name_post)s with target %(target)s
+ */
+#include "ANNarchy.h"
+
+// Computes the weighted sum of inputs or updates the conductances
+void ProjStruct%(id_proj)s::compute_psp() {
+%(psp_prefix)s
+%(psp_code)s
+}
+
+// Draws random numbers
+void ProjStruct%(id_proj)s::update_rng() {
+%(update_rng)s
+}
+
+// Updates synaptic variables
+void ProjStruct%(id_proj)s::update_synapse() {
+%(update_prefix)s
+%(update_variables)s
+}
+
+// Post-synaptic events
+void ProjStruct%(id_proj)s::post_event() {
+%(post_event_prefix)s
+%(post_event)s
+}
+"""
+
 # Definition for the usage of C++11 STL template random
 # number generators
 #
@@ -146,7 +171,7 @@ cpp_11_rng = {
         dist_%(rd_name)s = %(rd_init)s;
     """,
         'update': """
-                %(rd_name)s[i] = dist_%(rd_name)s(rng);
+                %(rd_name)s[i] = decltype(dist_%(rd_name)s)(dist_%(rd_name)s.param())(_rng);
     """
     },
     'global': {
@@ -158,11 +183,60 @@ cpp_11_rng = {
         dist_%(rd_name)s = %(rd_init)s;
     """,
         'update': """
-            %(rd_name)s = dist_%(rd_name)s(rng);
+            %(rd_name)s = decltype(dist_%(rd_name)s)(dist_%(rd_name)s.param())(_rng);
     """
     }
 }
 
+######################################
+### Thread partition
+######################################
+# The synaptic loops iterate over blocks of contiguous dendrites holding the same
+# number of synapses (plus one per dendrite for the per-row work), so that
+# heavy-tailed fan-ins do not end up in the same thread. The blocks are computed
+# from a prefix sum over the row lengths and recomputed when the connectivity or
+# the number of threads changes.
+#
+# Parameters:
+#
+#    nb_rows: number of rows (dendrites, or chunks for sell)
+#    row_length: number of synapses stored in the row i
+thread_partition = {
+    'declare': """
+    // Partition of the rows into blocks with similar numbers of synapses:
+    // block b covers the rows _thread_rows[b] to _thread_rows[b+1]-1
+    std::vector<int> _thread_rows;
+    // Set when the connectivity changes, the partition is recomputed before the next step
+    bool _thread_rows_dirty = true;
+""",
+    'accessor': """
+    // Splits the rows into nb_blocks contiguous blocks with similar numbers of synapses
+    void update_thread_partition(int nb_blocks) {
+        int nb_rows = %(nb_rows)s;
+        std::vector<long> _prefix(nb_rows + 1, 0);
+        for(int i = 0; i < nb_rows; i++)
+            _prefix[i+1] = _prefix[i] + (%(row_length)s) + 1;
+        _thread_rows = _split_prefix(_prefix, nb_blocks);
+        _thread_rows_dirty = false;
+    }
+    // Bounds of nb_blocks contiguous blocks of rows with similar sums, prefix holding the
+    // (strictly increasing) prefix sum of the row weights: every row is in exactly one block
+    static std::vector<int> _split_prefix(const std::vector<long>& prefix, int nb_blocks) {
+        int nb_rows = prefix.size() - 1;
+        std::vector<int> bounds(nb_blocks + 1, nb_rows);
+        bounds[0] = 0;
+        for(int b = 1; b < nb_blocks; b++)
+            bounds[b] = std::lower_bound(prefix.begin(), prefix.end(), (prefix[nb_rows] * b) / nb_blocks) - prefix.begin();
+        return bounds;
+    }
+    // Recomputes the partition if the connectivity or the number of blocks changed
+    void check_thread_partition(int nb_blocks) {
+        if(_thread_rows_dirty || _thread_rows.size() != nb_blocks + 1)
+            update_thread_partition(nb_blocks);
+    }
+"""
+}
+
 ######################################
 ### Structural plasticity
 ######################################
@@ -192,6 +266,7 @@ structural_plasticity = {
         }
         pre_rank[post].insert(pre_rank[post].begin() + idx, pre);
         w[post].insert(w[post].begin() + idx, weight);
+        _thread_rows_dirty = true;
 %(delay_code)s
 %(add_code)s
 %(spike_add)s
@@ -200,11 +275,67 @@ structural_plasticity = {
     void removeSynapse(int post, int idx){
         pre_rank[post].erase(pre_rank[post].begin() + idx);
         w[post].erase(w[post].begin() + idx);
+        _thread_rows_dirty = true;
 %(delay_remove)s
 %(add_remove)s
 %(spike_remove)s
 %(rd_remove)s
     };
+    // Inserts the synapses coming from the (sorted) ranks pre in the dendrite post
+    void addSynapses(int post, const std::vector<int>& pre, double weight, int _delay=0%(extra_args)s){
+        // Origin of each synapse in the new dendrite: index in the old one, -1 for a new synapse
+        std::vector<int> _src, _ranks;
+        _src.reserve(pre_rank[post].size() + pre.size());
+        _ranks.reserve(pre_rank[post].size() + pre.size());
+        int k = 0;
+        for(int j = 0; j < pre_rank[post].size(); j++){
+            while(k < pre.size() && pre[k] < pre_rank[post][j]){
+                _src.push_back(-1);
+                _ranks.push_back(pre[k++]);
+            }
+            _src.push_back(j);
+            _ranks.push_back(pre_rank[post][j]);
+        }
+        for(; k < pre.size(); k++){
+            _src.push_back(-1);
+            _ranks.push_back(pre[k]);
+        }
+        pre_rank[post].swap(_ranks);
+        _merge_synapses(w[post], _src, weight);
+        _thread_rows_dirty = true;
+%(delay_batch_add)s
+%(batch_add)s
+%(rd_batch_add)s
+    };
+    // Removes the synapses of the dendrite post whose flag in keep is 0
+    void removeSynapses(int post, const std::vector<char>& keep){
+        _compact_synapses(pre_rank[post], keep);
+        _compact_synapses(w[post], keep);
+        _thread_rows_dirty = true;
+%(delay_batch_remove)s
+%(batch_remove)s
+%(rd_batch_remove)s
+    };
+    template<typename T, typename V>
+    void _merge_synapses(std::vector<T>& values, const std::vector<int>& src, const V& value){
+        std::vector<T> res;
+        res.reserve(src.size());
+        for(int j = 0; j < src.size(); j++)
+            res.push_back(src[j] >= 0 ? values[src[j]] : static_cast<T>(value));
+        values.swap(res);
+    }
+    template<typename T>
+    void _compact_synapses(std::vector<T>& values, const std::vector<char>& keep){
+        int k = 0;
+        for(int j = 0; j < values.size(); j++){
+            if(keep[j]){
+                if(k != j)
+                    values[k] = values[j];
+                k++;
+            }
+        }
+        values.resize(k);
+    }
 """,
         'pruning': """
     // Pruning
@@ -219,25 +350,22 @@ structural_plasticity = {
     long int _creating_offset;
 """,
         'spiking_addcode': """
-        // Add the corresponding pair in inv_pre_rank
-        int idx_post = 0;
-        for(int i=0; i<post_rank.size(); i++){
-            if(post_rank[i] == post){
-                idx_post = i;
-                break;
-            }
-        }
-        inv_pre_rank[pre].push_back(std::pair<int, int>(idx_post, idx));
+        // The inverse connectivity is rebuilt before the next transmission
+        _inv_dirty = true;
 """,
         'spiking_removecode': """
-        // Remove the corresponding pair in inv_pre_rank
-        int pre = pre_rank[post][idx];
-        for(int i=0; i<inv_pre_rank[pre].size(); i++){
-            if(inv_pre_rank[pre][i].second == idx){
-                inv_pre_rank[pre].erase(inv_pre_rank[pre].begin() + i);
-                break;
-            }
-        }
+        // The inverse connectivity is rebuilt before the next transmission
+        _inv_dirty = true;
+""",
+        'spiking_batchcode': """
+    // The inverse connectivity is rebuilt before the next transmission
+    if(_changed)
+        proj%(id_proj)s._inv_dirty = true;
+""",
+        'spiking_update_inverse': """
+// Synapses were added or removed since the last step: the whole inverse connectivity is rebuilt
+if (_inv_dirty)
+    inverse_connectivity_matrix();
 """
     },
     'pyx_struct': {
@@ -304,8 +432,10 @@ lil_summation_operation = {
     'sum' : """
 %(pre_copy)s
 nb_post = post_rank.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++) {
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++) {
     sum = 0.0;
     for(int j = 0; j < pre_rank[i].size(); j++) {
         sum += %(psp)s ;
@@ -316,8 +446,10 @@ for(int i = 0; i < nb_post; i++) {
     'max': """
 %(pre_copy)s
 nb_post = post_rank.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
     int j = 0;
     sum = %(psp)s ;
     for(int j = 1; j < pre_rank[i].size(); j++){
@@ -331,8 +463,10 @@ for(int i = 0; i < nb_post; i++){
     'min': """
 %(pre_copy)s
 nb_post = post_rank.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
     int j= 0;
     sum = %(psp)s ;
     for(int j = 1; j < pre_rank[i].size(); j++){
@@ -346,8 +480,10 @@ for(int i = 0; i < nb_post; i++){
     'mean': """
 %(pre_copy)s
 nb_post = post_rank.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
     sum = 0.0 ;
     for(int j = 0; j < pre_rank[i].size(); j++){
         sum += %(psp)s ;
@@ -362,10 +498,12 @@ csr_summation_operation = {
     'sum' : """
 %(pre_copy)s
 nb_post = post_ranks.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++) {
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++) {
     sum = 0.0;
-    for(int j = _row_ptr[i]; j < _row_ptr[i+1]; j++) {
+    for(int j = _row_ptr[post_ranks[i]]; j < _row_ptr[post_ranks[i]+1]; j++) {
         sum += %(psp)s ;
     }
     pop%(id_post)s._sum_%(target)s[%(post_index)s] += sum;
@@ -373,12 +511,14 @@ for(int i = 0; i < nb_post; i++) {
 """,
     'max': """
 %(pre_copy)s
-nb_post = post_rank.size();
+nb_post = post_ranks.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
-    int j = _row_ptr[i];
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
+    int j = _row_ptr[post_ranks[i]];
     sum = %(psp)s ;
-    for(int j = _row_ptr[i]+1; j < _row_ptr[i+1]; j++){
+    for(int j = _row_ptr[post_ranks[i]]+1; j < _row_ptr[post_ranks[i]+1]; j++){
         if(%(psp)s > sum){
             sum = %(psp)s ;
         }
@@ -388,12 +528,14 @@ for(int i = 0; i < nb_post; i++){
 """,
     'min': """
 %(pre_copy)s
-nb_post = post_rank.size();
+nb_post = post_ranks.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
-    int j= _row_ptr[i];
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
+    int j= _row_ptr[post_ranks[i]];
     sum = %(psp)s ;
-    for(int j = _row_ptr[i]+1; j < _row_ptr[i+1]; j++){
+    for(int j = _row_ptr[post_ranks[i]]+1; j < _row_ptr[post_ranks[i]+1]; j++){
         if(%(psp)s < sum){
             sum = %(psp)s ;
         }
@@ -403,18 +545,131 @@ for(int i = 0; i < nb_post; i++){
 """,
     'mean': """
 %(pre_copy)s
-nb_post = post_rank.size();
+nb_post = post_ranks.size();
+check_thread_partition(%(thread_blocks)s);
 %(omp_code)s
-for(int i = 0; i < nb_post; i++){
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
     sum = 0.0 ;
-    for(int j = _row_ptr[i]; j < _row_ptr[i+1]; j++){
+    for(int j = _row_ptr[post_ranks[i]]; j < _row_ptr[post_ranks[i]+1]; j++){
         sum += %(psp)s ;
     }
-    pop%(id_post)s._sum_%(target)s[%(post_index)s] += sum / (double)(pre_rank[i].size());
+    pop%(id_post)s._sum_%(target)s[%(post_index)s] += sum / (double)(_row_ptr[post_ranks[i]+1] - _row_ptr[post_ranks[i]]);
 }
 """
 }
-    
+
+# Sliced ELLPACK (SELL-C-sigma): the rows of a chunk are summed in SIMD lanes,
+# the padding is masked by the row lengths.
+sell_summation_operation = {
+    'sum' : """
+%(pre_copy)s
+nb_post = _chunk_width.size();
+check_thread_partition(%(thread_blocks)s);
+%(omp_code)s
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++) {
+    %(float_prec)s _sum[_chunk_size] = {};
+    for(int j = 0; j < _chunk_width[_c]; j++) {
+        #pragma omp simd
+        for(int _r = 0; _r < _chunk_size; _r++) {
+            const int _row = _c * _chunk_size + _r;
+            const int i = _row_perm[_row];
+            const long _k = _chunk_ptr[_c] + (long)j * _chunk_size + _r;
+            const %(float_prec)s _psp = %(psp)s;
+            _sum[_r] += (j < _row_length[_row]) ? _psp : 0.0;
+        }
+    }
+    for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++) {
+        const int i = _row_perm[_c * _chunk_size + _r];
+        pop%(id_post)s._sum_%(target)s%(post_index)s += _sum[_r];
+    }
+}
+""",
+    'max': """
+%(pre_copy)s
+nb_post = _chunk_width.size();
+check_thread_partition(%(thread_blocks)s);
+%(omp_code)s
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++) {
+    %(float_prec)s _sum[_chunk_size];
+    for(int _r = 0; _r < _chunk_size; _r++)
+        _sum[_r] = std::numeric_limits<%(float_prec)s>::lowest();
+    for(int j = 0; j < _chunk_width[_c]; j++) {
+        #pragma omp simd
+        for(int _r = 0; _r < _chunk_size; _r++) {
+            const int _row = _c * _chunk_size + _r;
+            const int i = _row_perm[_row];
+            const long _k = _chunk_ptr[_c] + (long)j * _chunk_size + _r;
+            const %(float_prec)s _psp = %(psp)s;
+            _sum[_r] = (j < _row_length[_row] && _psp > _sum[_r]) ? _psp : _sum[_r];
+        }
+    }
+    for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++) {
+        if (_row_length[_c * _chunk_size + _r] == 0) // no synapse left, e.g. after pruning
+            continue;
+        const int i = _row_perm[_c * _chunk_size + _r];
+        pop%(id_post)s._sum_%(target)s%(post_index)s += _sum[_r];
+    }
+}
+""",
+    'min': """
+%(pre_copy)s
+nb_post = _chunk_width.size();
+check_thread_partition(%(thread_blocks)s);
+%(omp_code)s
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++) {
+    %(float_prec)s _sum[_chunk_size];
+    for(int _r = 0; _r < _chunk_size; _r++)
+        _sum[_r] = std::numeric_limits<%(float_prec)s>::max();
+    for(int j = 0; j < _chunk_width[_c]; j++) {
+        #pragma omp simd
+        for(int _r = 0; _r < _chunk_size; _r++) {
+            const int _row = _c * _chunk_size + _r;
+            const int i = _row_perm[_row];
+            const long _k = _chunk_ptr[_c] + (long)j * _chunk_size + _r;
+            const %(float_prec)s _psp = %(psp)s;
+            _sum[_r] = (j < _row_length[_row] && _psp < _sum[_r]) ? _psp : _sum[_r];
+        }
+    }
+    for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++) {
+        if (_row_length[_c * _chunk_size + _r] == 0) // no synapse left, e.g. after pruning
+            continue;
+        const int i = _row_perm[_c * _chunk_size + _r];
+        pop%(id_post)s._sum_%(target)s%(post_index)s += _sum[_r];
+    }
+}
+""",
+    'mean': """
+%(pre_copy)s
+nb_post = _chunk_width.size();
+check_thread_partition(%(thread_blocks)s);
+%(omp_code)s
+for(int _b = 0; _b < %(thread_blocks)s; _b++)
+for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++) {
+    %(float_prec)s _sum[_chunk_size] = {};
+    for(int j = 0; j < _chunk_width[_c]; j++) {
+        #pragma omp simd
+        for(int _r = 0; _r < _chunk_size; _r++) {
+            const int _row = _c * _chunk_size + _r;
+            const int i = _row_perm[_row];
+            const long _k = _chunk_ptr[_c] + (long)j * _chunk_size + _r;
+            const %(float_prec)s _psp = %(psp)s;
+            _sum[_r] += (j < _row_length[_row]) ? _psp : 0.0;
+        }
+    }
+    for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++) {
+        if (_row_length[_c * _chunk_size + _r] == 0) // no synapse left, e.g. after pruning
+            continue;
+        const int i = _row_perm[_c * _chunk_size + _r];
+        pop%(id_post)s._sum_%(target)s%(post_index)s += _sum[_r] / (double)(_row_length[_c * _chunk_size + _r]);
+    }
+}
+"""
+}
+
 # Dense matrix
 dense_summation_operation = {
     'sum' : """
@@ -483,23 +738,15 @@ if (_transmission && pop%(id_post)s._active){
     for(int _idx_j = 0; _idx_j < %(pre_array)s.size(); _idx_j++){
         // Rank of the presynaptic neuron
         int rk_j = %(pre_array)s[_idx_j];
-        // Find the presynaptic neuron in the inverse connectivity matrix
-        auto inv_post_ptr = inv_pre_rank.find(rk_j);
-        if (inv_post_ptr == inv_pre_rank.end())
-            continue;
-        // List of postsynaptic neurons receiving spikes from that neuron
-        std::vector< std::pair<int, int> >& inv_post = inv_post_ptr->second;
-        // Number of post neurons
-        int nb_post = inv_post.size();
 
 #ifdef _OPENMP
         int thr = omp_get_thread_num();
 #endif
-        // Iterate over connected post neurons
-        for(int _idx_i = 0; _idx_i < nb_post; _idx_i++){
+        // Iterate over connected post neurons (contiguous range in the inverse connectivity)
+        for(int _idx_i = inv_pre_ptr[rk_j]; _idx_i < inv_pre_ptr[rk_j+1]; _idx_i++){
             // Retrieve the correct indices
-            int i = inv_post[_idx_i].first;
-            int j = inv_post[_idx_i].second;
+            int i = inv_idx[_idx_i].first;
+            int j = inv_idx[_idx_i].second;
 
             // Event-driven integration
             %(event_driven)s
@@ -566,51 +813,133 @@ if (_transmission && pop%(id_post)s._active){
 } // active
 """
 
-# Uses a ring buffer to process non-uniform delays in spiking networks
+# Non-uniform delays in spiking networks.
+#
+# The synapses of each presynaptic neuron are sorted by delay in the inverse
+# connectivity (inv_idx) and grouped into buckets of equal delay, each bucket
+# being sorted by post-synaptic index. A spike emits one event (rank, delay)
+# per bucket into a ring buffer of event queues. When the events arrive, each
+# thread processes the synapses of a contiguous range of post-synaptic
+# neurons, so neither atomics nor reductions are needed.
+spiking_variable_delay = {
+    'declare': """
+    // Synapses of the presynaptic neuron rk are grouped by delay: the buckets _pre_bucket_ptr[rk]:_pre_bucket_ptr[rk+1]
+    // have the delays _delay_bucket_d[b] and contain the synapses inv_idx[_delay_bucket_ptr[b]:_delay_bucket_ptr[b+1]]
+    std::vector< int > _pre_bucket_ptr ;
+    std::vector< int > _delay_bucket_ptr ;
+    std::vector< int > _delay_bucket_d ;
+    // Ring buffer of (presynaptic rank, delay) events, the queues keep their capacity
+    std::vector< std::vector< std::pair<int, int> > > _delayed_events ;""",
+    'init': """
+        _delayed_events = std::vector< std::vector< std::pair<int, int> > >(max_delay, std::vector< std::pair<int, int> >());
+""",
+    'init_inverse': """
+        // Sort the synapses of each presynaptic neuron by delay and group them into buckets
+        _pre_bucket_ptr = std::vector< int >(pop%(id_pre)s.size + 1, 0);
+        _delay_bucket_ptr.clear();
+        _delay_bucket_d.clear();
+        for(int rk=0; rk<pop%(id_pre)s.size; rk++){
+            // stable: the synapses of a bucket remain sorted by post-synaptic index
+            std::stable_sort(inv_idx.begin() + inv_pre_ptr[rk], inv_idx.begin() + inv_pre_ptr[rk+1],
+                [this](const std::pair<int, int>& a, const std::pair<int, int>& b){
+                    return delay[a.first][a.second] < delay[b.first][b.second];
+                });
+            for(int _x=inv_pre_ptr[rk]; _x<inv_pre_ptr[rk+1]; _x++){
+                int d = delay[inv_idx[_x].first][inv_idx[_x].second];
+                if(_x == inv_pre_ptr[rk] || d != _delay_bucket_d.back()){
+                    _delay_bucket_ptr.push_back(_x);
+                    _delay_bucket_d.push_back(d);
+                }
+            }
+            _pre_bucket_ptr[rk+1] = _delay_bucket_d.size();
+        }
+        _delay_bucket_ptr.push_back(inv_idx.size());
+""",
+    'update_max_delay': """
+        // No need to do anything if the new max delay is smaller than the old one
+        if(d <= max_delay)
+            return;
+
+        // Update delays
+        int prev_max = max_delay;
+        max_delay = d;
+        int add_steps = d - prev_max;
+
+        // Insert as many empty queues as needed at the current pointer position
+        _delayed_events.insert(_delayed_events.begin() + idx_delay, add_steps, std::vector< std::pair<int, int> >());
+
+        // The delay index has to be updated
+        idx_delay = (idx_delay + add_steps) % max_delay;
+"""
+}
+
 spiking_summation_variable_delay = """
 // Event-based summation
 if (_transmission && pop%(id_post)s._active){
 
-    // Iterate over the spikes emitted during the last step in the pre population
+    // Enqueue the spikes emitted during the last step: one event per distinct delay
     for(int idx_spike=0; idx_spike<pop%(id_pre)s.spiked.size(); idx_spike++){
-
-        // Get the rank of the pre-synaptic neuron which spiked
         int rk_pre = pop%(id_pre)s.spiked[idx_spike];
-        // List of post neurons receiving connections
-        std::vector< std::pair<int, int> > rks_post = inv_pre_rank[rk_pre];
-
-        // Iterate over the post neurons
-        for(int x=0; x<rks_post.size(); x++){
-            // Index of the post neuron in the connectivity matrix
-            int i = rks_post[x].first ;
-            // Index of the pre neuron in the connecivity matrix
-            int j = rks_post[x].second ;
-            // Delay of that connection
-            int d = delay[i][j]-1;
-            // Index in the ring buffer
-            int modulo_delay = (idx_delay + d) %% max_delay;
-            // Add the spike in the ring buffer
-            _delayed_spikes[modulo_delay][i].push_back(j);
+        for(int b=_pre_bucket_ptr[rk_pre]; b<_pre_bucket_ptr[rk_pre+1]; b++){
+            int d = _delay_bucket_d[b];
+            _delayed_events[(idx_delay + d - 1) %% max_delay].push_back(std::pair<int, int>(rk_pre, d));
         }
     }
 
-    // Iterate over all post neurons having received spikes in the previous steps
-    for (int i=0; i<_delayed_spikes[idx_delay].size(); i++){
-        for (int _idx_j=0; _idx_j<_delayed_spikes[idx_delay][i].size(); _idx_j++){
-            // Pre-synaptic index in the connectivity matrix
-            int j = _delayed_spikes[idx_delay][i][_idx_j];
+    // Events arriving at this step
+    std::vector< std::pair<int, int> >& _events = _delayed_events[idx_delay];
 
-            // Event-driven integration
-            %(event_driven)s
-            // Update conductance
-            %(g_target)s
-            // Synaptic plasticity: pre-events
-            %(pre_event)s
+    %(omp_code)s
+    {
+    #ifdef _OPENMP
+        int _nb_threads = omp_get_num_threads();
+        int _tid = omp_get_thread_num();
+    #else
+        int _nb_threads = 1;
+        int _tid = 0;
+    #endif
+        // Each thread processes a contiguous range of post-synaptic neurons
+        int _i_begin = (long int)(post_rank.size()) * _tid / _nb_threads;
+        int _i_end = (long int)(post_rank.size()) * (_tid + 1) / _nb_threads;
+
+        for(int _idx_ev=0; _idx_ev<_events.size(); _idx_ev++){
+            int rk_pre = _events[_idx_ev].first;
+
+            // Bucket of the synapses having that delay
+            int b = _pre_bucket_ptr[rk_pre];
+            while(b < _pre_bucket_ptr[rk_pre+1] && _delay_bucket_d[b] != _events[_idx_ev].second)
+                b++;
+            if(b == _pre_bucket_ptr[rk_pre+1]) // the synapses were removed in the meantime
+                continue;
+
+            // Synapses of the bucket targeting the post-synaptic neurons of this thread
+            int _x_begin = _delay_bucket_ptr[b];
+            int _x_end = _delay_bucket_ptr[b+1];
+            if(_nb_threads > 1){
+                auto _cmp = [](const std::pair<int, int>& a, int i){ return a.first < i; };
+                _x_begin = std::lower_bound(inv_idx.begin() + _x_begin, inv_idx.begin() + _x_end, _i_begin, _cmp) - inv_idx.begin();
+                _x_end = std::lower_bound(inv_idx.begin() + _x_begin, inv_idx.begin() + _x_end, _i_end, _cmp) - inv_idx.begin();
+            }
+
+            for(int _x=_x_begin; _x<_x_end; _x++){
+                // Index of the post neuron in the connectivity matrix
+                int i = inv_idx[_x].first ;
+                // Index of the pre neuron in the connecivity matrix
+                int j = inv_idx[_x].second ;
+
+                // Event-driven integration
+                %(event_driven)s
+                // Update conductance
+                %(g_target)s
+                // Synaptic plasticity: pre-events
+                %(pre_event)s
+            }
         }
-        // Empty the current list of the ring buffer
-        _delayed_spikes[idx_delay][i].clear();
     }
 
+    // Empty the current queue of the ring buffer
+    _events.clear();
+
     // Increment the index of the ring buffer
     idx_delay = (idx_delay + 1) %% max_delay;
 
@@ -644,8 +973,10 @@ if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%
     // Global variables
     %(global)s
     // Local variables
+    check_thread_partition(%(thread_blocks)s);
     %(omp_code)s
-    for(int i = 0; i < post_rank.size(); i++){
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
         rk_post = post_rank[i]; // Get postsynaptic rank
         // Semi-global variables
         %(semiglobal)s
@@ -663,8 +994,10 @@ if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%
     // Global variables
     %(global)s
     // Local variables
+    check_thread_partition(%(thread_blocks)s);
     %(omp_code)s
-    for(int i = 0; i < post_rank.size(); i++){
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
         rk_post = post_rank[i]; // Get postsynaptic rank
     %(semiglobal)s
     }
@@ -676,8 +1009,10 @@ csr_update_variables = {
     'local': """
 if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%%_update_period == 0L) ){
     %(global)s
+    check_thread_partition(%(thread_blocks)s);
     %(omp_code)s
-    for(int i = 0; i < post_ranks.size(); i++){
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
         rk_post = post_ranks[i];
     %(semiglobal)s
         for(int j = _row_ptr[rk_post]; j < _row_ptr[rk_post+1]; j++){
@@ -690,8 +1025,10 @@ if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%
     'global': """
 if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%%_update_period == 0L)){
     %(global)s
+    check_thread_partition(%(thread_blocks)s);
     %(omp_code)s
-    for(int i = 0; i < post_ranks.size(); i++){
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int i = _thread_rows[_b]; i < _thread_rows[_b+1]; i++){
         rk_post = post_ranks[i];
     %(semiglobal)s
     }
@@ -699,6 +1036,58 @@ if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%
 """
 }
 
+sell_update_variables = {
+    'local': """
+// Check periodicity
+if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%%_update_period == 0L) ){
+    // Global variables
+    %(global)s
+    // Local variables
+    check_thread_partition(%(thread_blocks)s);
+    %(omp_code)s
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++){
+        // Semi-global variables
+        for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++){
+            const int i = _row_perm[_c * _chunk_size + _r];
+            rk_post = post_rank[i]; // Get postsynaptic rank
+    %(semiglobal)s
+        }
+        // Local variables, column-major inside the chunk
+        for(int j = 0; j < _chunk_width[_c]; j++){
+            for(int _r = 0; _r < _chunk_size; _r++){
+                const int _row = _c * _chunk_size + _r;
+                if(j >= _row_length[_row]) continue;
+                const int i = _row_perm[_row];
+                const long _k = _chunk_ptr[_c] + (long)j * _chunk_size + _r;
+                rk_post = post_rank[i]; // Get postsynaptic rank
+                rk_pre = _col_idx[_k]; // Get presynaptic rank
+    %(local)s
+            }
+        }
+    }
+}
+""",
+    'global': """
+// Check periodicity
+if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%%_update_period == 0L)){
+    // Global variables
+    %(global)s
+    // Semi-global variables
+    check_thread_partition(%(thread_blocks)s);
+    %(omp_code)s
+    for(int _b = 0; _b < %(thread_blocks)s; _b++)
+    for(int _c = _thread_rows[_b]; _c < _thread_rows[_b+1]; _c++){
+        for(int _r = 0; _r < _chunk_size && _c * _chunk_size + _r < post_rank.size(); _r++){
+            const int i = _row_perm[_c * _chunk_size + _r];
+            rk_post = post_rank[i]; // Get postsynaptic rank
+    %(semiglobal)s
+        }
+    }
+}
+"""
+}
+
 dense_update_variables = {
     'local': """
 // Check periodicity
@@ -735,5 +1124,6 @@ if(_transmission && _update && pop%(id_post)s._active && ( (t - _update_offset)%
 
 openmp_templates = {
     'projection_header': projection_header,
+    'projection_body': projection_body,
     'rng': cpp_11_rng
 }
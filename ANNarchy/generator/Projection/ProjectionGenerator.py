@@ -156,8 +156,10 @@ class ProjectionGenerator(object):
                     'template': rd['template'] % {'float_prec':Global.config['precision']}
                 }
 
-        # Structural plasticity
-        if Global.config['structural_plasticity']:
+        # Structural plasticity (the sell format and the specific projections
+        # defining their own connectivity can not add or remove synapses)
+        if Global.config['structural_plasticity'] and proj._storage_format != "sell" and \
+           not 'declare_connectivity_matrix' in proj._specific_template.keys():
             declare_parameters_variables += self._header_structural_plasticity(proj)
 
         # Specific projections can overwrite
@@ -342,8 +344,8 @@ class ProjectionGenerator(object):
                     code += """size_in_bytes += sizeof(%(ctype)s) * %(name)s.capacity();\t// %(name)s
 for(auto it = %(name)s.begin(); it != %(name)s.end(); it++)
     size_in_bytes += (it->capacity()) * sizeof(%(ctype)s);\n""" % ids
-                elif proj._storage_format == "csr":
-                    code += """size_in_bytes += sizeof(%(ctype)s) * %(name)s.capacity();\t// %(name)s""" % ids
+                elif proj._storage_format in ["csr", "sell"]:
+                    code += """size_in_bytes += sizeof(%(ctype)s) * %(name)s.capacity();\t// %(name)s\n""" % ids
                 else:
                     # TODO: sanity check???
                     pass
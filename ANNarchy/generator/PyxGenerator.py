@@ -31,7 +31,7 @@ from ANNarchy.generator.Population import CUDATemplates as cuda_templates
 
 from ANNarchy.generator.Projection import OpenMPTemplates as proj_omp_templates
 
-from ANNarchy.generator.Projection.Connectivity import LIL_OpenMP, CSR_OpenMP
+from ANNarchy.generator.Projection.Connectivity import LIL_OpenMP, CSR_OpenMP, SELL_OpenMP
 from ANNarchy.generator.Projection.Connectivity import LIL_CUDA, CSR_CUDA
 
 class PyxGenerator(object):
@@ -174,6 +174,8 @@ class PyxGenerator(object):
                 return LIL_OpenMP.conn_templates
             elif proj._storage_format == "csr":
                 return CSR_OpenMP.conn_templates
+            elif proj._storage_format == "sell":
+                return SELL_OpenMP.conn_templates
             else:
                 raise NotImplementedError
 
@@ -521,6 +523,13 @@ def _set_%(name)s(%(float_prec)s value):
                 continue
             export_parameters_variables += PyxTemplate.attribute_cpp_export[var['locality']] % {'type' : var['ctype'], 'name': var['name'], 'attr_type': 'variable'}
 
+        # Bulk export/import of local attributes
+        if 'attribute_export' in template_dict.keys():
+            for var in proj.synapse_type.description['parameters'] + proj.synapse_type.description['variables']:
+                if var['name'] == 'w' or var['locality'] != 'local':
+                    continue
+                export_parameters_variables += template_dict['attribute_export']['pyx_struct'] % {'type' : var['ctype'], 'name': var['name']}
+
         # Local functions
         export_functions = ""
         if len(proj.synapse_type.description['functions']) > 0:
@@ -537,7 +546,8 @@ def _set_%(name)s(%(float_prec)s value):
 
         # Structural plasticity
         structural_plasticity = ""
-        if Global.config['structural_plasticity']:
+        if Global.config['structural_plasticity'] and proj._storage_format != "sell" and \
+           not 'declare_connectivity_matrix' in proj._specific_template.keys():
             # Pruning in the synapse
             if 'pruning' in proj.synapse_type.description.keys():
                 structural_plasticity += sp_tpl['pruning']
@@ -673,6 +683,14 @@ def _set_%(name)s(%(float_prec)s value):
                 continue
             wrapper_access_parameters_variables += pyx_acc_tpl[var['locality']] % {'id' : proj.id, 'name': var['name'], 'type': var['ctype'], 'attr_type': 'variable'}
 
+        # Bulk export/import of local attributes
+        if 'attribute_export' in template_dict.keys():
+            dtypes = {'double': 'np.float64', 'float': 'np.float32', 'int': 'np.int32', 'bool': 'np.bool_'}
+            for var in proj.synapse_type.description['parameters'] + proj.synapse_type.description['variables']:
+                if var['name'] == 'w' or var['locality'] != 'local':
+                    continue
+                wrapper_access_parameters_variables += template_dict['attribute_export']['pyx_wrapper'] % {'id' : proj.id, 'name': var['name'], 'type': var['ctype'], 'dtype': dtypes[var['ctype']]}
+
         # Local functions
         wrapper_access_functions = ""
         if len(proj.synapse_type.description['functions']) > 0:
@@ -702,7 +720,8 @@ def _set_%(name)s(%(float_prec)s value):
 
         # Structural plasticity (TODO: not templated yet)
         structural_plasticity = ""
-        if Global.config['structural_plasticity']:
+        if Global.config['structural_plasticity'] and proj._storage_format != "sell" and \
+           not 'declare_connectivity_matrix' in proj._specific_template.keys():
             # Pruning in the synapse
             if 'pruning' in proj.synapse_type.description.keys():
                 structural_plasticity += sp_tpl['pruning'] % {'id' : proj.id}
@@ -775,7 +794,12 @@ def _set_%(name)s(%(float_prec)s value):
                 continue
             attributes.append(var['name'])
 
-            if var['name'] in pop.neuron_type.description['local']:
+            if Global.config['paradigm'] == "openmp":
+                tpl_code += """
+        RecordBuffer[%(type)s] %(name)s
+        bool record_%(name)s
+""" % {'name': var['name'], 'type': var['ctype']}
+            elif var['name'] in pop.neuron_type.description['local']:
                 tpl_code += """
         vector[vector[%(type)s]] %(name)s
         bool record_%(name)s
@@ -786,7 +810,13 @@ def _set_%(name)s(%(float_prec)s value):
         bool record_%(name)s
 """ % {'name': var['name'], 'type': var['ctype']}
 
-        if pop.neuron_type.type == 'spike':
+        if pop.neuron_type.type == 'spike' and Global.config['paradigm'] == "openmp":
+            tpl_code += """
+        map[int, vector[long]] get_spike()
+        bool record_spike
+        void clear_spike()
+"""
+        elif pop.neuron_type.type == 'spike':
             tpl_code += """
         map[int, vector[long]] spike
         bool record_spike
@@ -798,7 +828,13 @@ def _set_%(name)s(%(float_prec)s value):
             tpl_code += """
         # Targets"""
             for target in sorted(list(set(pop.neuron_type.description['targets'] + pop.targets))):
-                tpl_code += """
+                if Global.config['paradigm'] == "openmp":
+                    tpl_code += """
+        RecordBuffer[%(float_prec)s] _sum_%(target)s
+        bool record__sum_%(target)s
+""" % {'target': target, 'float_prec': Global.config['precision']}
+                else:
+                    tpl_code += """
         vector[vector[%(float_prec)s]] _sum_%(target)s
         bool record__sum_%(target)s
 """ % {'target': target, 'float_prec': Global.config['precision']}
@@ -825,6 +861,12 @@ cdef class PopRecorder%(id)s_wrapper(Monitor_wrapper):
             if var['name'] in attributes:
                 continue
             attributes.append(var['name'])
+
+            if Global.config['paradigm'] == "openmp":
+                ndim = 2 if var['name'] in pop.neuron_type.description['local'] else 1
+                tpl_code += PyxGenerator._pop_monitor_buffer(pop.id, var['name'], var['ctype'], ndim)
+                continue
+
             tpl_code += """
     property %(name)s:
         def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).%(name)s
@@ -836,7 +878,17 @@ cdef class PopRecorder%(id)s_wrapper(Monitor_wrapper):
         (<PopRecorder%(id)s *>self.thisptr).%(name)s.clear()
 """ % {'id' : pop.id, 'name': var['name']}
 
-        if pop.neuron_type.type == 'spike':
+        if pop.neuron_type.type == 'spike' and Global.config['paradigm'] == "openmp":
+            tpl_code += """
+    property spike:
+        def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).get_spike()
+    property record_spike:
+        def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).record_spike
+        def __set__(self, val): (<PopRecorder%(id)s *>self.thisptr).record_spike = val
+    def clear_spike(self):
+        (<PopRecorder%(id)s *>self.thisptr).clear_spike()
+""" % {'id' : pop.id}
+        elif pop.neuron_type.type == 'spike':
             tpl_code += """
     property spike:
         def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).spike
@@ -853,6 +905,10 @@ cdef class PopRecorder%(id)s_wrapper(Monitor_wrapper):
             tpl_code += """
     # Targets"""
             for target in sorted(list(set(pop.neuron_type.description['targets'] + pop.targets))):
+                if Global.config['paradigm'] == "openmp":
+                    tpl_code += PyxGenerator._pop_monitor_buffer(pop.id, '_sum_'+target, Global.config['precision'], 2)
+                    continue
+
                 tpl_code += """
     property %(name)s:
         def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).%(name)s
@@ -866,6 +922,39 @@ cdef class PopRecorder%(id)s_wrapper(Monitor_wrapper):
 
         return tpl_code % {'id' : pop.id, 'name': pop.name}
 
+    @staticmethod
+    def _pop_monitor_buffer(pop_id, name, ctype, ndim):
+        """
+        Generate the wrapper of a variable recorded in a RecordBuffer (openMP).
+
+        ``get_<name>(keep)`` returns the recorded data as a NumPy array of
+        ``ndim`` dimensions (time x recorded neurons for local variables). If
+        ``keep`` is False, the array takes over the memory of the buffer, which
+        is then empty. Otherwise, the data is copied once.
+        """
+        typenum = {
+            'double': 'np.NPY_DOUBLE',
+            'float': 'np.NPY_FLOAT',
+            'int': 'np.NPY_INT',
+            'bool': 'np.NPY_BOOL'
+        }[ctype]
+
+        return """
+    property %(name)s:
+        def __get__(self): return self.get_%(name)s(True)
+    property record_%(name)s:
+        def __get__(self): return (<PopRecorder%(id)s *>self.thisptr).record_%(name)s
+        def __set__(self, val): (<PopRecorder%(id)s *>self.thisptr).record_%(name)s = val
+    def get_%(name)s(self, bool keep):
+        cdef RecordBuffer[%(type)s]* data = &(<PopRecorder%(id)s *>self.thisptr).%(name)s
+        cdef long rows = data.rows()
+        if keep:
+            return _recorded_array(data.data(), rows, data.cols(), %(ndim)s, %(typenum)s, False)
+        return _recorded_array(data.release(), rows, data.cols(), %(ndim)s, %(typenum)s, True)
+    def clear_%(name)s(self):
+        (<PopRecorder%(id)s *>self.thisptr).%(name)s.clear()
+""" % {'id': pop_id, 'name': name, 'type': ctype, 'ndim': ndim, 'typenum': typenum}
+
     @staticmethod
     def _proj_monitor_struct(proj):
         """
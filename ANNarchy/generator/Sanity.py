@@ -61,8 +61,37 @@ def check_structure(populations, projections):
     # Check locality of variable is respected
     _check_locality(populations, projections)
 
+    # Check that the storage formats support the projections
+    _check_storage_formats(projections)
 
 
+def check_ensemble(populations, projections):
+    """
+    Checks that the network can be simulated in ensemble mode, i.e. that all instances stay independent. Must be called after the code generation, which collects the global operations.
+    """
+    if not Global._check_paradigm("openmp"):
+        Global._error('compile(): the ensemble mode is only available with the openMP backend.')
+
+    for pop in populations:
+        if pop._specific_template:
+            Global._error('compile(): the population', pop.name, 'of type', type(pop).__name__, 'can not be used in ensemble mode.')
+        for var in pop.neuron_type.description['variables']:
+            if var['locality'] == 'global':
+                Global._error('compile(): the population-wise variable', var['name'], 'of the population', pop.name, 'would be shared by all instances, it can not be used in ensemble mode.')
+        if len(pop.global_operations) > 0:
+            Global._error('compile(): global operations (min, max, mean...) on the population', pop.name, 'would be computed over all instances, they can not be used in ensemble mode.')
+
+    for proj in projections:
+        if proj._specific_template:
+            Global._error('compile(): the projection', proj.name, 'of type', type(proj).__name__, 'can not be used in ensemble mode.')
+        for var in proj.synapse_type.description['variables']:
+            if var['locality'] == 'global':
+                Global._error('compile(): the projection-wise variable', var['name'], 'of the projection', proj.name, 'would be shared by all instances, it can not be used in ensemble mode.')
+        if 'creating' in proj.synapse_type.description or 'pruning' in proj.synapse_type.description:
+            Global._error('compile(): the creating and pruning conditions of the projection', proj.name, 'can not be used in ensemble mode.')
+        if proj._dense_matrix or proj._storage_format != "lil" or proj._storage_order != "post_to_pre":
+            Global._error('compile(): the projection', proj.name, 'must use the default sparse storage format (lil, post_to_pre) in ensemble mode.')
+
 
 def _check_reserved_names(populations, projections):
     """
@@ -153,6 +182,26 @@ def _check_locality(populations, projections):
                     Global._error('The postsynaptic variable', var['name'], 'cannot depend on pre-synaptic ones (e.g. pre.r).')
 
 
+def _check_storage_formats(projections):
+    """
+    Checks that the projections using the sliced ELLPACK format (sell) only use the supported features.
+    """
+    for proj in projections:
+        if proj._storage_format != "sell":
+            continue
+
+        if not Global._check_paradigm("openmp"):
+            Global._error('The projection', proj.name, 'uses the sell storage format, which is only available with the openMP backend.')
+        if proj.synapse_type.type == "spike":
+            Global._error('The projection', proj.name, 'uses the sell storage format, which is only available for rate-coded synapses.')
+        if proj.max_delay > 1 and proj.uniform_delay == -1:
+            Global._error('The projection', proj.name, 'uses the sell storage format, which does not support non-uniform delays.')
+        if 'pruning' in proj.synapse_type.description.keys() or 'creating' in proj.synapse_type.description.keys():
+            Global._error('The projection', proj.name, 'uses the sell storage format, which does not support structural plasticity.')
+        if len(proj.synapse_type.description['random_distributions']) > 0:
+            Global._error('The projection', proj.name, 'uses the sell storage format, which does not support random distributions in the synapse.')
+
+
 def _get_locality(name, description):
     "Returns the locality of an attribute based on its name"
     for var in description['variables'] + description['parameters']:
@@ -14,8 +14,120 @@ omp_header_template = """#pragma once
 #include <string.h>
 #include <cmath>
 #include <random>
+#include <cstdint>
 %(include_omp)s
 
+/*
+ * Fixed-capacity circular buffer storing the last values of a delayed variable:
+ * element 0 is the most recent value, element d the value d steps before.
+ * push() overwrites the oldest element in place, so no allocation takes place
+ * during the simulation and the delayed values can be accessed by reference.
+ *
+ */
+template<typename T>
+class DelayBuffer {
+public:
+    DelayBuffer() : _head(0) {}
+    DelayBuffer(int size, const T& value) : _data(size, value), _head(0) {}
+
+    // Value delayed by d steps
+    inline T& operator[](int d) {
+        int idx = _head + d;
+        return _data[ idx < _data.size() ? idx : idx - _data.size() ];
+    }
+    inline const T& operator[](int d) const {
+        int idx = _head + d;
+        return _data[ idx < _data.size() ? idx : idx - _data.size() ];
+    }
+
+    int size() const { return _data.size(); }
+
+    // The oldest element becomes the most recent one
+    inline void push(const T& value) {
+        if ( _data.empty() )
+            return;
+        _head = ( _head == 0 ? _data.size() : _head ) - 1;
+        _data[_head] = value;
+    }
+
+    // Changes the capacity, the new (oldest) elements are set to value
+    void resize(int size, const T& value) {
+        std::vector<T> data;
+        data.reserve(size);
+        for ( int d = 0; d < std::min(size, this->size()); d++ )
+            data.push_back( (*this)[d] );
+        data.resize(size, value);
+        _data.swap(data);
+        _head = 0;
+    }
+
+    void clear() {
+        _data.clear();
+        _head = 0;
+    }
+
+private:
+    std::vector<T> _data;
+    int _head;
+};
+
+/*
+ * Counter-based random number generator (Philox4x32-10, Salmon et al. 2011).
+ *
+ * A stream is identified by a key (seed and object) and a counter (element
+ * and time step), so the numbers drawn for a neuron or a synapse do not depend
+ * on the order in which the elements are updated: they can be drawn in
+ * parallel and are identical for any number of threads.
+ *
+ */
+class PhiloxStream {
+public:
+    typedef uint32_t result_type;
+
+    PhiloxStream(long int seed, uint32_t object, uint32_t c0, uint32_t c1, long int step) : _idx(4) {
+        _key[0] = (uint32_t)seed;
+        _key[1] = (uint32_t)(seed >> 32) ^ object;
+        _ctr[0] = c0;
+        _ctr[1] = c1;
+        _ctr[2] = (uint32_t)step;
+        _ctr[3] = (uint32_t)(step >> 32) << 16; // the lower 16 bits count the blocks of the stream
+    }
+
+    static constexpr result_type min() { return 0; }
+    static constexpr result_type max() { return 0xFFFFFFFF; }
+
+    inline result_type operator()() {
+        if ( _idx == 4 ) {
+            _generate();
+            _ctr[3]++;
+            _idx = 0;
+        }
+        return _out[_idx++];
+    }
+
+private:
+    inline void _generate() {
+        uint32_t c0 = _ctr[0], c1 = _ctr[1], c2 = _ctr[2], c3 = _ctr[3];
+        uint32_t k0 = _key[0], k1 = _key[1];
+        for ( int round = 0; round < 10; round++ ) {
+            uint64_t p0 = (uint64_t)0xD2511F53 * c0;
+            uint64_t p1 = (uint64_t)0xCD9E8D57 * c2;
+            c0 = (uint32_t)(p1 >> 32) ^ c1 ^ k0;
+            c1 = (uint32_t)p1;
+            c2 = (uint32_t)(p0 >> 32) ^ c3 ^ k1;
+            c3 = (uint32_t)p0;
+            k0 += 0x9E3779B9;
+            k1 += 0xBB67AE85;
+        }
+        _out[0] = c0; _out[1] = c1; _out[2] = c2; _out[3] = c3;
+    }
+
+    uint32_t _key[2];
+    uint32_t _ctr[4];
+    uint32_t _out[4];
+    int _idx;
+};
+
 /*
  * Built-in functions
  *
@@ -53,6 +165,7 @@ omp_header_template = """#pragma once
 extern %(float_prec)s dt;
 extern long int t;
 extern std::mt19937  rng;
+extern long int rng_seed;
 
 
 /*
@@ -126,6 +239,7 @@ omp_body_template = """
 %(float_prec)s dt;
 long int t;
 std::mt19937  rng;
+long int rng_seed;
 
 // Custom constants
 %(custom_constant)s
@@ -188,11 +302,12 @@ void initialize(%(float_prec)s _dt, long int seed) {
 // Change the seed of the RNG
 void setSeed(long int seed){
     if(seed==-1){
-        rng = std::mt19937(time(NULL));
+        rng_seed = time(NULL);
     }
     else{
-        rng = std::mt19937(seed);
+        rng_seed = seed;
     }
+    rng = std::mt19937(rng_seed);
 }
 
 // Step method. Generated by ANNarchy.
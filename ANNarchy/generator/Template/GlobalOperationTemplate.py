@@ -1,73 +1,57 @@
+# Fused computation of all global operations on the same variable
+# (OpenMP): the array is read only once, in a single (parallel) loop.
+#
+# Each operation defines:
+#
+#    init: declaration of its accumulator
+#    clause: OpenMP reduction clause of the accumulator
+#    update: accumulation of the element i
+#    result: final value of the global operation
+#
+# Parameters:
+#
+#    type: floating point precision
+#    var: name of the variable
 global_operation_templates_openmp = {
-    'max' : """
-// Computes the maximum value of an array
-%(type)s max_value(const %(type)s* array, int n)
-{
-    %(type)s max = array[0];
-    for(int i=0; i<n; i++)
-    {
-        if(array[i] > max)
-            max = array[i];
-    }
-
-    return max;
-}
-    """,
-    'min' : """
-// Computes the minimum value of an array
-%(type)s min_value(const %(type)s* array, int n)
-{
-    %(type)s min = array[0];
-    for(int i=0; i<n; i++)
-    {
-        if(array[i] < min)
-            min = array[i];
-    }
-
-    return min;
-}
-    """,
-    'mean' : """
-// Computes the mean value of an array
-%(type)s mean_value(const %(type)s* array, int n)
-{
-    %(type)s sum = 0.0;
-    %(omp)s#pragma omp parallel for reduction(+:sum)
-    for(int i=0; i<n; i++)
-    {
-        sum += array[i];
-    }
-    return sum/(%(type)s)n;
-}
-    """,
-    'norm1' : """
-// Computes the L1-norm of an array
-%(type)s norm1_value(const %(type)s* array, int n)
-{
-    %(type)s sum = 0.0;
-    %(omp)s#pragma omp parallel for reduction(+:sum)
-    for(int i=0; i<n; i++)
-    {
-        sum += fabs(array[i]);
-    }
-
-    return sum;
-}
-    """,
-    'norm2' : """
-// Computes the L2-norm (Euclidian) of an array
-%(type)s norm2_value(const %(type)s* array, int n)
-{
-    %(type)s sum = 0.0;
-    %(omp)s#pragma omp parallel for reduction(+:sum)
-    for(int i=0; i<n; i++)
-    {
-        sum += pow(array[i], 2.0);
-    }
-
-    return sqrt(sum);
-}
-    """
+    'max': {
+        'init': "%(type)s _%(var)s_max = %(var)s[0];",
+        'clause': "reduction(max: _%(var)s_max)",
+        'update': "if (%(var)s[i] > _%(var)s_max) _%(var)s_max = %(var)s[i];",
+        'result': "_max_%(var)s = _%(var)s_max;"
+    },
+    'min': {
+        'init': "%(type)s _%(var)s_min = %(var)s[0];",
+        'clause': "reduction(min: _%(var)s_min)",
+        'update': "if (%(var)s[i] < _%(var)s_min) _%(var)s_min = %(var)s[i];",
+        'result': "_min_%(var)s = _%(var)s_min;"
+    },
+    'mean': {
+        'init': "%(type)s _%(var)s_sum = 0.0;",
+        'clause': "reduction(+: _%(var)s_sum)",
+        'update': "_%(var)s_sum += %(var)s[i];",
+        'result': "_mean_%(var)s = _%(var)s_sum / (%(type)s)size;"
+    },
+    'norm1': {
+        'init': "%(type)s _%(var)s_norm1 = 0.0;",
+        'clause': "reduction(+: _%(var)s_norm1)",
+        'update': "_%(var)s_norm1 += fabs(%(var)s[i]);",
+        'result': "_norm1_%(var)s = _%(var)s_norm1;"
+    },
+    'norm2': {
+        'init': "%(type)s _%(var)s_norm2 = 0.0;",
+        'clause': "reduction(+: _%(var)s_norm2)",
+        'update': "_%(var)s_norm2 += %(var)s[i] * %(var)s[i];",
+        'result': "_norm2_%(var)s = sqrt(_%(var)s_norm2);"
+    },
+    'body': """
+        // Global operations on %(var)s: %(ops)s
+%(init)s
+        %(omp)s#pragma omp parallel for %(clauses)s
+        for (int i = 0; i < size; i++) {
+%(update)s
+        }
+%(result)s
+"""
 }
 
 global_operation_templates_extern = {
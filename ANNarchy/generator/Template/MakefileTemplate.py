@@ -1,18 +1,32 @@
 # Linux, Seq or OMP
+#
+# Each population, projection, the simulation core and the Cython wrapper
+# are compiled into separate object files. The dependencies on the headers
+# are tracked by the compiler (-MMD), so only the modified objects are rebuilt.
 linux_omp_template = """# Makefile generated by ANNarchy
-all:
+CXX = %(launcher)s%(compiler)s
+CXXFLAGS = %(cpu_flags)s -fPIC -fpermissive -std=c++11 %(openmp)s
+INCLUDES = %(python_include)s -I%(numpy_include)s -I%(cython_ext)s
+LIBS = %(python_lib)s %(python_libpath)s %(extra_libs)s
+
+OBJECTS = $(patsubst %%.cpp,%%.o,$(filter-out ANNarchyCore%(net_id)s.cpp,$(wildcard *.cpp))) ANNarchyCore%(net_id)s.o
+
+all: ../../ANNarchyCore%(net_id)s.so
+
+ANNarchyCore%(net_id)s.cpp: ANNarchyCore%(net_id)s.pyx
 \tcython%(cy_major)s -%(py_major)s ANNarchyCore%(net_id)s.pyx --cplus
-\t%(compiler)s %(cpu_flags)s -shared -fPIC -fpermissive -std=c++11 %(openmp)s \\
-        *.cpp -o ANNarchyCore%(net_id)s.so \\
-        %(python_include)s -I%(numpy_include)s \\
-        -I%(cython_ext)s \\
-        %(python_lib)s \\
-        %(python_libpath)s %(extra_libs)s
-\tmv ANNarchyCore%(net_id)s.so ../..
+
+%%.o: %%.cpp
+\t$(CXX) $(CXXFLAGS) $(INCLUDES) -MMD -MP -c $< -o $@
+
+../../ANNarchyCore%(net_id)s.so: $(OBJECTS)
+\t$(CXX) $(CXXFLAGS) -shared $(OBJECTS) -o $@ $(LIBS)
 
 clean:
-\trm -rf *.o
+\trm -rf *.o *.d
 \trm -rf *.so
+
+-include $(OBJECTS:.o=.d)
 """
 
 # Linux, CUDA
@@ -35,17 +49,27 @@ clean:
 
 # OSX, Seq only
 osx_seq_template = """# Makefile generated by ANNarchy
-all:
+CXX = %(launcher)s%(compiler)s
+CXXFLAGS = -stdlib=libc++ -std=c++11 -fPIC %(cpu_flags)s -fpermissive
+INCLUDES = %(python_include)s -I%(numpy_include)s -I%(cython_ext)s
+LIBS = %(python_lib)s %(python_libpath)s %(extra_libs)s
+
+OBJECTS = $(patsubst %%.cpp,%%.o,$(filter-out ANNarchyCore%(net_id)s.cpp,$(wildcard *.cpp))) ANNarchyCore%(net_id)s.o
+
+all: ../../ANNarchyCore%(net_id)s.so
+
+ANNarchyCore%(net_id)s.cpp: ANNarchyCore%(net_id)s.pyx
 \tcython%(cy_major)s -%(py_major)s ANNarchyCore%(net_id)s.pyx --cplus
-\t%(compiler)s -stdlib=libc++ -std=c++11 -fPIC -shared %(cpu_flags)s -fpermissive \\
-        *.cpp -o ANNarchyCore%(net_id)s.so \\
-        %(python_include)s -I%(numpy_include)s \\
-        -I%(cython_ext)s \\
-        %(python_lib)s \\
-        %(python_libpath)s  %(extra_libs)s
-\tmv ANNarchyCore%(net_id)s.so ../..
+
+%%.o: %%.cpp
+\t$(CXX) $(CXXFLAGS) $(INCLUDES) -MMD -MP -c $< -o $@
+
+../../ANNarchyCore%(net_id)s.so: $(OBJECTS)
+\t$(CXX) $(CXXFLAGS) -shared $(OBJECTS) -o $@ $(LIBS)
 
 clean:
-\trm -rf *.o
+\trm -rf *.o *.d
 \trm -rf *.so
+
+-include $(OBJECTS:.o=.d)
 """
@@ -22,6 +22,77 @@
 #
 #===============================================================================
 record_base_class = """
+/*
+ * Contiguous storage of recorded values: one row of cols() elements per
+ * recorded step, all rows being stored in a single malloc'ed array.
+ *
+ * The array can be handed over to Python without any conversion: release()
+ * returns the pointer (which must then be freed by the caller) and leaves an
+ * empty buffer with the same number of columns.
+ */
+template<typename T>
+class RecordBuffer
+{
+public:
+    RecordBuffer() : data_(nullptr), rows_(0), cols_(0), capacity_(0) {}
+    ~RecordBuffer() { free(data_); }
+
+    RecordBuffer(const RecordBuffer&) = delete;
+    RecordBuffer& operator=(const RecordBuffer&) = delete;
+
+    long int rows() const { return rows_; }
+    long int cols() const { return cols_; }
+    T* data() { return data_; }
+
+    // Number of allocated elements
+    long int capacity() const { return capacity_ * cols_; }
+
+    // Sets the number of elements per row, removes the recorded data
+    void set_cols(long int cols) {
+        clear();
+        cols_ = cols;
+    }
+
+    // Returns a pointer to a new row at the end of the buffer
+    T* append() {
+        if ( rows_ == capacity_ ) {
+            long int capacity = (capacity_ == 0) ? 64 : 2 * capacity_;
+            T* data = static_cast<T*>(realloc(data_, capacity * cols_ * sizeof(T)));
+            if ( data == nullptr ) {
+                std::cerr << "RecordBuffer: could not allocate memory for the recorded data." << std::endl;
+                exit(EXIT_FAILURE);
+            }
+            data_ = data;
+            capacity_ = capacity;
+        }
+        return data_ + (rows_++) * cols_;
+    }
+
+    // Appends a single value (cols() == 1)
+    void push_back(const T& value) {
+        *append() = value;
+    }
+
+    // Hands over the recorded data to the caller
+    T* release() {
+        T* data = data_;
+        data_ = nullptr;
+        rows_ = 0;
+        capacity_ = 0;
+        return data;
+    }
+
+    void clear() {
+        free(release());
+    }
+
+private:
+    T* data_;
+    long int rows_;
+    long int cols_;
+    long int capacity_;
+};
+
 /*
  * Recorders
  *
@@ -85,21 +156,20 @@ public:
     'local': {
     'struct': """
     // Local variable %(name)s
-    std::vector< std::vector< %(type)s > > %(name)s ;
+    RecordBuffer< %(type)s > %(name)s ;
     bool record_%(name)s ; """,
     'init': """
-        this->%(name)s = std::vector< std::vector< %(type)s > >();
+        this->%(name)s.set_cols(this->partial ? this->ranks.size() : pop%(id)s.size);
         this->record_%(name)s = false; """,
     'recording': """
         if(this->record_%(name)s && ( (t - this->offset_) %% this->period_ == this->period_offset_ )){
+            %(type)s* row = this->%(name)s.append();
             if(!this->partial)
-                this->%(name)s.push_back(pop%(id)s.%(name)s); 
+                std::copy(pop%(id)s.%(name)s.begin(), pop%(id)s.%(name)s.end(), row);
             else{
-                std::vector<%(type)s> tmp = std::vector<%(type)s>();
                 for(int i=0; i<this->ranks.size(); i++){
-                    tmp.push_back(pop%(id)s.%(name)s[this->ranks[i]]);
+                    row[i] = pop%(id)s.%(name)s[this->ranks[i]];
                 }
-                this->%(name)s.push_back(tmp);
             }
         }"""
     },
@@ -111,15 +181,57 @@ public:
     'global': {
         'struct': """
     // Global variable %(name)s
-    std::vector< %(type)s > %(name)s ;
+    RecordBuffer< %(type)s > %(name)s ;
     bool record_%(name)s ; """, 
         'init': """
-        this->%(name)s = std::vector< %(type)s >();
+        this->%(name)s.set_cols(1);
         this->record_%(name)s = false; """,
         'recording': """
         if(this->record_%(name)s && ( (t - this->offset_) %% this->period_ == 0 )){
             this->%(name)s.push_back(pop%(id)s.%(name)s); 
         } """    
+    },
+    'spike': {
+        'struct': """
+    // Local variable %(name)s: the events of the neuron of rank rk are stored in
+    // %(name)s_buffer[_%(name)s_slot[rk]], the slot being -1 if the neuron is not recorded
+    std::vector< std::vector< %(type)s > > %(name)s_buffer ;
+    std::vector< int > _%(name)s_slot ;
+    bool record_%(name)s ;
+    // Only the neurons which emitted events are returned
+    std::map<int, std::vector< %(type)s > > get_%(name)s() {
+        std::map<int, std::vector< %(type)s > > data;
+        for ( int rk = 0; rk < _%(name)s_slot.size(); rk++ ) {
+            if ( _%(name)s_slot[rk] >= 0 && !%(name)s_buffer[_%(name)s_slot[rk]].empty() )
+                data[rk] = %(name)s_buffer[_%(name)s_slot[rk]];
+        }
+        return data;
+    }
+    void clear_%(name)s() {
+        for ( auto it = %(name)s_buffer.begin(); it != %(name)s_buffer.end(); it++ ) {
+            it->clear();
+        }
+    }
+""",
+        'init': """
+        this->_%(name)s_slot = std::vector< int >(pop%(id)s.size, -1);
+        if(!this->partial){
+            for(int i=0; i<pop%(id)s.size; i++) {
+                this->_%(name)s_slot[i] = i;
+            }
+        }
+        else{
+            for(int i=0; i<this->ranks.size(); i++) {
+                this->_%(name)s_slot[this->ranks[i]] = i;
+            }
+        }
+        this->%(name)s_buffer = std::vector< std::vector< %(type)s > >(this->partial ? this->ranks.size() : pop%(id)s.size);
+        this->record_%(name)s = false; """,
+        'size_in_bytes': """
+size_in_bytes += sizeof(int) * _%(name)s_slot.capacity();	//%(name)s
+for(auto it = %(name)s_buffer.begin(); it != %(name)s_buffer.end(); it++)
+    size_in_bytes += sizeof(%(type)s) * it->capacity();
+"""
     }
 }
 
@@ -240,6 +352,18 @@ public:
             this->%(name)s.push_back(tmp);
             tmp.clear();
         }
+""",
+        # the sliced ELLPACK format stores the synapses of a dendrite interleaved with other dendrites
+        'recording_sell': """
+        if(this->record_%(name)s && ( (t - this->offset_) %% this->period_ == this->period_offset_ )){
+            std::vector< std::vector< %(type)s > > tmp;
+            for(int i=0; i<this->ranks.size(); i++){
+                auto dendrite = proj%(id)s.get_dendrite_%(name)s(this->ranks[i]);
+                tmp.push_back(std::vector< %(type)s >(dendrite.begin(), dendrite.end()));
+            }
+            this->%(name)s.push_back(tmp);
+            tmp.clear();
+        }
 """
     },
     'semiglobal': {
@@ -401,13 +525,9 @@ recording_spike_tpl= {
     'openmp' : """
         if(this->record_spike){
             for(int i=0; i<pop%(id)s.spiked.size(); i++){
-                if(!this->partial){
-                    this->spike[pop%(id)s.spiked[i]].push_back(t);
-                }
-                else{
-                    if( std::find(this->ranks.begin(), this->ranks.end(), pop%(id)s.spiked[i])!=this->ranks.end() ){
-                        this->spike[pop%(id)s.spiked[i]].push_back(t);
-                    }
+                int slot = this->_spike_slot[pop%(id)s.spiked[i]];
+                if( slot >= 0 ){
+                    this->spike_buffer[slot].push_back(t);
                 }
             }
         } """,
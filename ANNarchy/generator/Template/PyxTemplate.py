@@ -3,8 +3,10 @@ from cpython.exc cimport PyErr_CheckSignals
 from libcpp.vector cimport vector
 from libcpp.map cimport map, pair
 from libcpp cimport bool
+from libc.stdlib cimport free
 import numpy as np
 cimport numpy as np
+np.import_array()
 
 import ANNarchy
 from ANNarchy.core.cython_ext.Connector cimport LILConnectivity as LIL
@@ -23,6 +25,13 @@ cdef extern from "ANNarchy.h":
 %(proj_struct)s
 
     # Monitors
+    cdef cppclass RecordBuffer[T]:
+        long rows()
+        long cols()
+        T* data()
+        T* release()
+        void clear()
+
     cdef cppclass Monitor:
         vector[int] ranks
         int period_
@@ -41,8 +50,8 @@ cdef extern from "ANNarchy.h":
     void initialize(%(float_prec)s, long)
     void setSeed(long)
     void run(int nbSteps) nogil
-    int run_until(int steps, vector[int] populations, bool or_and)
-    void step()
+    int run_until(int steps, vector[int] populations, bool or_and) nogil
+    void step() nogil
 
     # Time
     long getTime()
@@ -60,6 +69,37 @@ cdef extern from "ANNarchy.h":
 # Projection wrappers
 %(proj_class)s
 
+# Recorded data
+cdef class _RecordedData:
+    """
+    Owner of the memory released by a RecordBuffer, freed with the NumPy array using it.
+    """
+    cdef void* ptr
+    def __dealloc__(self):
+        free(self.ptr)
+
+cdef object _recorded_array(void* data, long rows, long cols, int ndim, int typenum, bool owner):
+    """
+    Returns a NumPy array of shape (rows, cols) (or (rows,) if ndim is 1) using the recorded data. If owner is True, the array frees the memory when it is garbage collected, otherwise the data is copied.
+    """
+    cdef np.npy_intp dims[2]
+    cdef _RecordedData base
+    if rows == 0:
+        if owner:
+            free(data)
+        return np.array([])
+
+    dims[0] = rows
+    dims[1] = cols
+    array = np.PyArray_SimpleNewFromData(ndim, dims, typenum, data)
+    if not owner:
+        return array.copy()
+
+    base = _RecordedData()
+    base.ptr = data
+    np.set_array_base(array, base)
+    return array
+
 # Monitor wrappers
 cdef class Monitor_wrapper:
     cdef Monitor *thisptr
@@ -110,17 +150,21 @@ def pyx_run(int nb_steps):
                 run(batch)
             PyErr_CheckSignals()
         if rest > 0:
-            run(rest)
+            with nogil:
+                run(rest)
 
 # Simulation for the given number of steps except if a criterion is reached
 def pyx_run_until(int nb_steps, list populations, bool mode):
     cdef int nb
-    nb = run_until(nb_steps, populations, mode)
+    cdef vector[int] pops = populations
+    with nogil:
+        nb = run_until(nb_steps, pops, mode)
     return nb
 
 # Simulate for one step
 def pyx_step():
-    step()
+    with nogil:
+        step()
 
 # Access time
 def set_time(t):
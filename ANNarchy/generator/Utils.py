@@ -182,6 +182,23 @@ def generate_equation_code(pop_id, desc, locality='local', obj='pop', conductanc
 
     return padded_code
 
+def rng_key(obj):
+    """
+    Key of the counter-based random streams (PhiloxStream) of a population or a projection.
+
+    The key is the position of the object in its network (even for populations, odd for
+    projections), so that the random numbers do not depend on the objects created before
+    in other networks.
+    """
+    for network in Global._network:
+        for idx, pop in enumerate(network['populations']):
+            if pop is obj:
+                return 2 * idx
+        for idx, proj in enumerate(network['projections']):
+            if proj is obj:
+                return 2 * idx + 1
+    Global._error('The object ' + obj.name + ' does not belong to a network.')
+
 def indentLine(line, spaces=1):
     return (' ' * 4 * spaces) + line
 
@@ -0,0 +1,134 @@
+"""
+
+    test_Autotuner.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import json
+import shutil
+import tempfile
+import unittest
+import numpy
+
+from ANNarchy import Neuron, Population, Projection, Network
+from ANNarchy.core import Global, Simulate
+from ANNarchy.generator import Autotuner
+
+input_neuron = Neuron(
+    parameters = "baseline = 0.0",
+    equations = "r = baseline"
+)
+
+neuron = Neuron(
+    equations = "r = sum(exc)"
+)
+
+pop_in = Population(30, input_neuron)
+pop_out = Population(20, neuron)
+pop_one = Population(30, neuron)
+
+proj = Projection(pop_in, pop_out, "exc")
+proj.connect_all_to_all(weights=0.5, force_multiple_weights=True)
+
+proj_one = Projection(pop_in, pop_one, "exc")
+proj_one.connect_one_to_one(weights=1.0)
+
+class test_Autotuner(unittest.TestCase):
+    """
+    Tests the automatic selection of the storage format of projections.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test with an empty tuning cache.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.prev_cache_dir = Global.config['cache_dir']
+        Global.config['cache_dir'] = self.tmp
+
+        self.test_net = Network()
+        self.test_net.add([pop_in, pop_out, pop_one, proj, proj_one])
+        self.nb_networks = len(Global._network)
+        self.test_net.compile(silent=True, autotune=True)
+
+        self.pop_in = self.test_net.get(pop_in)
+        self.pop_out = self.test_net.get(pop_out)
+        self.proj = self.test_net.get(proj)
+
+    @classmethod
+    def tearDownClass(self):
+        Global.config['cache_dir'] = self.prev_cache_dir
+        shutil.rmtree(self.tmp, True)
+
+    def test_candidates(self):
+        """
+        Only the connection patterns supporting several storage formats are tuned.
+        """
+        formats = [(config['storage_format'], config['storage_order']) for config in Autotuner.candidates(proj)]
+        self.assertTrue(('lil', 'post_to_pre') in formats)
+        self.assertTrue(('sell', 'post_to_pre') in formats)
+        self.assertFalse(('csr', 'pre_to_post') in formats)
+        self.assertEqual(Autotuner.candidates(proj_one), [])
+
+    def test_decision(self):
+        """
+        The decision is stored in the tuning cache and applied to the compiled projection.
+        """
+        with open(Autotuner.tuning_cache_file(), 'r') as rfile:
+            cache = json.load(rfile)
+        decision = cache[Autotuner.projection_key(proj)]
+        self.assertEqual(decision['storage_format'], self.proj._storage_format)
+        self.assertEqual(len(decision['timings']), len(Autotuner.candidates(proj)))
+
+    def test_reuse(self):
+        """
+        An identical projection takes the decision from the cache without any trial network.
+        """
+        nb_networks = len(Global._network)
+        other = Projection(pop_in, pop_out, "exc")
+        other.connect_all_to_all(weights=0.5, force_multiple_weights=True)
+        Global._network[0]['projections'].remove(other)
+
+        Autotuner.tune([other], directory='annarchy/autotune', silent=True)
+        self.assertEqual(len(Global._network), nb_networks)
+        self.assertEqual(other._storage_format, self.proj._storage_format)
+
+    def test_trial_removed(self):
+        """
+        The trial networks are removed once measured, a new trial network can take the same id.
+        """
+        self.assertEqual(len(Global._network), self.nb_networks)
+        self.assertEqual(len(Simulate._callbacks), self.nb_networks)
+
+        other = Projection(pop_in, pop_out, "exc")
+        other.connect_fixed_probability(0.5, weights=0.5)
+        Global._network[0]['projections'].remove(other)
+
+        Autotuner.tune([other], directory='annarchy/autotune', silent=True)
+        self.assertEqual(len(Global._network), self.nb_networks)
+        self.assertTrue(other._storage_format in ['lil', 'csr', 'sell'])
+
+    def test_sum(self):
+        """
+        The weighted sum does not depend on the selected format.
+        """
+        self.pop_in.baseline = numpy.linspace(0.0, 1.0, 30)
+        self.test_net.simulate(2)
+        self.assertTrue(numpy.allclose(self.pop_out.r, 0.5 * numpy.sum(numpy.linspace(0.0, 1.0, 30))))
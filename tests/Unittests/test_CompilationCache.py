@@ -0,0 +1,110 @@
+"""
+
+    test_CompilationCache.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2019 Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>,
+    Julien Vitay <julien.vitay@informatik.tu-chemnitz.de>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ANNarchy.core import Global
+from ANNarchy.generator import CompilationCache
+
+class test_CompilationCache(unittest.TestCase):
+    """
+    This class tests the storage, lookup and LRU eviction of the cache of compiled networks.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Use a temporary cache directory and a fake generated network.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.prev_cache_dir = Global.config['cache_dir']
+        Global.config['cache_dir'] = self.tmp + '/cache'
+
+        self.source_dir = self.tmp + '/generate'
+        os.mkdir(self.source_dir)
+        with open(self.source_dir + '/ANNarchy.cpp', 'w') as wfile:
+            wfile.write("int main() { return 0; }")
+
+        self.library = self.tmp + '/ANNarchyCore0.so'
+        with open(self.library, 'wb') as wfile:
+            wfile.write(b'0' * 1024)
+
+    @classmethod
+    def tearDownClass(self):
+        Global.config['cache_dir'] = self.prev_cache_dir
+        shutil.rmtree(self.tmp, True)
+
+    def setUp(self):
+        CompilationCache.purge()
+
+    def test_key(self):
+        """
+        The key depends on the content of the generated files.
+        """
+        key = CompilationCache.compute_key(self.source_dir, 'g++')
+        self.assertEqual(key, CompilationCache.compute_key(self.source_dir, 'g++'))
+
+        with open(self.source_dir + '/pop0.hpp', 'w') as wfile:
+            wfile.write("// population")
+        self.assertNotEqual(key, CompilationCache.compute_key(self.source_dir, 'g++'))
+        os.remove(self.source_dir + '/pop0.hpp')
+
+    def test_key_versions(self):
+        """
+        The key depends on the Cython and NumPy versions.
+        """
+        key = CompilationCache.compute_key(self.source_dir, 'g++')
+        for module in [CompilationCache.Cython, CompilationCache.np]:
+            version = module.__version__
+            try:
+                module.__version__ = version + '.dev0'
+                self.assertNotEqual(key, CompilationCache.compute_key(self.source_dir, 'g++'))
+            finally:
+                module.__version__ = version
+        self.assertEqual(key, CompilationCache.compute_key(self.source_dir, 'g++'))
+
+    def test_store_fetch(self):
+        """
+        A stored library can be fetched under the same key only.
+        """
+        target = self.tmp + '/fetched/ANNarchyCore0.so'
+        os.makedirs(os.path.dirname(target))
+
+        self.assertFalse(CompilationCache.fetch('abc', target))
+        CompilationCache.store('abc', self.library)
+        self.assertTrue(CompilationCache.fetch('abc', target))
+        self.assertTrue(os.path.isfile(target))
+        self.assertFalse(CompilationCache.fetch('def', target))
+
+    def test_eviction(self):
+        """
+        The least recently used entries are removed first.
+        """
+        CompilationCache.store('first', self.library)
+        CompilationCache.store('second', self.library)
+        os.utime(Global.config['cache_dir'] + '/first', (0, 0))
+        CompilationCache.evict(1.5/1024.) # one entry of ~1.3 kB fits
+        keys = [entry[0] for entry in CompilationCache.entries()]
+        self.assertEqual(keys, ['second'])
@@ -0,0 +1,201 @@
+"""
+
+    test_Ensemble.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import *
+from ANNarchy.core import Global
+
+class test_Ensemble(unittest.TestCase):
+    """
+    Tests the simulation of several instances of a network compiled in
+    ensemble mode.
+    """
+    @classmethod
+    def setUpClass(self):
+        neuron = Neuron(
+            parameters = """
+                baseline = 0.0
+            """,
+            equations = "r = baseline + sum(exc)"
+        )
+        pop1 = Population((2, 2), neuron)
+        pop2 = Population(3, neuron)
+        proj = Projection(pop1, pop2, "exc")
+        proj.connect_all_to_all(weights=1.0)
+        mon = Monitor(pop2, 'r')
+        pop3 = Population(5, neuron)
+        pop3.baseline = Uniform(0.0, 1.0)
+        self.baseline_before_compile = pop3.baseline
+
+        self.test_net = Network()
+        self.test_net.add([pop1, pop2, proj, mon, pop3])
+        self.test_net.compile(silent=True, ensemble=3)
+
+        self.test_pop1 = self.test_net.get(pop1)
+        self.test_pop2 = self.test_net.get(pop2)
+        self.test_pop3 = self.test_net.get(pop3)
+        self.test_proj = self.test_net.get(proj)
+        self.test_mon = self.test_net.get(mon)
+
+    def setUp(self):
+        """
+        In our *setUp()* method we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+
+    def test_get(self):
+        """
+        Local attributes have one leading dimension for the instances.
+        """
+        self.assertEqual(self.test_pop1.r.shape, (3, 2, 2))
+        self.assertEqual(self.test_pop2.baseline.shape, (3, 3))
+
+    def test_set_per_instance(self):
+        """
+        Values are broadcast to all instances, the instances are simulated
+        independently.
+        """
+        self.test_pop1.baseline = numpy.array([1.0, 2.0, 3.0])[:, None, None]
+        self.test_net.simulate(2)
+
+        self.assertTrue(numpy.allclose(self.test_pop1.r[:, 0, 0], [1.0, 2.0, 3.0]))
+        self.assertTrue(numpy.allclose(self.test_pop2.r, numpy.array([[4.0], [8.0], [12.0]]) * numpy.ones((3, 3))))
+
+    def test_individual_neuron(self):
+        """
+        A single neuron has one value per instance.
+        """
+        self.test_pop2.neuron(1).baseline = [1.0, 2.0, 3.0]
+        self.assertTrue(numpy.allclose(self.test_pop2.neuron(1).baseline, [1.0, 2.0, 3.0]))
+        self.assertTrue(numpy.allclose(self.test_pop2.baseline[:, 0], 0.0))
+
+    def test_monitor(self):
+        """
+        Recordings are reshaped with one dimension for the instances.
+        """
+        self.test_mon.get()
+        self.test_pop1.baseline = 1.0
+        self.test_net.simulate(2)
+
+        data = self.test_mon.get('r', reshape=True)
+        self.assertEqual(data.shape, (2, 3, 3))
+        self.assertTrue(numpy.allclose(data[-1], 4.0))
+
+    def test_connectivity(self):
+        """
+        Each instance has its own copy of the connectivity.
+        """
+        self.assertEqual(self.test_proj.nb_synapses, 3 * 12)
+
+        matrix = self.test_proj.connectivity_matrix()
+        self.assertEqual(matrix.shape, (9, 12))
+        self.assertTrue(numpy.allclose(matrix, numpy.kron(numpy.eye(3), numpy.ones((3, 4)))))
+
+    def test_random_init(self):
+        """
+        Random distributions assigned before compile() are drawn for each
+        instance, also after reset().
+        """
+        baseline = self.test_pop3.baseline
+        self.assertEqual(baseline.shape, (3, 5))
+        self.assertTrue(numpy.allclose(baseline[0], self.baseline_before_compile))
+        self.assertFalse(numpy.allclose(baseline[1], baseline[0]))
+        self.assertFalse(numpy.allclose(baseline[2], baseline[0]))
+
+        self.test_pop3.baseline = 0.0
+        self.test_net.reset()
+        self.assertTrue(numpy.allclose(self.test_pop3.baseline, baseline))
+
+class test_EnsembleGlobalVariables(unittest.TestCase):
+    """
+    Population-wise and projection-wise variables would be shared by the
+    instances, they are rejected in ensemble mode.
+    """
+    def compile_ensemble(self, neuron, synapse):
+        pop = Population(3, neuron)
+        proj = Projection(pop, pop, "exc", synapse)
+        proj.connect_all_to_all(weights=1.0)
+
+        net = Network()
+        net.add([pop, proj])
+        net.compile(silent=True, ensemble=2)
+
+    def test_population_variable(self):
+        """
+        A population-wise variable is rejected, not a population-wise parameter.
+        """
+        neuron = Neuron(
+            parameters = "tau = 10.0 : population",
+            equations = """
+                x = tau : population
+                r = x + sum(exc)
+            """
+        )
+        with self.assertRaises(Global.ANNarchyException):
+            self.compile_ensemble(neuron, Synapse())
+
+    def test_projection_variable(self):
+        """
+        A projection-wise variable is rejected.
+        """
+        neuron = Neuron(equations = "r = sum(exc)")
+        synapse = Synapse(equations = "y = 1.0 : projection")
+        with self.assertRaises(Global.ANNarchyException):
+            self.compile_ensemble(neuron, synapse)
+
+class test_EnsemblePoisson(unittest.TestCase):
+    """
+    A Poisson population with constant rates uses the default code in
+    ensemble mode.
+    """
+    @classmethod
+    def setUpClass(self):
+        pop1 = PoissonPopulation(100, rates=10.0)
+        pop2 = Population(100, Izhikevich)
+        proj = Projection(pop1, pop2, 'exc')
+        proj.connect_fixed_probability(weights=5.0, probability=0.2)
+        mon = Monitor(pop1, 'spike')
+
+        self.test_net = Network()
+        self.test_net.add([pop1, pop2, proj, mon])
+        self.test_net.compile(silent=True, ensemble=4)
+
+        self.test_pop1 = self.test_net.get(pop1)
+        self.test_mon = self.test_net.get(mon)
+
+    def test_rates(self):
+        """
+        Each instance fires at its own rate.
+        """
+        self.test_pop1.rates = numpy.linspace(0.0, 60.0, 4)[:, None]
+        self.test_net.simulate(1000.)
+        spikes = self.test_mon.get('spike')
+        counts = numpy.zeros(400)
+        for rank, times in spikes.items():
+            counts[rank] = len(times)
+        counts = counts.reshape((4, 100)).sum(axis=1)
+        # Poisson counts of 100 neurons during 1 s
+        expected = 100. * numpy.linspace(0.0, 60.0, 4)
+        self.assertTrue(numpy.all(numpy.abs(counts - expected) <= 5. * numpy.sqrt(expected)))
@@ -119,6 +119,16 @@ class test_GlobalOps_1D(unittest.TestCase):
         """
         self.assertTrue(numpy.allclose( self.net_pop.l1, 12.0))
 
+    def test_modified_r(self):
+        """
+        *r* is a parameter: the global operations are recomputed only when it
+        is modified, also for a single neuron.
+        """
+        self.net_pop[3].r = 4.0
+        self.test_net.simulate(2)
+        self.assertTrue( numpy.allclose( self.net_pop.max_r, 4.0) )
+        self.assertTrue( numpy.allclose( self.net_pop.mean_r, 0.5 ) )
+
     def test_get_l2_norm(self):
         """
         Tests the result of *norm2(r)* (L2 norm) for *pop*.
@@ -0,0 +1,243 @@
+"""
+
+    test_IO.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy
+
+from ANNarchy import *
+
+class test_BinarySaveLoad(unittest.TestCase):
+    """
+    Tests saving and loading the state of a network in the directory
+    (raw binary) format.
+    """
+    @classmethod
+    def setUpClass(self):
+        neuron = Neuron(
+            parameters = """
+                tau = 10.0 : population
+                baseline = 0.0
+            """,
+            equations = "tau * dr/dt + r = baseline"
+        )
+        synapse = Synapse(
+            parameters = """
+                eta = 0.1 : projection
+                alpha = 1.0 : postsynaptic
+            """,
+            equations = "x = 1.0"
+        )
+        pop1 = Population((3, 3), neuron)
+        pop2 = Population(4, neuron)
+        proj = Projection(pop1, pop2, "exc", synapse)
+        proj.connect_from_matrix(numpy.array([
+            [1.0, 2.0, None, None, 3.0, None, None, None, None],
+            [None, None, None, 4.0, None, None, None, None, 5.0],
+            [6.0, None, None, None, None, None, None, None, None],
+            [None, 7.0, 8.0, None, None, None, None, None, 9.0]
+        ]))
+        proj_empty = Projection(pop1, pop2, "inh", synapse)
+        proj_empty.connect_fixed_probability(0.0, weights=Uniform(0.0, 1.0))
+
+        self.test_net = Network()
+        self.test_net.add([pop1, pop2, proj, proj_empty])
+        self.test_net.compile(silent=True)
+
+        self.test_pop1 = self.test_net.get(pop1)
+        self.test_pop2 = self.test_net.get(pop2)
+        self.test_proj = self.test_net.get(proj)
+        self.test_proj_empty = self.test_net.get(proj_empty)
+
+        self.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.directory)
+
+    def setUp(self):
+        """
+        In our *setUp()* method we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+
+    def test_save_load(self):
+        """
+        The values of all attributes are restored.
+        """
+        filename = os.path.join(self.directory, 'net') + os.sep
+        self.test_pop1.baseline = numpy.arange(9).reshape((3, 3))
+        self.test_pop2.tau = 5.0
+        self.test_proj.eta = 0.5
+        self.test_proj.alpha = [1.0, 2.0, 3.0, 4.0]
+        self.test_net.save(filename)
+
+        self.test_pop1.baseline = 0.0
+        self.test_pop2.tau = 10.0
+        self.test_proj.eta = 0.1
+        self.test_proj.alpha = 1.0
+        self.test_proj.w = 0.0
+        self.test_net.load(filename)
+
+        self.assertTrue(numpy.allclose(self.test_pop1.baseline, numpy.arange(9).reshape((3, 3))))
+        self.assertEqual(self.test_pop2.tau, 5.0)
+        self.assertEqual(self.test_proj.eta, 0.5)
+        self.assertTrue(numpy.allclose(self.test_proj.alpha, [1.0, 2.0, 3.0, 4.0]))
+        self.assertEqual(self.test_proj.dendrite(3).pre_ranks, [1, 2, 8])
+        self.assertTrue(numpy.allclose(self.test_proj.dendrite(3).w, [7.0, 8.0, 9.0]))
+
+    def test_memmap(self):
+        """
+        The arrays can be read back with numpy.memmap.
+        """
+        filename = os.path.join(self.directory, 'proj') + os.sep
+        self.test_proj.save(filename)
+
+        with open(os.path.join(filename, 'description.json')) as rfile:
+            arrays = json.load(rfile)['arrays']
+        indptr = numpy.memmap(os.path.join(filename, 'indptr.bin'), dtype=arrays['indptr']['dtype'], mode='r')
+        w = numpy.memmap(os.path.join(filename, 'w.bin'), dtype=arrays['w']['dtype'], mode='r')
+
+        self.assertTrue(numpy.allclose(indptr, [0, 3, 5, 6, 9]))
+        self.assertTrue(numpy.allclose(w, numpy.arange(1, 10)))
+
+    def test_empty_projection(self):
+        """
+        A projection without any synapse can be saved and loaded.
+        """
+        filename = os.path.join(self.directory, 'empty') + os.sep
+        self.test_proj_empty.save(filename)
+        self.test_proj_empty.load(filename)
+
+        self.assertEqual(self.test_proj_empty.size, 0)
+        self.assertTrue(numpy.allclose(self.test_proj_empty.connectivity_matrix(), 0.0))
+
+    def test_save_connectivity(self):
+        """
+        save_connectivity() keeps its layout (one list per dendrite), also without any synapse.
+        """
+        from ANNarchy.core.IO import _load_data
+
+        filename = os.path.join(self.directory, 'connectivity.data')
+        self.test_proj.save_connectivity(filename)
+        data = _load_data(filename)
+        self.assertEqual(data['pre_ranks'], [[0, 1, 4], [3, 8], [0], [1, 2, 8]])
+        self.assertEqual(data['w'], [[1.0, 2.0, 3.0], [4.0, 5.0], [6.0], [7.0, 8.0, 9.0]])
+        self.assertEqual(data['nb_synapses'], 9)
+
+        filename = os.path.join(self.directory, 'empty.data')
+        self.test_proj_empty.save_connectivity(filename)
+        data = _load_data(filename)
+        self.assertEqual(data['pre_ranks'], [])
+        self.assertEqual(data['w'], [])
+        self.assertEqual(data['nb_synapses'], 0)
+
+    def test_is_binary(self):
+        """
+        Only directories written in the binary format are recognized without a trailing separator.
+        """
+        from ANNarchy.core.IO import _is_binary
+
+        filename = os.path.join(self.directory, 'binary')
+        self.test_net.save(filename + os.sep)
+        self.assertTrue(_is_binary(filename))
+
+        other = os.path.join(self.directory, 'other')
+        os.mkdir(other)
+        self.assertFalse(_is_binary(other))
+        self.assertTrue(_is_binary(other + os.sep))
+
+    def test_load_wrong_size(self):
+        """
+        Arrays which do not match the network are rejected before reaching the C++ side.
+        """
+        from ANNarchy.core.IO import _read_description, _write_description, _write_array
+        from ANNarchy.core.Global import ANNarchyException
+
+        # Population: the variable is skipped
+        filename = os.path.join(self.directory, 'wrong_pop') + os.sep
+        self.test_pop2.save(filename)
+        desc = _read_description(filename)
+        _write_array(filename, 'r', numpy.ones(3), desc['arrays'])
+        _write_description(filename, desc)
+        self.test_pop2.load(filename)
+        self.assertTrue(numpy.allclose(self.test_pop2.r, 0.0))
+
+        # Projection: the connectivity is inconsistent
+        filename = os.path.join(self.directory, 'wrong_proj') + os.sep
+        self.test_proj.save(filename)
+        desc = _read_description(filename)
+        _write_array(filename, 'indices', numpy.zeros(8, dtype=numpy.int32), desc['arrays'])
+        _write_description(filename, desc)
+        with self.assertRaises(ANNarchyException):
+            self.test_proj.load(filename)
+        self.assertEqual(self.test_proj.dendrite(3).pre_ranks, [1, 2, 8])
+
+class test_Checkpoint(unittest.TestCase):
+    """
+    Tests the periodic checkpoints taken during simulate().
+    """
+    @classmethod
+    def setUpClass(self):
+        neuron = Neuron(
+            parameters = "baseline = 1.0",
+            equations = "r = r + baseline"
+        )
+        pop = Population(3, neuron)
+
+        self.test_net = Network()
+        self.test_net.add([pop])
+        self.test_net.compile(silent=True)
+
+        self.test_pop = self.test_net.get(pop)
+
+        self.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.directory)
+
+    def setUp(self):
+        """
+        In our *setUp()* method we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+
+    def test_restore(self):
+        """
+        Only the last checkpoints are kept, the latest one is restored.
+        """
+        checkpoint = Checkpoint(self.directory, period=5.0, keep=2, net_id=self.test_net.id)
+        self.test_net.simulate(20.0)
+        checkpoint.stop()
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ['latest.json', 'step_10', 'step_15'])
+        # The parameter did not change, its file is shared with the previous checkpoint
+        self.assertEqual(os.stat(os.path.join(self.directory, 'step_15', self.test_pop.name, 'baseline.bin')).st_nlink, 2)
+
+        self.test_net.simulate(5.0)
+        self.assertEqual(checkpoint.restore(), 15.0)
+        self.assertTrue(numpy.allclose(self.test_pop.r, 15.0))
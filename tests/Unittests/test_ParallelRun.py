@@ -0,0 +1,156 @@
+"""
+
+    test_ParallelRun.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import *
+from ANNarchy.core import Global, Simulate
+
+def simulation(idx, net):
+    """
+    The first job disables the learning and a population, adds a monitor
+    and a callback: none of these changes may be visible in the next jobs.
+    """
+    objects = test_ParallelRun.objects
+    if idx == 0:
+        net.get(objects['proj']).disable_learning()
+        net.get(objects['pop_in']).disable()
+        Monitor(net.get(objects['pop_in']), 'r', net_id=net.id)
+
+        @every(period=1.0, net_id=net.id)
+        def increase(n):
+            net.get(objects['pop_out']).baseline += 1.0
+
+    nb_monitors = len(Global._network[net.id]['monitors'])
+    nb_callbacks = len(Simulate._callbacks[net.id])
+    net.simulate(5.0)
+    return (
+        net.get(objects['proj']).w,
+        net.get(objects['pop_out']).r,
+        net.get(objects['mon']).get('r'),
+        nb_monitors,
+        nb_callbacks
+    )
+
+def random_simulation(idx, net):
+    """
+    Returns the random connectivity and the random values of a simulation.
+    """
+    objects = test_ParallelRun.objects
+    net.simulate(2.0)
+    proj = net.get(objects['proj_rnd'])
+    return proj.connectivity_matrix(), net.get(objects['pop_rnd']).r
+
+class test_ParallelRun(unittest.TestCase):
+    """
+    Tests parallel_run() on reused copies of the network.
+    """
+    @classmethod
+    def setUpClass(self):
+        # parallel_run() simulates the network 0, which must only contain
+        # the objects of this test
+        self.network0 = {}
+        for key in ['populations', 'projections', 'monitors']:
+            self.network0[key] = Global._network[0][key]
+            Global._network[0][key] = []
+
+        neuron = Neuron(
+            parameters = "baseline = 1.0",
+            equations = "r = baseline + sum(exc)"
+        )
+        synapse = Synapse(equations = "w = w + 1.0")
+        pop_in = Population(3, neuron)
+        pop_out = Population(2, neuron)
+        proj = Projection(pop_in, pop_out, "exc", synapse)
+        proj.connect_all_to_all(weights=0.0)
+        mon = Monitor(pop_out, 'r')
+
+        pop_rnd = Population(20, Neuron(equations = "r = Uniform(0.0, 1.0)"))
+        proj_rnd = Projection(pop_rnd, pop_rnd, "exc")
+        proj_rnd.connect_fixed_probability(0.3, weights=Uniform(0.0, 1.0))
+        compile(silent=True)
+
+        test_ParallelRun.objects = {'pop_in': pop_in, 'pop_out': pop_out, 'proj': proj, 'mon': mon, 'pop_rnd': pop_rnd, 'proj_rnd': proj_rnd}
+
+    @classmethod
+    def tearDownClass(self):
+        for key, objects in self.network0.items():
+            Global._network[0][key] = objects
+        Global._network[0]['compiled'] = False
+
+    def assertSameResults(self, first, second):
+        self.assertTrue(numpy.allclose(first[0], second[0]))
+        self.assertTrue(numpy.allclose(first[1], second[1]))
+        self.assertTrue(numpy.allclose(first[2], second[2]))
+        self.assertEqual(first[3:], second[3:])
+
+    def test_more_jobs_than_copies(self):
+        """
+        More simulations than copies of the network give the same results as
+        sequential runs.
+        """
+        results = parallel_run(method=simulation, number=6, max_processes=2)
+        sequential = parallel_run(method=simulation, number=6, sequential=True)
+
+        self.assertEqual(len(results), 6)
+        for idx in range(6):
+            self.assertSameResults(results[idx], sequential[idx])
+
+    def test_isolation(self):
+        """
+        The changes made by a simulation are not visible in the next ones.
+        """
+        results = parallel_run(method=simulation, number=3, sequential=True)
+
+        # The modified simulation differs
+        self.assertTrue(numpy.allclose(results[0][0], 0.0))
+        self.assertEqual(results[0][3:], (2, 1))
+
+        # The next ones are identical to the unmodified network
+        for idx in [1, 2]:
+            self.assertTrue(numpy.allclose(results[idx][0], 5.0))
+            self.assertTrue(numpy.allclose(results[idx][1], 1.0 + 3.0 * 4.0))
+            self.assertEqual(results[idx][2].shape, (5, 2))
+            self.assertEqual(results[idx][3:], (1, 0))
+            self.assertSameResults(results[idx], results[1])
+
+    def test_reproducible(self):
+        """
+        All copies use the connectivity of the network, a simulation gives the
+        same results whichever copy runs it, the caller's seed is not modified.
+        """
+        seed = Global.config['seed']
+        state = numpy.random.get_state()
+        first = parallel_run(method=random_simulation, number=6, max_processes=3)
+        second = parallel_run(method=random_simulation, number=6, max_processes=2)
+
+        self.assertEqual(Global.config['seed'], seed)
+        self.assertTrue(numpy.all(numpy.random.get_state()[1] == state[1]))
+
+        connectivity = test_ParallelRun.objects['proj_rnd'].connectivity_matrix()
+        for idx in range(6):
+            self.assertTrue(numpy.allclose(first[idx][0], connectivity))
+            self.assertTrue(numpy.allclose(second[idx][0], connectivity))
+            self.assertTrue(numpy.allclose(first[idx][1], second[idx][1]))
+        self.assertFalse(numpy.allclose(first[0][1], first[1][1]))
@@ -0,0 +1,104 @@
+"""
+
+    test_PoissonPopulation.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import PoissonPopulation, Monitor, Network
+from ANNarchy.core import Global
+
+rates = numpy.linspace(10.0, 100.0, 100)
+
+class test_PoissonPopulation(unittest.TestCase):
+    """
+    Tests the spike trains of Poisson populations with constant rates.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test
+        """
+        pop = PoissonPopulation(100, rates=rates)
+        pop_refractory = PoissonPopulation(100, rates=500.0, refractory=2.0)
+
+        m = Monitor(pop, 'spike')
+        m_refractory = Monitor(pop_refractory, 'spike')
+
+        self.test_net = Network()
+        self.test_net.add([pop, pop_refractory, m, m_refractory])
+        self.test_net.compile(silent=True)
+
+        self.pop = self.test_net.get(pop)
+        self.pop_refractory = self.test_net.get(pop_refractory)
+        self.monitors = {pop.name: self.test_net.get(m), pop_refractory.name: self.test_net.get(m_refractory)}
+
+    def setUp(self):
+        self.test_net.reset()
+        self.pop.rates = rates
+        for monitor in self.monitors.values():
+            monitor.get('spike')
+
+    def count_spikes(self, population, duration):
+        """
+        Number of spikes emitted by each neuron during the simulation.
+        """
+        self.test_net.simulate(duration)
+        spikes = self.monitors[population.name].get('spike')
+        return numpy.array([len(spikes.get(i, [])) for i in range(population.size)]), spikes
+
+    def test_rates(self):
+        """
+        The mean firing rates follow the rates parameter.
+        """
+        counts, _ = self.count_spikes(self.pop, 10000.)
+        # Poisson counts: standard deviation sqrt(rates * T)
+        self.assertTrue(numpy.all(numpy.abs(counts - 10. * rates) < 5. * numpy.sqrt(10. * rates)))
+        self.assertTrue(abs(counts.sum()/10. - rates.sum()) < 0.02 * rates.sum())
+
+    def test_refractory(self):
+        """
+        No spike is emitted during the refractory period.
+        """
+        counts, spikes = self.count_spikes(self.pop_refractory, 1000.)
+        self.assertTrue(min(numpy.diff(spikes.get(i, [])).min() for i in range(100) if counts[i] > 1) > 2.0/Global.config['dt'])
+        # mean inter-spike interval: 2 ms of refractory period + 2 ms at 500 Hz
+        self.assertTrue(numpy.allclose(counts.mean(), 250.0, rtol=0.05))
+
+    def test_change_rates(self):
+        """
+        Modified rates are taken into account at the next step.
+        """
+        self.pop[:50].rates = 0.0
+        counts, _ = self.count_spikes(self.pop, 1000.)
+        self.assertEqual(counts[:50].sum(), 0)
+        self.assertTrue(counts[50:].min() > 0)
+
+    def test_p(self):
+        """
+        The variable p is below the rate of the neurons which fired at the last step.
+        """
+        _, spikes = self.count_spikes(self.pop, 100.)
+        last = self.test_net.get_current_step() - 1
+        fired = numpy.array([last in spikes.get(i, []) for i in range(self.pop.size)])
+        self.assertTrue(numpy.all((self.pop.p < rates) == fired))
+        self.assertTrue(numpy.all(self.pop.p < 1000.0/Global.config['dt']))
@@ -68,7 +68,7 @@ class test_NeuronRandomVariables(unittest.TestCase):
         self.test_net.simulate(1)
 
         if _check_paradigm("openmp"):
-            self.assertTrue(np.allclose(self.net_local_pop.r, [0.99718481, 0.93255736, 0.12812445]))
+            self.assertTrue(np.allclose(self.net_local_pop.r, [0.89468472, 0.87411194, 0.55650023]))
         elif _check_paradigm("cuda"):
             self.assertTrue(np.allclose(self.net_local_pop.r, [0.72449183, 0.43824338, 0.50516922]))
         else:
@@ -78,7 +78,7 @@ class test_NeuronRandomVariables(unittest.TestCase):
         self.test_net.simulate(1)
 
         if _check_paradigm("openmp"):
-            self.assertTrue(np.allclose(self.net_global_pop.r, [0.669746040447]))
+            self.assertTrue(np.allclose(self.net_global_pop.r, [0.286656408397]))
         elif _check_paradigm("cuda"):
             self.assertTrue(np.allclose(self.net_global_pop.r, [0.0883819042494]))
         else:
@@ -120,7 +120,7 @@ class test_SynapseRandomVariables(unittest.TestCase):
         self.test_net.simulate(1)
 
         if _check_paradigm("openmp"):
-            self.assertTrue(np.allclose(self.test_proj.w, [[-0.0005497461789554497], [-0.001402872709127921], [0.0015827522919751402], [-0.0010451468104420224], [0.0002575935412914901]]))
+            self.assertTrue(np.allclose(self.test_proj.w, [[0.00013523557350933382], [-0.0013125404953860552], [0.00199889883346169], [-0.0002909205527428218], [0.00043242896821409706]]))
         elif _check_paradigm("cuda"):
             self.assertTrue(np.allclose(self.test_proj.w, [[0.00042327516097052], [-0.0012390467863954901], [0.000405209302949961], [0.00023072272200176617], [0.0005326660317661457]]))
         else:
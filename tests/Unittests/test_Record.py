@@ -160,6 +160,18 @@ class test_Record(unittest.TestCase):
         datam = self.test_net.get(m).get()
         self.assertTrue(numpy.allclose(datam['r'], [[10.0, 10.0, 10.0], [11.0, 11.0, 11.0], [12.0, 12.0, 12.0], [13.0, 13.0, 13.0], [14.0, 14.0, 14.0], [15.0, 15.0, 15.0], [16.0, 16.0, 16.0], [17.0, 17.0, 17.0], [18.0, 18.0, 18.0], [19.0, 19.0, 19.0]]))
 
+    def test_r_keep(self):
+        """
+        Tests that the data retrieved with *keep=True* is not modified by the following recordings and is still returned by the next call to *get()*.
+        """
+        self.test_net.simulate(5)
+        datam = self.test_net.get(m).get('r', keep=True)
+        self.test_net.simulate(5)
+        self.assertTrue(numpy.allclose(datam, [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [2.0, 2.0, 2.0], [3.0, 3.0, 3.0], [4.0, 4.0, 4.0]]))
+        datam = self.test_net.get(m).get('r')
+        self.assertEqual(datam.shape, (10, 3))
+        self.assertTrue(numpy.allclose(datam[:, 0], [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0]))
+
     def test_r_after_5(self):
         """
         Tests the access to a recording of the variable *r* made at a specific time step.
@@ -192,6 +204,15 @@ class test_Record(unittest.TestCase):
         datar = self.test_net.get(r).get('spike')
         self.assertEqual(datar[0], [4, 6, 8])
 
+    def test_spike_silent(self):
+        """
+        Tests that only the neurons which emitted spikes are keys of the recorded *spikes*.
+        """
+        self.test_net.simulate(3)
+        self.assertEqual(self.test_net.get(r).get('spike'), {})
+        self.test_net.simulate(7)
+        self.assertEqual(sorted(self.test_net.get(r).get('spike').keys()), [0, 1, 2])
+
     def test_r_ref(self):
         """
         Tests if the variable *v* of a *Population* consisting of neurons with a defined *refractory* period is correctly recorded.
@@ -207,3 +228,59 @@ class test_Record(unittest.TestCase):
         self.test_net.simulate(10)
         datas = self.test_net.get(s).get('spike')
         self.assertEqual(datas[1], [2, 7])
+
+class test_SpikeStatistics(unittest.TestCase):
+    """
+    This class tests the offline analysis of recorded spikes.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Spike times (in steps) of three neurons, the second one being silent.
+        """
+        self.spikes = {0: [2, 4, 8, 16], 1: [], 2: [1, 5, 9]}
+
+    def test_raster_plot(self):
+        """
+        Tests that the spike times and ranks are flattened in the order of the dictionary.
+        """
+        t, n = raster_plot(self.spikes)
+        self.assertTrue(numpy.allclose(t, dt() * numpy.array([2, 4, 8, 16, 1, 5, 9])))
+        self.assertTrue(numpy.allclose(n, [0, 0, 0, 0, 2, 2, 2]))
+
+    def test_histogram(self):
+        """
+        Tests the number of spikes per bin of 5 steps, starting at the first spike.
+        """
+        self.assertTrue(numpy.allclose(histogram(self.spikes, bins=5.0*dt()), [4, 2, 0, 1]))
+
+    def test_inter_spike_interval(self):
+        """
+        Tests the inter-spike intervals of all neurons and per neuron.
+        """
+        self.assertTrue(numpy.allclose(inter_spike_interval(self.spikes), dt() * numpy.array([2, 4, 8, 4, 4])))
+        isi = inter_spike_interval(self.spikes, ranks=[0, 1], per_neuron=True)
+        self.assertEqual(sorted(isi.keys()), [0, 1])
+        self.assertTrue(numpy.allclose(isi[0], dt() * numpy.array([2, 4, 8])))
+        self.assertEqual(len(isi[1]), 0)
+
+    def test_silent_neuron(self):
+        """
+        A requested neuron which never spiked is absent from the dictionary returned by ``get('spike')``.
+        """
+        spikes = {0: [2, 4, 8, 16], 2: [1, 5, 9]}
+        isi = inter_spike_interval(spikes, ranks=[0, 3], per_neuron=True)
+        self.assertTrue(numpy.allclose(isi[0], dt() * numpy.array([2, 4, 8])))
+        self.assertEqual(len(isi[3]), 0)
+        self.assertTrue(numpy.allclose(inter_spike_interval(spikes, ranks=[2, 3]), dt() * numpy.array([4, 4])))
+        cv = coefficient_of_variation(spikes, ranks=[0, 3], per_neuron=True)
+        self.assertEqual(sorted(cv.keys()), [0])
+
+    def test_coefficient_of_variation(self):
+        """
+        Tests the coefficient of variation of the inter-spike intervals of each neuron.
+        """
+        cv = coefficient_of_variation(self.spikes, per_neuron=True)
+        self.assertEqual(sorted(cv.keys()), [0, 2])
+        self.assertAlmostEqual(cv[0], numpy.std([2, 4, 8])/numpy.mean([2, 4, 8]))
+        self.assertAlmostEqual(cv[2], 0.0)
@@ -0,0 +1,155 @@
+"""
+
+    test_SELLConnectivity.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import Neuron, Synapse, Population, Projection, Network, Uniform
+
+input_neuron = Neuron(
+    parameters = "baseline = 0.0",
+    equations = "r = baseline"
+)
+
+neuron = Neuron(
+    equations = "r = sum(exc)"
+)
+
+neuron_max = Neuron(
+    equations = "r = sum(inh)"
+)
+
+oja = Synapse(
+    parameters = """
+        eta = 0.01 : postsynaptic
+        alpha = 0.1
+    """,
+    equations = """
+        dw/dt = eta * ( pre.r * post.r - alpha * post.r^2 * w ) : min=-1.0
+        z = 2 * w
+    """
+)
+
+max_synapse = Synapse(
+    psp = "w * pre.r",
+    operation = "max"
+)
+
+class test_SELLConnectivity(unittest.TestCase):
+    """
+    Tests the sliced ELLPACK (sell) storage format against the default list-of-lists.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test
+        """
+        pop_in = Population(20, input_neuron)
+        pop_lil = Population(13, neuron)
+        pop_sell = Population(13, neuron)
+        pop_max = Population(13, neuron_max)
+
+        proj_lil = Projection(pop_in, pop_lil, "exc", oja)
+        proj_lil.connect_all_to_all(weights=Uniform(0.0, 1.0), storage_format="lil")
+
+        proj_sell = Projection(pop_in, pop_sell, "exc", oja)
+        proj_sell.connect_all_to_all(weights=Uniform(0.0, 1.0), storage_format="sell")
+
+        proj_max = Projection(pop_in, pop_max, "inh", max_synapse)
+        proj_max.connect_fixed_number_pre(5, weights=Uniform(-1.0, 1.0), storage_format="sell")
+
+        self.test_net = Network()
+        self.test_net.add([pop_in, pop_lil, pop_sell, pop_max, proj_lil, proj_sell, proj_max])
+        self.test_net.compile(silent=True)
+
+        self.pop_in = self.test_net.get(pop_in)
+        self.pop_lil = self.test_net.get(pop_lil)
+        self.pop_sell = self.test_net.get(pop_sell)
+        self.pop_max = self.test_net.get(pop_max)
+        self.proj_lil = self.test_net.get(proj_lil)
+        self.proj_sell = self.test_net.get(proj_sell)
+        self.proj_max = self.test_net.get(proj_max)
+
+    def setUp(self):
+        """
+        The same weights are used in both projections.
+        """
+        self.test_net.reset(synapses=True)
+        self.pop_in.baseline = numpy.sin(numpy.arange(20))
+        self.proj_sell.w = self.proj_lil.w
+
+    def test_dendrite(self):
+        """
+        The synapses of a dendrite are accessed as with lil.
+        """
+        self.assertEqual(self.proj_sell.nb_synapses, 13 * 20)
+        self.assertEqual(self.proj_sell.dendrite(3).pre_ranks, list(range(20)))
+        self.proj_sell.dendrite(3).synapse(7).w = 0.5
+        self.assertEqual(self.proj_sell.dendrite(3).synapse(7).w, 0.5)
+        self.assertEqual(self.proj_sell.w[3][7], 0.5)
+
+    def test_sum(self):
+        """
+        The weighted sums and the learned weights are the same as with lil.
+        """
+        self.test_net.simulate(20)
+        self.assertTrue(numpy.allclose(self.pop_lil.r, self.pop_sell.r))
+        self.assertTrue(numpy.allclose(self.proj_lil.w, self.proj_sell.w))
+        self.assertTrue(numpy.allclose(self.proj_lil.z, self.proj_sell.z))
+
+    def test_max(self):
+        """
+        The maximum is taken over the synapses of each dendrite.
+        """
+        self.test_net.simulate(2)
+        rates = numpy.zeros(13)
+        for dendrite in self.proj_max.dendrites:
+            psp = numpy.array(dendrite.w) * self.pop_in.r[dendrite.pre_ranks]
+            rates[dendrite.post_rank] = psp.max()
+        self.assertTrue(numpy.allclose(self.pop_max.r, rates))
+
+    def test_max_empty_row(self):
+        """
+        A dendrite without synapses does not contribute to the maximum.
+        """
+        desc, arrays = self.proj_max._binary_data()
+        arrays = dict(arrays)
+        indptr = numpy.array(arrays['indptr'])
+        try:
+            # Remove the synapses of the first dendrite
+            empty = dict(arrays)
+            empty['indptr'] = numpy.concatenate(([0, 0], indptr[2:] - indptr[1]))
+            empty['indices'] = arrays['indices'][indptr[1]:]
+            empty['w'] = arrays['w'][indptr[1]:]
+            self.proj_max._load_binary_data(desc, empty)
+            self.assertEqual(self.proj_max.nb_synapses, 12 * 5)
+
+            self.test_net.simulate(2)
+            rates = numpy.zeros(13)
+            for dendrite in self.proj_max.dendrites:
+                if dendrite.size > 0:
+                    psp = numpy.array(dendrite.w) * self.pop_in.r[dendrite.pre_ranks]
+                    rates[dendrite.post_rank] = psp.max()
+            self.assertTrue(numpy.allclose(self.pop_max.r, rates))
+        finally:
+            self.proj_max._load_binary_data(desc, arrays)
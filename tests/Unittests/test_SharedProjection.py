@@ -0,0 +1,124 @@
+"""
+
+    test_SharedProjection.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import Neuron, Population, Network
+from ANNarchy.core import Global
+from ANNarchy.extensions.weightsharing import SharedProjection
+
+input_neuron = Neuron(
+    parameters = "baseline = 0.0",
+    equations = "r = baseline"
+)
+
+neuron = Neuron(
+    equations = "r = sum(exc)"
+)
+
+rng = numpy.random.RandomState(1)
+kernel = rng.uniform(-1.0, 1.0, (3, 5))
+separable_kernel = numpy.outer(rng.uniform(-1.0, 1.0, 5), rng.uniform(-1.0, 1.0, 3))
+bank = rng.uniform(-1.0, 1.0, (4, 3, 3))
+
+pop_in = Population((12, 10), input_neuron)
+
+# Each backend is compared to the default loop with the same arguments
+cases = {
+    'split': ((12, 10), {'weights': kernel, 'padding': 'border'}, {'operation': 'max'}),
+    'separable': ((6, 5), {'weights': separable_kernel, 'method': 'filter'}, {}),
+    'gemm': ((6, 5, 4), {'weights': bank, 'multiple': True, 'delays': 2.0}, {}),
+}
+
+pops = {}
+projs = {}
+for backend, (geometry, convolve_args, proj_args) in cases.items():
+    for name in ['loop', backend]:
+        pops[(backend, name)] = Population(geometry, neuron)
+        projs[(backend, name)] = SharedProjection(pop_in, pops[(backend, name)], "exc", **proj_args)
+        projs[(backend, name)].convolve(backend=name, **convolve_args)
+
+class test_SharedProjection(unittest.TestCase):
+    """
+    Tests the backends of the convolution with shared weights against the default loop.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test
+        """
+        self.test_net = Network()
+        self.test_net.add([pop_in] + list(pops.values()) + list(projs.values()))
+        self.test_net.compile(silent=True)
+
+        self.pop_in = self.test_net.get(pop_in)
+
+    def setUp(self):
+        self.test_net.reset()
+        self.pop_in.baseline = rng.uniform(0.0, 1.0, (12, 10))
+
+    def assertSameRates(self, backend):
+        self.assertTrue(numpy.allclose(
+            self.test_net.get(pops[(backend, 'loop')]).r,
+            self.test_net.get(pops[(backend, backend)]).r
+        ))
+
+    def test_split(self):
+        """
+        Interior and border neurons computed separately.
+        """
+        self.test_net.simulate(2)
+        self.assertSameRates('split')
+
+    def test_separable(self):
+        """
+        Rank-1 kernel applied as two 1D filters, and default loop when the new kernel is not separable.
+        """
+        self.test_net.simulate(2)
+        self.assertSameRates('separable')
+
+        for name in ['loop', 'separable']:
+            self.test_net.get(projs[('separable', name)]).cyInstance.set_w(kernel.T.tolist())
+        self.test_net.simulate(2)
+        self.assertSameRates('separable')
+
+    def test_gemm(self):
+        """
+        Bank of filters computed as a matrix product, with delays.
+        """
+        self.test_net.simulate(4)
+        self.assertSameRates('gemm')
+
+    def test_auto(self):
+        """
+        Selection of the backend.
+        """
+        def selected(post, weights, **args):
+            proj = SharedProjection(pop_in, post, "exc").convolve(weights, backend='auto', **args)
+            Global._network[0]['projections'].remove(proj)
+            return proj.backend
+
+        self.assertEqual(selected(pops[('gemm', 'loop')], bank, multiple=True), 'gemm')
+        self.assertEqual(selected(pops[('split', 'loop')], separable_kernel), 'separable')
+        self.assertEqual(selected(pops[('split', 'loop')], kernel), 'split')
@@ -0,0 +1,162 @@
+"""
+
+    test_Simulate.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import *
+from ANNarchy.core import Global
+
+class test_AsyncSimulation(unittest.TestCase):
+    """
+    Tests the simulation of a network in a background thread with
+    *simulate_async()*.
+    """
+    @classmethod
+    def setUpClass(self):
+        neuron = Neuron(
+            parameters = "baseline = 1.0",
+            equations = "r += baseline"
+        )
+        pop = Population(3, neuron)
+        mon = Monitor(pop, 'r')
+
+        self.test_net = Network()
+        self.test_net.add([pop, mon])
+        self.test_net.compile(silent=True)
+
+        self.test_pop = self.test_net.get(pop)
+        self.test_mon = self.test_net.get(mon)
+
+    def setUp(self):
+        """
+        In our *setUp()* method we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+        self.test_net.set_current_step(0)
+
+    def test_result(self):
+        """
+        The simulation runs to its end, *result()* returns the simulated
+        duration.
+        """
+        sim = self.test_net.simulate_async(100., batch=7)
+        self.assertEqual(sim.result(), 100.)
+        self.assertTrue(sim.done())
+        self.assertFalse(sim.cancelled())
+        self.assertEqual(sim.progress, 1.0)
+        self.assertEqual(self.test_net.get_current_step(), 100)
+        self.assertTrue(numpy.allclose(self.test_pop.r, 100.))
+
+    def test_cancel(self):
+        """
+        A cancelled simulation stops at the end of a batch.
+        """
+        sim = self.test_net.simulate_async(10000., batch=1)
+        sim.add_done_callback(lambda s: self.assertTrue(s.done()))
+        sim.cancel()
+        duration = sim.result()
+        self.assertTrue(sim.cancelled())
+        self.assertFalse(sim.cancel())
+        self.assertTrue(duration < 10000.)
+        self.assertEqual(self.test_net.get_current_step(), int(duration / dt()))
+
+    def test_running(self):
+        """
+        The network can not be simulated twice at the same time.
+        """
+        from ANNarchy.core.Global import ANNarchyException
+        sim = self.test_net.simulate_async(10000., batch=1)
+        with self.assertRaises(ANNarchyException):
+            self.test_net.step()
+        sim.cancel()
+        sim.wait()
+        self.test_net.step()
+
+    def test_concurrent_start(self):
+        """
+        Only one of several concurrent calls to *simulate_async()* starts a
+        simulation.
+        """
+        import threading
+        from ANNarchy.core.Global import ANNarchyException
+        barrier = threading.Barrier(8)
+        started = []
+        errors = []
+
+        def start():
+            barrier.wait()
+            try:
+                started.append(self.test_net.simulate_async(10000., batch=1))
+            except ANNarchyException:
+                errors.append(True)
+
+        # Switch often between the threads so that they interleave inside simulate_async()
+        import sys
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=start) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        for sim in started:
+            sim.cancel()
+            sim.wait()
+        self.assertEqual(len(started), 1)
+        self.assertEqual(len(errors), 7)
+
+    def test_running_access(self):
+        """
+        The recordings and the state of the populations can not be modified
+        during the simulation.
+        """
+        from ANNarchy.core.Global import ANNarchyException
+        sim = self.test_net.simulate_async(10000., batch=1)
+        with self.assertRaises(ANNarchyException):
+            self.test_mon.get('r')
+        with self.assertRaises(ANNarchyException):
+            self.test_mon.pause()
+        with self.assertRaises(ANNarchyException):
+            self.test_pop.reset()
+        with self.assertRaises(ANNarchyException):
+            self.test_pop.clear()
+        with self.assertRaises(ANNarchyException):
+            Monitor(self.test_pop, 'r', net_id=self.test_net.id)
+        self.assertEqual(len(Global._network[self.test_net.id]['monitors']), 1)
+        sim.cancel()
+        sim.wait()
+        self.assertEqual(self.test_mon.get('r').shape[1], 3)
+
+    def test_await(self):
+        """
+        The simulation can be awaited in a coroutine.
+        """
+        import asyncio
+        async def run():
+            return await self.test_net.simulate_async(10.)
+        self.assertEqual(asyncio.run(run()), 10.)
+        self.assertTrue(numpy.allclose(self.test_pop.r, 10.))
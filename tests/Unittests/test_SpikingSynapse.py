@@ -131,3 +131,58 @@ class test_PostSpike(unittest.TestCase):
         # w should not increase further
         self.test_net.simulate(5)
         self.assertTrue(numpy.allclose(self.test_proj.dendrite(0).w, [10.0, 10.0]))
+
+class test_NonUniformDelay(unittest.TestCase):
+    """
+    This class tests the transmission of spikes through synapses with
+    non-uniform delays.
+    """
+    @classmethod
+    def setUpClass(self):
+        # Both presynaptic neurons spike at t = 1 ms
+        inp = SpikeSourceArray(spike_times=[[1.0], [1.0]])
+
+        # mp is the input received during the step
+        SpkNeuron = Neuron(
+            equations = "mp = g_exc",
+            spike = "mp > 100.0"
+        )
+        pop = Population(2, neuron=SpkNeuron)
+
+        # post 0 receives pre 0 after 2 ms and pre 1 after 3 ms, post 1 receives pre 0 after 5 ms
+        proj = Projection(inp, pop, "exc")
+        proj.connect_from_matrix(
+            weights=numpy.array([[1.0, 2.0], [4.0, None]]),
+            delays=numpy.array([[2.0, 3.0], [5.0, 0.0]])
+        )
+
+        self.test_net = Network()
+        self.test_net.add([inp, pop, proj])
+        self.test_net.compile(silent=True)
+
+        self.test_pop = self.test_net.get(pop)
+
+    def setUp(self):
+        """
+        In our *setUp()* method we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+
+    def test_arrival(self):
+        """
+        The spikes of each synapse arrive after the corresponding delay.
+        """
+        self.test_net.simulate(3)
+        self.assertTrue(numpy.allclose(self.test_pop.mp, [0.0, 0.0]))
+
+        self.test_net.simulate(1)
+        self.assertTrue(numpy.allclose(self.test_pop.mp, [1.0, 0.0]))
+
+        self.test_net.simulate(1)
+        self.assertTrue(numpy.allclose(self.test_pop.mp, [2.0, 0.0]))
+
+        self.test_net.simulate(1)
+        self.assertTrue(numpy.allclose(self.test_pop.mp, [0.0, 0.0]))
+
+        self.test_net.simulate(1)
+        self.assertTrue(numpy.allclose(self.test_pop.mp, [0.0, 4.0]))
@@ -128,6 +128,74 @@ class test_StructuralPlasticityModelDelay(unittest.TestCase):
         pass
 
 
+class test_StructuralPlasticityRules(unittest.TestCase):
+    """
+    This class tests the *creating* and *pruning* conditions defined in the
+    synapse description, which are evaluated periodically once
+    *start_creating()* and *start_pruning()* have been called.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test
+        """
+        neuron = Neuron(parameters="r = 0.0")
+
+        synapse = Synapse(
+            creating="pre.r * post.r > 0.5 : w = 2.0",
+            pruning="w < 0.5"
+        )
+
+        pop = Population(4, neuron)
+
+        proj = Projection(pop, pop, "exc", synapse)
+        proj.connect_from_matrix(numpy.array([
+            [None, 0.1, 0.2, 1.0],
+            [0.3, None, 1.0, None],
+            [1.0, 0.4, None, 0.2],
+            [None, None, None, None]
+        ]))
+
+        self.test_net = Network()
+        self.test_net.add([pop, proj])
+        self.test_net.compile(silent=True)
+
+        self.test_pop = self.test_net.get(pop)
+        self.test_proj = self.test_net.get(proj)
+
+    def setUp(self):
+        """
+        In our *setUp()* function we call *reset()* to reset the network.
+        """
+        self.test_net.reset()
+
+    def test_pruning_creating(self):
+        """
+        All synapses fulfilling the pruning condition are removed in one
+        step, including consecutive synapses of a dendrite. The synapses
+        fulfilling the creating condition are then inserted in the dendrites,
+        which remain sorted by presynaptic rank.
+        """
+        self.test_proj.start_pruning(period=1.0)
+        self.test_net.simulate(1)
+        self.test_proj.stop_pruning()
+
+        self.assertEqual(self.test_proj.dendrite(0).pre_ranks, [3])
+        self.assertEqual(self.test_proj.dendrite(1).pre_ranks, [2])
+        self.assertEqual(self.test_proj.dendrite(2).pre_ranks, [0])
+
+        self.test_pop.r = [0.0, 0.8, 0.9, 1.0]
+        self.test_proj.start_creating(period=1.0)
+        self.test_net.simulate(1)
+        self.test_proj.stop_creating()
+
+        self.assertEqual(self.test_proj.dendrite(0).pre_ranks, [3])
+        self.assertEqual(self.test_proj.dendrite(1).pre_ranks, [1, 2, 3])
+        self.assertTrue(numpy.allclose(self.test_proj.dendrite(1).w, [2.0, 1.0, 2.0]))
+        self.assertEqual(self.test_proj.dendrite(2).pre_ranks, [0, 1, 2, 3])
+        self.assertTrue(numpy.allclose(self.test_proj.dendrite(2).w, [1.0, 2.0, 2.0, 2.0]))
+
+
 class test_StructuralPlasticityEnvironment(unittest.TestCase):
     """
     This class tests the *Structural Plasticity* feature, which can optinally
@@ -228,3 +296,60 @@ class test_StructuralPlasticityEnvironment(unittest.TestCase):
 
         self.assertEqual(self.test_proj2.dendrite(3).pre_ranks, [2, 3, 4, 6])
         self.assertTrue(numpy.allclose(self.test_proj2.dendrite(3).w, [2.0, 1.0, 2.0, 2.0]))
+
+class test_StructuralPlasticityInverse(unittest.TestCase):
+    """
+    Spiking projections transmit the spikes through the inverse connectivity, which is
+    rebuilt after synapses were pruned or created. The post-synaptic neurons must receive
+    exactly the weights of the synapses existing at the time of the spike.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test
+        """
+        neuron = Neuron(
+            equations="v += g_exc",
+            spike="v > 1000.0"
+        )
+
+        inp = SpikeSourceArray(spike_times=[[1.0, 3.0] for _ in range(6)])
+        pop = Population(4, neuron)
+
+        proj = Projection(pre=inp, post=pop, target="exc")
+        proj.connect_all_to_all(weights=1.0)
+
+        self.test_net = Network()
+        self.test_net.add([inp, pop, proj])
+        self.test_net.compile(silent=True)
+
+        self.test_pop = self.test_net.get(pop)
+        self.test_proj = self.test_net.get(proj)
+
+    def setUp(self):
+        """
+        In our *setUp()* function we call *reset()* to reset the network.
+        """
+        self.test_net.reset(synapses=True)
+
+    def test_inverse(self):
+        """
+        Distinct weights are used, so that a synapse index left stale in the inverse
+        connectivity after a pruning would transmit the weight of another synapse.
+        """
+        for dendrite in self.test_proj.dendrites:
+            dendrite.w = [1.0 + 0.1 * rk for rk in dendrite.pre_ranks]
+
+        # the spikes emitted at 1 ms are received at the next step
+        self.test_net.simulate(3)
+        self.assertTrue(numpy.allclose(self.test_pop.v, [sum(d.w) for d in self.test_proj.dendrites]))
+
+        self.test_proj.dendrite(1).prune_synapse(0)
+        self.test_proj.dendrite(1).prune_synapse(3)
+        self.test_proj.dendrite(2).prune_synapse(5)
+        self.test_proj.dendrite(2).create_synapse(5, 10.0)
+        self.test_proj.dendrite(3).prune_synapse(2)
+
+        self.test_pop.v = 0.0
+        self.test_net.simulate(2)
+        self.assertTrue(numpy.allclose(self.test_pop.v, [sum(d.w) for d in self.test_proj.dendrites]))
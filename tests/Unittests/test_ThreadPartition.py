@@ -0,0 +1,166 @@
+"""
+
+    test_ThreadPartition.py
+
+    This file is part of ANNarchy.
+
+    Copyright (C) 2013-2016 Joseph Gussev <joseph.gussev@s2012.tu-chemnitz.de>,
+    Helge Uelo Dinkelbach <helge.dinkelbach@gmail.com>
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    ANNarchy is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import unittest
+import numpy
+
+from ANNarchy import Neuron, Synapse, Population, Projection, Network, CSR, Uniform
+from ANNarchy.core import Global
+
+input_neuron = Neuron(
+    parameters = "baseline = 1.0",
+    equations = "r = baseline"
+)
+
+neuron = Neuron(
+    equations = "r = sum(exc)"
+)
+
+spiking_neuron = Neuron(
+    parameters = "v = 1",
+    equations = "mp = g_exc",
+    spike = "v > 0"
+)
+
+counting_synapse = Synapse(
+    equations = """
+        updates = updates + 1
+        noise = Uniform(0.0, 1.0)
+    """
+)
+
+post_synapse = Synapse(
+    post_spike = "w += 1.0"
+)
+
+def skewed_pattern(pre, post, weight):
+    """
+    The first dendrite receives all presynaptic neurons, the odd ones a few
+    of them and the even ones are empty.
+    """
+    synapses = CSR()
+    synapses.add(0, list(range(pre.size)), [weight] * pre.size, [0.0] * pre.size)
+    for rk in range(1, post.size, 2):
+        nb = rk % 7 + 1
+        synapses.add(rk, list(range(nb)), [weight] * nb, [0.0] * nb)
+    return synapses
+
+class test_ThreadPartition(unittest.TestCase):
+    """
+    The synaptic loops distribute blocks of dendrites with similar numbers of
+    synapses between the threads. Each synapse must be processed exactly once,
+    whatever the number of threads.
+    """
+    @classmethod
+    def setUpClass(self):
+        """
+        Compile the network for this test with openMP (csr does not support structural plasticity)
+        """
+        self.config = dict(Global.config)
+        Global.config['num_threads'] = 4
+        Global.config['structural_plasticity'] = False
+
+        pop_in = Population(200, input_neuron)
+        pop_lil = Population(150, neuron)
+        pop_csr = Population(150, neuron)
+        pop_spk = Population(150, spiking_neuron)
+
+        proj_lil = Projection(pop_in, pop_lil, "exc", counting_synapse)
+        proj_lil.connect_with_func(skewed_pattern, weight=1.0)
+
+        proj_csr = Projection(pop_in, pop_csr, "exc")
+        proj_csr.connect_all_to_all(weights=1.0, force_multiple_weights=True, storage_format="csr")
+
+        proj_spk = Projection(pop_spk, pop_spk, "exc", post_synapse)
+        proj_spk.connect_with_func(skewed_pattern, weight=0.0)
+
+        self.test_net = Network()
+        self.test_net.add([pop_in, pop_lil, pop_csr, pop_spk, proj_lil, proj_csr, proj_spk])
+        self.test_net.compile(silent=True)
+
+        self.pop_lil = self.test_net.get(pop_lil)
+        self.pop_csr = self.test_net.get(pop_csr)
+        self.pop_spk = self.test_net.get(pop_spk)
+        self.proj_lil = self.test_net.get(proj_lil)
+        self.proj_csr = self.test_net.get(proj_csr)
+        self.proj_spk = self.test_net.get(proj_spk)
+
+    @classmethod
+    def tearDownClass(self):
+        Global.config['num_threads'] = self.config['num_threads']
+        Global.config['structural_plasticity'] = self.config['structural_plasticity']
+
+    def set_threads(self, number):
+        Global._network[self.test_net.id]['instance'].set_number_threads(number)
+
+    def test_sum(self):
+        """
+        Each synapse contributes once to the weighted sum.
+        """
+        for number in [4, 1]:
+            self.set_threads(number)
+            self.test_net.simulate(2)
+            sizes = numpy.zeros(150)
+            for dendrite in self.proj_lil.dendrites:
+                sizes[dendrite.post_rank] = dendrite.size
+            self.assertTrue(numpy.allclose(self.pop_lil.r, sizes))
+            self.assertTrue(numpy.allclose(self.pop_csr.r, 200.0))
+
+    def test_update(self):
+        """
+        Each synapse is updated once per step.
+        """
+        for number in [4, 1]:
+            self.set_threads(number)
+            self.proj_lil.updates = 0.0
+            self.test_net.simulate(3)
+            for dendrite in self.proj_lil.dendrites:
+                self.assertTrue(numpy.allclose(dendrite.updates, 3.0))
+
+    def test_post_event(self):
+        """
+        The synapses of the neurons which fired are processed once per spike.
+        """
+        self.pop_spk.v = numpy.arange(150) % 3
+        for number in [4, 1]:
+            self.set_threads(number)
+            self.proj_spk.w = 0.0
+            self.test_net.simulate(3)
+            for dendrite in self.proj_spk.dendrites:
+                expected = 3.0 if dendrite.post_rank % 3 else 0.0
+                self.assertTrue(numpy.allclose(dendrite.w, expected))
+
+    def test_random(self):
+        """
+        All random values are drawn again at each step, independently of the number of threads.
+        """
+        noise = []
+        for number in [4, 1]:
+            self.set_threads(number)
+            self.test_net.set_current_step(10)
+            self.test_net.simulate(1)
+            previous = numpy.concatenate([dendrite.noise for dendrite in self.proj_lil.dendrites])
+            self.test_net.simulate(1)
+            noise.append(numpy.concatenate([dendrite.noise for dendrite in self.proj_lil.dendrites]))
+            self.assertTrue(numpy.all(noise[-1] != previous))
+        self.assertTrue(numpy.allclose(noise[0], noise[1]))
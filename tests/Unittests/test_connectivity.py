@@ -52,18 +52,30 @@ class TestConnectivity(unittest.TestCase):
         proj1 = Projection(pre=pop1, post=pop2, target="exc")
         proj2 = Projection(pre=pop1, post=pop2, target="exc")
         proj3 = Projection(pre=pop1, post=pop2, target="exc")
+        proj4 = Projection(pre=pop1, post=pop2, target="exc")
+        proj5 = Projection(pre=pop1, post=pop2, target="exc")
+        proj6 = Projection(pre=pop1, post=pop2, target="exc")
+        proj7 = Projection(pre=pop1, post=pop2, target="exc")
 
         proj1.connect_one_to_one(weights=0.1)
         proj2.connect_all_to_all(weights=0.1)
         proj3.connect_fixed_number_pre(3, weights=0.1)
+        proj4.connect_gaussian(amp=1.0, sigma=0.5, limit=0.5)
+        proj5.connect_distance(kernel=lambda d: 1.0 - d, radius=0.5)
+        proj6.connect_fixed_number_post(3, weights=0.1)
+        proj7.connect_fixed_probability(1.0, weights=0.1)
 
         cls.test_net = Network()
-        cls.test_net.add([pop1, pop2, proj1, proj2, proj3])
+        cls.test_net.add([pop1, pop2, proj1, proj2, proj3, proj4, proj5, proj6, proj7])
         cls.test_net.compile(silent=True)
 
         cls.test_proj1 = cls.test_net.get(proj1)
         cls.test_proj2 = cls.test_net.get(proj2)
         cls.test_proj3 = cls.test_net.get(proj3)
+        cls.test_proj4 = cls.test_net.get(proj4)
+        cls.test_proj5 = cls.test_net.get(proj5)
+        cls.test_proj6 = cls.test_net.get(proj6)
+        cls.test_proj7 = cls.test_net.get(proj7)
 
     def setUp(self):
         """
@@ -98,3 +110,51 @@ class TestConnectivity(unittest.TestCase):
         """
         tmp = [dend.size for dend in self.test_proj3.dendrites]
         self.assertTrue(np.allclose(tmp, 3))
+
+    def test_fixed_number_post(self):
+        """
+        Each pre-synaptic neuron projects on exactly 3 post-synaptic neurons.
+        """
+        pre_ranks = np.concatenate([dend.pre_ranks for dend in self.test_proj6.dendrites])
+        self.assertTrue(np.allclose(np.bincount(pre_ranks, minlength=9), 3))
+
+    def test_fixed_probability(self):
+        """
+        With a probability of 1, all synapses are created.
+        """
+        self.assertEqual(self.test_proj7.dendrite(3).pre_ranks, [0, 1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertTrue(np.allclose(self.test_proj7.dendrite(3).w, 0.1))
+
+    def test_gaussian(self):
+        """
+        Tests the *gaussian* connectivity pattern. The neighbours in the
+        normalized space are at a distance of 0.5, the diagonal ones are
+        below the limit.
+        """
+        self.assertEqual(self.test_proj4.dendrite(4).pre_ranks, [1, 3, 4, 5, 7])
+        self.assertTrue(np.allclose(self.test_proj4.dendrite(4).w, [np.exp(-0.5), np.exp(-0.5), 1.0, np.exp(-0.5), np.exp(-0.5)]))
+        self.assertEqual(self.test_proj4.dendrite(0).pre_ranks, [0, 1, 3])
+
+    def test_distance(self):
+        """
+        Tests the *distance* connectivity pattern with a linear kernel.
+        """
+        self.assertEqual(self.test_proj5.dendrite(4).pre_ranks, [1, 3, 4, 5, 7])
+        self.assertTrue(np.allclose(self.test_proj5.dendrite(4).w, [0.5, 0.5, 1.0, 0.5, 0.5]))
+        self.assertEqual(self.test_proj5.dendrite(8).pre_ranks, [5, 7, 8])
+
+    def test_connectivity_matrix(self):
+        """
+        The dense matrix has the post-synaptic neurons as first index.
+        """
+        matrix = self.test_proj5.connectivity_matrix(fill=-1.0)
+        self.assertTrue(np.allclose(matrix[4], [-1.0, 0.5, -1.0, 0.5, 1.0, 0.5, -1.0, 0.5, -1.0]))
+        self.assertTrue(np.allclose(matrix[8], [-1.0, -1.0, -1.0, -1.0, -1.0, 0.5, -1.0, 0.5, 1.0]))
+
+    def test_to_scipy_sparse(self):
+        """
+        The sparse matrix has the pre-synaptic neurons as first index.
+        """
+        matrix = self.test_proj5.to_scipy_sparse()
+        self.assertEqual(matrix.nnz, self.test_proj5.nb_synapses)
+        self.assertTrue(np.allclose(matrix.toarray().T, self.test_proj5.connectivity_matrix()))